@@ -543,6 +543,23 @@ async def health_check():
         )
 
 
+@app.get("/api/research/metrics")
+async def koji_metrics(limit: Optional[int] = None):
+    """
+    Koji query metrics for this process
+
+    Returns per-statement-template latency histograms, row counts and
+    bytes returned, costliest first. ``limit`` keeps only the top entries.
+    """
+    koji_client = getattr(app.state, "koji_client", None)
+    if koji_client is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Koji client not initialized",
+        )
+    return koji_client.query_stats.snapshot(limit=limit)
+
+
 # Mount session router
 from tkr_docusearch.api.research_sessions import router as sessions_router  # noqa: E402
 
@@ -14,6 +14,8 @@ from typing import Any, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 
+from ...storage import DOCUMENT_SUMMARY_COLUMNS
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/graph", tags=["graph"])
@@ -52,33 +54,37 @@ async def graph_overview(
     storage = _require_storage()
 
     try:
-        # Fetch documents with graph properties
+        # Fetch documents with graph properties, streaming so only one
+        # batch of raw metadata JSON is held at a time
         if project_id:
-            docs_result = storage.query(
+            doc_batches = storage.query_batches(
                 "SELECT doc_id, filename, format, num_pages, metadata "
-                "FROM documents WHERE project_id = ? ORDER BY doc_id",
-                [project_id],
+                "FROM documents WHERE project_id = ?",
+                key="doc_id",
+                params=[project_id],
             )
         else:
-            docs_result = storage.query(
+            doc_batches = storage.query_batches(
                 "SELECT doc_id, filename, format, num_pages, metadata "
-                "FROM documents ORDER BY doc_id"
+                "FROM documents",
+                key="doc_id",
             )
-        d = docs_result.to_pydict()
 
         nodes = []
-        for i in range(docs_result.num_rows):
-            meta = _parse_metadata(d["metadata"][i])
-            graph = meta.get("graph", {})
-            nodes.append({
-                "doc_id": d["doc_id"][i],
-                "filename": d["filename"][i],
-                "format": d["format"][i],
-                "num_pages": d["num_pages"][i],
-                "pagerank_score": graph.get("pagerank_score", 0.0),
-                "community_id": graph.get("community_id"),
-                "hub_score": graph.get("hub_score", 0),
-            })
+        for batch in doc_batches:
+            d = batch.to_pydict()
+            for i in range(batch.num_rows):
+                meta = _parse_metadata(d["metadata"][i])
+                graph = meta.get("graph", {})
+                nodes.append({
+                    "doc_id": d["doc_id"][i],
+                    "filename": d["filename"][i],
+                    "format": d["format"][i],
+                    "num_pages": d["num_pages"][i],
+                    "pagerank_score": graph.get("pagerank_score", 0.0),
+                    "community_id": graph.get("community_id"),
+                    "hub_score": graph.get("hub_score", 0),
+                })
 
         # Edge counts by type
         if project_id:
@@ -148,13 +154,15 @@ async def graph_neighborhood(
     storage = _require_storage()
 
     # Verify document exists
-    doc = storage.get_document(doc_id)
+    doc = storage.get_document_summary(doc_id)
     if doc is None:
         raise HTTPException(404, f"Document '{doc_id}' not found")
 
     try:
         # Get related documents via BFS
-        related = storage.get_related_documents(doc_id, max_depth=depth)
+        related = storage.get_related_documents(
+            doc_id, max_depth=depth, columns=DOCUMENT_SUMMARY_COLUMNS,
+        )
 
         # Get all edges for the center + related documents
         all_doc_ids = {doc_id} | {r["doc_id"] for r in related}
@@ -198,7 +206,7 @@ async def graph_path(
 
     # Verify both documents exist
     for did, label in [(source, "Source"), (target, "Target")]:
-        if storage.get_document(did) is None:
+        if not storage.document_exists(did):
             raise HTTPException(404, f"{label} document '{did}' not found")
 
     try:
@@ -263,7 +271,7 @@ async def graph_communities(
     for label, doc_ids in sorted(groups.items(), key=lambda x: -len(x[1])):
         members = []
         for did in sorted(doc_ids):
-            doc = storage.get_document(did)
+            doc = storage.get_document_summary(did)
             if doc:
                 members.append({
                     "doc_id": did,
@@ -313,7 +321,7 @@ async def graph_importance(
 
     documents = []
     for doc_id, score in ranked:
-        doc = storage.get_document(doc_id)
+        doc = storage.get_document_summary(doc_id)
         if doc:
             meta = _parse_metadata(doc.get("metadata"))
             graph = meta.get("graph", {})
@@ -349,7 +357,7 @@ async def graph_similar(
     """
     storage = _require_storage()
 
-    doc = storage.get_document(doc_id)
+    doc = storage.get_document_summary(doc_id)
     if doc is None:
         raise HTTPException(404, f"Document '{doc_id}' not found")
 
@@ -382,7 +390,7 @@ async def graph_similar(
 
     results = []
     for other_id, score in unique[:limit]:
-        other_doc = storage.get_document(other_id)
+        other_doc = storage.get_document_summary(other_id)
         if other_doc:
             results.append({
                 "doc_id": other_id,
@@ -522,7 +530,7 @@ async def graph_reading_order(
         # Fetch document details
         documents = []
         for i, doc_id in enumerate(ordered_ids):
-            doc = storage.get_document(doc_id)
+            doc = storage.get_document_summary(doc_id)
             if doc:
                 documents.append({
                     "position": i + 1,
@@ -543,6 +551,32 @@ async def graph_reading_order(
     }
 
 
+# ---------------------------------------------------------------------------
+# GET /api/graph/stats — graph index and algorithm cache statistics
+# ---------------------------------------------------------------------------
+
+
+@router.get("/stats")
+async def graph_stats():
+    """Relation graph size and graph algorithm cache statistics.
+
+    The algorithm cache lives in this process's storage client, so the
+    hit rate reflects requests served by this API server.
+    """
+    storage = _require_storage()
+
+    try:
+        index = storage.graph_index().stats()
+    except Exception as exc:
+        logger.error(f"graph_stats failed: {exc}", exc_info=True)
+        raise HTTPException(500, f"Failed to load graph stats: {exc}")
+
+    return {
+        "graph": index,
+        "algorithm_cache": storage.graph_cache_stats(),
+    }
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -584,24 +618,24 @@ def _collect_edges(
     edge_types: Optional[str] = None,
 ) -> list[dict]:
     """Collect all edges between a set of documents."""
-    type_filter = set(edge_types.split(",")) if edge_types else None
+    type_filter = edge_types.split(",") if edge_types else None
+    try:
+        # Every edge inside the set is an outgoing edge of one member.
+        grouped = storage.get_relations_for(
+            doc_ids, direction="outgoing", relation_types=type_filter,
+        )
+    except Exception:
+        return []
+
     seen: set[tuple[str, str, str]] = set()
     edges: list[dict] = []
-
-    for doc_id in doc_ids:
-        try:
-            relations = storage.get_relations(doc_id, direction="both")
-        except Exception:
-            continue
-
+    for relations in grouped.values():
         for rel in relations:
             src = rel["src_doc_id"]
             dst = rel["dst_doc_id"]
             rtype = rel["relation_type"]
 
-            if src not in doc_ids or dst not in doc_ids:
-                continue
-            if type_filter and rtype not in type_filter:
+            if dst not in doc_ids:
                 continue
 
             key = (src, dst, rtype)
@@ -623,38 +657,13 @@ def _reconstruct_path(
     target: str,
     max_depth: int = 10,
 ) -> list[dict]:
-    """BFS to reconstruct the shortest path between two documents."""
-    from collections import deque
-
-    visited = {source}
-    queue: deque[tuple[str, list[dict]]] = deque([(source, [])])
-
-    while queue:
-        current, path = queue.popleft()
-        if len(path) >= max_depth:
-            continue
-
-        try:
-            relations = storage.get_relations(current, direction="outgoing")
-        except Exception:
-            continue
-
-        for rel in relations:
-            neighbor = rel["dst_doc_id"]
-            if neighbor in visited:
-                continue
-            visited.add(neighbor)
-
-            step = {
-                "from": current,
-                "to": neighbor,
-                "relation_type": rel["relation_type"],
-            }
-            new_path = path + [step]
-
-            if neighbor == target:
-                return new_path
-
-            queue.append((neighbor, new_path))
-
-    return []
+    """BFS over the storage graph index for the shortest path between two documents."""
+    try:
+        steps = storage.graph_index().shortest_path(source, target, max_depth=max_depth)
+    except Exception as exc:
+        logger.warning(f"graph path lookup failed: {exc}")
+        return []
+    return [
+        {"from": src, "to": dst, "relation_type": rel_type}
+        for src, dst, rel_type in steps
+    ]
@@ -287,8 +287,10 @@ async def get_status():
     stats = SystemStats()
     if _app_state["storage_client"]:
         try:
-            docs = _app_state["storage_client"].list_documents(limit=10000)
-            stats.total_documents = len(docs)
+            docs_result = _app_state["storage_client"].query(
+                "SELECT COUNT(*) AS cnt FROM documents"
+            )
+            stats.total_documents = docs_result.column("cnt")[0].as_py()
             pages_result = _app_state["storage_client"].query(
                 "SELECT COUNT(*) AS cnt FROM pages"
             )
@@ -17,13 +17,47 @@ class KojiConfig:
         db_path: Path to the Koji database file.
         server_port: Port for Koji server (reserved for multi-process access).
         sync_on_write: Whether to flush to disk after mutations.
-        compact_interval: Number of writes before triggering compaction.
+        run_maintenance: Whether this client runs the background
+            compaction scheduler. Enable it only in the one long-lived
+            service that owns the database; every other process
+            (worker pool children, short-lived clients, CLIs) leaves it
+            off so they do not compact the same dataset concurrently.
+        compact_interval: Writes (or new data fragments) since the last
+            compaction before background compaction becomes due. ``0``
+            disables compaction.
+        compact_idle_seconds: Seconds without writes before a due
+            compaction may run.
+        compact_check_seconds: How often the maintenance thread
+            re-evaluates whether compaction is due.
+        cache_max_entries: Rows cached per table by the read-through row
+            cache. ``0`` disables the cache.
+        cache_max_bytes: Estimated bytes cached per table.
+        cache_ttl_seconds: Seconds before a cached row expires, bounding
+            staleness from writes made by other processes. ``0`` never
+            expires rows.
+        graph_index_ttl_seconds: Seconds before the in-memory relation
+            graph index is reloaded, picking up relations written by
+            other processes. ``0`` never reloads.
+        graph_cache_max_entries: Graph algorithm results (PageRank,
+            communities, topological order, ...) kept per client.
+            ``0`` disables the result cache.
+        slow_query_ms: Koji statements at or above this latency are
+            logged with redacted parameters. ``0`` disables the log.
     """
 
     db_path: str = os.getenv("KOJI_DB_PATH", "./data/koji.db")
     server_port: int = int(os.getenv("KOJI_SERVER_PORT", "8003"))
     sync_on_write: bool = os.getenv("KOJI_SYNC_ON_WRITE", "true").lower() == "true"
+    run_maintenance: bool = os.getenv("KOJI_RUN_MAINTENANCE", "false").lower() == "true"
     compact_interval: int = int(os.getenv("KOJI_COMPACT_INTERVAL", "100"))
+    compact_idle_seconds: float = float(os.getenv("KOJI_COMPACT_IDLE_SECONDS", "5"))
+    compact_check_seconds: float = float(os.getenv("KOJI_COMPACT_CHECK_SECONDS", "30"))
+    cache_max_entries: int = int(os.getenv("KOJI_CACHE_MAX_ENTRIES", "1024"))
+    cache_max_bytes: int = int(os.getenv("KOJI_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_ttl_seconds: float = float(os.getenv("KOJI_CACHE_TTL_SECONDS", "300"))
+    graph_index_ttl_seconds: float = float(os.getenv("KOJI_GRAPH_INDEX_TTL_SECONDS", "300"))
+    graph_cache_max_entries: int = int(os.getenv("KOJI_GRAPH_CACHE_MAX_ENTRIES", "128"))
+    slow_query_ms: float = float(os.getenv("KOJI_SLOW_QUERY_MS", "500"))
 
     @classmethod
     def from_env(cls) -> "KojiConfig":
@@ -36,7 +70,16 @@ class KojiConfig:
             db_path=os.getenv("KOJI_DB_PATH", "./data/koji.db"),
             server_port=int(os.getenv("KOJI_SERVER_PORT", "8003")),
             sync_on_write=os.getenv("KOJI_SYNC_ON_WRITE", "true").lower() == "true",
+            run_maintenance=os.getenv("KOJI_RUN_MAINTENANCE", "false").lower() == "true",
             compact_interval=int(os.getenv("KOJI_COMPACT_INTERVAL", "100")),
+            compact_idle_seconds=float(os.getenv("KOJI_COMPACT_IDLE_SECONDS", "5")),
+            compact_check_seconds=float(os.getenv("KOJI_COMPACT_CHECK_SECONDS", "30")),
+            cache_max_entries=int(os.getenv("KOJI_CACHE_MAX_ENTRIES", "1024")),
+            cache_max_bytes=int(os.getenv("KOJI_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            cache_ttl_seconds=float(os.getenv("KOJI_CACHE_TTL_SECONDS", "300")),
+            graph_index_ttl_seconds=float(os.getenv("KOJI_GRAPH_INDEX_TTL_SECONDS", "300")),
+            graph_cache_max_entries=int(os.getenv("KOJI_GRAPH_CACHE_MAX_ENTRIES", "128")),
+            slow_query_ms=float(os.getenv("KOJI_SLOW_QUERY_MS", "500")),
         )
 
     def to_dict(self) -> dict:
@@ -49,7 +92,16 @@ class KojiConfig:
             "db_path": self.db_path,
             "server_port": self.server_port,
             "sync_on_write": self.sync_on_write,
+            "run_maintenance": self.run_maintenance,
             "compact_interval": self.compact_interval,
+            "compact_idle_seconds": self.compact_idle_seconds,
+            "compact_check_seconds": self.compact_check_seconds,
+            "cache_max_entries": self.cache_max_entries,
+            "cache_max_bytes": self.cache_max_bytes,
+            "cache_ttl_seconds": self.cache_ttl_seconds,
+            "graph_index_ttl_seconds": self.graph_index_ttl_seconds,
+            "graph_cache_max_entries": self.graph_cache_max_entries,
+            "slow_query_ms": self.slow_query_ms,
         }
 
     def __repr__(self) -> str:
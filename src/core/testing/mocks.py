@@ -24,8 +24,9 @@ Classes:
 
 import logging
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import numpy as np
 from PIL import Image
@@ -395,6 +396,8 @@ class MockKojiClient:
         self._pages: List[Dict[str, Any]] = []
         self._chunks: List[Dict[str, Any]] = []
         self._relations: List[Dict[str, Any]] = []
+        self._relations_version: int = 0
+        self._row_writes: int = 0
         self._open: bool = False
 
     # ------------------------------------------------------------------
@@ -412,6 +415,11 @@ class MockKojiClient:
     def sync(self) -> None:
         """No-op — in-memory store requires no syncing."""
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """No-op — in-memory writes are applied immediately."""
+        yield
+
     # ------------------------------------------------------------------
     # Health / introspection
     # ------------------------------------------------------------------
@@ -470,17 +478,96 @@ class MockKojiClient:
             "enrichment": enrichment,
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
+        self._row_writes += 1
 
-    def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+    def get_document(
+        self,
+        doc_id: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
         """Retrieve a document by ID.
 
         Args:
             doc_id: Document identifier.
+            columns: Optional column projection (``doc_id`` always included).
 
         Returns:
             Document dict or ``None`` if not found.
         """
-        return self._documents.get(doc_id)
+        doc = self._documents.get(doc_id)
+        if doc is None or columns is None:
+            return doc
+        return self._project(doc, columns)
+
+    def get_document_summary(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a document without its ``markdown`` and ``enrichment``.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            Document summary dict or ``None`` if not found.
+        """
+        from src.storage.koji_client import DOCUMENT_SUMMARY_COLUMNS
+
+        return self.get_document(doc_id, columns=DOCUMENT_SUMMARY_COLUMNS)
+
+    def find_document_by_filename(
+        self,
+        filename: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Retrieve the newest document with an exact *filename*.
+
+        Args:
+            filename: Stored filename to match.
+            columns: Optional column projection (``doc_id`` always included).
+
+        Returns:
+            Document dict or ``None`` if no document matches.
+        """
+        matches = [d for d in self._documents.values() if d.get("filename") == filename]
+        if not matches:
+            return None
+        doc = max(matches, key=lambda d: d.get("created_at", ""))
+        return doc if columns is None else self._project(doc, columns)
+
+    def document_exists(self, doc_id: str) -> bool:
+        """Check whether a document exists.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            ``True`` if the document exists.
+        """
+        return doc_id in self._documents
+
+    def get_documents(
+        self,
+        doc_ids: Iterable[str],
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Retrieve several documents keyed by ID.
+
+        Args:
+            doc_ids: Document identifiers.
+            columns: Optional column projection (``doc_id`` always included).
+
+        Returns:
+            Mapping of ``doc_id`` to document dict; missing IDs are omitted.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        for doc_id in doc_ids:
+            doc = self.get_document(doc_id, columns=columns)
+            if doc is not None:
+                found[doc_id] = doc
+        return found
+
+    @staticmethod
+    def _project(doc: Dict[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+        """Return a copy of *doc* restricted to *columns* plus ``doc_id``."""
+        return {k: doc.get(k) for k in ("doc_id", *columns)}
 
     def list_documents(
         self,
@@ -488,6 +575,7 @@ class MockKojiClient:
         project_id: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """List documents with optional format and project filters.
 
@@ -496,6 +584,7 @@ class MockKojiClient:
             project_id: Filter by project (optional).
             limit: Maximum number of results.
             offset: Number of results to skip.
+            columns: Optional column projection (``doc_id`` always included).
 
         Returns:
             List of document dicts.
@@ -505,7 +594,78 @@ class MockKojiClient:
             docs = [d for d in docs if d["format"] == format]
         if project_id is not None:
             docs = [d for d in docs if d.get("project_id") == project_id]
-        return docs[offset : offset + limit]
+        docs = docs[offset : offset + limit]
+        if columns is not None:
+            docs = [self._project(d, columns) for d in docs]
+        return docs
+
+    def list_document_summaries(
+        self,
+        project_id: Optional[str] = None,
+        search: Optional[str] = None,
+        extensions: Optional[List[str]] = None,
+        sort_by: str = "newest_first",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[List[Dict[str, Any]], int]:
+        """List lightweight document summaries with filters and paging.
+
+        Mirrors the filtering and sort semantics of the real client's SQL
+        pushdown using in-memory data.
+
+        Args:
+            project_id: Filter by project (optional).
+            search: Case-insensitive filename substring (optional).
+            extensions: Allowed filename extensions with dot prefix (optional).
+            sort_by: ``newest_first``, ``oldest_first``, ``name_asc``, ``name_desc``.
+            limit: Maximum number of results.
+            offset: Number of results to skip.
+
+        Returns:
+            Tuple of ``(summaries, total)``.
+        """
+        docs = list(self._documents.values())
+        if project_id is not None:
+            docs = [d for d in docs if d.get("project_id") == project_id]
+        if search:
+            docs = [d for d in docs if search.lower() in (d.get("filename") or "").lower()]
+        if extensions is not None:
+            docs = [
+                d for d in docs
+                if any((d.get("filename") or "").lower().endswith(ext) for ext in extensions)
+            ]
+
+        if sort_by in ("name_asc", "name_desc"):
+            docs.sort(
+                key=lambda d: ((d.get("filename") or "").lower(), d["doc_id"]),
+                reverse=sort_by == "name_desc",
+            )
+        else:
+            docs.sort(
+                key=lambda d: (d.get("created_at") or "", d["doc_id"]),
+                reverse=sort_by != "oldest_first",
+            )
+
+        total = len(docs)
+        summaries: List[Dict[str, Any]] = []
+        for doc in docs[offset : offset + limit]:
+            pages = self.get_pages_for_document(doc["doc_id"])
+            first_page = pages[0] if pages else None
+            summaries.append({
+                "doc_id": doc["doc_id"],
+                "project_id": doc.get("project_id"),
+                "filename": doc.get("filename"),
+                "format": doc.get("format"),
+                "created_at": doc.get("created_at"),
+                "metadata": doc.get("metadata"),
+                "page_count": len(pages),
+                "chunk_count": len(self.get_chunks_for_document(doc["doc_id"])),
+                "first_page_num": first_page.get("page_num") if first_page else None,
+                "first_page_has_image": bool(
+                    first_page and (first_page.get("thumb") or first_page.get("image"))
+                ),
+            })
+        return summaries, total
 
     def update_document(self, doc_id: str, **fields: Any) -> None:
         """Update fields on an existing document.
@@ -516,6 +676,7 @@ class MockKojiClient:
         """
         if doc_id in self._documents:
             self._documents[doc_id].update(fields)
+            self._row_writes += 1
 
     def delete_document(self, doc_id: str) -> None:
         """Delete a document and all associated pages, chunks, and relations.
@@ -531,6 +692,7 @@ class MockKojiClient:
             for r in self._relations
             if r.get("src_doc_id") != doc_id and r.get("dst_doc_id") != doc_id
         ]
+        self._relations_version += 1
 
     # ------------------------------------------------------------------
     # Page operations
@@ -543,6 +705,7 @@ class MockKojiClient:
             pages: List of page dicts (must include ``id``, ``doc_id``, ``page_num``).
         """
         self._pages.extend(pages)
+        self._row_writes += 1
 
     def get_pages_for_document(self, doc_id: str) -> List[Dict[str, Any]]:
         """Get all pages for a document, sorted by page number.
@@ -569,6 +732,113 @@ class MockKojiClient:
         """
         return next((p for p in self._pages if p.get("id") == page_id), None)
 
+    def get_page_image(
+        self, doc_id: str, page_num: int, thumbnail: bool = False
+    ) -> Optional[bytes]:
+        """Get a page's stored image or thumbnail bytes.
+
+        Args:
+            doc_id: Document identifier.
+            page_num: 1-based page number.
+            thumbnail: Return the ``thumb`` column instead of ``image``.
+
+        Returns:
+            Image bytes or ``None`` if the page or column is empty.
+        """
+        column = "thumb" if thumbnail else "image"
+        page = next(
+            (
+                p for p in self._pages
+                if p.get("doc_id") == doc_id and p.get("page_num") == page_num
+            ),
+            None,
+        )
+        return page.get(column) if page else None
+
+    def list_pages_missing_thumbs(
+        self, after_id: str = "", limit: int = 32
+    ) -> List[Dict[str, Any]]:
+        """List pages without a thumbnail, in page ID order.
+
+        Args:
+            after_id: Return pages with ``id`` greater than this.
+            limit: Maximum pages to return.
+
+        Returns:
+            List of dicts with ``id``, ``doc_id``, ``page_num``, ``image``.
+        """
+        pages = sorted(
+            (p for p in self._pages if not p.get("thumb") and p["id"] > after_id),
+            key=lambda p: p["id"],
+        )
+        return [
+            {k: p.get(k) for k in ("id", "doc_id", "page_num", "image")}
+            for p in pages[:limit]
+        ]
+
+    def set_page_thumbs(self, thumbs: Dict[str, bytes]) -> int:
+        """Store thumbnail bytes on pages.
+
+        Args:
+            thumbs: Mapping of page ID to thumbnail bytes.
+
+        Returns:
+            Number of pages updated.
+        """
+        updated = 0
+        for page in self._pages:
+            if page.get("id") in thumbs:
+                page["thumb"] = thumbs[page["id"]]
+                updated += 1
+        return updated
+
+    def list_rows_missing_pooled(
+        self, table: str, after_id: str = "", limit: int = 256
+    ) -> List[Dict[str, Any]]:
+        """List pages or chunks with an embedding but no pooled vector.
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            after_id: Return rows with ``id`` greater than this.
+            limit: Maximum rows to return.
+
+        Returns:
+            List of dicts with ``id`` and ``embedding``.
+        """
+        rows = sorted(
+            (
+                r for r in self._pooled_rows(table)
+                if r.get("embedding") and not r.get("pooled_embedding")
+                and r["id"] > after_id
+            ),
+            key=lambda r: r["id"],
+        )
+        return [{"id": r["id"], "embedding": r["embedding"]} for r in rows[:limit]]
+
+    def set_pooled_embeddings(self, table: str, pooled: Dict[str, bytes]) -> int:
+        """Store pooled vectors on pages or chunks.
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            pooled: Mapping of row ID to packed pooled vector.
+
+        Returns:
+            Number of rows updated.
+        """
+        updated = 0
+        for row in self._pooled_rows(table):
+            if row.get("id") in pooled:
+                row["pooled_embedding"] = pooled[row["id"]]
+                updated += 1
+        if updated:
+            self._row_writes += 1
+        return updated
+
+    def _pooled_rows(self, table: str) -> List[Dict[str, Any]]:
+        if table not in ("pages", "chunks"):
+            raise ValueError(f"table must be pages or chunks, got {table!r}")
+        return self._pages if table == "pages" else self._chunks
+
     # ------------------------------------------------------------------
     # Chunk operations
     # ------------------------------------------------------------------
@@ -580,6 +850,7 @@ class MockKojiClient:
             chunks: List of chunk dicts (must include ``id``, ``doc_id``, ``page_num``).
         """
         self._chunks.extend(chunks)
+        self._row_writes += 1
 
     def get_chunks_for_document(self, doc_id: str) -> List[Dict[str, Any]]:
         """Get all chunks for a document, sorted by page then chunk ID.
@@ -652,6 +923,61 @@ class MockKojiClient:
             "relation_type": relation_type,
             "metadata": metadata,
         })
+        self._relations_version += 1
+
+    def create_relations_bulk(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        on_conflict: str = "skip",
+    ) -> Dict[str, int]:
+        """Create many relationships, skipping invalid and duplicate rows.
+
+        Args:
+            rows: Relation dicts with ``src_doc_id``, ``dst_doc_id``,
+                ``relation_type`` and optional ``metadata``.
+            on_conflict: ``"skip"`` or ``"replace"`` existing relations.
+
+        Returns:
+            Dict with ``created``, ``replaced``, and ``skipped`` counts.
+
+        Raises:
+            ValueError: If *on_conflict* is not a recognised mode.
+        """
+        if on_conflict not in ("skip", "replace"):
+            raise ValueError(f"Invalid on_conflict mode: {on_conflict!r}")
+
+        index = {
+            (r["src_doc_id"], r["dst_doc_id"], r["relation_type"]): r
+            for r in self._relations
+        }
+        seen: set = set()
+        counts = {"created": 0, "replaced": 0, "skipped": 0}
+        for row in rows:
+            key = (row["src_doc_id"], row["dst_doc_id"], row["relation_type"])
+            if (
+                key in seen
+                or key[0] not in self._documents
+                or key[1] not in self._documents
+                or (key in index and on_conflict == "skip")
+            ):
+                counts["skipped"] += 1
+                continue
+            seen.add(key)
+            if key in index:
+                index[key]["metadata"] = row.get("metadata")
+                counts["replaced"] += 1
+                continue
+            relation = {
+                "src_doc_id": key[0],
+                "dst_doc_id": key[1],
+                "relation_type": key[2],
+                "metadata": row.get("metadata"),
+            }
+            self._relations.append(relation)
+            index[key] = relation
+            counts["created"] += 1
+        self._relations_version += 1
+        return counts
 
     def get_relations(
         self,
@@ -683,6 +1009,37 @@ class MockKojiClient:
 
         return results
 
+    def get_relations_for(
+        self,
+        doc_ids: Iterable[str],
+        direction: str = "both",
+        relation_types: Optional[Iterable[str]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get relations for several documents keyed by ID.
+
+        Args:
+            doc_ids: Document identifiers.
+            direction: ``"outgoing"``, ``"incoming"``, or ``"both"``.
+            relation_types: Optional filter by relation types.
+
+        Returns:
+            Mapping of every requested ``doc_id`` to its relation dicts.
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        if direction not in ("outgoing", "incoming", "both"):
+            raise ValueError(f"Invalid relation direction: {direction!r}")
+
+        types = set(relation_types) if relation_types else None
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for doc_id in doc_ids:
+            relations = self.get_relations(doc_id, direction=direction)
+            if types is not None:
+                relations = [r for r in relations if r["relation_type"] in types]
+            grouped[doc_id] = relations
+        return grouped
+
     def delete_relation(
         self,
         src_doc_id: str,
@@ -705,11 +1062,56 @@ class MockKojiClient:
                 and r["relation_type"] == relation_type
             )
         ]
+        self._relations_version += 1
+
+    def graph_index(self) -> Any:
+        """Build a graph index over the in-memory relations.
+
+        Returns:
+            A fresh ``GraphIndex`` whose version counts relation writes.
+        """
+        from src.storage.graph_index import GraphIndex, edge_weight
+
+        return GraphIndex.from_edges(
+            (
+                (r["src_doc_id"], r["dst_doc_id"], r["relation_type"],
+                 edge_weight(r.get("metadata")))
+                for r in self._relations
+            ),
+            version=self._relations_version,
+        )
+
+    @property
+    def graph_version(self) -> int:
+        """Number of relation writes so far."""
+        return self._relations_version
+
+    @property
+    def index_version(self) -> int:
+        """Number of document, page, chunk and relation writes so far."""
+        return self._row_writes + self._relations_version
+
+    def graph_cache_stats(self) -> Dict[str, Any]:
+        """Graph algorithm cache counters (the mock never caches).
+
+        Returns:
+            Zeroed counters shaped like ``KojiClient.graph_cache_stats``.
+        """
+        return {
+            "entries": 0,
+            "max_entries": 0,
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "compute_ms_total": 0.0,
+            "algorithms": {},
+        }
 
     def get_related_documents(
         self,
         root_doc_id: str,
         max_depth: int = 3,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Find all documents related to a root document via graph traversal.
 
@@ -718,6 +1120,7 @@ class MockKojiClient:
         Args:
             root_doc_id: Starting document identifier.
             max_depth: Maximum traversal depth.
+            columns: Optional column projection (``doc_id`` always included).
 
         Returns:
             List of related document dicts with ``depth`` and ``relation_type``.
@@ -738,7 +1141,7 @@ class MockKojiClient:
             doc_id, depth, rel_type = queue.popleft()
             doc = self._documents.get(doc_id)
             if doc is not None:
-                result = dict(doc)
+                result = dict(doc) if columns is None else self._project(doc, columns)
                 result["depth"] = depth
                 result["relation_type"] = rel_type
                 results.append(result)
@@ -978,6 +1381,7 @@ class MockKojiClient:
         self._relations = [
             r for r in self._relations if r["relation_type"] != relation_type
         ]
+        self._relations_version += 1
         return original_count - len(self._relations)
 
     # ------------------------------------------------------------------
@@ -1002,6 +1406,28 @@ class MockKojiClient:
 
         raise KojiQueryError("MockKojiClient does not support raw SQL")
 
+    def query_batches(
+        self,
+        sql: str,
+        key: Any,
+        params: Optional[List[Any]] = None,
+        batch_size: int = 1000,
+    ) -> Any:
+        """Not supported in mock — raises ``KojiQueryError``.
+
+        Args:
+            sql: SQL query string.
+            key: Key column(s) to paginate by.
+            params: Optional query parameters.
+            batch_size: Maximum rows per batch.
+
+        Raises:
+            KojiQueryError: Always — raw SQL is not supported in mock.
+        """
+        from src.storage.koji_client import KojiQueryError
+
+        raise KojiQueryError("MockKojiClient does not support raw SQL")
+
     def insert(self, table: str, data: Any) -> None:
         """Not supported in mock — raises ``NotImplementedError``.
 
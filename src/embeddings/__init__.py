@@ -2,9 +2,13 @@
 Embeddings module for DocuSearch.
 
 This module provides the QueryEngine for semantic search
-over Koji multi-vector embeddings.
+over Koji multi-vector embeddings, the QueryEmbeddingCache it uses to
+skip the model for repeated queries, and the QueryBatcher that coalesces
+concurrent queries into one model call.
 """
 
+from .query_batcher import QueryBatcher
+from .query_cache import QueryEmbeddingCache
 from .query_engine import QueryEngine
 
-__all__ = ["QueryEngine"]
+__all__ = ["QueryEngine", "QueryEmbeddingCache", "QueryBatcher"]
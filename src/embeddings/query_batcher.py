@@ -0,0 +1,225 @@
+"""Micro-batching for query encoding.
+
+``QueryEngine`` funnels every cache-missing query through a
+:class:`QueryBatcher`. A single inference thread owns the model call:
+it takes the first waiting query, gathers whatever else arrives within a
+short window (up to a maximum batch size), encodes them with one
+``encode_queries`` call and resolves each caller's future. Concurrent
+searches therefore share forward passes, and the engine's event loop is
+only ever driven from one thread.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from typing import Any, Optional
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_STOP = object()
+
+
+class QueryBatcher:
+    """Coalesce concurrent encode requests onto one inference thread.
+
+    Args:
+        encode_batch: Encodes a list of queries, returning one array per
+            query in order. Only ever called from the inference thread.
+        window_ms: How long to wait for more queries after the first one
+            of a batch arrives.
+        max_batch_size: Maximum queries per ``encode_batch`` call.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[list[str]], Sequence[np.ndarray]],
+        window_ms: float = 5.0,
+        max_batch_size: int = 16,
+    ) -> None:
+        self._encode_batch = encode_batch
+        self._window_s = max(window_ms, 0.0) / 1000.0
+        self._max_batch_size = max(max_batch_size, 1)
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Guards ``_accepting`` so no request is enqueued after the
+        # inference thread has drained the queue for the last time.
+        self._lifecycle_lock = threading.Lock()
+        self._accepting = False
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._queries = 0
+        self._largest_batch = 0
+        self._encode_ms_total = 0.0
+
+    @property
+    def running(self) -> bool:
+        """Whether the inference thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the inference thread. Idempotent."""
+        with self._lifecycle_lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="query-encoder", daemon=True,
+            )
+            self._accepting = True
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the batch in flight, fail queued requests, and join.
+
+        Args:
+            timeout: Seconds to wait for the inference thread.
+        """
+        with self._lifecycle_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._accepting = False
+            self._queue.put(_STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    def encode(self, query: str) -> np.ndarray:
+        """Encode one query, sharing a forward pass with concurrent callers.
+
+        Args:
+            query: Query text.
+
+        Returns:
+            The query's embedding matrix.
+
+        Raises:
+            RuntimeError: If the batcher is not running.
+            Exception: Whatever ``encode_batch`` raised for this batch.
+        """
+        return self._submit([query])[0].result()
+
+    def encode_many(self, queries: Sequence[str]) -> list[np.ndarray]:
+        """Encode several queries, enqueued together so they share batches.
+
+        Up to ``max_batch_size`` queries go through one ``encode_batch``
+        call; larger lists are split across consecutive batches.
+
+        Args:
+            queries: Query texts.
+
+        Returns:
+            Embedding matrices in *queries* order.
+
+        Raises:
+            RuntimeError: If the batcher is not running.
+            Exception: Whatever ``encode_batch`` raised for a batch.
+        """
+        return [future.result() for future in self._submit(queries)]
+
+    def stats(self) -> dict[str, Any]:
+        """Batch counters: batches, queries, mean and largest batch size."""
+        with self._stats_lock:
+            return {
+                "window_ms": self._window_s * 1000.0,
+                "max_batch_size": self._max_batch_size,
+                "batches": self._batches,
+                "queries": self._queries,
+                "mean_batch_size": self._queries / self._batches if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "encode_ms_total": round(self._encode_ms_total, 3),
+            }
+
+    def _submit(self, queries: Sequence[str]) -> list[Future[np.ndarray]]:
+        """Enqueue *queries*; every returned future is eventually resolved.
+
+        The check and the puts happen under the lifecycle lock, so the
+        requests land ahead of the stop sentinel and are either encoded
+        or failed by the inference thread's final drain.
+        """
+        futures: list[Future[np.ndarray]] = []
+        with self._lifecycle_lock:
+            if not self._accepting:
+                raise RuntimeError("QueryBatcher is not running")
+            for query in queries:
+                future: Future[np.ndarray] = Future()
+                self._queue.put((query, future))
+                futures.append(future)
+        return futures
+
+    # -- inference thread ------------------------------------------------------
+
+    def _run(self) -> None:
+        try:
+            self._serve()
+        finally:
+            with self._lifecycle_lock:
+                # A timed-out stop() may already have been followed by a
+                # start(); leave the new thread's queue alone then.
+                if self._thread in (None, threading.current_thread()):
+                    self._accepting = False
+                    self._fail_pending()
+
+    def _serve(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._window_s
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining) if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._encode(batch)
+
+    def _encode(self, batch: list[tuple[str, Future[np.ndarray]]]) -> None:
+        # Identical queries in one window share a single slot in the batch.
+        unique = list(dict.fromkeys(query for query, _ in batch))
+        start = time.perf_counter()
+        try:
+            encoded = self._encode_batch(unique)
+            if len(encoded) != len(unique):
+                raise RuntimeError(
+                    f"Encoder returned {len(encoded)} embeddings for {len(unique)} queries"
+                )
+        except Exception as exc:
+            logger.warning("query_batcher.encode_failed", batch_size=len(unique), error=str(exc))
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        by_query = dict(zip(unique, encoded))
+        for query, future in batch:
+            future.set_result(by_query[query])
+
+        with self._stats_lock:
+            self._batches += 1
+            self._queries += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            self._encode_ms_total += elapsed_ms
+
+    def _fail_pending(self) -> None:
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                item[1].set_exception(RuntimeError("QueryBatcher stopped"))
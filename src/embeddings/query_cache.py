@@ -0,0 +1,259 @@
+"""Bounded cache of query embeddings.
+
+``QueryEngine`` consults a :class:`QueryEmbeddingCache` before running
+the embedding model, so repeated searches (research follow-ups, MCP
+retries, the frontend re-issuing a search on navigation) skip straight
+to the vector scan. Entries are keyed by normalized query text, model
+and quantization, bounded by entry count and bytes, expire after a TTL,
+and can be persisted to an ``.npz`` file that is reloaded on restart.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+CacheKey = tuple[str, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text for cache lookups.
+
+    Applies Unicode NFC and collapses whitespace. Case is preserved
+    because the tokenizer is case-sensitive.
+
+    Args:
+        query: Raw query text.
+
+    Returns:
+        Normalized text.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", query)).strip()
+
+
+@dataclass
+class QueryCacheStats:
+    """Query embedding cache counters.
+
+    Attributes:
+        entries: Embeddings currently cached.
+        bytes: Bytes held by cached arrays.
+        hits: Lookups served from the cache.
+        misses: Lookups that ran the model.
+        evictions: Entries dropped to stay within bounds.
+        expirations: Entries dropped after their TTL.
+    """
+
+    entries: int = 0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of query embedding matrices.
+
+    Args:
+        max_entries: Maximum cached queries. ``0`` disables the cache.
+        max_bytes: Maximum bytes of cached arrays.
+        ttl_seconds: Entry lifetime; ``None`` or ``0`` keeps entries
+            until evicted.
+        persist_path: Optional ``.npz`` file loaded at construction and
+            written by :meth:`save`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 3600.0,
+        persist_path: Optional[str | Path] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds or None
+        self.persist_path = Path(persist_path) if persist_path else None
+        self._lock = threading.Lock()
+        # key -> (read-only array, created_at wall-clock seconds)
+        self._entries: OrderedDict[CacheKey, tuple[np.ndarray, float]] = OrderedDict()
+        self._stats = QueryCacheStats()
+        if self.persist_path is not None and self.enabled:
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> "QueryEmbeddingCache":
+        """Build a cache from ``QUERY_CACHE_*`` environment variables.
+
+        ``QUERY_CACHE_MAX_ENTRIES`` (default 1024, ``0`` disables),
+        ``QUERY_CACHE_MAX_MB`` (default 64), ``QUERY_CACHE_TTL_SECONDS``
+        (default 3600, ``0`` for no expiry) and ``QUERY_CACHE_PATH``
+        (unset for memory only).
+
+        Returns:
+            Configured cache.
+        """
+        return cls(
+            max_entries=int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "1024")),
+            max_bytes=int(float(os.getenv("QUERY_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600")),
+            persist_path=os.getenv("QUERY_CACHE_PATH") or None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: CacheKey) -> Optional[np.ndarray]:
+        """Look up an embedding.
+
+        Args:
+            key: ``(normalized_query, model, quantization)``.
+
+        Returns:
+            The cached read-only ``float32`` array, or ``None`` on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1], time.time()):
+                self._drop(key)
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[0]
+
+    def put(self, key: CacheKey, embedding: np.ndarray) -> None:
+        """Store an embedding.
+
+        Args:
+            key: ``(normalized_query, model, quantization)``.
+            embedding: ``float32`` token matrix. A read-only copy is kept.
+        """
+        if not self.enabled:
+            return
+        array = np.array(embedding, dtype=np.float32, copy=True)
+        array.setflags(write=False)
+        self._store(key, array, time.time())
+
+    def clear(self) -> None:
+        """Drop every entry, keeping counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stats.entries = 0
+            self._stats.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters plus configured bounds and hit rate."""
+        with self._lock:
+            lookups = self._stats.hits + self._stats.misses
+            return {
+                **asdict(self._stats),
+                "hit_rate": self._stats.hits / lookups if lookups else 0.0,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "persist_path": str(self.persist_path) if self.persist_path else None,
+            }
+
+    def save(self) -> int:
+        """Write unexpired entries to ``persist_path``.
+
+        The file is written to a temporary name and renamed into place,
+        so a crash never leaves a truncated cache behind.
+
+        Returns:
+            Entries written (``0`` when persistence is not configured).
+        """
+        if self.persist_path is None or not self.enabled:
+            return 0
+        now = time.time()
+        with self._lock:
+            items = [
+                (key, array, created)
+                for key, (array, created) in self._entries.items()
+                if not self._expired(created, now)
+            ]
+        index = [
+            {"query": q, "model": m, "quantization": qz, "created_at": created}
+            for (q, m, qz), _, created in items
+        ]
+        arrays = {f"e{i}": array for i, (_, array, _) in enumerate(items)}
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.persist_path.with_name(self.persist_path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.savez(fh, index=np.array(json.dumps(index)), **arrays)
+        os.replace(tmp, self.persist_path)
+        logger.info("query_cache.saved", path=str(self.persist_path), entries=len(items))
+        return len(items)
+
+    # -- internal helpers ------------------------------------------------------
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at >= self.ttl_seconds
+
+    def _drop(self, key: CacheKey) -> None:
+        """Remove *key*. Caller holds the lock."""
+        array, _ = self._entries.pop(key)
+        self._stats.entries -= 1
+        self._stats.bytes -= array.nbytes
+
+    def _store(self, key: CacheKey, array: np.ndarray, created_at: float) -> None:
+        if array.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (array, created_at)
+            self._stats.entries += 1
+            self._stats.bytes += array.nbytes
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._stats.bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def _load(self) -> None:
+        """Populate from ``persist_path``; a missing or corrupt file is ignored."""
+        if not self.persist_path.exists():
+            return
+        try:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                index = json.loads(str(data["index"]))
+                now = time.time()
+                for i, item in enumerate(index):
+                    if self._expired(item["created_at"], now):
+                        continue
+                    array = np.asarray(data[f"e{i}"], dtype=np.float32)
+                    array.setflags(write=False)
+                    key = (item["query"], item["model"], item["quantization"])
+                    self._store(key, array, item["created_at"])
+        except Exception as exc:
+            logger.warning(
+                "query_cache.load_failed", path=str(self.persist_path), error=str(exc),
+            )
+            self.clear()
+            return
+        logger.info("query_cache.loaded", path=str(self.persist_path), entries=len(self._entries))
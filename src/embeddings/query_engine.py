@@ -7,6 +7,10 @@ throughout the embeddings package.
 
 Supports engine injection so a single ``ColNomicEngine`` instance can be
 shared with ``ShikomiIngester`` -- avoiding loading the model twice.
+Repeated queries are served from a :class:`QueryEmbeddingCache` without
+running the model, and concurrent cache misses are micro-batched into a
+single ``encode_queries`` call on one inference thread (see
+:class:`QueryBatcher`).
 
 Example:
     >>> from processing.shikomi_ingester import ShikomiIngester
@@ -14,30 +18,42 @@ Example:
     >>> ingester.connect()
     >>> qe = QueryEngine(engine=ingester.engine)
     >>> qe.connect()
-    >>> vectors = qe.embed_query("what is the revenue for Q3?")
+    >>> matrix = qe.embed_query("what is the revenue for Q3?")
     >>> qe.close()
 """
 
 from __future__ import annotations
 
 import asyncio
+import os
 from typing import TYPE_CHECKING, Any, Optional
 
+import numpy as np
 import structlog
 
+from .query_batcher import QueryBatcher
+from .query_cache import QueryEmbeddingCache, normalize_query
+
 if TYPE_CHECKING:
     from shikomi.embedding import ColNomicEngine
 
 logger = structlog.get_logger(__name__)
 
+MODEL_ID = "colnomic-embed-multimodal-7b"
+
+DEFAULT_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", "5"))
+DEFAULT_MAX_BATCH_SIZE = int(os.getenv("QUERY_MAX_BATCH_SIZE", "16"))
+
 
 class QueryEngine:
     """Sync query embedding engine using ColNomicEngine.
 
     Wraps ``shikomi.ColNomicEngine.encode_queries`` to provide the same
-    ``embed_query`` interface that ``KojiSearch`` expects.  Bridges async
-    calls to sync using a dedicated event loop that is safe to call from
-    ``ThreadPoolExecutor`` workers.
+    ``embed_query`` interface that ``KojiSearch`` expects.  Model calls
+    run on a single inference thread that owns a private event loop;
+    ``embed_query`` is safe to call from any number of threads, and
+    queries arriving within *batch_window_ms* of each other share one
+    forward pass.
 
     Args:
         engine: Optional pre-loaded ``ColNomicEngine`` for sharing with
@@ -47,6 +63,12 @@ class QueryEngine:
             Only used when *engine* is ``None``.
         quantization: Model quantization (``4bit``, ``8bit``, ``fp16``).
             Only used when *engine* is ``None``.
+        cache: Query embedding cache. Defaults to one configured from
+            ``QUERY_CACHE_*`` environment variables.
+        batch_window_ms: How long the inference thread waits for more
+            queries before encoding a batch (``QUERY_BATCH_WINDOW_MS``).
+        max_batch_size: Maximum queries per ``encode_queries`` call
+            (``QUERY_MAX_BATCH_SIZE``).
     """
 
     def __init__(
@@ -54,20 +76,28 @@ class QueryEngine:
         engine: Optional[ColNomicEngine] = None,
         device: str = "mps",
         quantization: str = "4bit",
+        cache: Optional[QueryEmbeddingCache] = None,
+        batch_window_ms: float = DEFAULT_BATCH_WINDOW_MS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
     ) -> None:
         self._device = device
         self._quantization = quantization
         self._engine: Optional[ColNomicEngine] = engine
         self._engine_injected: bool = engine is not None
         self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cache = cache if cache is not None else QueryEmbeddingCache.from_env()
+        self._batcher = QueryBatcher(
+            self._encode_batch, window_ms=batch_window_ms, max_batch_size=max_batch_size,
+        )
 
     # -- lifecycle -------------------------------------------------------------
 
     def connect(self) -> None:
-        """Initialize the engine and create a private event loop.
+        """Initialize the engine and start the inference thread.
 
         Creates a ``ColNomicEngine`` if one was not injected at
-        construction time.  Idempotent -- safe to call multiple times.
+        construction time, plus the private event loop the inference
+        thread drives.  Idempotent -- safe to call multiple times.
         """
         if self._loop is not None:
             return
@@ -82,6 +112,8 @@ class QueryEngine:
                 quantization=self._quantization,
             )
 
+        self._batcher.start()
+
         logger.info(
             "query_engine.connected",
             device=self._device,
@@ -92,11 +124,20 @@ class QueryEngine:
     def close(self) -> None:
         """Release resources.
 
-        Closes the private event loop.  If the engine was injected at
+        Stops the inference thread (queries still queued fail with
+        ``RuntimeError``), closes the private event loop and persists the
+        query cache when a cache file is configured.  If the engine was injected at
         construction time the caller retains ownership and the engine
         reference is preserved.  If the engine was created internally it
         is released.
         """
+        try:
+            self._cache.save()
+        except OSError as exc:
+            logger.warning("query_engine.cache_save_failed", error=str(exc))
+
+        self._batcher.stop()
+
         if self._loop is not None:
             self._loop.close()
             self._loop = None
@@ -111,29 +152,42 @@ class QueryEngine:
 
         Returns:
             Dictionary with ``connected``, ``model``, ``device``,
-            ``quantization``, and ``mode`` fields.
+            ``quantization``, ``mode``, query ``cache`` counters and
+            micro-``batching`` counters.
         """
         return {
             "connected": self._engine is not None and self._loop is not None,
-            "model": "colnomic-embed-multimodal-7b",
+            "model": MODEL_ID,
             "device": self._device,
             "quantization": self._quantization,
             "mode": "query_engine",
+            "cache": self._cache.stats(),
+            "batching": self._batcher.stats(),
         }
 
+    @property
+    def cache(self) -> QueryEmbeddingCache:
+        """Query embedding cache consulted by :meth:`embed_query`."""
+        return self._cache
+
     # -- embedding method ------------------------------------------------------
 
-    def embed_query(self, query: str) -> list[list[float]]:
-        """Embed a search query, returning nested float lists.
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, returning the engine's token matrix.
 
-        Returns ``list[list[float]]`` for direct use with Koji's
-        ``<~>`` MaxSim operator.
+        The array is handed through without conversion to Python floats;
+        pack it with ``storage.pack_multivec`` for Koji's ``<~>`` MaxSim
+        operator.  Repeated queries (after whitespace and Unicode
+        normalization) are answered from the cache as read-only arrays;
+        misses wait for the inference thread to encode them, possibly
+        alongside queries from other threads.
 
         Args:
             query: Search query string.
 
         Returns:
-            Multi-vector embedding as nested list of floats.
+            Multi-vector embedding as a ``float32`` array of shape
+            ``(num_tokens, dim)``.
 
         Raises:
             ValueError: If *query* is empty or whitespace-only.
@@ -144,8 +198,13 @@ class QueryEngine:
 
         self._require_connected()
 
-        embeddings = self._run_async(self._engine.encode_queries([query]))
-        result: list[list[float]] = embeddings[0].data.tolist()
+        key = (normalize_query(query), MODEL_ID, self._quantization)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._batcher.encode(query)
+        self._cache.put(key, result)
 
         logger.debug(
             "query_engine.query_embedded",
@@ -154,6 +213,44 @@ class QueryEngine:
         )
         return result
 
+    def embed_queries(self, queries: list[str]) -> list[np.ndarray]:
+        """Embed several queries, running the model once for all misses.
+
+        Cached queries are answered from the cache; the rest are handed
+        to the inference thread together, so up to ``max_batch_size`` of
+        them share a single ``encode_queries`` call.
+
+        Args:
+            queries: Search query strings.
+
+        Returns:
+            One ``float32`` ``(num_tokens, dim)`` array per query, in order.
+
+        Raises:
+            ValueError: If any query is empty or whitespace-only.
+            RuntimeError: If the engine is not connected.
+        """
+        if any(not q or not q.strip() for q in queries):
+            raise ValueError("Query cannot be empty")
+
+        self._require_connected()
+
+        keys = [(normalize_query(q), MODEL_ID, self._quantization) for q in queries]
+        results: list[Optional[np.ndarray]] = [self._cache.get(key) for key in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if missing:
+            encoded = self._batcher.encode_many([queries[i] for i in missing])
+            for i, matrix in zip(missing, encoded):
+                self._cache.put(keys[i], matrix)
+                results[i] = matrix
+
+        logger.debug(
+            "query_engine.queries_embedded",
+            queries=len(queries),
+            encoded=len(missing),
+        )
+        return results  # type: ignore[return-value]
+
     # -- internal helpers ------------------------------------------------------
 
     def _require_connected(self) -> None:
@@ -163,10 +260,18 @@ class QueryEngine:
                 "QueryEngine is not connected. Call connect() first."
             )
 
+    def _encode_batch(self, queries: list[str]) -> list[np.ndarray]:
+        """Encode *queries* in one model call.
+
+        Runs on the inference thread only, so the private event loop is
+        never driven from two threads at once.
+        """
+        embeddings = self._run_async(self._engine.encode_queries(queries))
+        return [np.asarray(e.data, dtype=np.float32) for e in embeddings]
+
     def _run_async(self, coro: Any) -> Any:
         """Run an async coroutine on the private event loop.
 
-        Safe to call from ``ThreadPoolExecutor`` workers because the
-        loop is private to this instance and not shared with FastAPI.
+        The loop is private to this instance and not shared with FastAPI.
         """
         return self._loop.run_until_complete(coro)
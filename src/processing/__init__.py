@@ -8,6 +8,7 @@ Page rendering, visual embedding, and Koji storage are coordinated by
 from .processor import (
     DocumentProcessor,
     EmbeddingError,
+    ProcessingAbortedError,
     ProcessingError,
     ProcessingStatus,
     StorageConfirmation,
@@ -23,6 +24,7 @@ __all__ = [
     "ProcessingError",
     "EmbeddingError",
     "StorageError",
+    "ProcessingAbortedError",
     # Ingester
     "ShikomiIngester",
 ]
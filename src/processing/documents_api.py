@@ -346,104 +346,29 @@ async def get_supported_formats():
     return SupportedFormatsResponse(extensions=extensions, groups=groups)
 
 
-def _apply_search_filter(doc_list: List[Dict], search: Optional[str]) -> List[Dict]:
-    """Filter documents by filename search.
-
-    Args:
-        doc_list: List of documents to filter
-        search: Search string (case-insensitive)
-
-    Returns:
-        Filtered list of documents
-    """
-    if not search:
-        return doc_list
-
-    search_lower = search.lower()
-    return [doc for doc in doc_list if search_lower in doc["filename"].lower()]
-
-
-def _apply_file_type_filter(doc_list: List[Dict], file_type_group: str) -> List[Dict]:
-    """Filter documents by file type group.
-
-    Args:
-        doc_list: List of documents to filter
-        file_type_group: Filter group (all, pdf, audio, office, text, images)
-
-    Returns:
-        Filtered list of documents
-    """
-    # Get extensions for the group
-    extensions = resolve_filter_group(file_type_group)
-
-    # If None (all group) or invalid group, return all documents
-    if extensions is None:
-        return doc_list
-
-    # Filter documents by extension
-    filtered = []
-    for doc in doc_list:
-        filename = doc.get("filename", "")
-        file_ext = Path(filename).suffix.lower()
-
-        if file_ext in extensions:
-            filtered.append(doc)
-
-    return filtered
-
-
-def _sort_documents(doc_list: List[Dict], sort_by: str) -> None:
-    """Sort documents in-place by specified criteria.
-
-    Args:
-        doc_list: List of documents to sort
-        sort_by: Sort order (newest_first, oldest_first, name_asc, name_desc)
-    """
-    if sort_by == "name_asc":
-        doc_list.sort(key=lambda d: d["filename"].lower())
-    elif sort_by == "name_desc":
-        doc_list.sort(key=lambda d: d["filename"].lower(), reverse=True)
-    elif sort_by == "oldest_first":
-        doc_list.sort(key=lambda d: d["date_added"])
-    else:  # newest_first (default)
-        doc_list.sort(key=lambda d: d["date_added"], reverse=True)
-
-
 def _resolve_document_thumbnail(doc: Dict) -> Optional[str]:
-    """Resolve thumbnail URL for document.
+    """Resolve thumbnail URL for a document summary.
 
     Checks, in order:
-    1. First page ``thumb`` binary (Koji DB) — most common path
-    2. First page ``image`` binary (Koji DB) — fallback for pages without thumbs
-    3. First page ``thumb_path`` on filesystem (legacy)
-    4. First page thumbnail on disk (when Koji has no page records)
-    5. Album art cover file on disk (audio files)
+    1. First page ``thumb``/``image`` binary (Koji DB) — most common path;
+       the URL requests the thumbnail so the library grid never pulls the
+       full-resolution page
+    2. First page thumbnail on disk (legacy filesystem storage)
+    3. Album art cover file on disk (audio files)
 
     Args:
-        doc: Document dictionary
+        doc: Document summary from ``KojiClient.list_document_summaries``
 
     Returns:
         Thumbnail URL or None
     """
     doc_id = doc["doc_id"]
 
-    if doc["pages"] and doc["has_images"]:
-        first_page = doc["pages"][0]
-
-        # Prefer thumb, fall back to full image (both stored as binary in Koji)
-        if first_page.get("thumb") or first_page.get("image"):
-            page_num = first_page.get("page_num", 1)
-            return f"/images/{doc_id}/page{page_num:03d}.png"
-
-        # Legacy filesystem path
-        if first_page.get("thumb_path"):
-            thumb_path = first_page["thumb_path"]
-            if "/" in thumb_path:
-                parts = thumb_path.split("/")
-                if len(parts) >= 2:
-                    return f"/images/{parts[-2]}/{parts[-1]}"
+    if doc.get("first_page_has_image"):
+        page_num = doc.get("first_page_num") or 1
+        return f"/images/{doc_id}/page{page_num:03d}_thumb.jpg"
 
-    # Check for first page thumbnail on disk (Koji may lack page records)
+    # Check for first page thumbnail on disk (Koji may lack page blobs)
     thumb_on_disk = Path(PAGE_IMAGE_DIR) / doc_id / "page001_thumb.jpg"
     if thumb_on_disk.exists():
         return f"/images/{doc_id}/page001_thumb.jpg"
@@ -460,29 +385,27 @@ def _resolve_document_thumbnail(doc: Dict) -> Optional[str]:
 
 
 def _convert_to_response_items(doc_list: List[Dict]) -> List[DocumentListItem]:
-    """Convert document dictionaries to response items.
+    """Convert document summaries to response items.
 
     Args:
-        doc_list: List of document dictionaries
+        doc_list: Summaries from ``KojiClient.list_document_summaries``
 
     Returns:
         List of DocumentListItem objects
     """
     response_docs = []
     for doc in doc_list:
-        first_page_thumb = _resolve_document_thumbnail(doc)
-
         response_docs.append(
             DocumentListItem(
                 doc_id=doc["doc_id"],
-                project_id=doc.get("project_id", "default"),
-                filename=doc["filename"],
-                page_count=len(doc["pages"]),
-                chunk_count=len(doc["chunks"]),
-                date_added=doc["date_added"],
-                collections=doc["collections"],
-                has_images=doc["has_images"],
-                first_page_thumb=first_page_thumb,
+                project_id=doc.get("project_id") or "default",
+                filename=doc.get("filename") or "unknown",
+                page_count=doc.get("page_count", 0),
+                chunk_count=doc.get("chunk_count", 0),
+                date_added=doc.get("created_at") or "",
+                collections=[],
+                has_images=doc.get("page_count", 0) > 0,
+                first_page_thumb=_resolve_document_thumbnail(doc),
             )
         )
 
@@ -514,6 +437,9 @@ async def list_documents(
 ):
     """List all stored documents with metadata.
 
+    Search, file-type filtering, sorting, and pagination are pushed down
+    into Koji; only the requested page of documents is materialized.
+
     Args:
         limit: Number of results (1-100)
         offset: Pagination offset
@@ -530,40 +456,15 @@ async def list_documents(
     try:
         client = get_storage_client()
 
-        # Get documents from Koji (scoped to project if specified)
-        doc_list_raw = client.list_documents(limit=10000, project_id=project_id)
-
-        # Build document aggregation matching legacy format
-        documents = {}
-        for doc in doc_list_raw:
-            doc_id = doc["doc_id"]
-            pages = client.get_pages_for_document(doc_id)
-            chunks = client.get_chunks_for_document(doc_id)
-            documents[doc_id] = {
-                "doc_id": doc_id,
-                "project_id": doc.get("project_id", "default"),
-                "filename": doc.get("filename", "unknown"),
-                "date_added": doc.get("created_at", ""),
-                "pages": pages,
-                "chunks": chunks,
-                "has_images": len(pages) > 0,
-                "collections": [],
-                "metadata": doc.get("metadata", {}),
-            }
-
-        # Convert to list and apply filters/sorting
-        doc_list = list(documents.values())
-        doc_list = _apply_search_filter(doc_list, search)
-        doc_list = _apply_file_type_filter(doc_list, file_type_group)
-        _sort_documents(doc_list, sort_by)
-
-        # Get total before pagination
-        total = len(doc_list)
-
-        # Apply pagination
-        doc_list = doc_list[offset : offset + limit]
+        doc_list, total = client.list_document_summaries(
+            project_id=project_id,
+            search=search,
+            extensions=resolve_filter_group(file_type_group),
+            sort_by=sort_by,
+            limit=limit,
+            offset=offset,
+        )
 
-        # Convert to response format
         response_docs = _convert_to_response_items(doc_list)
 
         return DocumentListResponse(
@@ -733,8 +634,10 @@ async def get_document(doc_id: str):
     try:
         client = get_storage_client()
 
-        # Query document from Koji
-        doc_data = client.get_document(doc_id)
+        # Query document from Koji (markdown body is served separately)
+        doc_data = client.get_document(
+            doc_id, columns=["filename", "created_at", "metadata"]
+        )
         if doc_data is None:
             raise HTTPException(
                 status_code=404,
@@ -869,7 +772,7 @@ async def get_markdown(doc_id: str, include_markers: bool = True):
     # Get filename from Koji for the download filename
     try:
         client = get_storage_client()
-        doc_data = client.get_document(doc_id)
+        doc_data = client.get_document(doc_id, columns=["filename"])
 
         filename = "unknown.md"
         if doc_data:
@@ -988,7 +891,7 @@ async def get_vtt(doc_id: str):
     # Get filename from Koji for the download filename
     try:
         client = get_storage_client()
-        doc_data = client.get_document(doc_id)
+        doc_data = client.get_document(doc_id, columns=["filename"])
 
         filename = "unknown.vtt"
         if doc_data:
@@ -1050,7 +953,7 @@ async def get_audio(doc_id: str):
     try:
         koji_client = get_storage_client()
 
-        doc_data = koji_client.get_document(doc_id)
+        doc_data = koji_client.get_document(doc_id, columns=["filename"])
 
         if doc_data is None:
             raise HTTPException(
@@ -1266,33 +1169,56 @@ def _find_image_in_directories(doc_id: str, filename: str) -> Optional[Path]:
     return None
 
 
-def _get_page_image_from_db(doc_id: str, page_num: int) -> Optional[bytes]:
+def _get_page_image_from_db(
+    doc_id: str, page_num: int, thumbnail: bool = False
+) -> Optional[bytes]:
     """Retrieve a page image from the Koji database.
 
-    Prefers the ``thumb`` column; falls back to ``image``.
+    Thumbnail requests read the ``thumb`` column and fall back to the
+    full ``image`` for pages not yet backfilled. Full-size requests read
+    only ``image``.
 
     Args:
         doc_id: Document identifier.
         page_num: 1-based page number.
+        thumbnail: Whether the thumbnail was requested.
 
     Returns:
         Raw image bytes or None if not found.
     """
     try:
         client = get_storage_client()
-        result = client.query(
-            "SELECT thumb, image FROM pages WHERE doc_id = ? AND page_num = ? LIMIT 1",
-            [doc_id, page_num],
-        )
-        if result.num_rows == 0:
-            return None
-        row = result.to_pydict()
-        return row["thumb"][0] or row["image"][0]
+        if thumbnail:
+            thumb = client.get_page_image(doc_id, page_num, thumbnail=True)
+            if thumb:
+                return thumb
+        return client.get_page_image(doc_id, page_num)
     except Exception as exc:
         logger.debug(f"DB image lookup failed for {doc_id} page {page_num}: {exc}")
         return None
 
 
+def _sniff_image_type(data: bytes) -> str:
+    """Determine content type from image magic bytes.
+
+    Used for DB-served images, where a thumbnail request may be answered
+    with the full PNG for pages that have no stored thumbnail yet.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        MIME type string
+    """
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
 def _get_image_content_type(filename: str) -> str:
     """Determine content type from filename extension.
 
@@ -1328,8 +1254,9 @@ def _get_image_content_type(filename: str) -> str:
 async def get_image(doc_id: str, filename: str):
     """Serve page image, thumbnail, or cover art files.
 
-    Checks the filesystem first (legacy path), then falls back to
-    serving the ``image`` or ``thumb`` column from the Koji pages table.
+    Checks the filesystem first (legacy path), then falls back to the
+    Koji pages table: ``pageNNN_thumb.jpg`` serves the ``thumb`` column
+    and ``pageNNN.png`` serves the full ``image``.
 
     Args:
         doc_id: Document identifier
@@ -1355,12 +1282,14 @@ async def get_image(doc_id: str, filename: str):
         )
 
     # 2. Fall back to Koji DB: extract page number from filename (e.g. page001.png → 1)
-    page_match = re.match(r"page(\d+)", filename)
+    page_match = re.match(r"page(\d+)(_thumb)?", filename)
     if page_match:
         page_num = int(page_match.group(1))
-        image_data = _get_page_image_from_db(doc_id, page_num)
+        image_data = _get_page_image_from_db(
+            doc_id, page_num, thumbnail=page_match.group(2) is not None
+        )
         if image_data:
-            media_type = _get_image_content_type(filename)
+            media_type = _sniff_image_type(image_data)
             return Response(
                 content=image_data,
                 media_type=media_type,
@@ -1424,7 +1353,7 @@ async def delete_document(doc_id: str):  # noqa: C901
         client = get_storage_client()
 
         # Check if document exists
-        doc_data = client.get_document(doc_id)
+        doc_data = client.get_document(doc_id, columns=["filename"])
         if doc_data is None:
             raise HTTPException(
                 status_code=404,
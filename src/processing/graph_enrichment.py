@@ -17,10 +17,13 @@ from typing import Any
 import structlog
 
 from ..config.graph_config import GraphEnrichmentConfig
-from ..storage.koji_client import KojiClient, KojiDuplicateError, KojiQueryError
+from ..storage.koji_client import KojiClient, KojiQueryError
 
 logger = structlog.get_logger(__name__)
 
+# Chunk rows per batch when scanning ``context`` JSON for headings.
+_HEADING_SCAN_BATCH_SIZE = 2000
+
 
 class GraphEnrichmentService:
     """Batch graph enrichment for the document library.
@@ -136,7 +139,7 @@ class GraphEnrichmentService:
 
         self._storage.delete_relations_by_type("similar_to")
 
-        created = 0
+        rows: list[dict[str, Any]] = []
         # Track pairs already connected so we don't duplicate
         connected: set[tuple[str, str]] = set()
 
@@ -180,20 +183,10 @@ class GraphEnrichmentService:
                 metadata = {"score": round(score, 4), "method": method}
 
                 # Bidirectional edges
-                rel_fwd = self._safe_create_relation(
-                    doc_id, target_id, "similar_to", metadata=metadata,
-                )
-                rel_rev = self._safe_create_relation(
-                    target_id, doc_id, "similar_to", metadata=metadata,
-                )
-                if rel_fwd or rel_rev:
-                    connected.add(pair)
-                if rel_fwd:
-                    created += 1
-                if rel_rev:
-                    created += 1
+                connected.add(pair)
+                rows.extend(_bidirectional(doc_id, target_id, "similar_to", metadata))
 
-        return created
+        return self._create_relations(rows, "similar_to")
 
     # ------------------------------------------------------------------
     # Step 2 — same_topic (heading Jaccard similarity)
@@ -219,7 +212,7 @@ class GraphEnrichmentService:
 
         self._storage.delete_relations_by_type("same_topic")
 
-        created = 0
+        rows: list[dict[str, Any]] = []
         sorted_ids = sorted(doc_headings.keys())
 
         for id_a, id_b in itertools.combinations(sorted_ids, 2):
@@ -237,19 +230,9 @@ class GraphEnrichmentService:
 
             shared = sorted(intersection)
             metadata = {"jaccard": round(jaccard, 4), "shared_headings": shared}
+            rows.extend(_bidirectional(id_a, id_b, "same_topic", metadata))
 
-            rel_fwd = self._safe_create_relation(
-                id_a, id_b, "same_topic", metadata=metadata,
-            )
-            rel_rev = self._safe_create_relation(
-                id_b, id_a, "same_topic", metadata=metadata,
-            )
-            if rel_fwd:
-                created += 1
-            if rel_rev:
-                created += 1
-
-        return created
+        return self._create_relations(rows, "same_topic")
 
     # ------------------------------------------------------------------
     # Step 3 — overlaps_topic (community detection)
@@ -289,7 +272,7 @@ class GraphEnrichmentService:
         for doc_id, label in communities.items():
             groups[label].append(doc_id)
 
-        created = 0
+        rows: list[dict[str, Any]] = []
         max_size = self._config.max_community_full_connect
 
         for community_id, members in groups.items():
@@ -306,18 +289,9 @@ class GraphEnrichmentService:
             metadata = {"community_id": community_id}
 
             for id_a, id_b in itertools.combinations(sorted_members, 2):
-                rel_fwd = self._safe_create_relation(
-                    id_a, id_b, "overlaps_topic", metadata=metadata,
-                )
-                rel_rev = self._safe_create_relation(
-                    id_b, id_a, "overlaps_topic", metadata=metadata,
-                )
-                if rel_fwd:
-                    created += 1
-                if rel_rev:
-                    created += 1
+                rows.extend(_bidirectional(id_a, id_b, "overlaps_topic", metadata))
 
-        return created
+        return self._create_relations(rows, "overlaps_topic")
 
     # ------------------------------------------------------------------
     # Step 4 — node properties (PageRank, community, hub score)
@@ -376,35 +350,36 @@ class GraphEnrichmentService:
         updated = 0
         enriched_at = datetime.now(timezone.utc).isoformat()
 
-        for doc_id in all_doc_ids:
-            try:
-                doc = self._storage.get_document(doc_id)
-                if doc is None:
-                    continue
-
-                metadata = doc.get("metadata")
-                if metadata is None:
-                    metadata = {}
-                elif isinstance(metadata, str):
-                    metadata = json.loads(metadata)
-
-                metadata["graph"] = {
-                    "pagerank_score": round(
-                        pagerank_scores.get(doc_id, 0.0), 6
-                    ),
-                    "community_id": community_labels.get(doc_id),
-                    "hub_score": hub_scores.get(doc_id, 0),
-                    "enriched_at": enriched_at,
-                }
-
-                self._storage.update_document(doc_id, metadata=metadata)
-                updated += 1
-            except Exception as exc:
-                logger.warning(
-                    "graph_enrichment.node_properties.update_failed",
-                    doc_id=doc_id,
-                    error=str(exc),
-                )
+        with self._storage.batch():
+            for doc_id in all_doc_ids:
+                try:
+                    doc = self._storage.get_document(doc_id, columns=["metadata"])
+                    if doc is None:
+                        continue
+
+                    metadata = doc.get("metadata")
+                    if metadata is None:
+                        metadata = {}
+                    elif isinstance(metadata, str):
+                        metadata = json.loads(metadata)
+
+                    metadata["graph"] = {
+                        "pagerank_score": round(
+                            pagerank_scores.get(doc_id, 0.0), 6
+                        ),
+                        "community_id": community_labels.get(doc_id),
+                        "hub_score": hub_scores.get(doc_id, 0),
+                        "enriched_at": enriched_at,
+                    }
+
+                    self._storage.update_document(doc_id, metadata=metadata)
+                    updated += 1
+                except Exception as exc:
+                    logger.warning(
+                        "graph_enrichment.node_properties.update_failed",
+                        doc_id=doc_id,
+                        error=str(exc),
+                    )
 
         return updated
 
@@ -586,54 +561,35 @@ class GraphEnrichmentService:
         Returns:
             Dict mapping ``doc_id`` to a set of heading strings.
         """
+        headings: dict[str, set[str]] = defaultdict(set)
         try:
             if project_id is not None:
-                result = self._storage.query(
-                    "SELECT c.doc_id, c.context FROM chunks c "
+                batches = self._storage.query_batches(
+                    "SELECT c.id, c.doc_id, c.context FROM chunks c "
                     "JOIN documents d ON c.doc_id = d.doc_id "
                     "WHERE c.context IS NOT NULL AND d.project_id = ?",
-                    [project_id],
+                    key="c.id",
+                    params=[project_id],
+                    batch_size=_HEADING_SCAN_BATCH_SIZE,
                 )
             else:
-                result = self._storage.query(
-                    "SELECT doc_id, context FROM chunks WHERE context IS NOT NULL"
+                batches = self._storage.query_batches(
+                    "SELECT id, doc_id, context FROM chunks "
+                    "WHERE context IS NOT NULL",
+                    key="id",
+                    batch_size=_HEADING_SCAN_BATCH_SIZE,
                 )
+            # Only one batch of raw context JSON is alive at a time.
+            for batch in batches:
+                doc_ids = batch.column("doc_id").to_pylist()
+                contexts = batch.column("context").to_pylist()
+                for doc_id, ctx_raw in zip(doc_ids, contexts):
+                    found = _context_headings(ctx_raw)
+                    if found:
+                        headings[doc_id].update(found)
         except KojiQueryError:
             return {}
 
-        d = result.to_pydict()
-        doc_ids = d.get("doc_id", [])
-        contexts = d.get("context", [])
-
-        headings: dict[str, set[str]] = defaultdict(set)
-
-        for i in range(len(doc_ids)):
-            ctx_raw = contexts[i]
-            if not ctx_raw:
-                continue
-
-            try:
-                ctx = json.loads(ctx_raw) if isinstance(ctx_raw, str) else ctx_raw
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-            if not isinstance(ctx, dict):
-                continue
-
-            doc_id = doc_ids[i]
-
-            parent_heading = ctx.get("parent_heading")
-            if parent_heading and isinstance(parent_heading, str):
-                headings[doc_id].add(parent_heading.strip().lower())
-
-            section_path = ctx.get("section_path")
-            if isinstance(section_path, list):
-                for entry in section_path:
-                    if isinstance(entry, str) and entry.strip():
-                        headings[doc_id].add(entry.strip().lower())
-            elif isinstance(section_path, str) and section_path.strip():
-                headings[doc_id].add(section_path.strip().lower())
-
         return dict(headings)
 
     def _compute_hub_scores(self) -> dict[str, int]:
@@ -676,53 +632,72 @@ class GraphEnrichmentService:
 
         return hub
 
-    def _safe_create_relation(
-        self,
-        src_doc_id: str,
-        dst_doc_id: str,
-        relation_type: str,
-        metadata: dict[str, Any] | None = None,
-    ) -> bool:
-        """Create a relation, swallowing duplicates and other errors.
+    def _create_relations(self, rows: list[dict[str, Any]], relation_type: str) -> int:
+        """Bulk-create computed relations, logging instead of raising.
 
         Args:
-            src_doc_id: Source document identifier.
-            dst_doc_id: Destination document identifier.
-            relation_type: Relationship type string.
-            metadata: Optional metadata dict.
+            rows: Relation dicts for :meth:`KojiClient.create_relations_bulk`.
+            relation_type: Relation type being computed, for logging.
 
         Returns:
-            ``True`` if the relation was created, ``False`` otherwise.
+            Number of relations created.
         """
+        if not rows:
+            return 0
         try:
-            self._storage.create_relation(
-                src_doc_id=src_doc_id,
-                dst_doc_id=dst_doc_id,
-                relation_type=relation_type,
-                metadata=metadata,
-            )
-            logger.debug(
-                "graph_enrichment.relation_created",
-                src=src_doc_id,
-                dst=dst_doc_id,
-                type=relation_type,
-            )
-            return True
-        except (KojiDuplicateError, KojiQueryError, ValueError) as exc:
-            logger.debug(
-                "graph_enrichment.relation_skipped",
-                src=src_doc_id,
-                dst=dst_doc_id,
-                type=relation_type,
-                reason=str(exc),
-            )
-            return False
+            counts = self._storage.create_relations_bulk(rows)
         except Exception as exc:
             logger.warning(
-                "graph_enrichment.relation_failed",
-                src=src_doc_id,
-                dst=dst_doc_id,
+                "graph_enrichment.relations_failed",
                 type=relation_type,
+                rows=len(rows),
                 error=str(exc),
             )
-            return False
+            return 0
+        logger.debug(
+            "graph_enrichment.relations_created",
+            type=relation_type,
+            **counts,
+        )
+        return counts["created"]
+
+
+def _context_headings(ctx_raw: Any) -> set[str]:
+    """Lower-cased ``parent_heading`` and ``section_path`` entries of a chunk context."""
+    if not ctx_raw:
+        return set()
+    try:
+        ctx = json.loads(ctx_raw) if isinstance(ctx_raw, str) else ctx_raw
+    except (json.JSONDecodeError, TypeError):
+        return set()
+    if not isinstance(ctx, dict):
+        return set()
+
+    found: set[str] = set()
+    parent_heading = ctx.get("parent_heading")
+    if parent_heading and isinstance(parent_heading, str):
+        found.add(parent_heading.strip().lower())
+
+    section_path = ctx.get("section_path")
+    if isinstance(section_path, list):
+        for entry in section_path:
+            if isinstance(entry, str) and entry.strip():
+                found.add(entry.strip().lower())
+    elif isinstance(section_path, str) and section_path.strip():
+        found.add(section_path.strip().lower())
+    return found
+
+
+def _bidirectional(
+    id_a: str,
+    id_b: str,
+    relation_type: str,
+    metadata: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Relation rows for an edge in both directions."""
+    return [
+        {"src_doc_id": id_a, "dst_doc_id": id_b, "relation_type": relation_type,
+         "metadata": metadata},
+        {"src_doc_id": id_b, "dst_doc_id": id_a, "relation_type": relation_type,
+         "metadata": metadata},
+    ]
@@ -9,10 +9,11 @@ Consumers: parser-agent, api-agent
 Contract: integration-contracts/02-image-utils.contract.md
 """
 
+import io
 import logging
 import re
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 
 try:
     from PIL import Image
@@ -132,9 +133,8 @@ def save_page_image(image: Image.Image, doc_id: str, page_num: int) -> Tuple[str
             )
 
         # Generate and save thumbnail
-        thumbnail = generate_thumbnail(image, THUMBNAIL_SIZE, THUMBNAIL_QUALITY)
-        logger.debug(f"Saving thumbnail: {thumb_path}, size: {thumbnail.size}")
-        thumbnail.save(thumb_path, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+        logger.debug(f"Saving thumbnail: {thumb_path}")
+        thumb_path.write_bytes(encode_thumbnail(image))
 
         # Return paths as strings
         result_image_path = str(image_path)
@@ -223,6 +223,41 @@ def generate_thumbnail(image: Image.Image, size: Tuple[int, int], quality: int)
     return thumb
 
 
+def encode_thumbnail(image: Union[Image.Image, bytes]) -> bytes:
+    """
+    Generate a thumbnail and encode it for storage.
+
+    Uses THUMBNAIL_SIZE, THUMBNAIL_QUALITY and THUMBNAIL_FORMAT, so the
+    bytes match the ``page{NNN}_thumb.jpg`` files written by
+    save_page_image and can be stored in the ``pages.thumb`` column.
+
+    Args:
+        image: PIL Image, or encoded image bytes (PNG/JPEG)
+
+    Returns:
+        Encoded thumbnail bytes
+
+    Raises:
+        ValueError: If image is None or cannot be decoded
+
+    Example:
+        >>> data = encode_thumbnail(Image.new('RGB', (1600, 2000)))
+        >>> data[:2]
+        b'\xff\xd8'
+    """
+    if isinstance(image, (bytes, bytearray)):
+        try:
+            image = Image.open(io.BytesIO(image))
+            image.load()
+        except Exception as e:
+            raise ValueError(f"Cannot decode image bytes: {e}") from e
+
+    thumbnail = generate_thumbnail(image, THUMBNAIL_SIZE, THUMBNAIL_QUALITY)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format=THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
 def get_image_path(doc_id: str, page_num: int, is_thumb: bool = False) -> str:
     """
     Get path to image file.
@@ -0,0 +1,50 @@
+"""Backfill ``node_id`` on documents ingested before it was stored.
+
+Graph algorithms use each document's persisted ``node_id`` as its vertex
+id, so documents without one are left out of PageRank, communities and
+the other algorithms until this has run. Ids are drawn from the shared
+counter that ``create_document`` uses, so it is safe next to ingestion.
+
+Run it once per database; it opens the database directly.
+
+Usage:
+    python3 -m tkr_docusearch.processing.node_id_backfill [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DB_PATH = os.getenv("KOJI_DB_PATH", "./data/koji.db")
+
+
+def main() -> None:
+    """Run the node_id backfill against ``KOJI_DB_PATH``."""
+    parser = argparse.ArgumentParser(
+        description="Assign graph node ids to documents that have none",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be written without writing",
+    )
+    args = parser.parse_args()
+
+    from ..config.koji_config import KojiConfig
+    from ..storage.koji_client import KojiClient
+
+    client = KojiClient(KojiConfig(db_path=DB_PATH))
+    client.open()
+    try:
+        report = client.backfill_node_ids(dry_run=args.dry_run)
+    finally:
+        client.close()
+
+    logger.info("node_id_backfill.complete", dry_run=args.dry_run, **report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Backfill ``pooled_embedding`` for pages and chunks ingested before it was stored.
+
+Two-stage search prefilters candidates on each row's pooled vector, so
+rows without one are invisible to it until this has run. Walks every
+page and chunk whose ``pooled_embedding`` is empty and fills it from the
+row's multi-vector ``embedding``.
+
+Run it with the worker stopped or idle; it opens the database directly.
+
+Usage:
+    python3 -m tkr_docusearch.processing.pooled_embedding_backfill [--dry-run] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Any
+
+import structlog
+
+from ..storage.koji_client import pool_multivec
+
+logger = structlog.get_logger(__name__)
+
+DB_PATH = os.getenv("KOJI_DB_PATH", "./data/koji.db")
+
+
+def backfill_pooled_embeddings(
+    client: Any,
+    batch_size: int = 256,
+    dry_run: bool = False,
+) -> dict[str, dict[str, int]]:
+    """Fill ``pooled_embedding`` on every page and chunk that lacks it.
+
+    Args:
+        client: Open ``KojiClient``.
+        batch_size: Rows read (and updated) per round trip.
+        dry_run: Count what would be written without writing.
+
+    Returns:
+        Per-table counts of rows ``scanned``, ``updated`` and ``failed``
+        (embedding could not be decoded).
+    """
+    report: dict[str, dict[str, int]] = {}
+    for table in ("pages", "chunks"):
+        stats = {"scanned": 0, "updated": 0, "failed": 0}
+        after_id = ""
+
+        while True:
+            rows = client.list_rows_missing_pooled(table, after_id=after_id, limit=batch_size)
+            if not rows:
+                break
+            after_id = rows[-1]["id"]
+
+            pooled: dict[str, bytes] = {}
+            for row in rows:
+                stats["scanned"] += 1
+                try:
+                    blob = pool_multivec(row["embedding"])
+                except Exception as exc:
+                    blob = None
+                    logger.warning(
+                        "pooled_backfill.row_failed", table=table, row_id=row["id"],
+                        error=str(exc),
+                    )
+                if blob is None:
+                    stats["failed"] += 1
+                    continue
+                pooled[row["id"]] = blob
+
+            if dry_run:
+                stats["updated"] += len(pooled)
+            else:
+                stats["updated"] += client.set_pooled_embeddings(table, pooled)
+
+            logger.info("pooled_backfill.progress", table=table, after_id=after_id, **stats)
+
+        report[table] = stats
+    return report
+
+
+def main() -> None:
+    """Run the pooled embedding backfill against ``KOJI_DB_PATH``."""
+    parser = argparse.ArgumentParser(
+        description="Backfill pages/chunks.pooled_embedding from multi-vector embeddings",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be written without writing",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=256, help="Rows processed per round trip",
+    )
+    args = parser.parse_args()
+
+    from ..config.koji_config import KojiConfig
+    from ..storage.koji_client import KojiClient
+
+    client = KojiClient(KojiConfig(db_path=DB_PATH))
+    client.open()
+    try:
+        report = backfill_pooled_embeddings(
+            client, batch_size=args.batch_size, dry_run=args.dry_run,
+        )
+    finally:
+        client.close()
+
+    logger.info("pooled_backfill.complete", dry_run=args.dry_run, **report)
+
+
+if __name__ == "__main__":
+    main()
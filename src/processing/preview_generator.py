@@ -83,7 +83,10 @@ class PreviewGenerator:
             if page_data and page_data.get("image"):
                 img = Image.open(BytesIO(page_data["image"]))
                 image_data_uri = self._image_to_base64_png(img)
-                doc_data = self.storage_client.get_document(doc_id) or {}
+                doc_data = (
+                    self.storage_client.get_document(doc_id, columns=["filename", "format"])
+                    or {}
+                )
                 return PreviewResponse(
                     doc_id=doc_id,
                     page_num=page_num,
@@ -259,7 +262,9 @@ class PreviewGenerator:
                 if file_path:
                     return file_path, page_data
 
-            doc_data = self.storage_client.get_document(doc_id)
+            doc_data = self.storage_client.get_document(
+                doc_id, columns=["filename", "metadata"]
+            )
             if doc_data:
                 metadata = doc_data.get("metadata") or {}
                 file_path = metadata.get("file_path") if isinstance(metadata, dict) else None
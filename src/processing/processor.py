@@ -90,6 +90,10 @@ class StorageError(ProcessingError):
     """Storage operation error."""
 
 
+class ProcessingAbortedError(ProcessingError):
+    """Processing stopped by the caller's abort check before storing."""
+
+
 # ---------------------------------------------------------------------------
 # DocumentProcessor
 # ---------------------------------------------------------------------------
@@ -136,6 +140,7 @@ class DocumentProcessor:
         file_path: str,
         status_callback: Optional[Callable] = None,
         project_id: str = "default",
+        should_abort: Optional[Callable[[], bool]] = None,
     ) -> StorageConfirmation:
         """Process a document through the complete pipeline.
 
@@ -144,11 +149,15 @@ class DocumentProcessor:
             status_callback: Optional callback receiving
                 ``ProcessingStatus`` objects.
             project_id: Project to assign the document to.
+            should_abort: Optional check polled before artifacts are
+                written and again before the Koji batch commits; when it
+                returns ``True`` nothing further is written.
 
         Returns:
             StorageConfirmation with storage details.
 
         Raises:
+            ProcessingAbortedError: If *should_abort* returned ``True``.
             ProcessingError: If processing fails at any stage.
         """
         start_time = time.time()
@@ -185,10 +194,13 @@ class DocumentProcessor:
                 pages=len(result.page_images) if result.page_images else 0,
             )
 
-            # ---- Stage 2: Save page images to disk --------------------------
+            self._check_abort(should_abort, doc_id)
+
+            # ---- Stage 2: Save page images and thumbnails ------------------
             page_image_bytes = result.page_images or []
+            page_thumbs: List[Optional[bytes]] = []
             if page_image_bytes:
-                self._save_page_images_from_bytes(doc_id, page_image_bytes)
+                page_thumbs = self._save_page_images_from_bytes(doc_id, page_image_bytes)
 
             # ---- Stage 3: Save VTT / markdown / album art to disk -----------
             self._save_artifacts(doc_id, result, filename)
@@ -207,6 +219,8 @@ class DocumentProcessor:
                 project_id=project_id,
                 visual_embeddings=result.visual_embeddings,
                 page_image_bytes=page_image_bytes,
+                page_thumbs=page_thumbs,
+                should_abort=should_abort,
             )
 
             # ---- Done -------------------------------------------------------
@@ -251,27 +265,34 @@ class DocumentProcessor:
     def _save_page_images_from_bytes(
         doc_id: str,
         page_image_bytes: List[bytes],
-    ) -> None:
+    ) -> List[Optional[bytes]]:
         """Save rendered page images and thumbnails to disk.
 
         Converts image bytes (from shikomi's ``IngestResult.page_images``)
         to PIL Images for thumbnail generation, then saves both the
-        full-size image and thumbnail.
+        full-size image and thumbnail. The encoded thumbnails are returned
+        so they can also be stored in ``pages.thumb``.
 
         Args:
             doc_id: Document identifier.
             page_image_bytes: List of PNG/JPEG bytes, one per page.
+
+        Returns:
+            Encoded thumbnail bytes per page (``None`` where generation
+            failed).
         """
+        thumbs: List[Optional[bytes]] = [None] * len(page_image_bytes)
         try:
             from PIL import Image
 
-            from .image_utils import save_page_image
+            from .image_utils import encode_thumbnail, save_page_image
 
             for idx, img_bytes in enumerate(page_image_bytes):
                 page_num = idx + 1
                 try:
                     img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-                    save_page_image(image=img, doc_id=doc_id, page_num=page_num)
+                    _, thumb_path = save_page_image(image=img, doc_id=doc_id, page_num=page_num)
+                    thumbs[idx] = Path(thumb_path).read_bytes()
                 except Exception as exc:
                     logger.warning(
                         "processor.page_image_save_failed",
@@ -279,8 +300,13 @@ class DocumentProcessor:
                         page_num=page_num,
                         error=str(exc),
                     )
+                    try:
+                        thumbs[idx] = encode_thumbnail(img_bytes)
+                    except Exception:
+                        pass
         except ImportError:
             logger.warning("processor.image_utils_unavailable")
+        return thumbs
 
     @staticmethod
     def _save_artifacts(
@@ -349,6 +375,8 @@ class DocumentProcessor:
         project_id: str,
         visual_embeddings: Optional[list] = None,
         page_image_bytes: Optional[List[bytes]] = None,
+        page_thumbs: Optional[List[Optional[bytes]]] = None,
+        should_abort: Optional[Callable[[], bool]] = None,
     ) -> StorageConfirmation:
         """Map IngestResult to Koji records and store.
 
@@ -359,11 +387,15 @@ class DocumentProcessor:
             project_id: Project identifier.
             visual_embeddings: Optional list of ``MultiVectorEmbedding``.
             page_image_bytes: Optional PNG bytes per page.
+            page_thumbs: Optional encoded thumbnail bytes per page.
+            should_abort: Optional check run before the batch commits;
+                raising from inside the batch discards its buffered rows.
 
         Returns:
             StorageConfirmation with storage details.
 
         Raises:
+            ProcessingAbortedError: If *should_abort* returned ``True``.
             StorageError: If storage fails.
         """
         try:
@@ -373,78 +405,84 @@ class DocumentProcessor:
                 else None
             )
 
-            # Document record
-            doc_record = map_document_record(
-                result, filename, project_id, num_pages=num_pages,
-            )
-            self.storage_client.create_document(**doc_record)
-
-            # Page records (visual formats only). ``result`` is passed so
-            # the mapper can attach per-page figure enrichment derived
-            # from the chunk -> figure cross-reference.
-            visual_ids: list = []
-            visual_size = 0
-            if visual_embeddings:
-                page_records = map_page_records(
-                    doc_id=doc_id,
-                    visual_embeddings=visual_embeddings,
-                    page_images=page_image_bytes,
-                    result=result,
-                )
-                self.storage_client.insert_pages(page_records)
-                visual_ids = [r["id"] for r in page_records]
-                visual_size = sum(
-                    len(r.get("embedding", b"")) + len(r.get("image", b""))
-                    for r in page_records
-                )
-
-            # Chunk records
-            text_ids: list = []
-            text_size = 0
-            if result.chunks:
-                chunk_records = map_chunk_records(doc_id, result)
-                self.storage_client.insert_chunks(chunk_records)
-                text_ids = [r["id"] for r in chunk_records]
-                text_size = sum(
-                    len(r.get("embedding", b"")) + len(r.get("text", "").encode())
-                    for r in chunk_records
+            # Group every insert for this document into one commit.
+            with self.storage_client.batch():
+                # Document record
+                doc_record = map_document_record(
+                    result, filename, project_id, num_pages=num_pages,
                 )
+                self.storage_client.create_document(**doc_record)
+
+                # Page records (visual formats only). ``result`` is passed so
+                # the mapper can attach per-page figure enrichment derived
+                # from the chunk -> figure cross-reference.
+                visual_ids: list = []
+                visual_size = 0
+                if visual_embeddings:
+                    page_records = map_page_records(
+                        doc_id=doc_id,
+                        visual_embeddings=visual_embeddings,
+                        page_images=page_image_bytes,
+                        page_thumbs=page_thumbs,
+                        result=result,
+                    )
+                    self.storage_client.insert_pages(page_records)
+                    visual_ids = [r["id"] for r in page_records]
+                    visual_size = sum(
+                        len(r.get("embedding", b""))
+                        + len(r.get("image", b""))
+                        + len(r.get("thumb", b""))
+                        for r in page_records
+                    )
 
-            # Synthetic enrichment chunks — document summary, figure
-            # captions, code analyses, formula interpretations are
-            # embedded via the shared ColNomic engine and persisted as
-            # regular chunks so enrichment flows into the searchable
-            # text stream.
-            if self.index_enrichment_captions:
-                synthetic_ids, synthetic_size = self._store_synthetic_enrichment(
-                    doc_id=doc_id,
-                    result=result,
-                )
-                text_ids.extend(synthetic_ids)
-                text_size += synthetic_size
+                # Chunk records
+                text_ids: list = []
+                text_size = 0
+                if result.chunks:
+                    chunk_records = map_chunk_records(doc_id, result)
+                    self.storage_client.insert_chunks(chunk_records)
+                    text_ids = [r["id"] for r in chunk_records]
+                    text_size = sum(
+                        len(r.get("embedding", b"")) + len(r.get("text", "").encode())
+                        for r in chunk_records
+                    )
 
-            # Relations (already detected by shikomi ingester)
-            if result.relations:
-                for rel in result.relations:
+                # Synthetic enrichment chunks — document summary, figure
+                # captions, code analyses, formula interpretations are
+                # embedded via the shared ColNomic engine and persisted as
+                # regular chunks so enrichment flows into the searchable
+                # text stream.
+                if self.index_enrichment_captions:
+                    synthetic_ids, synthetic_size = self._store_synthetic_enrichment(
+                        doc_id=doc_id,
+                        result=result,
+                    )
+                    text_ids.extend(synthetic_ids)
+                    text_size += synthetic_size
+
+                # Relations (already detected by shikomi ingester)
+                if result.relations:
+                    rows = [
+                        {**rel, "src_doc_id": rel.get("src_doc_id", doc_id)}
+                        for rel in result.relations
+                    ]
                     try:
-                        self.storage_client.create_relation(
-                            src_doc_id=rel.get("src_doc_id", doc_id),
-                            dst_doc_id=rel["dst_doc_id"],
-                            relation_type=rel["relation_type"],
-                            metadata=rel.get("metadata"),
-                        )
+                        counts = self.storage_client.create_relations_bulk(rows)
                     except Exception as exc:
                         logger.warning(
                             "processor.relation_store_failed",
-                            relation=rel,
+                            doc_id=doc_id,
+                            count=len(rows),
                             error=str(exc),
                         )
+                    else:
+                        logger.info(
+                            "processor.relations_stored",
+                            doc_id=doc_id,
+                            **counts,
+                        )
 
-                logger.info(
-                    "processor.relations_stored",
-                    doc_id=doc_id,
-                    count=len(result.relations),
-                )
+                self._check_abort(should_abort, doc_id)
 
             return StorageConfirmation(
                 doc_id=doc_id,
@@ -454,6 +492,8 @@ class DocumentProcessor:
                 timestamp=datetime.now(timezone.utc).isoformat(),
             )
 
+        except ProcessingAbortedError:
+            raise
         except Exception as exc:
             raise StorageError(f"Failed to store results: {exc}") from exc
 
@@ -533,6 +573,11 @@ class DocumentProcessor:
 
     # -- status helpers ------------------------------------------------------
 
+    @staticmethod
+    def _check_abort(should_abort: Optional[Callable[[], bool]], doc_id: str) -> None:
+        if should_abort is not None and should_abort():
+            raise ProcessingAbortedError(f"Processing of {doc_id} aborted before storing")
+
     @staticmethod
     def _emit_status(
         doc_id: str,
@@ -0,0 +1,50 @@
+"""Backfill ``project_id`` on pages and chunks ingested before it was stored.
+
+Project-scoped searches filter pages and chunks on their own copy of
+``project_id``, so rows without one are invisible to them until this has
+run. Copies each row's ``project_id`` from its document.
+
+Run it once per database, with the worker stopped or idle; it opens the
+database directly.
+
+Usage:
+    python3 -m tkr_docusearch.processing.project_id_backfill [--dry-run]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DB_PATH = os.getenv("KOJI_DB_PATH", "./data/koji.db")
+
+
+def main() -> None:
+    """Run the project_id backfill against ``KOJI_DB_PATH``."""
+    parser = argparse.ArgumentParser(
+        description="Backfill pages/chunks.project_id from their documents",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be written without writing",
+    )
+    args = parser.parse_args()
+
+    from ..config.koji_config import KojiConfig
+    from ..storage.koji_client import KojiClient
+
+    client = KojiClient(KojiConfig(db_path=DB_PATH))
+    client.open()
+    try:
+        report = client.backfill_row_project_ids(dry_run=args.dry_run)
+    finally:
+        client.close()
+
+    logger.info("project_id_backfill.complete", dry_run=args.dry_run, **report)
+
+
+if __name__ == "__main__":
+    main()
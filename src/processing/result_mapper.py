@@ -253,6 +253,7 @@ def map_page_records(
     page_structures: list[dict[str, Any]] | None = None,
     result: IngestResult | None = None,
     chunks: list[TextChunk] | None = None,
+    page_thumbs: list[bytes | None] | None = None,
 ) -> list[dict[str, Any]]:
     """Build page record dicts from visual embeddings and optional images.
 
@@ -275,12 +276,14 @@ def map_page_records(
         result: Optional full ``IngestResult`` for enrichment extraction.
         chunks: Optional explicit chunk list for enrichment correlation.
             Falls back to ``result.chunks`` when not provided.
+        page_thumbs: Optional encoded thumbnail bytes per page, parallel
+            to embeddings. ``None`` entries are skipped.
 
     Returns:
         List of dicts with keys matching ``KojiClient.insert_pages``
         format: ``id``, ``doc_id``, ``page_num``, ``embedding``,
-        ``image`` (optional), ``structure`` (optional),
-        ``enrichment`` (optional).
+        ``image`` (optional), ``thumb`` (optional), ``structure``
+        (optional), ``enrichment`` (optional).
     """
     records: list[dict[str, Any]] = []
 
@@ -339,6 +342,9 @@ def map_page_records(
         if page_images is not None and idx < len(page_images):
             record["image"] = page_images[idx]
 
+        if page_thumbs is not None and idx < len(page_thumbs) and page_thumbs[idx]:
+            record["thumb"] = page_thumbs[idx]
+
         if page_structures is not None and idx < len(page_structures):
             record["structure"] = page_structures[idx]
 
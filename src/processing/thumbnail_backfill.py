@@ -0,0 +1,132 @@
+"""Backfill ``pages.thumb`` for documents ingested before thumbnails were stored.
+
+Walks every page whose ``thumb`` column is empty and fills it from the
+page's stored ``image``, or from the legacy on-disk thumbnail / page
+image when the database holds no image blob.
+
+Run it with the worker stopped or idle; it opens the database directly.
+
+Usage:
+    python3 -m tkr_docusearch.processing.thumbnail_backfill [--dry-run] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+import structlog
+
+from .image_utils import encode_thumbnail, get_image_path
+
+logger = structlog.get_logger(__name__)
+
+DB_PATH = os.getenv("KOJI_DB_PATH", "./data/koji.db")
+
+
+def thumbnail_for_page(page: dict[str, Any]) -> Optional[bytes]:
+    """Produce thumbnail bytes for a page row.
+
+    Args:
+        page: Row from ``KojiClient.list_pages_missing_thumbs``.
+
+    Returns:
+        Encoded thumbnail, or ``None`` if no source image is available.
+    """
+    if page.get("image"):
+        return encode_thumbnail(page["image"])
+
+    try:
+        thumb_path = Path(get_image_path(page["doc_id"], page["page_num"], is_thumb=True))
+        image_path = Path(get_image_path(page["doc_id"], page["page_num"]))
+    except ValueError:
+        return None
+
+    if thumb_path.exists():
+        return thumb_path.read_bytes()
+    if image_path.exists():
+        return encode_thumbnail(image_path.read_bytes())
+    return None
+
+
+def backfill_page_thumbnails(
+    client: Any,
+    batch_size: int = 32,
+    dry_run: bool = False,
+) -> dict[str, int]:
+    """Fill ``pages.thumb`` for every page that lacks it.
+
+    Args:
+        client: Open ``KojiClient``.
+        batch_size: Pages read (and updated) per round trip.
+        dry_run: Count what would be written without writing.
+
+    Returns:
+        Counts of pages ``scanned``, ``updated``, ``skipped`` (no source
+        image), and ``failed`` (source image could not be decoded).
+    """
+    stats = {"scanned": 0, "updated": 0, "skipped": 0, "failed": 0}
+    after_id = ""
+
+    while True:
+        pages = client.list_pages_missing_thumbs(after_id=after_id, limit=batch_size)
+        if not pages:
+            break
+        after_id = pages[-1]["id"]
+
+        thumbs: dict[str, bytes] = {}
+        for page in pages:
+            stats["scanned"] += 1
+            try:
+                thumb = thumbnail_for_page(page)
+            except Exception as exc:
+                stats["failed"] += 1
+                logger.warning(
+                    "thumbnail_backfill.page_failed", page_id=page["id"], error=str(exc),
+                )
+                continue
+            if thumb is None:
+                stats["skipped"] += 1
+                continue
+            thumbs[page["id"]] = thumb
+
+        if dry_run:
+            stats["updated"] += len(thumbs)
+        else:
+            stats["updated"] += client.set_page_thumbs(thumbs)
+
+        logger.info("thumbnail_backfill.progress", after_id=after_id, **stats)
+
+    return stats
+
+
+def main() -> None:
+    """Run the thumbnail backfill against ``KOJI_DB_PATH``."""
+    parser = argparse.ArgumentParser(description="Backfill pages.thumb from page images")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Report what would be written without writing",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=32, help="Pages processed per round trip",
+    )
+    args = parser.parse_args()
+
+    from ..config.koji_config import KojiConfig
+    from ..storage.koji_client import KojiClient
+
+    client = KojiClient(KojiConfig(db_path=DB_PATH))
+    client.open()
+    try:
+        stats = backfill_page_thumbnails(
+            client, batch_size=args.batch_size, dry_run=args.dry_run,
+        )
+    finally:
+        client.close()
+
+    logger.info("thumbnail_backfill.complete", dry_run=args.dry_run, **stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,26 @@ files sequentially through shikomi, and stores results in Koji.
 No HTTP server, no event loop, no uvicorn.  Koji's Tokio runtime and
 PyTorch MPS run uncontested in this process.
 
+Jobs are claimed under a lease that a heartbeat thread renews while the
+job runs; jobs whose lease expires (crashed or hung worker) are requeued
+by whichever worker notices first. ``--concurrency N`` starts N worker
+processes sharing the same database, each with its own models.
+
 Usage:
-    python3 -m tkr_docusearch.processing.worker
+    python3 -m tkr_docusearch.processing.worker [--concurrency N]
 """
 
 from __future__ import annotations
 
+import argparse
 import hashlib
+import multiprocessing
 import os
+import re
 import signal
+import socket
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Any, Optional
@@ -33,6 +43,82 @@ DEVICE = os.getenv("DEVICE", "mps")
 QUANTIZATION = os.getenv("MODEL_PRECISION", "fp16")
 POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "2.0"))
 DB_PATH = os.getenv("KOJI_DB_PATH", "./data/koji.db")
+CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+LEASE_SECONDS = float(os.getenv("WORKER_LEASE_SECONDS", "300"))
+MAX_ATTEMPTS = int(os.getenv("WORKER_MAX_ATTEMPTS", "3"))
+REQUEUE_INTERVAL = float(os.getenv("WORKER_REQUEUE_INTERVAL", "30"))
+
+
+def worker_identity(index: int = 0) -> str:
+    """Build a lease-holder ID unique to this process.
+
+    Args:
+        index: Worker slot within a ``--concurrency`` pool.
+
+    Returns:
+        ID of the form ``<host>-<pid>-<index>`` restricted to characters
+        Koji accepts in SQL predicates.
+    """
+    host = re.sub(r"[^a-zA-Z0-9_\-]", "-", socket.gethostname())[:64]
+    return f"{host}-{os.getpid()}-{index}"
+
+
+class LeaseHeartbeat:
+    """Renews a job lease on a background thread while the job runs.
+
+    Usable as a context manager around processing. ``lost`` is set if a
+    renewal finds the job no longer leased to this worker; the caller
+    must then stop writing the job's results.
+
+    Args:
+        koji_client: ``KojiClient`` holding the lease.
+        doc_id: Job identifier.
+        worker_id: Lease holder.
+        lease_seconds: Lease duration; renewed every third of it.
+    """
+
+    def __init__(
+        self,
+        koji_client: Any,
+        doc_id: str,
+        worker_id: str,
+        lease_seconds: float = LEASE_SECONDS,
+    ) -> None:
+        self._koji = koji_client
+        self._doc_id = doc_id
+        self._worker_id = worker_id
+        self._lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.lost = False
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread = threading.Thread(
+            target=self._run, name=f"lease-{self._doc_id[:12]}", daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._lease_seconds / 3):
+            try:
+                renewed = self._koji.heartbeat_job(
+                    self._doc_id, self._worker_id, self._lease_seconds,
+                )
+            except Exception as exc:
+                logger.warning("worker.heartbeat_failed", doc_id=self._doc_id, error=str(exc))
+                continue
+            if not renewed:
+                self.lost = True
+                logger.warning(
+                    "worker.lease_lost", doc_id=self._doc_id, worker_id=self._worker_id,
+                )
+                return
 
 
 # ---------------------------------------------------------------------------
@@ -44,16 +130,24 @@ def process_job(
     job: dict[str, Any],
     processor: Any,
     koji_client: Any,
+    worker_id: Optional[str] = None,
+    lease_seconds: float = LEASE_SECONDS,
 ) -> None:
     """Process a single job from the queue.
 
     Calls ``DocumentProcessor.process_document()`` with a status callback
-    that writes progress to the ``processing_jobs`` table in Koji.
+    that writes progress to the ``processing_jobs`` table in Koji. When
+    *worker_id* is given, the job's lease is renewed while processing and
+    the final status is written only if this worker still holds it. A
+    lost lease aborts processing before any results are stored, since
+    the requeued job may already be running on another worker.
 
     Args:
         job: Job dict from ``koji_client.claim_next_job()``.
         processor: ``DocumentProcessor`` instance.
         koji_client: ``KojiClient`` instance for status updates.
+        worker_id: Lease holder that claimed the job.
+        lease_seconds: Lease duration used for heartbeats.
     """
     doc_id = job["doc_id"]
     filename = job["filename"]
@@ -66,8 +160,15 @@ def process_job(
         filename=filename,
     )
 
+    heartbeat: Optional[LeaseHeartbeat] = None
+
+    def _lease_lost() -> bool:
+        return heartbeat is not None and heartbeat.lost
+
     def _status_callback(status: Any) -> None:
         """Forward processing status to Koji."""
+        if _lease_lost():
+            return  # the job belongs to another worker now
         try:
             koji_client.update_job_progress(
                 doc_id,
@@ -79,13 +180,22 @@ def process_job(
             pass  # non-critical — don't interrupt processing
 
     try:
-        result = processor.process_document(
-            file_path=file_path,
-            status_callback=_status_callback,
-            project_id=project_id,
-        )
+        if worker_id is None:
+            result = processor.process_document(
+                file_path=file_path,
+                status_callback=_status_callback,
+                project_id=project_id,
+            )
+        else:
+            with LeaseHeartbeat(koji_client, doc_id, worker_id, lease_seconds) as heartbeat:
+                result = processor.process_document(
+                    file_path=file_path,
+                    status_callback=_status_callback,
+                    project_id=project_id,
+                    should_abort=_lease_lost,
+                )
 
-        koji_client.complete_job(doc_id)
+        koji_client.complete_job(doc_id, worker_id=worker_id)
 
         logger.info(
             "worker.completed",
@@ -96,8 +206,14 @@ def process_job(
         )
 
     except Exception as exc:
+        if _lease_lost():
+            # Another worker owns the job; leave its status alone.
+            logger.warning(
+                "worker.aborted_lease_lost", doc_id=doc_id, filename=filename,
+            )
+            return
         error_msg = str(exc)
-        koji_client.fail_job(doc_id, error_msg)
+        koji_client.fail_job(doc_id, error_msg, worker_id=worker_id)
 
         logger.error(
             "worker.failed",
@@ -113,14 +229,18 @@ def process_job(
 # ---------------------------------------------------------------------------
 
 
-def main() -> None:
-    """Run the processing worker.
+def run_worker(index: int = 0) -> None:
+    """Run one processing worker.
 
     Initializes all components (Koji, ShikomiIngester, DocumentProcessor),
     then enters a poll loop that claims and processes jobs sequentially.
     Exits cleanly on SIGTERM or SIGINT.
+
+    Args:
+        index: Worker slot within a ``--concurrency`` pool.
     """
     running = True
+    worker_id = worker_identity(index)
 
     def _shutdown(signum: int, frame: Any) -> None:
         nonlocal running
@@ -133,7 +253,9 @@ def main() -> None:
 
     # -- Initialize components -----------------------------------------------
 
-    logger.info("worker.starting", device=DEVICE, quantization=QUANTIZATION)
+    logger.info(
+        "worker.starting", worker_id=worker_id, device=DEVICE, quantization=QUANTIZATION,
+    )
 
     from ..config.koji_config import KojiConfig
     from ..storage.koji_client import KojiClient
@@ -186,20 +308,28 @@ def main() -> None:
     # -- Poll loop -----------------------------------------------------------
 
     jobs_processed = 0
+    last_requeue = 0.0
     try:
         while running:
-            job = koji_client.claim_next_job()
+            if time.monotonic() - last_requeue >= REQUEUE_INTERVAL:
+                koji_client.requeue_expired_jobs(
+                    max_attempts=MAX_ATTEMPTS, lease_seconds=LEASE_SECONDS,
+                )
+                last_requeue = time.monotonic()
+
+            job = koji_client.claim_next_job(worker_id=worker_id, lease_seconds=LEASE_SECONDS)
 
             if job is None:
                 time.sleep(POLL_INTERVAL)
                 continue
 
-            process_job(job, processor, koji_client)
+            process_job(job, processor, koji_client, worker_id, LEASE_SECONDS)
             jobs_processed += 1
 
     finally:
         logger.info(
             "worker.shutting_down",
+            worker_id=worker_id,
             jobs_processed=jobs_processed,
         )
         ingester.close()
@@ -207,5 +337,61 @@ def main() -> None:
         logger.info("worker.stopped")
 
 
+def run_pool(concurrency: int) -> None:
+    """Run *concurrency* worker processes and wait for them to exit.
+
+    Each child loads its own models and claims jobs independently; the
+    lease-based claim keeps them from processing the same document.
+    SIGTERM/SIGINT are forwarded to the children.
+
+    Args:
+        concurrency: Number of worker processes.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    children = [
+        ctx.Process(target=run_worker, args=(index,), name=f"worker-{index}")
+        for index in range(concurrency)
+    ]
+
+    def _forward(signum: int, frame: Any) -> None:
+        logger.info("worker.pool_shutdown_requested", signal=signal.Signals(signum).name)
+        for child in children:
+            if child.is_alive():
+                child.terminate()
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    for child in children:
+        child.start()
+    logger.info("worker.pool_started", concurrency=concurrency)
+
+    for child in children:
+        child.join()
+    logger.info(
+        "worker.pool_stopped",
+        exit_codes=[child.exitcode for child in children],
+    )
+
+
+def main() -> None:
+    """Parse arguments and run one worker, or a pool of them."""
+    parser = argparse.ArgumentParser(description="DocuSearch processing worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=CONCURRENCY,
+        help="Number of worker processes sharing the database (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.concurrency == 1:
+        run_worker()
+    else:
+        run_pool(args.concurrency)
+
+
 if __name__ == "__main__":
     main()
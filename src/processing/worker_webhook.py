@@ -12,16 +12,26 @@ This server:
 """
 
 import asyncio
+import dataclasses
 import hashlib
 import json
 import logging
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 import uvicorn
-from fastapi import BackgroundTasks, FastAPI, File, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import (
+    BackgroundTasks,
+    FastAPI,
+    File,
+    HTTPException,
+    Query,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
@@ -71,6 +81,8 @@ UPLOADS_DIR = Path(os.getenv("UPLOAD_DIR", os.path.join(os.path.dirname(os.path.
 DEVICE = os.getenv("DEVICE", "mps")
 PRECISION = os.getenv("MODEL_PRECISION", "fp16")
 WORKER_PORT = int(os.getenv("WORKER_PORT", "8002"))
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "./data/snapshots"))
+SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "16"))
 
 # Global components (initialized at startup)
 koji_client: Optional[KojiClient] = None
@@ -320,46 +332,39 @@ async def delete_document(request: DeleteRequest):
     temp_dirs_count = 0
     doc_id = None
 
+    # Delete through the shared client so its row cache and index version
+    # (which keys KojiSearch's result cache) see the write.
+    if koji_client is None:
+        raise HTTPException(status_code=503, detail="Koji client not initialized")
+
     try:
-        # Initialize Koji client
-        from src.storage.koji_client import KojiClient
-        from src.config.koji_config import KojiConfig
+        # Find doc_id by filename
+        match = koji_client.find_document_by_filename(request.filename, columns=["doc_id"])
+
+        if match is None:
+            logger.warning(f"No document found for filename: {request.filename}")
+            return DeleteResponse(
+                message=f"No document found for {request.filename}",
+                doc_id=None,
+                visual_deleted=0,
+                text_deleted=0,
+                page_images_deleted=0,
+                cover_art_deleted=0,
+                markdown_deleted=False,
+                temp_dirs_cleaned=0,
+                status="not_found",
+            )
 
-        koji = KojiClient(KojiConfig.from_env())
-        koji.open()
+        doc_id = match["doc_id"]
+        logger.info(f"Starting comprehensive cleanup for document: {doc_id}")
 
+        # 1. Delete from Koji (cascades to pages, chunks, relations)
         try:
-            # Find doc_id by filename
-            docs = koji.list_documents(limit=10000)
-            matching = [d for d in docs if d.get("filename") == request.filename]
-
-            if not matching:
-                koji.close()
-                logger.warning(f"No document found for filename: {request.filename}")
-                return DeleteResponse(
-                    message=f"No document found for {request.filename}",
-                    doc_id=None,
-                    visual_deleted=0,
-                    text_deleted=0,
-                    page_images_deleted=0,
-                    cover_art_deleted=0,
-                    markdown_deleted=False,
-                    temp_dirs_cleaned=0,
-                    status="not_found",
-                )
-
-            doc_id = matching[0]["doc_id"]
-            logger.info(f"Starting comprehensive cleanup for document: {doc_id}")
-
-            # 1. Delete from Koji (cascades to pages, chunks, relations)
-            try:
-                koji.delete_document(doc_id)
-                logger.info(f"Koji cleanup complete for {doc_id}")
-            except Exception as e:
-                logger.error(f"Koji deletion failed: {e}", exc_info=True)
-                raise
-        finally:
-            koji.close()
+            koji_client.delete_document(doc_id)
+            logger.info(f"Koji cleanup complete for {doc_id}")
+        except Exception as e:
+            logger.error(f"Koji deletion failed: {e}", exc_info=True)
+            raise
 
         # 2. Delete page images and thumbnails
         try:
@@ -503,31 +508,20 @@ async def handle_upload_registration(websocket: WebSocket, message: Dict[str, An
         is_duplicate = False
         existing_doc = None
 
-        if not force_upload:
+        if not force_upload and koji_client is not None:
             try:
-                # Query Koji directly to check for existing files
-                from src.storage.koji_client import KojiClient
-                from src.config.koji_config import KojiConfig
-
-                koji = KojiClient(KojiConfig.from_env())
-                koji.open()
-
-                try:
-                    docs = koji.list_documents(limit=10000)
-                    for doc in docs:
-                        stored_filename = doc.get("filename", "")
-                        if stored_filename == filename:
-                            is_duplicate = True
-                            existing_doc = {
-                                "doc_id": doc.get("doc_id", ""),
-                                "filename": stored_filename,
-                                "date_added": doc.get("created_at", ""),
-                                "file_type": doc.get("format", ""),
-                            }
-                            logger.info(f"  Duplicate detected (exact): {filename}")
-                            break
-                finally:
-                    koji.close()
+                doc = koji_client.find_document_by_filename(
+                    filename, columns=["doc_id", "filename", "created_at", "format"],
+                )
+                if doc is not None:
+                    is_duplicate = True
+                    existing_doc = {
+                        "doc_id": doc.get("doc_id", ""),
+                        "filename": doc.get("filename", ""),
+                        "date_added": doc.get("created_at", ""),
+                        "file_type": doc.get("format", ""),
+                    }
+                    logger.info(f"  Duplicate detected (exact): {filename}")
 
             except Exception as e:
                 logger.warning(f"Could not check for duplicates: {e}")
@@ -685,9 +679,10 @@ async def startup_event():
     logger.info(f"  Supported Formats: {', '.join(processing_config.supported_formats)}")
 
     try:
-        # Initialize Koji (for document reads + job queue)
+        # Initialize Koji (for document reads + job queue). This service
+        # owns the database, so it alone runs background compaction.
         from ..config.koji_config import KojiConfig
-        koji_config = KojiConfig.from_env()
+        koji_config = dataclasses.replace(KojiConfig.from_env(), run_maintenance=True)
         logger.info(f"Opening Koji database ({koji_config.db_path})...")
         koji_client = KojiClient(koji_config)
         koji_client.open()
@@ -857,32 +852,149 @@ async def graph_stats():
         "documents": doc_count,
         "edges_by_type": edge_counts,
         "total_edges": sum(edge_counts.values()),
+        "algorithm_cache": storage.graph_cache_stats(),
     }
 
 
+# ============================================================================
+# Storage Maintenance Endpoints
+# ============================================================================
+
+
+def _compaction_scheduler():
+    """Return the Koji compaction scheduler or raise 503 if unavailable."""
+    scheduler = koji_client.maintenance if koji_client is not None else None
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Compaction scheduler not running")
+    return scheduler
+
+
+@app.get("/maintenance/compaction")
+async def compaction_status():
+    """Return background compaction heuristics and recent run history."""
+    scheduler = _compaction_scheduler()
+    return await asyncio.to_thread(scheduler.status)
+
+
+@app.post("/maintenance/compaction")
+async def trigger_compaction():
+    """Queue an immediate compaction pass on the maintenance thread.
+
+    Returns without waiting; poll ``GET /maintenance/compaction`` for
+    the run's duration and bytes reclaimed.
+    """
+    scheduler = _compaction_scheduler()
+    if not scheduler.trigger():
+        raise HTTPException(status_code=503, detail="Compaction scheduler not running")
+    return {"status": "compaction_queued"}
+
+
+class SnapshotRequest(BaseModel):
+    """Request body for ``POST /maintenance/snapshot``."""
+
+    name: Optional[str] = Field(
+        None, description="Snapshot directory name under SNAPSHOT_DIR (default: timestamp)",
+    )
+    format: str = Field("arrow", description="arrow or parquet")
+    compression: Optional[str] = Field("zstd", description="zstd, lz4, or null")
+
+
+@app.post("/maintenance/snapshot")
+async def export_koji_snapshot(request: SnapshotRequest):
+    """Export the content tables to an Arrow IPC or Parquet snapshot.
+
+    Runs on a worker thread while ingestion continues; the response is
+    the snapshot manifest, including per-table MB/s. Restore with
+    ``python -m tkr_docusearch.storage.snapshot import DIR``.
+    """
+    from ..storage.snapshot import SNAPSHOT_FORMATS, export_snapshot
+
+    if koji_client is None:
+        raise HTTPException(status_code=503, detail="Koji client not initialized")
+    if request.format not in SNAPSHOT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format: {request.format}")
+    if request.compression not in (None, "zstd", "lz4"):
+        raise HTTPException(
+            status_code=400, detail=f"Unknown compression: {request.compression}",
+        )
+    name = request.name or datetime.now().strftime("%Y%m%d-%H%M%S")
+    if Path(name).name != name or name in (".", ".."):
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot name: {name}")
+
+    try:
+        manifest = await asyncio.to_thread(
+            export_snapshot, koji_client, SNAPSHOT_DIR / name,
+            fmt=request.format, compression=request.compression,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(
+        f"Snapshot {name} exported: {manifest['rows']} rows, {manifest['mb_per_s']} MB/s"
+    )
+    return {"path": str(SNAPSHOT_DIR / name), **manifest}
+
+
+@app.get("/metrics")
+async def koji_metrics(limit: Optional[int] = None):
+    """Return per-statement Koji latency histograms, row and byte counts.
+
+    Templates are sorted by total time spent, so the costliest
+    statements come first. ``limit`` returns only the top entries.
+    """
+    if koji_client is None:
+        raise HTTPException(status_code=503, detail="Koji client not initialized")
+    return koji_client.query_stats.snapshot(limit=limit)
+
+
 # ============================================================================
 # Search Endpoint (used by Research API via HTTP)
 # ============================================================================
 
 
+class SearchFilterParams(BaseModel):
+    """Filters pushed down into the search SQL (see ``search.filters``)."""
+
+    file_type_group: Optional[str] = None
+    formats: Optional[list[str]] = None
+    doc_ids: Optional[list[str]] = Field(default=None, max_length=1000)
+    created_after: Optional[str] = None
+    created_before: Optional[str] = None
+    page_min: Optional[int] = Field(default=None, ge=1)
+    page_max: Optional[int] = Field(default=None, ge=1)
+    time_start: Optional[float] = Field(default=None, ge=0)
+    time_end: Optional[float] = Field(default=None, ge=0)
+
+
 class SearchRequest(BaseModel):
     """Search request model."""
 
     query: str = Field(..., min_length=1, max_length=1000)
     n_results: int = Field(default=10, ge=1, le=100)
     search_mode: str = Field(default="hybrid")
+    # "exact" or "two_stage"; None uses SEARCH_RETRIEVAL_MODE.
+    retrieval_mode: Optional[Literal["exact", "two_stage"]] = None
+    # Stage-1 candidates per table for two-stage retrieval.
+    candidates: Optional[int] = Field(default=None, ge=1, le=5000)
+    filters: Optional[SearchFilterParams] = None
+    # Return a next_cursor for GET /search/next; pages hold n_results.
+    paginate: bool = False
 
 
-@app.post("/search")
-async def search_documents(request: SearchRequest):
-    """Semantic search across indexed documents.
+# Map API mode names to KojiSearch mode names
+_SEARCH_MODE_MAP = {"visual": "visual_only", "text": "text_only", "hybrid": "hybrid"}
+_API_SEARCH_MODES = {mode: name for name, mode in _SEARCH_MODE_MAP.items()}
 
-    Lazy-loads the QueryEngine on first call (loads the embedding
-    model for query encoding).
+
+def _get_search_engine():
+    """Return the shared KojiSearch, lazy-loading the QueryEngine.
+
+    The first call loads the embedding model for query encoding.
+
+    Raises:
+        HTTPException: 503 if the QueryEngine cannot be loaded.
     """
     global query_engine
 
-    # Lazy-load QueryEngine on first search request
     if query_engine is None:
         try:
             query_engine = QueryEngine(device=DEVICE, quantization=PRECISION)
@@ -895,34 +1007,51 @@ async def search_documents(request: SearchRequest):
 
     from ..search.koji_search import KojiSearch
 
-    # Map API mode names to KojiSearch mode names
-    mode_map = {"visual": "visual_only", "text": "text_only", "hybrid": "hybrid"}
-    search_mode = mode_map.get(request.search_mode, request.search_mode)
-
-    # Get or create KojiSearch instance
     if not hasattr(app.state, "search_engine"):
         app.state.search_engine = KojiSearch(
             koji_client=koji_client, shikomi_client=query_engine
         )
+    return app.state.search_engine
 
-    # Run in thread — KojiSearch.search() uses run_until_complete()
-    # internally, which conflicts with uvicorn's running event loop
-    import asyncio
 
-    search_response = await asyncio.to_thread(
-        app.state.search_engine.search,
-        query=request.query,
-        n_results=request.n_results,
-        search_mode=search_mode,
-    )
+def _search_kwargs(request: SearchRequest) -> Dict[str, Any]:
+    """Translate a search request into ``KojiSearch.search`` arguments.
 
-    # Normalize results for the HTTP client
+    Optional settings are only passed when the request sets them, so
+    KojiSearch's own defaults apply otherwise.
+    """
+    kwargs: Dict[str, Any] = {
+        "query": request.query,
+        "n_results": request.n_results,
+        "search_mode": _SEARCH_MODE_MAP.get(request.search_mode, request.search_mode),
+    }
+    if request.retrieval_mode is not None:
+        kwargs["retrieval_mode"] = request.retrieval_mode
+    if request.candidates is not None:
+        kwargs["rerank_candidates"] = request.candidates
+    if request.filters is not None:
+        filters = request.filters.model_dump(exclude_none=True)
+        if filters:
+            kwargs["filters"] = filters
+    if request.paginate:
+        kwargs["paginate"] = True
+    return kwargs
+
+
+def _format_search_response(
+    search_response: Dict[str, Any], query: str, search_mode: str
+) -> Dict[str, Any]:
+    """Normalize a KojiSearch response for the HTTP client.
+
+    Paginated responses also carry ``next_cursor``, ``offset`` and
+    ``total_candidates``.
+    """
     results = []
     for r in search_response.get("results", []):
         results.append({
             "doc_id": r.get("doc_id"),
             "chunk_id": r.get("chunk_id"),
-            "page_num": r.get("page"),
+            "page_num": r.get("page_num", r.get("page")),
             "score": r.get("score", 0.0),
             "text_preview": r.get("text", "")[:200] if r.get("text") else None,
             "metadata": r.get("metadata", {}),
@@ -930,19 +1059,160 @@ async def search_documents(request: SearchRequest):
             "filename": r.get("metadata", {}).get("filename"),
         })
 
-    return {
-        "query": request.query,
+    formatted = {
+        "query": query,
         "results": results,
         "total_results": len(results),
         "search_time_ms": search_response.get("total_time_ms", 0),
-        "search_mode": request.search_mode,
+        "search_mode": search_mode,
+        "retrieval_mode": search_response.get("retrieval_mode"),
+    }
+    if "next_cursor" in search_response:
+        formatted["next_cursor"] = search_response["next_cursor"]
+        formatted["offset"] = search_response.get("offset", 0)
+        formatted["total_candidates"] = search_response.get("total_candidates")
+    return formatted
+
+
+@app.post("/search")
+async def search_documents(request: SearchRequest):
+    """Semantic search across indexed documents.
+
+    Lazy-loads the QueryEngine on first call (loads the embedding
+    model for query encoding).
+    """
+    search_engine = _get_search_engine()
+
+    # Run in thread — the QueryEngine blocks while the model runs, which
+    # would stall uvicorn's event loop
+    try:
+        search_response = await asyncio.to_thread(
+            search_engine.search, **_search_kwargs(request)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return _format_search_response(search_response, request.query, request.search_mode)
+
+
+@app.get("/search/next")
+async def search_next_page(cursor: str = Query(..., min_length=1, max_length=200)):
+    """Next page of a search made with ``paginate=true``.
+
+    Slices the results kept server-side by the original search, so
+    nothing is embedded or scanned. Replaying a cursor returns the same
+    page.
+
+    Raises:
+        HTTPException: 400 for a malformed cursor, 404 once the cursor's
+            results have expired (``SEARCH_CURSOR_TTL_SECONDS``) -- re-run
+            the search.
+    """
+    search_engine = getattr(app.state, "search_engine", None)
+    if search_engine is None:
+        raise HTTPException(status_code=404, detail="Search cursor expired or unknown")
+
+    try:
+        search_response = search_engine.next_page(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if search_response is None:
+        raise HTTPException(status_code=404, detail="Search cursor expired or unknown")
+
+    mode = search_response.get("search_mode", "hybrid")
+    return _format_search_response(
+        search_response, search_response.get("query", ""), _API_SEARCH_MODES.get(mode, mode),
+    )
+
+
+class SearchBatchRequest(BaseModel):
+    """Several searches answered with one embedding pass."""
+
+    searches: list[SearchRequest] = Field(
+        ..., min_length=1, max_length=SEARCH_BATCH_MAX_QUERIES
+    )
+
+
+@app.post("/search/batch")
+async def search_documents_batch(request: SearchBatchRequest):
+    """Run up to ``SEARCH_BATCH_MAX_QUERIES`` searches in one request.
+
+    All queries are embedded in a single model call and their Koji scans
+    run in parallel. Each entry of ``responses`` has the ``/search``
+    response shape, or carries an ``error`` if that search failed.
+    """
+    search_engine = _get_search_engine()
+
+    try:
+        batch = await asyncio.to_thread(
+            search_engine.search_many, [_search_kwargs(s) for s in request.searches]
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    responses = []
+    for item, search_response in zip(request.searches, batch["responses"]):
+        if "error" in search_response:
+            responses.append({
+                "query": item.query,
+                "results": [],
+                "total_results": 0,
+                "error": search_response["error"],
+            })
+        else:
+            responses.append(
+                _format_search_response(search_response, item.query, item.search_mode)
+            )
+
+    return {
+        "responses": responses,
+        "total_queries": len(responses),
+        "embed_time_ms": batch["embed_time_ms"],
+        "search_time_ms": batch["total_time_ms"],
     }
 
 
+class SearchRecallRequest(BaseModel):
+    """Representative queries to check two-stage recall against."""
+
+    queries: list[str] = Field(..., min_length=1, max_length=SEARCH_BATCH_MAX_QUERIES)
+    n_results: int = Field(default=10, ge=1, le=100)
+    search_mode: str = Field(default="hybrid")
+    # Stage-1 candidates per table; None uses SEARCH_TWO_STAGE_CANDIDATES.
+    candidates: Optional[int] = Field(default=None, ge=1, le=5000)
+
+
+@app.post("/search/recall")
+async def search_recall(request: SearchRecallRequest):
+    """Report two-stage recall@n_results against exact retrieval.
+
+    Every query runs both ways, bypassing the result cache, so this
+    costs two full searches per query. Use it to size
+    ``SEARCH_TWO_STAGE_CANDIDATES`` before switching
+    ``SEARCH_RETRIEVAL_MODE`` to ``two_stage``.
+    """
+    search_engine = _get_search_engine()
+
+    try:
+        return await asyncio.to_thread(
+            search_engine.measure_recall,
+            request.queries,
+            n_results=request.n_results,
+            search_mode=_SEARCH_MODE_MAP.get(request.search_mode, request.search_mode),
+            candidates=request.candidates,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("API server shutting down...")
+    search_engine = getattr(app.state, "search_engine", None)
+    if search_engine is not None:
+        search_engine.close()
+        logger.info("Search engine closed")
     if query_engine is not None:
         query_engine.close()
         logger.info("QueryEngine closed")
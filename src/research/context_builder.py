@@ -207,23 +207,26 @@ class ContextBuilder:
         sorted_sources = sorted(sources, key=lambda s: s.relevance_score, reverse=True)
         top_sources = sorted_sources[:5]
 
+        try:
+            relations_by_doc = self.storage_client.get_relations_for(
+                [s.doc_id for s in top_sources], direction="both"
+            )
+        except Exception as exc:
+            logger.debug(
+                "context_builder.get_relations_failed",
+                doc_ids=[s.doc_id for s in top_sources],
+                error=str(exc),
+            )
+            relations_by_doc = {}
+
         for source in top_sources:
-            try:
-                relations = self.storage_client.get_relations(
-                    source.doc_id, direction="both"
-                )
-            except Exception as exc:
-                logger.debug(
-                    "context_builder.get_relations_failed",
-                    doc_id=source.doc_id,
-                    error=str(exc),
-                )
+            if source.doc_id not in relations_by_doc:
                 continue
 
             neighbor_ids: List[str] = []
             relation_types: List[str] = []
 
-            for rel in relations:
+            for rel in relations_by_doc[source.doc_id]:
                 # Determine the neighbor doc_id (the other end of the relation)
                 if rel.get("src_doc_id") == source.doc_id:
                     neighbor_id = rel.get("dst_doc_id")
@@ -257,17 +260,22 @@ class ContextBuilder:
         )[:max_supplementary]
 
         # Fetch and create supplementary sources
-        for doc_id, parent_score in sorted_supplementary:
+        supplementary_docs: Dict[str, Dict[str, Any]] = {}
+        if sorted_supplementary:
             try:
-                doc_data = self.storage_client.get_document(doc_id)
+                supplementary_docs = self.storage_client.get_documents(
+                    [doc_id for doc_id, _ in sorted_supplementary],
+                    columns=["filename", "format"],
+                )
             except Exception as exc:
                 logger.debug(
                     "context_builder.supplementary_fetch_failed",
-                    doc_id=doc_id,
+                    doc_ids=[doc_id for doc_id, _ in sorted_supplementary],
                     error=str(exc),
                 )
-                continue
 
+        for doc_id, parent_score in sorted_supplementary:
+            doc_data = supplementary_docs.get(doc_id)
             if doc_data is None:
                 continue
 
@@ -570,7 +578,9 @@ class ContextBuilder:
             )
 
         # Merge document-level fields into metadata dict
-        doc_data = self.storage_client.get_document(doc_id)
+        doc_data = self.storage_client.get_document(
+            doc_id, columns=["filename", "format", "created_at"]
+        )
         if page_data is None and doc_data is None:
             raise ValueError(
                 f"Document {doc_id} page {page} not found"
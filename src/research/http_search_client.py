@@ -6,7 +6,7 @@ but delegates to the worker API on port 8002 instead of loading the
 embedding model in-process.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 import structlog
@@ -88,11 +88,7 @@ class HttpSearchClient:
             response.raise_for_status()
             data = response.json()
 
-        # Normalize: worker returns "page_num", ContextBuilder expects "page"
-        results = []
-        for result in data.get("results", []):
-            result["page"] = result.get("page_num", result.get("page"))
-            results.append(result)
+        results = _normalize_results(data)
 
         logger.info(
             "http_search_client.search.done",
@@ -104,3 +100,70 @@ class HttpSearchClient:
             "results": results,
             "total_time_ms": data.get("search_time_ms", 0),
         }
+
+    def search_many(self, searches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Execute several searches in one worker round trip.
+
+        The worker embeds every query in one model pass and runs the
+        searches in parallel (``POST /search/batch``).
+
+        Args:
+            searches: One dict per search with ``query`` and optionally
+                ``n_results``, ``search_mode`` (as for :meth:`search`),
+                ``filters``, ``retrieval_mode`` and ``candidates``.
+
+        Returns:
+            Dict with ``responses`` -- one :meth:`search`-shaped dict per
+            input, in order, plus ``error`` when that search failed --
+            and aggregate ``embed_time_ms`` and ``total_time_ms``.
+        """
+        payload = {"searches": []}
+        for item in searches:
+            entry = {k: v for k, v in item.items() if v is not None}
+            entry["search_mode"] = _MODE_MAP.get(item.get("search_mode") or "hybrid", "hybrid")
+            payload["searches"].append(entry)
+
+        logger.info(
+            "http_search_client.search_many",
+            num_queries=len(searches),
+            worker_url=self._worker_url,
+        )
+
+        with httpx.Client(timeout=self._timeout) as client:
+            response = client.post(
+                f"{self._worker_url}/search/batch",
+                json=payload,
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        responses = []
+        for item in data.get("responses", []):
+            normalized: Dict[str, Any] = {
+                "results": _normalize_results(item),
+                "total_time_ms": item.get("search_time_ms", 0),
+            }
+            if "error" in item:
+                normalized["error"] = item["error"]
+            responses.append(normalized)
+
+        logger.info(
+            "http_search_client.search_many.done",
+            num_queries=len(responses),
+            search_time_ms=data.get("search_time_ms", 0),
+        )
+
+        return {
+            "responses": responses,
+            "embed_time_ms": data.get("embed_time_ms", 0),
+            "total_time_ms": data.get("search_time_ms", 0),
+        }
+
+
+def _normalize_results(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Add ``page`` to worker results; ContextBuilder expects it over ``page_num``."""
+    results = []
+    for result in data.get("results", []):
+        result["page"] = result.get("page_num", result.get("page"))
+        results.append(result)
+    return results
@@ -6,10 +6,22 @@ similarity via the Koji database and Shikomi embeddings.
 
 Components:
 - KojiSearch: Main search interface over Koji + Shikomi
+- SearchFilters: Metadata filters compiled into the search SQL
+- maxsim_scores: Exact NumPy MaxSim used to rerank two-stage candidates
+- SearchResultCache: Index-versioned cache of search responses
+- SearchCursorStore: Candidate lists behind search pagination cursors
 """
 
+from .cursor_store import SearchCursorStore
+from .filters import SearchFilters
 from .koji_search import KojiSearch
+from .maxsim import maxsim_scores
+from .result_cache import SearchResultCache
 
 __all__ = [
     "KojiSearch",
+    "SearchCursorStore",
+    "SearchFilters",
+    "SearchResultCache",
+    "maxsim_scores",
 ]
@@ -0,0 +1,202 @@
+"""Server-side candidate lists behind search pagination cursors.
+
+A paginated ``KojiSearch.search`` retrieves one deep, fully merged,
+boosted and scored result list, returns its first page and parks the
+list here. The opaque cursor handed to the client names the stored list
+and the offset of the next page, so ``KojiSearch.next_page`` slices it
+without re-embedding or re-scanning. A cursor can be replayed (client
+retries return the same page) until its list expires.
+
+Lists are snapshots: writes after the search do not reorder pages that
+were already handed out. They live in process memory, so every page of
+one search must be served by the same worker process.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+
+@dataclass
+class CursorStoreStats:
+    """Cursor store counters.
+
+    Attributes:
+        opened: Candidate lists stored.
+        pages: Follow-up pages served.
+        misses: Cursors whose list was unknown or expired.
+        evictions: Lists dropped to stay within ``max_entries``.
+        expirations: Lists dropped after their TTL.
+    """
+
+    opened: int = 0
+    pages: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+@dataclass
+class CursorPage:
+    """A slice of a stored candidate list.
+
+    Attributes:
+        results: Results on this page.
+        offset: Index of the first result in the full list.
+        total: Length of the full list.
+        next_cursor: Cursor for the following page, or ``None`` at the end.
+        context: Response fields recorded when the list was stored.
+    """
+
+    results: list[dict[str, Any]]
+    offset: int
+    total: int
+    next_cursor: Optional[str]
+    context: dict[str, Any]
+
+
+class SearchCursorStore:
+    """Thread-safe, TTL-bounded LRU of paginated search results.
+
+    Args:
+        max_entries: Maximum stored candidate lists.
+        ttl_seconds: Lifetime of a list, counted from the search that
+            created it.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 600.0) -> None:
+        self.max_entries = max(max_entries, 1)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # list id -> (results, page_size, context, created_at monotonic seconds)
+        self._entries: OrderedDict[
+            str, tuple[list[dict[str, Any]], int, dict[str, Any], float]
+        ] = OrderedDict()
+        self._stats = CursorStoreStats()
+
+    @classmethod
+    def from_env(cls) -> "SearchCursorStore":
+        """Build a store from ``SEARCH_CURSOR_*`` environment variables.
+
+        ``SEARCH_CURSOR_MAX_ENTRIES`` (default 128) and
+        ``SEARCH_CURSOR_TTL_SECONDS`` (default 600).
+
+        Returns:
+            Configured store.
+        """
+        return cls(
+            max_entries=int(os.getenv("SEARCH_CURSOR_MAX_ENTRIES", "128")),
+            ttl_seconds=float(os.getenv("SEARCH_CURSOR_TTL_SECONDS", "600")),
+        )
+
+    def open(
+        self,
+        results: list[dict[str, Any]],
+        page_size: int,
+        context: dict[str, Any],
+    ) -> CursorPage:
+        """Store a candidate list and return its first page.
+
+        Nothing is stored when the list fits on one page.
+
+        Args:
+            results: Full ranked result list.
+            page_size: Results per page.
+            context: Response fields (query, mode, ...) repeated on
+                every later page.
+
+        Returns:
+            The first page.
+        """
+        page_size = max(page_size, 1)
+        next_cursor = None
+        if len(results) > page_size:
+            list_id = secrets.token_urlsafe(12)
+            with self._lock:
+                self._entries[list_id] = (results, page_size, context, time.monotonic())
+                self._stats.opened += 1
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats.evictions += 1
+            next_cursor = _encode_cursor(list_id, page_size)
+        return CursorPage(
+            results=results[:page_size],
+            offset=0,
+            total=len(results),
+            next_cursor=next_cursor,
+            context=context,
+        )
+
+    def page(self, cursor: str) -> Optional[CursorPage]:
+        """Return the page a cursor points at.
+
+        Args:
+            cursor: Cursor from a previous page.
+
+        Returns:
+            The page, or ``None`` if its list expired or was evicted.
+
+        Raises:
+            ValueError: If *cursor* is malformed.
+        """
+        list_id, offset = _decode_cursor(cursor)
+        with self._lock:
+            entry = self._entries.get(list_id)
+            if entry is not None and time.monotonic() - entry[3] >= self.ttl_seconds:
+                del self._entries[list_id]
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(list_id)
+            self._stats.pages += 1
+        results, page_size, context, _ = entry
+        end = offset + page_size
+        return CursorPage(
+            results=results[offset:end],
+            offset=offset,
+            total=len(results),
+            next_cursor=_encode_cursor(list_id, end) if end < len(results) else None,
+            context=context,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Store counters.
+
+        Returns:
+            Dict with ``entries``, ``max_entries``, ``ttl_seconds`` and
+            the :class:`CursorStoreStats` counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                **asdict(self._stats),
+            }
+
+
+def _encode_cursor(list_id: str, offset: int) -> str:
+    raw = f"{list_id}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        list_id, offset = raw.rsplit(":", 1)
+        offset_value = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Malformed search cursor") from exc
+    if not list_id or offset_value < 0:
+        raise ValueError("Malformed search cursor")
+    return list_id, offset_value
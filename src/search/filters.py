@@ -0,0 +1,218 @@
+"""Search filters compiled into Koji ``WHERE`` clauses.
+
+``KojiSearch`` accepts a ``filters`` dict and pushes it down into SQL so
+``LIMIT`` applies to matching rows and a filtered search still returns a
+full page of results. Row-level predicates (``doc_id``, ``page_num``,
+audio ``start_time``/``end_time``) sit next to the ``<~>`` operator.
+Document-level predicates (format, ``created_at``) go into the
+``documents`` join when a scan has one. Join-free scans resolve them to
+a ``doc_id`` set with one ``documents`` query and filter on
+``doc_id IN (...)`` -- but only up to a fixed set size; larger sets
+fall back to the join rather than binding most of the library.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from ..config.filter_groups import resolve_filter_group
+
+_FILTER_KEYS = frozenset({
+    "file_type_group",
+    "formats",
+    "doc_ids",
+    "created_after",
+    "created_before",
+    "page_min",
+    "page_max",
+    "time_start",
+    "time_end",
+})
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Validated search filters.
+
+    Attributes:
+        formats: Allowed ``documents.format`` values (extension without
+            the dot, lowercase).
+        doc_ids: Allowed document IDs. An empty tuple matches nothing.
+        created_after: Inclusive lower bound on ``documents.created_at``
+            (ISO-8601).
+        created_before: Exclusive upper bound on ``documents.created_at``.
+        page_min: Inclusive lower bound on ``page_num``.
+        page_max: Inclusive upper bound on ``page_num``.
+        time_start: Keep audio chunks ending at or after this second.
+        time_end: Keep audio chunks starting at or before this second.
+    """
+
+    formats: Optional[tuple[str, ...]] = None
+    doc_ids: Optional[tuple[str, ...]] = None
+    created_after: Optional[str] = None
+    created_before: Optional[str] = None
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
+    time_start: Optional[float] = None
+    time_end: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, filters: Optional[dict[str, Any]]) -> Optional["SearchFilters"]:
+        """Build filters from a request dict.
+
+        Recognized keys: ``file_type_group`` (see
+        ``config.filter_groups``), ``formats`` (extensions, with or
+        without a dot), ``doc_ids``, ``created_after``, ``created_before``,
+        ``page_min``, ``page_max``, ``time_start`` and ``time_end``.
+        ``None`` values are ignored.
+
+        Args:
+            filters: Filter dict, or ``None``.
+
+        Returns:
+            ``SearchFilters``, or ``None`` when nothing is filtered.
+
+        Raises:
+            ValueError: On unknown keys or inverted ranges.
+        """
+        if not filters:
+            return None
+        unknown = set(filters) - _FILTER_KEYS
+        if unknown:
+            raise ValueError(f"Unknown search filters: {sorted(unknown)}")
+
+        formats: Optional[set[str]] = None
+        group = filters.get("file_type_group")
+        if group:
+            extensions = resolve_filter_group(group)
+            if extensions is not None:
+                formats = {ext.lstrip(".").lower() for ext in extensions}
+        if filters.get("formats") is not None:
+            requested = {f.lstrip(".").lower() for f in filters["formats"]}
+            formats = requested if formats is None else formats & requested
+
+        doc_ids = filters.get("doc_ids")
+        result = cls(
+            formats=tuple(sorted(formats)) if formats is not None else None,
+            doc_ids=tuple(dict.fromkeys(doc_ids)) if doc_ids is not None else None,
+            created_after=filters.get("created_after"),
+            created_before=filters.get("created_before"),
+            page_min=filters.get("page_min"),
+            page_max=filters.get("page_max"),
+            time_start=filters.get("time_start"),
+            time_end=filters.get("time_end"),
+        )
+        for low, high in (
+            ("created_after", "created_before"),
+            ("page_min", "page_max"),
+            ("time_start", "time_end"),
+        ):
+            lo, hi = getattr(result, low), getattr(result, high)
+            if lo is not None and hi is not None and lo > hi:
+                raise ValueError(f"{low} must not be greater than {high}")
+        return None if result == cls() else result
+
+    @property
+    def has_document_predicates(self) -> bool:
+        """Whether any filter needs the ``documents`` table."""
+        return (
+            self.formats is not None
+            or self.created_after is not None
+            or self.created_before is not None
+        )
+
+    @property
+    def has_time_window(self) -> bool:
+        """Whether an audio time window is set."""
+        return self.time_start is not None or self.time_end is not None
+
+    def matches_nothing(self, table: str) -> bool:
+        """Whether no row of *table* can match.
+
+        Pages carry no timestamps, so a time window excludes them, and an
+        empty ``doc_ids`` set excludes everything.
+        """
+        return self.doc_ids == () or self.formats == () or (
+            table == "pages" and self.has_time_window
+        )
+
+    def with_doc_ids(self, doc_ids: set[str]) -> "SearchFilters":
+        """Replace document-level predicates with the IDs they resolved to."""
+        return replace(
+            self,
+            formats=None,
+            created_after=None,
+            created_before=None,
+            doc_ids=tuple(sorted(doc_ids)),
+        )
+
+    def document_where(
+        self, first_param: int, prefix: str = "", with_doc_ids: bool = True,
+    ) -> tuple[list[str], list[Any]]:
+        """Predicates on ``documents`` columns.
+
+        Args:
+            first_param: Number of the first ``$n`` placeholder to use.
+            prefix: Column qualifier such as ``"d."`` for joined queries.
+            with_doc_ids: Include the ``doc_id`` predicate. Joined scans
+                leave it to :meth:`row_where`.
+
+        Returns:
+            ``(clauses, params)`` to AND into a ``documents`` query.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        def bind(value: Any) -> str:
+            params.append(value)
+            return f"${first_param + len(params) - 1}"
+
+        if self.formats is not None:
+            clauses.append(f"{prefix}format IN ({', '.join(bind(f) for f in self.formats)})")
+        if self.created_after is not None:
+            clauses.append(f"{prefix}created_at >= {bind(self.created_after)}")
+        if self.created_before is not None:
+            clauses.append(f"{prefix}created_at < {bind(self.created_before)}")
+        if with_doc_ids and self.doc_ids is not None:
+            clauses.append(f"{prefix}doc_id IN ({', '.join(bind(d) for d in self.doc_ids)})")
+        return clauses, params
+
+    def row_where(
+        self, table: str, first_param: int, prefix: str = "",
+    ) -> tuple[list[str], list[Any]]:
+        """Predicates on ``pages``/``chunks`` columns.
+
+        Document-level predicates are not included; resolve them with
+        :meth:`with_doc_ids` or add :meth:`document_where` for a joined
+        ``documents`` table.
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            first_param: Number of the first ``$n`` placeholder to use.
+            prefix: Column qualifier such as ``"c."`` for joined queries.
+
+        Returns:
+            ``(clauses, params)`` to AND next to the ``<~>`` predicate.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        def bind(value: Any) -> str:
+            params.append(value)
+            return f"${first_param + len(params) - 1}"
+
+        if self.doc_ids:
+            clauses.append(
+                f"{prefix}doc_id IN ({', '.join(bind(d) for d in self.doc_ids)})"
+            )
+        if self.page_min is not None:
+            clauses.append(f"{prefix}page_num >= {bind(self.page_min)}")
+        if self.page_max is not None:
+            clauses.append(f"{prefix}page_num <= {bind(self.page_max)}")
+        if table == "chunks":
+            if self.time_start is not None:
+                clauses.append(f"{prefix}end_time >= {bind(self.time_start)}")
+            if self.time_end is not None:
+                clauses.append(f"{prefix}start_time <= {bind(self.time_end)}")
+        return clauses, params
@@ -12,11 +12,24 @@ for drop-in replacement.
 
 from __future__ import annotations
 
+import hashlib
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Any, Literal, Optional
 
+import numpy as np
+import pyarrow as pa
 import structlog
 
+from ..embeddings.query_cache import normalize_query
+from ..storage import pack_multivec, unpack_multivec_column
+from .cursor_store import CursorPage, SearchCursorStore
+from .filters import SearchFilters
+from .maxsim import maxsim_scores
+from .result_cache import SearchResultCache
+
 logger = structlog.get_logger(__name__)
 
 # Per-edge-type boost weights for graph-aware re-ranking.
@@ -31,6 +44,55 @@ _EDGE_BOOST_WEIGHTS: dict[str, float] = {
     "version_of": 0.05,
 }
 
+# Worker threads shared by all hybrid searches for their chunk scans;
+# the page scan runs on the calling thread.
+_SCAN_WORKERS = 8
+
+# Searches from one ``search_many`` call run this many at a time.
+_BATCH_WORKERS = 4
+
+_SEARCH_MANY_KEYS = frozenset({
+    "query", "n_results", "search_mode", "filters", "project_id",
+    "retrieval_mode", "rerank_candidates", "paginate",
+})
+
+_HYBRID_DOCUMENT_COLUMNS = ["doc_id", "filename", "format", "metadata"]
+
+# Largest doc_id set a document filter is resolved to for join-free
+# scans; bigger sets are filtered through a documents join instead.
+_MAX_RESOLVED_DOC_IDS = 256
+
+RetrievalMode = Literal["exact", "two_stage"]
+
+# ``exact`` scans every multi-vector with ``<~>``; ``two_stage`` takes
+# the top candidates by pooled vector and reranks them with exact MaxSim.
+DEFAULT_RETRIEVAL_MODE = os.getenv("SEARCH_RETRIEVAL_MODE", "exact")
+DEFAULT_TWO_STAGE_CANDIDATES = int(os.getenv("SEARCH_TWO_STAGE_CANDIDATES", "100"))
+
+# Results retrieved up front by a paginated search; later pages slice them.
+DEFAULT_CURSOR_DEPTH = int(os.getenv("SEARCH_CURSOR_DEPTH", "500"))
+
+_CHUNK_COLUMNS = ("id", "doc_id", "page_num", "text", "context")
+_PAGE_COLUMNS = ("id", "doc_id", "page_num", "structure")
+_HIT_COLUMNS = ("doc_id", "page_num")
+
+
+@dataclass
+class _ScanResult:
+    """Hits from one table scan.
+
+    Attributes:
+        hits: Result rows, scored by ``_distance`` or ``_score``.
+        scan_ms: Time spent in the Koji query.
+        rerank_ms: Time spent reranking (two-stage only).
+        candidates: Stage-1 candidates reranked (two-stage only).
+    """
+
+    hits: pa.Table
+    scan_ms: float
+    rerank_ms: float = 0.0
+    candidates: int = 0
+
 
 class KojiSearch:
     """Semantic search via Koji SQL with MaxSim operator.
@@ -38,16 +100,56 @@ class KojiSearch:
     Args:
         koji_client: KojiClient instance for database queries.
         shikomi_client: ShikomiClient instance for query embedding.
+        retrieval_mode: Default retrieval path, ``"exact"`` or
+            ``"two_stage"`` (``SEARCH_RETRIEVAL_MODE``).
+        candidates: Default stage-1 candidates per table for two-stage
+            retrieval (``SEARCH_TWO_STAGE_CANDIDATES``).
+        result_cache: Cache of search responses. Defaults to one
+            configured from ``SEARCH_CACHE_*`` environment variables.
+            Only used when *koji_client* exposes ``index_version``.
+        cursor_store: Candidate lists behind pagination cursors. Defaults
+            to one configured from ``SEARCH_CURSOR_*`` environment
+            variables.
+        cursor_depth: Results a paginated search retrieves
+            (``SEARCH_CURSOR_DEPTH``).
     """
 
-    def __init__(self, koji_client, shikomi_client) -> None:
+    def __init__(
+        self,
+        koji_client,
+        shikomi_client,
+        retrieval_mode: RetrievalMode = DEFAULT_RETRIEVAL_MODE,
+        candidates: int = DEFAULT_TWO_STAGE_CANDIDATES,
+        result_cache: SearchResultCache | None = None,
+        cursor_store: SearchCursorStore | None = None,
+        cursor_depth: int = DEFAULT_CURSOR_DEPTH,
+    ) -> None:
         self._koji = koji_client
         self._shikomi = shikomi_client
+        self._retrieval_mode = self._check_retrieval_mode(retrieval_mode)
+        self._candidates = max(1, candidates)
+        self._result_cache = (
+            result_cache if result_cache is not None else SearchResultCache.from_env()
+        )
+        self._cursors = cursor_store if cursor_store is not None else SearchCursorStore.from_env()
+        self._cursor_depth = max(1, cursor_depth)
 
         self._stats: dict[str, Any] = {
             "total_queries": 0,
             "total_times": [],
+            "stage1_times": [],
+            "stage2_times": [],
         }
+        # Shared by all hybrid searches for their chunk scans.
+        self._scan_pool = ThreadPoolExecutor(
+            max_workers=_SCAN_WORKERS, thread_name_prefix="koji-scan",
+        )
+        # Runs ``search_many`` items. Kept apart from the scan pool: batch
+        # items wait on their own chunk scans, so sharing one pool could
+        # starve those scans.
+        self._batch_pool = ThreadPoolExecutor(
+            max_workers=_BATCH_WORKERS, thread_name_prefix="koji-search-batch",
+        )
 
         logger.info("koji_search.initialized")
 
@@ -62,27 +164,64 @@ class KojiSearch:
         enable_reranking: bool = True,
         rerank_candidates: int | None = None,
         project_id: str | None = None,
+        retrieval_mode: RetrievalMode | None = None,
+        query_embedding: np.ndarray | None = None,
+        use_cache: bool = True,
+        paginate: bool = False,
     ) -> dict[str, Any]:
         """Execute semantic search.
 
         Signature matches the existing ``SearchEngine.search()`` for
-        drop-in replacement. ``enable_reranking`` and ``rerank_candidates``
-        are accepted but ignored — Koji handles scoring in a single pass.
+        drop-in replacement. ``enable_reranking`` is accepted but ignored.
+
+        With ``retrieval_mode="exact"`` Koji scores every multi-vector in
+        a single ``<~>`` pass. ``"two_stage"`` instead scans the compact
+        ``pooled_embedding`` column for ``rerank_candidates`` rows per
+        table and reranks those with exact MaxSim in NumPy; rows without
+        a pooled vector (see ``processing.pooled_embedding_backfill``) are
+        not found.
+
+        Repeated searches are answered from the result cache until a
+        document, page, chunk or relation write changes the Koji index
+        version (or the entry expires); such responses carry
+        ``cached=True``.
+
+        With ``paginate=True`` the search retrieves, merges, boosts and
+        scores ``cursor_depth`` results (at least *n_results*) in one
+        pass, returns the first *n_results* of that list and a
+        ``next_cursor`` for :meth:`next_page`, which serves the rest of
+        it without re-embedding or re-scanning.
 
         Args:
             query: Natural language search query.
             n_results: Number of results to return (default 10).
             search_mode: ``"hybrid"``, ``"visual_only"``, or ``"text_only"``.
-            filters: Metadata filters (reserved for future use).
-            enable_reranking: Ignored — no two-stage pipeline.
-            rerank_candidates: Ignored — no two-stage pipeline.
+            filters: Metadata filters pushed down into the vector scans'
+                ``WHERE`` clause: ``file_type_group``, ``formats``,
+                ``doc_ids``, ``created_after``/``created_before``
+                (ISO-8601), ``page_min``/``page_max`` and audio
+                ``time_start``/``time_end`` in seconds (chunks only, so
+                page results are dropped). See :class:`SearchFilters`.
+            enable_reranking: Ignored.
+            rerank_candidates: Stage-1 candidates per table for two-stage
+                retrieval. Defaults to the instance's *candidates*; never
+                fewer than *n_results*.
             project_id: Optional project scope. ``None`` searches all projects.
+            retrieval_mode: ``"exact"`` or ``"two_stage"``. Defaults to the
+                instance's *retrieval_mode*.
+            query_embedding: Precomputed query matrix; skips embedding.
+            use_cache: Consult and fill the result cache.
+            paginate: Return a ``next_cursor`` and keep the remaining
+                results server-side. Pages hold *n_results* results.
 
         Returns:
-            Search response dict matching the existing contract.
+            Search response dict matching the existing contract. Paginated
+            responses add ``next_cursor`` (``None`` on the last page),
+            ``offset`` and ``total_candidates``.
 
         Raises:
-            ValueError: If query is empty or search_mode is invalid.
+            ValueError: If query is empty, search_mode or retrieval_mode
+                is invalid, or *filters* is malformed.
         """
         if not query or not query.strip():
             raise ValueError("Query must not be empty")
@@ -93,20 +232,142 @@ class KojiSearch:
                 f"got '{search_mode}'"
             )
 
+        start = time.perf_counter()
         n_results = n_results or 10
+        page_size = n_results
+        if paginate:
+            n_results = max(n_results, self._cursor_depth)
+        parsed_filters = SearchFilters.from_dict(filters)
+        mode, candidates = self._resolve_retrieval(retrieval_mode, rerank_candidates, n_results)
+
+        version = getattr(self._koji, "index_version", None) if use_cache else None
+        if version is not None:
+            key = (
+                hashlib.sha256(normalize_query(query).encode()).hexdigest(),
+                search_mode, n_results, project_id, parsed_filters,
+                mode, candidates if mode == "two_stage" else None,
+            )
+            cached = self._result_cache.get(key, version)
+            if cached is not None:
+                cached["cached"] = True
+                cached["total_time_ms"] = (time.perf_counter() - start) * 1000
+                return self._first_page(cached, page_size) if paginate else cached
 
         dispatch = {
             "hybrid": self.hybrid_search,
             "visual_only": self.visual_search,
             "text_only": self.text_search,
         }
-        return dispatch[search_mode](query, n_results, project_id=project_id)
+        response = dispatch[search_mode](
+            query, n_results, project_id=project_id,
+            retrieval_mode=mode, candidates=candidates,
+            filters=parsed_filters, query_embedding=query_embedding,
+        )
+        response["cached"] = False
+        if version is not None:
+            self._result_cache.put(key, version, response)
+        return self._first_page(response, page_size) if paginate else response
+
+    def next_page(self, cursor: str) -> dict[str, Any] | None:
+        """Return the page of a paginated search that *cursor* points at.
+
+        Slices the candidate list stored by the original search; nothing
+        is embedded or scanned. Replaying a cursor returns the same page.
+
+        Args:
+            cursor: ``next_cursor`` from a previous page.
+
+        Returns:
+            Search response for the page, or ``None`` if the cursor's
+            results expired or were evicted (re-run the search).
+
+        Raises:
+            ValueError: If *cursor* is malformed.
+        """
+        start = time.perf_counter()
+        page = self._cursors.page(cursor)
+        if page is None:
+            return None
+        return self._page_response(page, (time.perf_counter() - start) * 1000)
+
+    def search_many(self, searches: list[dict[str, Any]]) -> dict[str, Any]:
+        """Run several searches with one embedding pass.
+
+        All queries are embedded together (one ``encode_queries`` call
+        when the embedder provides ``embed_queries``), then the searches
+        run in parallel, each with its own Koji scans.
+
+        Args:
+            searches: Keyword arguments for :meth:`search`, one dict per
+                search; each needs a ``query``.
+
+        Returns:
+            Dict with ``responses`` (one :meth:`search` response per
+            input, in order, or ``{"query", "error"}`` if that search
+            failed), ``embed_time_ms`` and ``total_time_ms``.
+
+        Raises:
+            ValueError: If any search has an empty query, an unknown
+                argument, or an invalid mode or filter.
+        """
+        start = time.perf_counter()
+        for i, params in enumerate(searches):
+            unknown = set(params) - _SEARCH_MANY_KEYS
+            if unknown:
+                raise ValueError(f"searches[{i}]: unknown arguments {sorted(unknown)}")
+            if not params.get("query", "").strip():
+                raise ValueError(f"searches[{i}]: query must not be empty")
+            if params.get("search_mode", "hybrid") not in ("hybrid", "visual_only", "text_only"):
+                raise ValueError(f"searches[{i}]: invalid search_mode {params['search_mode']!r}")
+            self._check_retrieval_mode(params.get("retrieval_mode") or self._retrieval_mode)
+            SearchFilters.from_dict(params.get("filters"))
+
+        queries = [params["query"] for params in searches]
+        if hasattr(self._shikomi, "embed_queries"):
+            embeddings = self._shikomi.embed_queries(queries)
+        else:
+            embeddings = [self._shikomi.embed_query(q) for q in queries]
+        embedded = time.perf_counter()
+
+        def run(params: dict[str, Any], embedding: np.ndarray) -> dict[str, Any]:
+            try:
+                return self.search(**params, query_embedding=embedding)
+            except Exception as exc:
+                logger.warning(
+                    "koji_search.batch_item_failed", query_len=len(params["query"]),
+                    error=str(exc),
+                )
+                return {"query": params["query"], "error": str(exc)}
+
+        futures = [
+            self._batch_pool.submit(run, params, embedding)
+            for params, embedding in zip(searches, embeddings)
+        ]
+        responses = [future.result() for future in futures]
+        end = time.perf_counter()
+
+        logger.info(
+            "koji_search.batch_completed",
+            queries=len(searches),
+            failed=sum(1 for r in responses if "error" in r),
+            embed_ms=round((embedded - start) * 1000, 3),
+            total_ms=round((end - start) * 1000, 3),
+        )
+        return {
+            "responses": responses,
+            "embed_time_ms": (embedded - start) * 1000,
+            "total_time_ms": (end - start) * 1000,
+        }
 
     def text_search(
         self,
         query: str,
         n_results: int = 10,
         project_id: str | None = None,
+        retrieval_mode: RetrievalMode | None = None,
+        candidates: int | None = None,
+        filters: SearchFilters | dict[str, Any] | None = None,
+        query_embedding: np.ndarray | None = None,
     ) -> dict[str, Any]:
         """Search text chunks by semantic similarity.
 
@@ -114,43 +375,47 @@ class KojiSearch:
             query: Search query.
             n_results: Maximum results.
             project_id: Optional project scope. ``None`` searches all projects.
+            retrieval_mode: ``"exact"`` or ``"two_stage"`` (see :meth:`search`).
+            candidates: Stage-1 candidates for two-stage retrieval.
+            filters: Search filters (see :meth:`search`).
+            query_embedding: Precomputed query matrix; skips embedding.
 
         Returns:
             Search response dict.
         """
         start = time.perf_counter()
+        mode, candidates = self._resolve_retrieval(retrieval_mode, candidates, n_results)
+        resolved = self._prepare_filters(
+            filters, project_id, resolve=project_id is not None or mode == "two_stage",
+        )
 
-        query_emb = self._shikomi.embed_query(query)
+        query_matrix = self._embed(query, query_embedding)
+        query_emb = pack_multivec(query_matrix)
+        embedded = time.perf_counter()
 
-        if project_id is not None:
-            result = self._koji.query(
-                """SELECT c.id, c.doc_id, c.page_num, c.text, c.context,
-                          d.filename, d.format, _distance
-                   FROM chunks c
-                   JOIN documents d ON c.doc_id = d.doc_id
-                   WHERE c.embedding <~> $1 AND d.project_id = $2
-                   LIMIT $3""",
-                [query_emb, project_id, n_results],
-            )
-        else:
-            result = self._koji.query(
-                """SELECT c.id, c.doc_id, c.page_num, c.text, c.context,
-                          d.filename, d.format, _distance
-                   FROM chunks c
-                   JOIN documents d ON c.doc_id = d.doc_id
-                   WHERE c.embedding <~> $1
-                   LIMIT $2""",
-                [query_emb, n_results],
-            )
+        scan = self._scan(
+            "chunks", _CHUNK_COLUMNS, query_matrix, query_emb, n_results,
+            project_id, mode, candidates, with_documents=True, filters=resolved,
+        )
+        scanned = time.perf_counter()
 
-        results = self._format_chunk_results(result)
-        results = self._boost_related_results(results)
-        relationships = self._collect_result_relationships(results)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        self._record_query(elapsed_ms)
+        results = self._format_chunk_results(scan.hits)
+        relations = self._fetch_result_relations(results)
+        results = self._boost_related_results(results, relations=relations)
+        relationships = self._collect_result_relationships(
+            results, relations=relations,
+        )
+        end = time.perf_counter()
 
-        return self._build_response(
-            results, query, "text_only", elapsed_ms, relationships=relationships,
+        timings = {
+            "embed_ms": (embedded - start) * 1000,
+            "chunk_scan_ms": scan.scan_ms,
+            **({"rerank_ms": scan.rerank_ms} if mode == "two_stage" else {}),
+            "boost_ms": (end - scanned) * 1000,
+        }
+        return self._finish(
+            results, query, "text_only", start, scanned, end, timings,
+            relationships=relationships, retrieval=(mode, [scan]),
         )
 
     def visual_search(
@@ -158,6 +423,10 @@ class KojiSearch:
         query: str,
         n_results: int = 10,
         project_id: str | None = None,
+        retrieval_mode: RetrievalMode | None = None,
+        candidates: int | None = None,
+        filters: SearchFilters | dict[str, Any] | None = None,
+        query_embedding: np.ndarray | None = None,
     ) -> dict[str, Any]:
         """Search page images by visual similarity.
 
@@ -165,43 +434,47 @@ class KojiSearch:
             query: Search query.
             n_results: Maximum results.
             project_id: Optional project scope. ``None`` searches all projects.
+            retrieval_mode: ``"exact"`` or ``"two_stage"`` (see :meth:`search`).
+            candidates: Stage-1 candidates for two-stage retrieval.
+            filters: Search filters (see :meth:`search`).
+            query_embedding: Precomputed query matrix; skips embedding.
 
         Returns:
             Search response dict.
         """
         start = time.perf_counter()
+        mode, candidates = self._resolve_retrieval(retrieval_mode, candidates, n_results)
+        resolved = self._prepare_filters(
+            filters, project_id, resolve=project_id is not None or mode == "two_stage",
+        )
 
-        query_emb = self._shikomi.embed_query(query)
+        query_matrix = self._embed(query, query_embedding)
+        query_emb = pack_multivec(query_matrix)
+        embedded = time.perf_counter()
 
-        if project_id is not None:
-            result = self._koji.query(
-                """SELECT p.id, p.doc_id, p.page_num, p.structure,
-                          d.filename, d.format, _distance
-                   FROM pages p
-                   JOIN documents d ON p.doc_id = d.doc_id
-                   WHERE p.embedding <~> $1 AND d.project_id = $2
-                   LIMIT $3""",
-                [query_emb, project_id, n_results],
-            )
-        else:
-            result = self._koji.query(
-                """SELECT p.id, p.doc_id, p.page_num, p.structure,
-                          d.filename, d.format, _distance
-                   FROM pages p
-                   JOIN documents d ON p.doc_id = d.doc_id
-                   WHERE p.embedding <~> $1
-                   LIMIT $2""",
-                [query_emb, n_results],
-            )
+        scan = self._scan(
+            "pages", _PAGE_COLUMNS, query_matrix, query_emb, n_results,
+            project_id, mode, candidates, with_documents=True, filters=resolved,
+        )
+        scanned = time.perf_counter()
 
-        results = self._format_page_results(result)
-        results = self._boost_related_results(results)
-        relationships = self._collect_result_relationships(results)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        self._record_query(elapsed_ms)
+        results = self._format_page_results(scan.hits)
+        relations = self._fetch_result_relations(results)
+        results = self._boost_related_results(results, relations=relations)
+        relationships = self._collect_result_relationships(
+            results, relations=relations,
+        )
+        end = time.perf_counter()
 
-        return self._build_response(
-            results, query, "visual_only", elapsed_ms, relationships=relationships,
+        timings = {
+            "embed_ms": (embedded - start) * 1000,
+            "page_scan_ms": scan.scan_ms,
+            **({"rerank_ms": scan.rerank_ms} if mode == "two_stage" else {}),
+            "boost_ms": (end - scanned) * 1000,
+        }
+        return self._finish(
+            results, query, "visual_only", start, scanned, end, timings,
+            relationships=relationships, retrieval=(mode, [scan]),
         )
 
     def hybrid_search(
@@ -209,117 +482,225 @@ class KojiSearch:
         query: str,
         n_results: int = 10,
         project_id: str | None = None,
+        retrieval_mode: RetrievalMode | None = None,
+        candidates: int | None = None,
+        filters: SearchFilters | dict[str, Any] | None = None,
+        query_embedding: np.ndarray | None = None,
     ) -> dict[str, Any]:
         """Search across both pages and chunks, merging results.
 
         Runs two separate vector searches (Koji ``<~>`` doesn't support CTEs)
-        and merges results in Python, keeping the best score per
-        ``(doc_id, page_num)`` pair.
+        concurrently -- the chunk scan on a worker thread, the page scan on
+        the calling thread -- and merges results in Python, keeping the best
+        score per ``(doc_id, page_num)`` pair.  Filenames, formats and the
+        cached PageRank scores for the top results come from one document
+        lookup.
 
         Args:
             query: Search query.
             n_results: Maximum results.
             project_id: Optional project scope. ``None`` searches all projects.
+            retrieval_mode: ``"exact"`` or ``"two_stage"`` (see :meth:`search`).
+            candidates: Stage-1 candidates per table for two-stage retrieval.
+            filters: Search filters (see :meth:`search`).
+            query_embedding: Precomputed query matrix; skips embedding.
 
         Returns:
-            Search response dict.
+            Search response dict. ``timings`` breaks ``total_time_ms`` into
+            ``embed_ms``, ``page_scan_ms``, ``chunk_scan_ms``, ``merge_ms``
+            and ``boost_ms`` (plus ``rerank_ms`` for two-stage retrieval).
         """
         start = time.perf_counter()
+        keep = n_results * 5
+        mode, candidates = self._resolve_retrieval(retrieval_mode, candidates, keep)
+        resolved = self._prepare_filters(filters, project_id)
 
-        query_emb = self._shikomi.embed_query(query)
-        candidates = n_results * 5
+        query_matrix = self._embed(query, query_embedding)
+        query_emb = pack_multivec(query_matrix)
+        embedded = time.perf_counter()
 
-        if project_id is not None:
-            page_hits = self._koji.query(
-                """SELECT p.doc_id, p.page_num, _distance
-                   FROM pages p
-                   JOIN documents d ON p.doc_id = d.doc_id
-                   WHERE p.embedding <~> $1 AND d.project_id = $2
-                   LIMIT $3""",
-                [query_emb, project_id, candidates],
-            )
-            chunk_hits = self._koji.query(
-                """SELECT c.doc_id, c.page_num, _distance
-                   FROM chunks c
-                   JOIN documents d ON c.doc_id = d.doc_id
-                   WHERE c.embedding <~> $1 AND d.project_id = $2
-                   LIMIT $3""",
-                [query_emb, project_id, candidates],
-            )
-        else:
-            page_hits = self._koji.query(
-                """SELECT doc_id, page_num, _distance
-                   FROM pages WHERE embedding <~> $1 LIMIT $2""",
-                [query_emb, candidates],
-            )
-            chunk_hits = self._koji.query(
-                """SELECT doc_id, page_num, _distance
-                   FROM chunks WHERE embedding <~> $1 LIMIT $2""",
-                [query_emb, candidates],
+        chunk_future = self._scan_pool.submit(
+            self._scan, "chunks", _HIT_COLUMNS, query_matrix, query_emb, keep,
+            project_id, mode, candidates, filters=resolved,
+        )
+        try:
+            page_scan = self._scan(
+                "pages", _HIT_COLUMNS, query_matrix, query_emb, keep,
+                project_id, mode, candidates, filters=resolved,
             )
+        finally:
+            # Never leave the chunk scan running unobserved, even on error.
+            chunk_scan = chunk_future.result()
+        scanned = time.perf_counter()
 
         # Merge in Python: best score per (doc_id, page_num), track source
         merged: dict[tuple[str, int], tuple[float, str]] = {}
 
-        for rows, source in [(page_hits, "visual"), (chunk_hits, "text")]:
-            d = rows.to_pydict()
-            for i in range(rows.num_rows):
+        for scan, source in [(page_scan, "visual"), (chunk_scan, "text")]:
+            d = scan.hits.to_pydict()
+            for i in range(scan.hits.num_rows):
                 key = (d["doc_id"][i], d["page_num"][i])
-                dist = d["_distance"][i]
-                if key not in merged or dist < merged[key][0]:
-                    merged[key] = (dist, source)
-
-        # Sort by distance, take top n_results
-        ranked = sorted(merged.items(), key=lambda item: item[1][0])[:n_results]
-
-        # Fetch document metadata for the result doc_ids
-        result_doc_ids = list({doc_id for (doc_id, _), _ in ranked})
-        doc_meta: dict[str, dict[str, str]] = {}
-        if result_doc_ids:
-            placeholders = ", ".join(f"${i+1}" for i in range(len(result_doc_ids)))
-            docs = self._koji.query(
-                f"SELECT doc_id, filename, format FROM documents "
-                f"WHERE doc_id IN ({placeholders})",
-                result_doc_ids,
-            )
-            d = docs.to_pydict()
-            for i in range(docs.num_rows):
-                doc_meta[d["doc_id"][i]] = {
-                    "filename": d["filename"][i],
-                    "format": d["format"][i],
-                }
+                score = self._row_score(d, i)
+                if key not in merged or score > merged[key][0]:
+                    merged[key] = (score, source)
+
+        # Sort by score, take top n_results
+        ranked = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:n_results]
+
+        # Document columns and cached PageRank in one lookup
+        documents = self._fetch_hybrid_documents({doc_id for (doc_id, _), _ in ranked})
 
         # Build result dicts
         results = []
-        for (doc_id, page_num), (dist, source) in ranked:
-            meta = doc_meta.get(doc_id, {})
+        for (doc_id, page_num), (score, source) in ranked:
+            meta = documents.get(doc_id, {})
             results.append({
                 "doc_id": doc_id,
                 "chunk_id": None,
                 "page_num": page_num,
-                "score": self._distance_to_score(dist),
+                "score": score,
                 "text": "",
                 "metadata": {
-                    "filename": meta.get("filename", ""),
-                    "format": meta.get("format", ""),
+                    "filename": meta.get("filename") or "",
+                    "format": meta.get("format") or "",
                     "source": source,
                 },
             })
+        merged_at = time.perf_counter()
+
+        relations = self._fetch_result_relations(results)
+        results = self._boost_related_results(
+            results, relations=relations,
+            pagerank_scores=self._pagerank_from_documents(documents),
+        )
+        relationships = self._collect_result_relationships(
+            results, relations=relations,
+        )
+        end = time.perf_counter()
+
+        timings = {
+            "embed_ms": (embedded - start) * 1000,
+            "page_scan_ms": page_scan.scan_ms,
+            "chunk_scan_ms": chunk_scan.scan_ms,
+            **(
+                {"rerank_ms": page_scan.rerank_ms + chunk_scan.rerank_ms}
+                if mode == "two_stage" else {}
+            ),
+            "merge_ms": (merged_at - scanned) * 1000,
+            "boost_ms": (end - merged_at) * 1000,
+        }
+        return self._finish(
+            results, query, "hybrid", start, scanned, end, timings,
+            relationships=relationships, retrieval=(mode, [page_scan, chunk_scan]),
+        )
 
-        results = self._boost_related_results(results)
-        relationships = self._collect_result_relationships(results)
-        elapsed_ms = (time.perf_counter() - start) * 1000
-        self._record_query(elapsed_ms)
+    def measure_recall(
+        self,
+        queries: list[str],
+        n_results: int = 10,
+        search_mode: Literal["hybrid", "visual_only", "text_only"] = "hybrid",
+        candidates: int | None = None,
+        project_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Compare two-stage retrieval against the exact path.
 
-        return self._build_response(
-            results, query, "hybrid", elapsed_ms, relationships=relationships,
+        Runs every query both ways and reports recall@*n_results*: the
+        fraction of exact results (by ``doc_id``, ``page_num`` and
+        ``chunk_id``) that two-stage retrieval also returned.
+
+        Args:
+            queries: Representative search queries.
+            n_results: Results per query.
+            search_mode: Search mode to evaluate.
+            candidates: Stage-1 candidates per table.
+            project_id: Optional project scope.
+
+        Returns:
+            Dict with mean ``recall``, mean ``exact_ms`` and
+            ``two_stage_ms``, and a ``per_query`` breakdown.
+        """
+        per_query = []
+        for query in queries:
+            exact = self.search(
+                query, n_results, search_mode, project_id=project_id,
+                retrieval_mode="exact", use_cache=False,
+            )
+            fast = self.search(
+                query, n_results, search_mode, project_id=project_id,
+                retrieval_mode="two_stage", rerank_candidates=candidates, use_cache=False,
+            )
+            expected = {self._result_key(r) for r in exact["results"]}
+            found = {self._result_key(r) for r in fast["results"]}
+            per_query.append({
+                "query": query,
+                "recall": len(expected & found) / len(expected) if expected else 1.0,
+                "exact_ms": exact["total_time_ms"],
+                "two_stage_ms": fast["total_time_ms"],
+            })
+
+        def mean(field: str) -> float:
+            return sum(q[field] for q in per_query) / len(per_query) if per_query else 0.0
+
+        report = {
+            "queries": len(per_query),
+            "n_results": n_results,
+            "search_mode": search_mode,
+            "candidates": self._resolve_retrieval("two_stage", candidates, n_results)[1],
+            "recall": mean("recall"),
+            "exact_ms": mean("exact_ms"),
+            "two_stage_ms": mean("two_stage_ms"),
+            "per_query": per_query,
+        }
+        logger.info(
+            "koji_search.recall_measured",
+            **{k: v for k, v in report.items() if k != "per_query"},
+        )
+        return report
+
+    def _first_page(self, response: dict[str, Any], page_size: int) -> dict[str, Any]:
+        """Store a paginated search's results and return its first page."""
+        context = {
+            key: value for key, value in response.items()
+            if key not in ("results", "total_results", "relationships")
+        }
+        context["relationships"] = response.get("relationships")
+        page = self._cursors.open(response["results"], page_size, context)
+        return self._page_response(page, response["total_time_ms"])
+
+    @staticmethod
+    def _page_response(page: CursorPage, total_time_ms: float) -> dict[str, Any]:
+        """Build the response for one page of a paginated search.
+
+        Relationship edges are narrowed to documents on the page.
+        """
+        response = {key: value for key, value in page.context.items() if key != "relationships"}
+        response.update(
+            results=page.results,
+            total_results=len(page.results),
+            total_time_ms=total_time_ms,
+            offset=page.offset,
+            total_candidates=page.total,
+            next_cursor=page.next_cursor,
         )
+        relationships = page.context.get("relationships")
+        if relationships is not None:
+            doc_ids = {r["doc_id"] for r in page.results}
+            response["relationships"] = [
+                edge for edge in relationships
+                if edge["src_doc_id"] in doc_ids and edge["dst_doc_id"] in doc_ids
+            ]
+        return response
 
     def get_search_stats(self) -> dict[str, Any]:
         """Get search performance statistics.
 
+        Latencies cover searches that ran; cache hits are only counted
+        under ``result_cache``.
+
         Returns:
-            Stats dict matching the existing ``SearchEngine.get_search_stats()`` contract.
+            Stats dict matching the existing ``SearchEngine.get_search_stats()``
+            contract, plus ``result_cache`` counters including ``hit_rate``
+            and pagination ``cursors`` counters.
         """
         if self._stats["total_queries"] == 0:
             return {
@@ -328,22 +709,291 @@ class KojiSearch:
                 "avg_stage2_ms": 0.0,
                 "avg_total_ms": 0.0,
                 "p95_total_ms": 0.0,
+                "result_cache": self._result_cache.stats(),
+                "cursors": self._cursors.stats(),
             }
 
         times = self._stats["total_times"]
+        stage1 = self._stats["stage1_times"]
+        stage2 = self._stats["stage2_times"]
         sorted_times = sorted(times)
         p95_idx = min(int(len(sorted_times) * 0.95), len(sorted_times) - 1)
 
         return {
             "total_queries": self._stats["total_queries"],
-            "avg_stage1_ms": sum(times) / len(times),  # single stage
-            "avg_stage2_ms": 0.0,  # no re-ranking stage
+            "avg_stage1_ms": sum(stage1) / len(stage1),  # embed + vector scans
+            "avg_stage2_ms": sum(stage2) / len(stage2),  # merge + graph boost
             "avg_total_ms": sum(times) / len(times),
             "p95_total_ms": sorted_times[p95_idx],
+            "result_cache": self._result_cache.stats(),
+            "cursors": self._cursors.stats(),
         }
 
+    def close(self) -> None:
+        """Shut down the scan and batch thread pools.
+
+        Waits for in-flight searches to finish. Searches started after
+        ``close()`` raise ``RuntimeError``.
+        """
+        self._batch_pool.shutdown(wait=True)
+        self._scan_pool.shutdown(wait=True)
+        logger.info("koji_search.closed")
+
+    # -- retrieval -----------------------------------------------------------
+
+    def _embed(self, query: str, query_embedding: np.ndarray | None) -> np.ndarray:
+        """Return *query_embedding*, or embed *query* when it is ``None``."""
+        if query_embedding is not None:
+            return query_embedding
+        return self._shikomi.embed_query(query)
+
+    @staticmethod
+    def _check_retrieval_mode(mode: str) -> RetrievalMode:
+        if mode not in ("exact", "two_stage"):
+            raise ValueError(f"retrieval_mode must be 'exact' or 'two_stage', got '{mode}'")
+        return mode  # type: ignore[return-value]
+
+    def _prepare_filters(
+        self,
+        filters: SearchFilters | dict[str, Any] | None,
+        project_id: str | None,
+        resolve: bool = True,
+    ) -> SearchFilters | None:
+        """Parse *filters* and resolve small document predicates to ``doc_ids``.
+
+        Format and ``created_at`` predicates live on ``documents``. When
+        *resolve* is set, one query turns them into the matching document
+        IDs so join-free scans can filter on their own ``doc_id`` column.
+        If more than ``_MAX_RESOLVED_DOC_IDS`` documents match, or
+        *resolve* is off because the scan joins ``documents`` anyway, the
+        predicates are kept and :meth:`_scan` applies them in the join.
+
+        Args:
+            filters: Filter dict or parsed filters.
+            project_id: Optional project scope for the document lookup.
+            resolve: Try to resolve document predicates to ``doc_ids``.
+
+        Returns:
+            Parsed filters, or ``None``.
+        """
+        parsed = (
+            filters if isinstance(filters, SearchFilters) or filters is None
+            else SearchFilters.from_dict(filters)
+        )
+        if parsed is None or not parsed.has_document_predicates:
+            return parsed
+        if parsed.matches_nothing("documents"):
+            return parsed.with_doc_ids(set())
+        if not resolve:
+            return parsed
+
+        clauses, params = parsed.document_where(1)
+        if project_id is not None:
+            clauses.append(f"project_id = ${len(params) + 1}")
+            params.append(project_id)
+        params.append(_MAX_RESOLVED_DOC_IDS + 1)
+        docs = self._koji.query(
+            f"SELECT doc_id FROM documents WHERE {' AND '.join(clauses)} "
+            f"LIMIT ${len(params)}",
+            params,
+        )
+        if docs.num_rows > _MAX_RESOLVED_DOC_IDS:
+            return parsed
+        return parsed.with_doc_ids(set(docs.column("doc_id").to_pylist()))
+
+    def _resolve_retrieval(
+        self,
+        mode: RetrievalMode | None,
+        candidates: int | None,
+        n_results: int,
+    ) -> tuple[RetrievalMode, int]:
+        """Apply instance defaults to per-call retrieval settings."""
+        mode = self._check_retrieval_mode(mode or self._retrieval_mode)
+        return mode, max(candidates or self._candidates, n_results)
+
+    def _scan(
+        self,
+        table: str,
+        columns: tuple[str, ...],
+        query_matrix: np.ndarray,
+        query_emb: bytes,
+        limit: int,
+        project_id: str | None,
+        mode: RetrievalMode,
+        candidates: int,
+        with_documents: bool = False,
+        filters: SearchFilters | None = None,
+    ) -> _ScanResult:
+        """Retrieve the top *limit* rows of *table* for a query.
+
+        Exact retrieval runs ``<~>`` over ``embedding`` and returns
+        ``_distance``. Two-stage retrieval runs ``<~>`` over
+        ``pooled_embedding`` for *candidates* rows, fetching their
+        multi-vectors in the same query, and reranks them with
+        :func:`maxsim_scores`; hits carry a ``_score`` in ``[0, 1]``
+        (MaxSim divided by the query token count).
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            columns: Columns to return for each hit.
+            query_matrix: Query token matrix.
+            query_emb: *query_matrix* packed for Koji.
+            limit: Hits to return.
+            project_id: Optional project scope.
+            mode: Retrieval path.
+            candidates: Stage-1 candidates for two-stage retrieval.
+            with_documents: Attach ``filename`` and ``format``. Unscoped
+                exact scans join ``documents`` for them; other scans look
+                them up for the returned hits only.
+            filters: Filters ANDed next to ``<~>``. Unresolved document
+                predicates (see :meth:`_prepare_filters`) join
+                ``documents`` and filter there.
+
+        Returns:
+            Hits with scan and rerank times.
+        """
+        start = time.perf_counter()
+        two_stage = mode == "two_stage"
+        column = "pooled_embedding" if two_stage else "embedding"
+        fetch = candidates if two_stage else limit
+        select = ", ".join(columns) + (", embedding" if two_stage else ", _distance")
+
+        if filters is not None and filters.matches_nothing(table):
+            empty = pa.table({c: pa.array([], pa.string()) for c in columns})
+            hits = empty.append_column("_distance", pa.array([], pa.float64()))
+            if with_documents:
+                hits = self._with_document_columns(hits)
+            return _ScanResult(hits, 0.0)
+
+        document_filters = filters is not None and filters.has_document_predicates
+        joined = document_filters or (project_id is None and with_documents and not two_stage)
+        alias = table[0]
+        prefix = f"{alias}." if joined else ""
+        where = [f"{prefix}{column} <~> $1"]
+        params: list[Any] = [query_emb]
+        if project_id is not None:
+            where.append(f"{prefix}project_id = ${len(params) + 1}")
+            params.append(project_id)
+        if filters is not None:
+            clauses, values = filters.row_where(table, len(params) + 1, prefix=prefix)
+            where.extend(clauses)
+            params.extend(values)
+        if document_filters:
+            clauses, values = filters.document_where(
+                len(params) + 1, prefix="d.", with_doc_ids=False,
+            )
+            where.extend(clauses)
+            params.extend(values)
+        params.append(fetch)
+        predicate = " AND ".join(where)
+
+        if joined:
+            select = ", ".join(f"{alias}.{c}" for c in columns)
+            if with_documents:
+                select += ", d.filename, d.format"
+            select += f", {alias}.embedding" if two_stage else ", _distance"
+            source = f"{table} {alias} JOIN documents d ON {alias}.doc_id = d.doc_id"
+        else:
+            source = table
+        hits = self._koji.query(
+            f"""SELECT {select}
+                   FROM {source} WHERE {predicate} LIMIT ${len(params)}""",
+            params,
+        )
+        scanned = time.perf_counter()
+
+        rerank_ms = 0.0
+        candidate_count = hits.num_rows
+        if two_stage:
+            hits = self._rerank(hits, query_matrix, limit)
+            rerank_ms = (time.perf_counter() - scanned) * 1000
+        if with_documents and not joined:
+            hits = self._with_document_columns(hits)
+        return _ScanResult(
+            hits, (scanned - start) * 1000, rerank_ms,
+            candidates=candidate_count if two_stage else 0,
+        )
+
+    @staticmethod
+    def _rerank(hits: pa.Table, query_matrix: np.ndarray, limit: int) -> pa.Table:
+        """Order two-stage candidates by exact MaxSim and keep the top *limit*.
+
+        Args:
+            hits: Stage-1 candidates including the packed ``embedding``.
+            query_matrix: Query token matrix.
+            limit: Hits to keep.
+
+        Returns:
+            The best candidates without ``embedding``, with ``_score``.
+        """
+        scores = maxsim_scores(query_matrix, unpack_multivec_column(hits.column("embedding")))
+        scores /= max(len(query_matrix), 1)
+        order = [int(i) for i in np.argsort(-scores, kind="stable")[:limit]]
+        order = [i for i in order if np.isfinite(scores[i])]
+        top = hits.select([c for c in hits.column_names if c != "embedding"])
+        top = top.take(pa.array(order, type=pa.int64()))
+        return top.append_column(
+            "_score", pa.array(np.clip(scores[order], 0.0, 1.0), type=pa.float64()),
+        )
+
     # -- result formatting ---------------------------------------------------
 
+    def _fetch_hybrid_documents(self, doc_ids: set[str]) -> dict[str, dict[str, Any]]:
+        """Fetch the document columns hybrid results and PageRank need.
+
+        Args:
+            doc_ids: Document IDs appearing in the results.
+
+        Returns:
+            Mapping of doc_id to ``filename``, ``format`` and ``metadata``.
+            Empty if the lookup fails.
+        """
+        if not doc_ids:
+            return {}
+        try:
+            return self._koji.get_documents(doc_ids, columns=_HYBRID_DOCUMENT_COLUMNS)
+        except Exception:
+            logger.debug("koji_search.document_lookup_failed", doc_count=len(doc_ids))
+            return {}
+
+    def _fetch_document_meta(self, doc_ids: set[str]) -> dict[str, dict[str, str]]:
+        """Look up ``filename`` and ``format`` for result documents.
+
+        Args:
+            doc_ids: Document IDs appearing in the results.
+
+        Returns:
+            Mapping of doc_id to ``{"filename", "format"}``.
+        """
+        if not doc_ids:
+            return {}
+        ids = list(doc_ids)
+        placeholders = ", ".join(f"${i+1}" for i in range(len(ids)))
+        docs = self._koji.query(
+            f"SELECT doc_id, filename, format FROM documents "
+            f"WHERE doc_id IN ({placeholders})",
+            ids,
+        )
+        d = docs.to_pydict()
+        return {
+            d["doc_id"][i]: {"filename": d["filename"][i], "format": d["format"][i]}
+            for i in range(docs.num_rows)
+        }
+
+    def _with_document_columns(self, hits: pa.Table) -> pa.Table:
+        """Append ``filename`` and ``format`` columns to join-free vector hits.
+
+        Project-scoped searches filter ``pages``/``chunks`` on their own
+        ``project_id`` so the vector scan only visits the project; the
+        document columns are then fetched for the top hits alone.
+        """
+        doc_ids = hits.column("doc_id").to_pylist()
+        meta = self._fetch_document_meta(set(doc_ids))
+        for column in ("filename", "format"):
+            values = [meta.get(doc_id, {}).get(column, "") for doc_id in doc_ids]
+            hits = hits.append_column(column, pa.array(values, type=pa.string()))
+        return hits
+
     @staticmethod
     def _distance_to_score(distance: float) -> float:
         """Convert Koji distance to a 0-1 similarity score.
@@ -359,6 +1009,17 @@ class KojiSearch:
         """
         return 1.0 / (1.0 + distance) if distance is not None else 0.0
 
+    @classmethod
+    def _row_score(cls, rows: dict[str, list], i: int) -> float:
+        """Score of row *i*: two-stage ``_score``, else from ``_distance``."""
+        if "_score" in rows:
+            return rows["_score"][i]
+        return cls._distance_to_score(rows["_distance"][i])
+
+    @staticmethod
+    def _result_key(result: dict[str, Any]) -> tuple[Any, Any, Any]:
+        return (result["doc_id"], result.get("page_num"), result.get("chunk_id"))
+
     def _format_chunk_results(self, result) -> list[dict[str, Any]]:
         """Convert PyArrow chunk results to result dicts."""
         import json
@@ -377,7 +1038,7 @@ class KojiSearch:
                 "doc_id": rows["doc_id"][i],
                 "chunk_id": rows["id"][i],
                 "page_num": rows["page_num"][i],
-                "score": self._distance_to_score(rows["_distance"][i]),
+                "score": self._row_score(rows, i),
                 "text": rows["text"][i],
                 "metadata": {
                     "filename": rows["filename"][i],
@@ -406,7 +1067,7 @@ class KojiSearch:
                 "doc_id": rows["doc_id"][i],
                 "chunk_id": None,
                 "page_num": rows["page_num"][i],
-                "score": self._distance_to_score(rows["_distance"][i]),
+                "score": self._row_score(rows, i),
                 "text": "",
                 "metadata": {
                     "filename": rows["filename"][i],
@@ -417,25 +1078,6 @@ class KojiSearch:
             })
         return out
 
-    def _format_hybrid_results(self, result) -> list[dict[str, Any]]:
-        """Convert PyArrow hybrid results to result dicts."""
-        rows = result.to_pydict()
-        out = []
-        for i in range(result.num_rows):
-            out.append({
-                "doc_id": rows["doc_id"][i],
-                "chunk_id": None,
-                "page_num": rows["page_num"][i],
-                "score": self._distance_to_score(rows["dist"][i]),
-                "text": "",
-                "metadata": {
-                    "filename": rows["filename"][i],
-                    "format": rows["format"][i],
-                    "source": rows["source"][i],
-                },
-            })
-        return out
-
     def _build_response(
         self,
         results: list[dict[str, Any]],
@@ -443,6 +1085,8 @@ class KojiSearch:
         search_mode: str,
         total_time_ms: float,
         relationships: list[dict[str, Any]] | None = None,
+        stage1_time_ms: float | None = None,
+        timings: dict[str, float] | None = None,
     ) -> dict[str, Any]:
         """Build the standardized search response dict.
 
@@ -453,39 +1097,129 @@ class KojiSearch:
             total_time_ms: Total elapsed time in milliseconds.
             relationships: Optional list of relationship edges between
                 result documents. Omitted from response when ``None``.
+            stage1_time_ms: Embedding plus vector scan time; the rest of
+                *total_time_ms* is reported as stage 2. Defaults to the
+                total.
+            timings: Optional per-stage breakdown in milliseconds.
+                Omitted from response when ``None``.
 
         Returns:
             Standardized response dict.
         """
+        if stage1_time_ms is None:
+            stage1_time_ms = total_time_ms
         response: dict[str, Any] = {
             "results": results,
             "total_results": len(results),
             "query": query,
             "search_mode": search_mode,
-            "stage1_time_ms": total_time_ms,
-            "stage2_time_ms": 0.0,
+            "stage1_time_ms": stage1_time_ms,
+            "stage2_time_ms": total_time_ms - stage1_time_ms,
             "total_time_ms": total_time_ms,
             "candidates_retrieved": len(results),
             "reranked_count": 0,
         }
         if relationships is not None:
             response["relationships"] = relationships
+        if timings is not None:
+            response["timings"] = {name: round(ms, 3) for name, ms in timings.items()}
         return response
 
+    def _finish(
+        self,
+        results: list[dict[str, Any]],
+        query: str,
+        search_mode: str,
+        start: float,
+        scanned: float,
+        end: float,
+        timings: dict[str, float],
+        relationships: list[dict[str, Any]] | None = None,
+        retrieval: tuple[RetrievalMode, list[_ScanResult]] | None = None,
+    ) -> dict[str, Any]:
+        """Record timings and build the response for a completed search.
+
+        Args:
+            results: Formatted search result dicts.
+            query: Original search query.
+            search_mode: The search mode used.
+            start: ``perf_counter`` reading when the search began.
+            scanned: Reading once the vector scans finished (end of stage 1).
+            end: Reading once results were boosted (end of stage 2).
+            timings: Per-stage breakdown in milliseconds.
+            relationships: Relationship edges between result documents.
+            retrieval: Retrieval path and its scans; two-stage scans fill
+                ``candidates_retrieved`` and ``reranked_count``.
+
+        Returns:
+            Standardized response dict.
+        """
+        total_ms = (end - start) * 1000
+        stage1_ms = (scanned - start) * 1000
+        self._record_query(total_ms, stage1_ms)
+        mode, scans = retrieval or ("exact", [])
+        logger.debug(
+            "koji_search.completed", search_mode=search_mode, retrieval_mode=mode, **timings,
+        )
+        response = self._build_response(
+            results, query, search_mode, total_ms,
+            relationships=relationships, stage1_time_ms=stage1_ms, timings=timings,
+        )
+        response["retrieval_mode"] = mode
+        if mode == "two_stage":
+            reranked = sum(scan.candidates for scan in scans)
+            response["candidates_retrieved"] = reranked
+            response["reranked_count"] = reranked
+        return response
+
+    def _fetch_result_relations(
+        self,
+        results: list[dict[str, Any]],
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Look up 1-hop relations for every result document.
+
+        Served from the client's in-memory graph index, so no query is
+        issued once the index is loaded.
+
+        Args:
+            results: Search result dicts (must have ``doc_id``).
+
+        Returns:
+            Mapping of ``doc_id`` to its relations. Empty if *results* is
+            empty or the lookup fails.
+        """
+        doc_ids = {r["doc_id"] for r in results}
+        if not doc_ids:
+            return {}
+        try:
+            return self._koji.graph_index().relations_for(doc_ids, direction="both")
+        except Exception:
+            logger.debug(
+                "koji_search.result_relations_failed",
+                doc_count=len(doc_ids),
+            )
+            return {}
+
     def _boost_related_results(
         self,
         results: list[dict[str, Any]],
         boost_factor: float = 0.05,
+        relations: dict[str, list[dict[str, Any]]] | None = None,
+        pagerank_scores: dict[str, float] | None = None,
     ) -> list[dict[str, Any]]:
         """Boost scores for documents related to other results in the set.
 
-        For each result, fetches 1-hop relations. If any neighbor is also
-        in the result set, adds a type-weighted score boost based on
+        For each result, inspects its 1-hop relations. If any neighbor is
+        also in the result set, adds a type-weighted score boost based on
         ``_EDGE_BOOST_WEIGHTS``. Re-sorts by boosted score.
 
         Args:
             results: Search result dicts (must have ``doc_id`` and ``score``).
             boost_factor: Default score increment for unknown edge types.
+            relations: Pre-fetched relations from
+                ``_fetch_result_relations``. Fetched here when omitted.
+            pagerank_scores: Pre-fetched PageRank scores. Read from
+                document metadata here when omitted.
 
         Returns:
             Results re-sorted by boosted score.
@@ -494,21 +1228,14 @@ class KojiSearch:
             return results
 
         result_doc_ids: set[str] = {r["doc_id"] for r in results}
+        if relations is None:
+            relations = self._fetch_result_relations(results)
 
         # Build a map of doc_id -> accumulated type-weighted boost
         boost_totals: dict[str, float] = {}
         for doc_id in result_doc_ids:
-            try:
-                relations = self._koji.get_relations(doc_id, direction="both")
-            except Exception:
-                logger.debug(
-                    "koji_search.boost_relations_failed",
-                    doc_id=doc_id,
-                )
-                relations = []
-
             accumulated = 0.0
-            for rel in relations:
+            for rel in relations.get(doc_id, []):
                 if rel["src_doc_id"] == doc_id:
                     other = rel["dst_doc_id"]
                 else:
@@ -542,7 +1269,8 @@ class KojiSearch:
 
         # Apply cached PageRank boost if available
         try:
-            pagerank_scores = self._get_cached_pagerank(result_doc_ids)
+            if pagerank_scores is None:
+                pagerank_scores = self._get_cached_pagerank(result_doc_ids)
             if pagerank_scores:
                 results = self._apply_pagerank_boost(results, pagerank_scores)
         except Exception:
@@ -553,6 +1281,7 @@ class KojiSearch:
     def _collect_result_relationships(
         self,
         results: list[dict[str, Any]],
+        relations: dict[str, list[dict[str, Any]]] | None = None,
     ) -> list[dict[str, Any]]:
         """Collect relationship edges between documents in the result set.
 
@@ -560,6 +1289,8 @@ class KojiSearch:
 
         Args:
             results: Search result dicts (must have ``doc_id``).
+            relations: Pre-fetched relations from
+                ``_fetch_result_relations``. Fetched here when omitted.
 
         Returns:
             List of edge dicts with ``src_doc_id``, ``dst_doc_id``, and
@@ -569,16 +1300,13 @@ class KojiSearch:
             return []
 
         result_doc_ids: set[str] = {r["doc_id"] for r in results}
+        if relations is None:
+            relations = self._fetch_result_relations(results)
         seen_edges: set[tuple[str, str, str]] = set()
         edges: list[dict[str, Any]] = []
 
         for doc_id in result_doc_ids:
-            try:
-                relations = self._koji.get_relations(doc_id, direction="both")
-            except Exception:
-                continue
-
-            for rel in relations:
+            for rel in relations.get(doc_id, []):
                 src = rel["src_doc_id"]
                 dst = rel["dst_doc_id"]
                 rtype = rel["relation_type"]
@@ -600,17 +1328,25 @@ class KojiSearch:
 
         Returns empty dict if no enrichment has run.
         """
+        try:
+            docs = self._koji.get_documents(doc_ids, columns=["metadata"])
+        except Exception:
+            return {}
+        return self._pagerank_from_documents(docs)
+
+    @staticmethod
+    def _pagerank_from_documents(docs: dict[str, dict[str, Any]]) -> dict[str, float]:
+        """Extract ``metadata.graph.pagerank_score`` from fetched documents."""
         scores: dict[str, float] = {}
-        for doc_id in doc_ids:
+        for doc_id, doc in docs.items():
+            meta = doc.get("metadata") or {}
+            graph = meta.get("graph") or {}
+            pr = graph.get("pagerank_score")
+            if pr is None:
+                continue
             try:
-                doc = self._koji.get_document(doc_id)
-                if doc:
-                    meta = doc.get("metadata") or {}
-                    graph = meta.get("graph") or {}
-                    pr = graph.get("pagerank_score")
-                    if pr is not None:
-                        scores[doc_id] = float(pr)
-            except Exception:
+                scores[doc_id] = float(pr)
+            except (TypeError, ValueError):
                 continue
         return scores
 
@@ -651,12 +1387,19 @@ class KojiSearch:
         results.sort(key=lambda r: r["score"], reverse=True)
         return results
 
-    def _record_query(self, elapsed_ms: float) -> None:
+    def _record_query(self, elapsed_ms: float, stage1_ms: float | None = None) -> None:
         """Record query timing for stats."""
+        if stage1_ms is None:
+            stage1_ms = elapsed_ms
         self._stats["total_queries"] += 1
-        self._stats["total_times"].append(elapsed_ms)
-        if len(self._stats["total_times"]) > 1000:
-            self._stats["total_times"] = self._stats["total_times"][-1000:]
+        for name, value in (
+            ("total_times", elapsed_ms),
+            ("stage1_times", stage1_ms),
+            ("stage2_times", elapsed_ms - stage1_ms),
+        ):
+            self._stats[name].append(value)
+            if len(self._stats[name]) > 1000:
+                self._stats[name] = self._stats[name][-1000:]
 
 
 class SearchError(Exception):
@@ -0,0 +1,53 @@
+"""Exact late-interaction (MaxSim) scoring in NumPy.
+
+Used by two-stage search to rerank the candidates a pooled-vector scan
+returns. For a query ``Q`` (``q x dim``) and a document ``D``
+(``t x dim``), MaxSim is ``sum_i max_j Q[i] . D[j]``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+def maxsim_scores(query: np.ndarray, docs: Sequence[np.ndarray | None]) -> np.ndarray:
+    """Score every document in *docs* against *query* with MaxSim.
+
+    All candidate token matrices are stacked into one array so the
+    query-token similarities come from a single matmul; per-document
+    maxima are then taken with ``np.maximum.reduceat`` over each
+    document's row span.
+
+    Args:
+        query: ``(q, dim)`` query token matrix.
+        docs: ``(t, dim)`` token matrices. ``None`` or empty entries
+            score ``-inf``.
+
+    Returns:
+        ``float32`` array of length ``len(docs)``.
+
+    Raises:
+        ValueError: If a document's dimension differs from the query's.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    scores = np.full(len(docs), -np.inf, dtype=np.float32)
+    present = [i for i, d in enumerate(docs) if d is not None and len(d)]
+    if not present or query.size == 0:
+        return scores
+
+    for i in present:
+        if docs[i].shape[1] != query.shape[1]:
+            raise ValueError(
+                f"Document {i} has dim {docs[i].shape[1]}, query has {query.shape[1]}"
+            )
+
+    stacked = np.concatenate([docs[i] for i in present], axis=0).astype(np.float32, copy=False)
+    lengths = np.fromiter((len(docs[i]) for i in present), dtype=np.int64, count=len(present))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    sims = query @ stacked.T  # (q, total_tokens)
+    per_doc_max = np.maximum.reduceat(sims, offsets, axis=1)  # (q, n_present)
+    scores[present] = per_doc_max.sum(axis=0)
+    return scores
@@ -0,0 +1,189 @@
+"""Bounded cache of search responses.
+
+``KojiSearch`` keeps recent responses keyed by a hash of the normalized
+query text plus every argument that shapes the result (mode,
+``n_results``, project, filters, retrieval settings), so repeated
+searches -- the frontend re-running one on navigation, research
+follow-ups, MCP retries -- skip the MaxSim scans and relation boosts.
+
+Each entry is tagged with the ``KojiClient.index_version`` it was
+computed against. Any document, page, chunk or relation write bumps that
+version; the first lookup or store under a newer version drops every
+older entry, and a response computed against an older version is never
+stored. A TTL bounds staleness from writes made by other processes,
+which the local version counter cannot see.
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CacheKey = tuple[Hashable, ...]
+
+
+@dataclass
+class ResultCacheStats:
+    """Search result cache counters.
+
+    Attributes:
+        hits: Searches answered from the cache.
+        misses: Searches that ran.
+        evictions: Entries dropped to stay within ``max_entries``.
+        expirations: Entries dropped after their TTL.
+        invalidations: Entries dropped because the index changed.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+class SearchResultCache:
+    """Thread-safe, index-versioned LRU of search responses.
+
+    Args:
+        max_entries: Maximum cached responses. ``0`` disables the cache.
+        ttl_seconds: Entry lifetime; ``None`` or ``0`` keeps entries
+            until evicted or invalidated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 300.0,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or None
+        self._lock = threading.Lock()
+        # key -> (response, created_at monotonic seconds)
+        self._entries: OrderedDict[CacheKey, tuple[dict[str, Any], float]] = OrderedDict()
+        self._version: Optional[int] = None
+        self._stats = ResultCacheStats()
+
+    @classmethod
+    def from_env(cls) -> "SearchResultCache":
+        """Build a cache from ``SEARCH_CACHE_*`` environment variables.
+
+        ``SEARCH_CACHE_MAX_ENTRIES`` (default 256, ``0`` disables) and
+        ``SEARCH_CACHE_TTL_SECONDS`` (default 300, ``0`` for no expiry).
+
+        Returns:
+            Configured cache.
+        """
+        return cls(
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256")),
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.max_entries > 0
+
+    def get(self, key: CacheKey, version: int) -> Optional[dict[str, Any]]:
+        """Look up a response.
+
+        Args:
+            key: Search arguments key.
+            version: Current index version.
+
+        Returns:
+            A copy of the cached response, or ``None`` on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._advance(version)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, key: CacheKey, version: int, response: dict[str, Any]) -> None:
+        """Store a response computed against *version*.
+
+        Responses computed against an index version older than the
+        newest one seen are discarded: a write landed mid-search.
+
+        Args:
+            key: Search arguments key.
+            version: Index version read before the search ran.
+            response: Search response. Stored as a copy.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._advance(version)
+            if version != self._version:
+                return
+            self._entries[key] = (copy.deepcopy(response), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached response, keeping counters."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters.
+
+        Returns:
+            Dict with ``entries``, ``max_entries``, ``ttl_seconds``,
+            ``index_version``, ``hit_rate`` and the
+            :class:`ResultCacheStats` counters.
+        """
+        with self._lock:
+            total = self._stats.hits + self._stats.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "index_version": self._version,
+                "hit_rate": self._stats.hits / total if total else 0.0,
+                **asdict(self._stats),
+            }
+
+    # -- internal helpers ----------------------------------------------------
+
+    def _advance(self, version: int) -> None:
+        """Drop every entry once a newer index version is seen.
+
+        Must be called with ``_lock`` held.
+        """
+        if self._version is not None and version <= self._version:
+            return
+        if self._entries:
+            self._stats.invalidations += len(self._entries)
+            logger.debug(
+                "search_result_cache.invalidated",
+                entries=len(self._entries),
+                index_version=version,
+            )
+            self._entries.clear()
+        self._version = version
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - created_at >= self.ttl_seconds
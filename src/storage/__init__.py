@@ -7,18 +7,36 @@ for documents, pages, chunks, and document relationships.
 Components:
 - KojiClient: Main client for Koji database operations
 - Custom exceptions: Storage-specific error types
+- Column projections: Document column sets for blob-free reads
 - Multi-vector utilities: Binary packing/unpacking for embeddings
+- Maintenance: Background compaction scheduler
+- Row cache: Bounded read-through cache for point lookups
+- Graph index: In-memory CSR adjacency over document relations
+- Graph cache: Versioned cache of graph algorithm results
+- Query stats: Per-SQL-template latency histograms and slow-query log
+- Snapshots: Arrow IPC / Parquet export and parallel restore
 """
 
 from .koji_client import (
+    DOCUMENT_COLUMNS,
+    DOCUMENT_SUMMARY_COLUMNS,
     KojiClient,
     KojiClientError,
     KojiConnectionError,
     KojiDuplicateError,
     KojiQueryError,
     pack_multivec,
+    pool_multivec,
     unpack_multivec,
+    unpack_multivec_array,
+    unpack_multivec_column,
 )
+from .graph_cache import GraphResultCache
+from .graph_index import GraphIndex
+from .maintenance import CompactionRun, CompactionScheduler
+from .query_stats import InstrumentedDatabase, QueryStats
+from .row_cache import RowCache
+from .snapshot import export_snapshot, import_snapshot
 
 __all__ = [
     # Main client
@@ -28,7 +46,27 @@ __all__ = [
     "KojiConnectionError",
     "KojiQueryError",
     "KojiDuplicateError",
+    # Column projections
+    "DOCUMENT_COLUMNS",
+    "DOCUMENT_SUMMARY_COLUMNS",
     # Multi-vector utilities
     "pack_multivec",
+    "pool_multivec",
     "unpack_multivec",
+    "unpack_multivec_array",
+    "unpack_multivec_column",
+    # Maintenance
+    "CompactionScheduler",
+    "CompactionRun",
+    # Row cache
+    "RowCache",
+    # Graph index
+    "GraphIndex",
+    "GraphResultCache",
+    # Query instrumentation
+    "QueryStats",
+    "InstrumentedDatabase",
+    # Snapshots
+    "export_snapshot",
+    "import_snapshot",
 ]
@@ -0,0 +1,132 @@
+"""
+Versioned cache for graph algorithm results.
+
+``KojiClient`` caches PageRank, community, SCC, topological-order and
+shortest-path results keyed by ``(algorithm, params, versions)``, where
+the versions are the relation graph version and a document-set
+counter. Any relation or document write changes a version, so stale
+results are simply never looked up again and are pruned on the next
+store. Entries are bounded by an LRU of ``max_entries``.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+
+@dataclass
+class AlgorithmStats:
+    """Counters for one graph algorithm.
+
+    Attributes:
+        hits: Calls served from the cache.
+        misses: Calls that ran the algorithm.
+        compute_ms_total: Wall time spent computing on misses.
+        last_compute_ms: Wall time of the most recent computation.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    compute_ms_total: float = 0.0
+    last_compute_ms: float = 0.0
+
+
+class GraphResultCache:
+    """Thread-safe LRU of graph algorithm results.
+
+    Args:
+        max_entries: Maximum cached results. ``0`` disables caching but
+            still records compute time.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[Hashable, ...], Any] = OrderedDict()
+        self._stats: dict[str, AlgorithmStats] = {}
+
+    def get(self, algorithm: str, key: tuple[Hashable, ...]) -> tuple[bool, Any]:
+        """Look up a cached result.
+
+        Args:
+            algorithm: Algorithm name, for per-algorithm counters.
+            key: Full cache key, including versions.
+
+        Returns:
+            ``(True, copy_of_result)`` on a hit, ``(False, None)`` otherwise.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(algorithm, AlgorithmStats())
+            if key not in self._entries:
+                stats.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            stats.hits += 1
+            return True, copy.copy(self._entries[key])
+
+    def put(
+        self,
+        algorithm: str,
+        key: tuple[Hashable, ...],
+        value: Any,
+        compute_ms: float,
+        versions: tuple[int, ...],
+    ) -> None:
+        """Store a freshly computed result.
+
+        Entries computed against other versions are dropped first.
+
+        Args:
+            algorithm: Algorithm name.
+            key: Full cache key; must end with *versions*.
+            value: Result to cache. Callers receive shallow copies.
+            compute_ms: Time the computation took.
+            versions: Versions current when the computation started.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(algorithm, AlgorithmStats())
+            stats.compute_ms_total += compute_ms
+            stats.last_compute_ms = compute_ms
+            if self._max_entries <= 0:
+                return
+            width = len(versions)
+            for stale in [k for k in self._entries if k[-width:] != versions]:
+                del self._entries[stale]
+            self._entries[key] = copy.copy(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached result, keeping counters."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Cache counters.
+
+        Returns:
+            Dict with ``entries``, ``max_entries``, overall ``hits``,
+            ``misses``, ``hit_rate`` and ``compute_ms_total``, plus
+            per-algorithm counters under ``algorithms``.
+        """
+        with self._lock:
+            hits = sum(s.hits for s in self._stats.values())
+            misses = sum(s.misses for s in self._stats.values())
+            total = hits + misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else 0.0,
+                "compute_ms_total": sum(s.compute_ms_total for s in self._stats.values()),
+                "algorithms": {
+                    name: asdict(stats) for name, stats in sorted(self._stats.items())
+                },
+            }
@@ -0,0 +1,615 @@
+"""
+In-memory adjacency index over ``doc_relations``.
+
+``KojiClient`` keeps a :class:`GraphIndex` so neighborhood expansion,
+BFS, shortest paths, and search-time graph boosts run in-process
+instead of issuing one SQL round trip per hop. The graph is stored
+as compressed sparse rows (CSR) in both directions: per-node offsets
+into flat ``int32`` neighbor ids, ``int16`` relation type codes, and
+``float32`` weights, so a lookup costs O(degree).
+
+Writes made through the client are applied incrementally. Added edges
+go to a small per-node overlay and removed CSR edges are masked; once
+the overlay grows past a fraction of the graph the CSR arrays are
+rebuilt. Every change bumps :attr:`GraphIndex.version`, which callers
+can use to key derived caches.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+# Overlay size (added plus masked edges) that triggers a CSR rebuild,
+# as a floor and as a fraction of the CSR edge count.
+_MIN_REBUILD_DELTA = 1024
+_REBUILD_FRACTION = 0.25
+
+_DIRECTIONS = ("outgoing", "incoming", "both")
+
+
+def edge_weight(metadata: Any) -> float:
+    """Derive an edge weight from relation metadata.
+
+    Uses the first numeric ``weight``, ``score``, or ``jaccard`` value,
+    falling back to ``1.0``.
+
+    Args:
+        metadata: Relation metadata as a dict or JSON string.
+
+    Returns:
+        Edge weight.
+    """
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except (json.JSONDecodeError, TypeError):
+            return 1.0
+    if isinstance(metadata, dict):
+        for key in ("weight", "score", "jaccard"):
+            value = metadata.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value)
+    return 1.0
+
+
+class _CSR:
+    """One direction of the adjacency: offsets plus parallel edge arrays."""
+
+    __slots__ = ("indptr", "indices", "types", "weights")
+
+    def __init__(
+        self,
+        num_nodes: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        types: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        order = np.argsort(rows, kind="stable")
+        counts = np.bincount(rows, minlength=num_nodes)
+        self.indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.indptr[1:])
+        self.indices = cols[order].astype(np.int32)
+        self.types = types[order].astype(np.int16)
+        self.weights = weights[order].astype(np.float32)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def row(self, node: int) -> range:
+        if node >= self.num_nodes:
+            return range(0)
+        return range(int(self.indptr[node]), int(self.indptr[node + 1]))
+
+
+class GraphIndex:
+    """Compact, incrementally maintained adjacency for document relations.
+
+    Document ids are mapped to dense ``int32`` node ids and relation
+    types to ``int16`` codes. Node ids are never reused, so removing a
+    document only drops its edges.
+
+    All methods are thread-safe.
+
+    Args:
+        version: Initial version number.
+    """
+
+    def __init__(self, version: int = 0) -> None:
+        self._lock = threading.RLock()
+        self._version = version
+        self._node_of: dict[str, int] = {}
+        self._doc_ids: list[str] = []
+        self._type_of: dict[str, int] = {}
+        self._type_names: list[str] = []
+        empty = np.zeros(0, dtype=np.int32)
+        self._out = _CSR(0, empty, empty, empty, np.zeros(0, dtype=np.float32))
+        self._in = _CSR(0, empty, empty, empty, np.zeros(0, dtype=np.float32))
+        # Overlay: edges added since the last rebuild, keyed by endpoint,
+        # as (other_node, type_code, weight).
+        self._added_out: dict[int, list[tuple[int, int, float]]] = {}
+        self._added_in: dict[int, list[tuple[int, int, float]]] = {}
+        # CSR edges deleted since the last rebuild, as (src, dst, type_code).
+        self._removed: set[tuple[int, int, int]] = set()
+        self._num_added = 0
+
+    @classmethod
+    def from_edges(
+        cls,
+        edges: Iterable[tuple[str, str, str, float]],
+        version: int = 0,
+    ) -> GraphIndex:
+        """Build an index from ``(src, dst, relation_type, weight)`` tuples.
+
+        Duplicate edges are collapsed, keeping the first weight.
+
+        Args:
+            edges: Edge tuples.
+            version: Initial version number.
+
+        Returns:
+            A new index.
+        """
+        index = cls(version=version)
+        seen: set[tuple[int, int, int]] = set()
+        src: list[int] = []
+        dst: list[int] = []
+        types: list[int] = []
+        weights: list[float] = []
+        for s, d, rel_type, weight in edges:
+            key = (index._node(s), index._node(d), index._type(rel_type))
+            if key in seen:
+                continue
+            seen.add(key)
+            src.append(key[0])
+            dst.append(key[1])
+            types.append(key[2])
+            weights.append(weight)
+        index._build(
+            np.asarray(src, dtype=np.int32),
+            np.asarray(dst, dtype=np.int32),
+            np.asarray(types, dtype=np.int16),
+            np.asarray(weights, dtype=np.float32),
+        )
+        return index
+
+    # -- reads ---------------------------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Monotonically increasing change counter."""
+        return self._version
+
+    def neighbors(
+        self,
+        doc_id: str,
+        direction: str = "outgoing",
+        relation_types: Iterable[str] | None = None,
+    ) -> list[tuple[str, str, float]]:
+        """List a document's adjacent documents.
+
+        Args:
+            doc_id: Document identifier.
+            direction: ``outgoing`` (default), ``incoming``, or ``both``.
+            relation_types: Restrict to these relation types (optional).
+
+        Returns:
+            ``(neighbor_doc_id, relation_type, weight)`` tuples. With
+            ``both``, outgoing edges come first.
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        _check_direction(direction)
+        with self._lock:
+            node = self._node_of.get(doc_id)
+            if node is None:
+                return []
+            codes = self._type_codes(relation_types)
+            return [
+                (self._doc_ids[other], self._type_names[code], weight)
+                for other, code, weight in self._adjacent(node, direction, codes)
+            ]
+
+    def relations_for(
+        self,
+        doc_ids: Iterable[str],
+        direction: str = "both",
+        relation_types: Iterable[str] | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Relation dicts per document, shaped like ``get_relations_for``.
+
+        Each dict has ``src_doc_id``, ``dst_doc_id``, ``relation_type``,
+        and ``weight``; relation metadata is not held in the index.
+
+        Args:
+            doc_ids: Document identifiers. Duplicates are ignored.
+            direction: ``outgoing``, ``incoming``, or ``both`` (default).
+            relation_types: Restrict to these relation types (optional).
+
+        Returns:
+            Mapping of every requested ``doc_id`` to its relations.
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        _check_direction(direction)
+        grouped: dict[str, list[dict[str, Any]]] = {}
+        with self._lock:
+            codes = self._type_codes(relation_types)
+            for doc_id in doc_ids:
+                if doc_id in grouped:
+                    continue
+                rels: list[dict[str, Any]] = []
+                grouped[doc_id] = rels
+                node = self._node_of.get(doc_id)
+                if node is None:
+                    continue
+                if direction in ("outgoing", "both"):
+                    for other, code, weight in self._adjacent(node, "outgoing", codes):
+                        rels.append(self._relation(node, other, code, weight))
+                if direction in ("incoming", "both"):
+                    for other, code, weight in self._adjacent(node, "incoming", codes):
+                        if other != node or direction == "incoming":
+                            rels.append(self._relation(other, node, code, weight))
+        return grouped
+
+    def bfs(
+        self,
+        root_doc_id: str,
+        max_depth: int = 3,
+        direction: str = "outgoing",
+        relation_types: Iterable[str] | None = None,
+    ) -> list[tuple[str, str, int]]:
+        """Breadth-first traversal from a document.
+
+        Args:
+            root_doc_id: Starting document identifier.
+            max_depth: Maximum number of hops.
+            direction: Edge direction to follow.
+            relation_types: Restrict to these relation types (optional).
+
+        Returns:
+            ``(doc_id, relation_type, depth)`` for every reachable
+            document except the root, in discovery order. The relation
+            type is that of the edge the document was first reached by.
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        _check_direction(direction)
+        with self._lock:
+            root = self._node_of.get(root_doc_id)
+            if root is None:
+                return []
+            codes = self._type_codes(relation_types)
+            visited = {root}
+            found: list[tuple[str, str, int]] = []
+            frontier = [root]
+            for depth in range(1, max_depth + 1):
+                next_frontier: list[int] = []
+                for node in frontier:
+                    for other, code, _ in self._adjacent(node, direction, codes):
+                        if other in visited:
+                            continue
+                        visited.add(other)
+                        found.append((self._doc_ids[other], self._type_names[code], depth))
+                        next_frontier.append(other)
+                if not next_frontier:
+                    break
+                frontier = next_frontier
+            return found
+
+    def shortest_path(
+        self,
+        src_doc_id: str,
+        dst_doc_id: str,
+        max_depth: int = 10,
+        direction: str = "outgoing",
+    ) -> list[tuple[str, str, str]]:
+        """Fewest-hop path between two documents.
+
+        Args:
+            src_doc_id: Source document identifier.
+            dst_doc_id: Target document identifier.
+            max_depth: Maximum path length in hops.
+            direction: Edge direction to follow.
+
+        Returns:
+            ``(from_doc_id, to_doc_id, relation_type)`` steps, or an
+            empty list when no path exists within *max_depth*.
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        _check_direction(direction)
+        with self._lock:
+            src = self._node_of.get(src_doc_id)
+            dst = self._node_of.get(dst_doc_id)
+            if src is None or dst is None or src == dst:
+                return []
+            parent: dict[int, tuple[int, int]] = {src: (-1, -1)}
+            queue: deque[tuple[int, int]] = deque([(src, 0)])
+            while queue:
+                node, depth = queue.popleft()
+                if depth >= max_depth:
+                    continue
+                for other, code, _ in self._adjacent(node, direction, None):
+                    if other in parent:
+                        continue
+                    parent[other] = (node, code)
+                    if other == dst:
+                        return self._unwind(parent, dst)
+                    queue.append((other, depth + 1))
+            return []
+
+    def stats(self) -> dict[str, int]:
+        """Index size counters.
+
+        Returns:
+            Dict with ``nodes``, ``edges``, ``relation_types``,
+            ``overlay_edges``, ``masked_edges``, and ``version``.
+        """
+        with self._lock:
+            return {
+                "nodes": len(self._doc_ids),
+                "edges": len(self._out.indices) - len(self._removed) + self._num_added,
+                "relation_types": len(self._type_names),
+                "overlay_edges": self._num_added,
+                "masked_edges": len(self._removed),
+                "version": self._version,
+            }
+
+    # -- writes --------------------------------------------------------------
+
+    def add_edge(
+        self,
+        src_doc_id: str,
+        dst_doc_id: str,
+        relation_type: str,
+        weight: float = 1.0,
+    ) -> bool:
+        """Add an edge.
+
+        Args:
+            src_doc_id: Source document identifier.
+            dst_doc_id: Destination document identifier.
+            relation_type: Relationship type.
+            weight: Edge weight.
+
+        Returns:
+            ``True`` if the edge was added, ``False`` if already present.
+        """
+        with self._lock:
+            src = self._node(src_doc_id)
+            dst = self._node(dst_doc_id)
+            code = self._type(relation_type)
+            if self._has_edge(src, dst, code):
+                return False
+            self._added_out.setdefault(src, []).append((dst, code, weight))
+            self._added_in.setdefault(dst, []).append((src, code, weight))
+            self._num_added += 1
+            self._changed()
+            return True
+
+    def remove_edge(self, src_doc_id: str, dst_doc_id: str, relation_type: str) -> bool:
+        """Remove an edge.
+
+        Args:
+            src_doc_id: Source document identifier.
+            dst_doc_id: Destination document identifier.
+            relation_type: Relationship type.
+
+        Returns:
+            ``True`` if the edge was present.
+        """
+        with self._lock:
+            src = self._node_of.get(src_doc_id)
+            dst = self._node_of.get(dst_doc_id)
+            code = self._type_of.get(relation_type)
+            if src is None or dst is None or code is None:
+                return False
+            if not self._remove(src, dst, code):
+                return False
+            self._changed()
+            return True
+
+    def remove_type(self, relation_type: str) -> int:
+        """Remove every edge of a relation type.
+
+        Rebuilds the CSR arrays, which is O(edges).
+
+        Args:
+            relation_type: Relationship type.
+
+        Returns:
+            Number of edges removed.
+        """
+        with self._lock:
+            code = self._type_of.get(relation_type)
+            if code is None:
+                return 0
+            before = self.stats()["edges"]
+            self._rebuild(drop_type=code)
+            removed = before - self.stats()["edges"]
+            if removed:
+                self._version += 1
+            return removed
+
+    def remove_node(self, doc_id: str) -> int:
+        """Remove every edge touching a document.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            Number of edges removed.
+        """
+        with self._lock:
+            node = self._node_of.get(doc_id)
+            if node is None:
+                return 0
+            edges = [(node, other, code) for other, code, _ in self._adjacent(node, "outgoing")]
+            edges += [
+                (other, node, code)
+                for other, code, _ in self._adjacent(node, "incoming")
+                if other != node
+            ]
+            removed = sum(1 for src, dst, code in edges if self._remove(src, dst, code))
+            if removed:
+                self._changed()
+            return removed
+
+    # -- internals -----------------------------------------------------------
+
+    def _node(self, doc_id: str) -> int:
+        node = self._node_of.get(doc_id)
+        if node is None:
+            node = len(self._doc_ids)
+            self._node_of[doc_id] = node
+            self._doc_ids.append(doc_id)
+        return node
+
+    def _type(self, relation_type: str) -> int:
+        code = self._type_of.get(relation_type)
+        if code is None:
+            code = len(self._type_names)
+            self._type_of[relation_type] = code
+            self._type_names.append(relation_type)
+        return code
+
+    def _type_codes(self, relation_types: Iterable[str] | None) -> set[int] | None:
+        if relation_types is None:
+            return None
+        return {self._type_of[t] for t in relation_types if t in self._type_of}
+
+    def _adjacent(
+        self,
+        node: int,
+        direction: str,
+        codes: set[int] | None = None,
+    ) -> Iterable[tuple[int, int, float]]:
+        """Yield ``(other_node, type_code, weight)`` for live edges."""
+        if direction in ("outgoing", "both"):
+            yield from self._scan(node, self._out, self._added_out, codes, outgoing=True)
+        if direction in ("incoming", "both"):
+            yield from self._scan(node, self._in, self._added_in, codes, outgoing=False)
+
+    def _scan(
+        self,
+        node: int,
+        csr: _CSR,
+        added: dict[int, list[tuple[int, int, float]]],
+        codes: set[int] | None,
+        outgoing: bool,
+    ) -> Iterable[tuple[int, int, float]]:
+        removed = self._removed
+        for k in csr.row(node):
+            other = int(csr.indices[k])
+            code = int(csr.types[k])
+            if codes is not None and code not in codes:
+                continue
+            if removed and (
+                (node, other, code) if outgoing else (other, node, code)
+            ) in removed:
+                continue
+            yield other, code, float(csr.weights[k])
+        for other, code, weight in added.get(node, ()):
+            if codes is None or code in codes:
+                yield other, code, weight
+
+    def _csr_has_edge(self, src: int, dst: int, code: int) -> bool:
+        csr = self._out
+        for k in csr.row(src):
+            if csr.indices[k] == dst and csr.types[k] == code:
+                return True
+        return False
+
+    def _has_edge(self, src: int, dst: int, code: int) -> bool:
+        if any(d == dst and c == code for d, c, _ in self._added_out.get(src, ())):
+            return True
+        return (src, dst, code) not in self._removed and self._csr_has_edge(src, dst, code)
+
+    def _remove(self, src: int, dst: int, code: int) -> bool:
+        """Drop one live edge from the overlay or mask it in the CSR."""
+        out = self._added_out.get(src, [])
+        for i, (d, c, _) in enumerate(out):
+            if d == dst and c == code:
+                del out[i]
+                inc = self._added_in[dst]
+                for j, (s, c2, _) in enumerate(inc):
+                    if s == src and c2 == code:
+                        del inc[j]
+                        break
+                self._num_added -= 1
+                return True
+        key = (src, dst, code)
+        if key in self._removed or not self._csr_has_edge(src, dst, code):
+            return False
+        self._removed.add(key)
+        return True
+
+    def _changed(self) -> None:
+        self._version += 1
+        delta = self._num_added + len(self._removed)
+        if delta > max(_MIN_REBUILD_DELTA, _REBUILD_FRACTION * len(self._out.indices)):
+            self._rebuild()
+
+    def _rebuild(self, drop_type: int | None = None) -> None:
+        """Fold the overlay into fresh CSR arrays."""
+        csr = self._out
+        src = np.repeat(
+            np.arange(csr.num_nodes, dtype=np.int32), np.diff(csr.indptr),
+        )
+        dst, types, weights = csr.indices, csr.types, csr.weights
+        keep = np.ones(len(dst), dtype=bool)
+        for s, d, c in self._removed:
+            for k in csr.row(s):
+                if dst[k] == d and types[k] == c:
+                    keep[k] = False
+                    break
+        added = [
+            (s, d, c, w) for s, edges in self._added_out.items() for d, c, w in edges
+        ]
+        if added:
+            extra = np.array([a[:3] for a in added], dtype=np.int64).reshape(-1, 3)
+            src = np.concatenate([src[keep], extra[:, 0].astype(np.int32)])
+            dst = np.concatenate([dst[keep], extra[:, 1].astype(np.int32)])
+            types = np.concatenate([types[keep], extra[:, 2].astype(np.int16)])
+            weights = np.concatenate(
+                [weights[keep], np.array([a[3] for a in added], dtype=np.float32)],
+            )
+        else:
+            src, dst, types, weights = src[keep], dst[keep], types[keep], weights[keep]
+        if drop_type is not None:
+            mask = types != drop_type
+            src, dst, types, weights = src[mask], dst[mask], types[mask], weights[mask]
+        self._build(src, dst, types, weights)
+
+    def _build(
+        self,
+        src: np.ndarray,
+        dst: np.ndarray,
+        types: np.ndarray,
+        weights: np.ndarray,
+    ) -> None:
+        num_nodes = len(self._doc_ids)
+        self._out = _CSR(num_nodes, src, dst, types, weights)
+        self._in = _CSR(num_nodes, dst, src, types, weights)
+        self._added_out.clear()
+        self._added_in.clear()
+        self._removed.clear()
+        self._num_added = 0
+
+    def _relation(self, src: int, dst: int, code: int, weight: float) -> dict[str, Any]:
+        return {
+            "src_doc_id": self._doc_ids[src],
+            "dst_doc_id": self._doc_ids[dst],
+            "relation_type": self._type_names[code],
+            "weight": weight,
+        }
+
+    def _unwind(
+        self, parent: dict[int, tuple[int, int]], node: int,
+    ) -> list[tuple[str, str, str]]:
+        steps: list[tuple[str, str, str]] = []
+        while True:
+            prev, code = parent[node]
+            if prev < 0:
+                break
+            steps.append((self._doc_ids[prev], self._doc_ids[node], self._type_names[code]))
+            node = prev
+        steps.reverse()
+        return steps
+
+
+def _check_direction(direction: str) -> None:
+    if direction not in _DIRECTIONS:
+        raise ValueError(f"Invalid relation direction: {direction!r}")
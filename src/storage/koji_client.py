@@ -15,18 +15,32 @@ All persistence operations flow through this client. It handles:
 
 from __future__ import annotations
 
+import functools
+import inspect
 import json
+import re
 import struct
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field as dc_field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pyarrow as pa
 import structlog
 import koji
 from koji._koji import ForeignKey
 
 from ..config.koji_config import KojiConfig
+from .graph_cache import GraphResultCache
+from .graph_index import GraphIndex, edge_weight
+from .maintenance import CompactionScheduler
+from .query_stats import InstrumentedDatabase, QueryStats
+from .row_cache import RowCache
 
 logger = structlog.get_logger(__name__)
 
@@ -119,6 +133,22 @@ def _sanitize_sql_value(value: str) -> str:
     return value
 
 
+def _sql_timestamp(value: str) -> str:
+    """Validate an ISO-8601 timestamp for interpolation into SQL.
+
+    Args:
+        value: Timestamp string, as written by ``datetime.isoformat()``.
+
+    Returns:
+        The original value if it parses as a timestamp.
+
+    Raises:
+        ValueError: If value is not an ISO-8601 timestamp.
+    """
+    datetime.fromisoformat(value)
+    return value
+
+
 class KojiClientError(Exception):
     """Base exception for Koji client operations."""
 
@@ -164,6 +194,11 @@ DOCUSEARCH_SCHEMA: dict = {
             # enrichment is disabled or source_type is not "document".
             "enrichment": {"type": "text"},
             "created_at": {"type": "text"},
+            # Persistent integer id used as the vertex id by graph
+            # algorithms. Drawn from the ``node_id`` counter at creation
+            # and never changed; legacy NULLs are filled once by
+            # ``processing.node_id_backfill``.
+            "node_id": {"type": "integer"},
         },
     },
     "pages": {
@@ -174,6 +209,9 @@ DOCUSEARCH_SCHEMA: dict = {
             "image": {"type": "binary"},
             "thumb": {"type": "binary"},
             "embedding": {"type": "binary"},
+            # Mean-pooled, L2-normalized ``embedding`` packed as a 1 x dim
+            # multi-vector; the candidate prefilter of two-stage search.
+            "pooled_embedding": {"type": "binary"},
             "structure": {"type": "text"},
             # JSON blob — per-page aggregate of figure captions, code
             # summaries, and formula interpretations from VLM
@@ -181,6 +219,9 @@ DOCUSEARCH_SCHEMA: dict = {
             "enrichment": {"type": "text"},
             "width": {"type": "integer"},
             "height": {"type": "integer"},
+            # Copy of ``documents.project_id`` so scoped vector searches
+            # filter pages directly instead of joining documents.
+            "project_id": {"type": "text"},
         },
     },
     "chunks": {
@@ -190,6 +231,8 @@ DOCUSEARCH_SCHEMA: dict = {
             "page_num": {"type": "integer"},
             "text": {"type": "text"},
             "embedding": {"type": "binary"},
+            # See ``pages.pooled_embedding``.
+            "pooled_embedding": {"type": "binary"},
             "context": {"type": "text"},
             # JSON blob — VLM enrichment attached to this chunk. For
             # organic chunks, holds figure descriptions matching
@@ -201,6 +244,8 @@ DOCUSEARCH_SCHEMA: dict = {
             "word_count": {"type": "integer"},
             "start_time": {"type": "float"},
             "end_time": {"type": "float"},
+            # Copy of ``documents.project_id``; see ``pages.project_id``.
+            "project_id": {"type": "text"},
         },
     },
     "doc_relations": {
@@ -224,6 +269,20 @@ DOCUSEARCH_SCHEMA: dict = {
             "queued_at": {"type": "text"},
             "started_at": {"type": "text"},
             "completed_at": {"type": "text"},
+            # Lease held by the claiming worker. A job whose lease has
+            # expired (worker crashed or hung) is requeued by
+            # ``requeue_expired_jobs``.
+            "worker_id": {"type": "text"},
+            "lease_expires_at": {"type": "text"},
+            "attempts": {"type": "integer"},
+        },
+    },
+    # Sequences shared by every process on the database, advanced by
+    # compare-and-set (see ``_allocate_node_ids``).
+    "counters": {
+        "columns": {
+            "name": {"type": "text", "primary_key": True},
+            "value": {"type": "integer"},
         },
     },
 }
@@ -266,46 +325,266 @@ DOCUSEARCH_FOREIGN_KEYS = [
     ),
 ]
 
+DOCUMENT_COLUMNS: tuple[str, ...] = tuple(DOCUSEARCH_SCHEMA["documents"]["columns"])
+
+# Document columns minus the (often multi-megabyte) ``markdown`` body and
+# the ``enrichment`` blob — enough for listings, graph nodes, and lookups.
+DOCUMENT_SUMMARY_COLUMNS: tuple[str, ...] = (
+    "doc_id",
+    "project_id",
+    "filename",
+    "format",
+    "num_pages",
+    "metadata",
+    "created_at",
+)
+
+_DOCUMENT_JSON_FIELDS = ("metadata", "enrichment")
+
+# PKs are non-nullable in Koji; relation inserts use this explicit schema.
+_RELATION_SCHEMA = pa.schema([
+    pa.field("src_doc_id", pa.string(), nullable=False),
+    pa.field("dst_doc_id", pa.string(), nullable=False),
+    pa.field("relation_type", pa.string(), nullable=False),
+    pa.field("metadata", pa.string()),
+])
+
+_RELATION_CONFLICT_MODES = ("skip", "replace")
+
+# Documents fetched per page when ``delete_project`` walks a project.
+_PROJECT_DELETE_PAGE_SIZE = 500
+
+# Finds an existing WHERE clause so query_batches can AND its key range in.
+_WHERE_RE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+# Documents per UPDATE when backfilling ``project_id`` on pages and chunks.
+_BACKFILL_DOCS_PER_UPDATE = 200
+
+# Tables carrying ``pooled_embedding``.
+_POOLED_TABLES = ("pages", "chunks")
+
+# Tables whose writes change search results; see KojiClient.index_version.
+_INDEX_TABLES = frozenset({"documents", "pages", "chunks", "doc_relations"})
+
+# ``counters`` row holding the next unused ``documents.node_id``.
+_NODE_ID_COUNTER = "node_id"
+# Compare-and-set rounds before a node id allocation gives up.
+_COUNTER_CAS_ATTEMPTS = 50
+
+# Processing job leases. Workers heartbeat well inside the lease; a job
+# whose lease lapses is requeued, and failed after too many attempts.
+DEFAULT_JOB_LEASE_SECONDS = 300.0
+DEFAULT_JOB_MAX_ATTEMPTS = 3
+
+# Queued jobs considered per claim, so concurrent workers that lose the
+# race for the oldest job move on to the next instead of idling.
+_CLAIM_CANDIDATES = 8
+
+# ORDER BY expressions for ``list_document_summaries`` sort keys.
+_DOCUMENT_SORT_ORDERS: dict[str, str] = {
+    "newest_first": "created_at DESC",
+    "oldest_first": "created_at ASC",
+    "name_asc": "LOWER(filename) ASC",
+    "name_desc": "LOWER(filename) DESC",
+}
+
 
 # ---------------------------------------------------------------------------
 # Multi-vector packing utilities
 # ---------------------------------------------------------------------------
 
-def pack_multivec(embedding: list[list[float]]) -> bytes:
+_MULTIVEC_HEADER = struct.Struct("<II")
+_MULTIVEC_DTYPE = np.dtype("<f4")
+
+
+def pack_multivec(embedding: np.ndarray | Sequence[Sequence[float]]) -> bytes:
     """Pack multi-vector embedding into Koji binary format.
 
     Format:
         Header: num_tokens (u32 LE) + dim (u32 LE)
         Data: num_tokens * dim * f32 values (LE, row-major)
 
+    A C-contiguous little-endian ``float32`` array is serialized with a
+    single ``tobytes()`` call; other inputs are converted first.
+
     Args:
-        embedding: List of token vectors, each a list of floats.
+        embedding: ``(num_tokens, dim)`` array, or list of token vectors.
 
     Returns:
         Packed binary blob compatible with Koji ``<~>`` operator.
+
+    Raises:
+        ValueError: If *embedding* is not two-dimensional.
     """
-    num_tokens = len(embedding)
-    dim = len(embedding[0])
-    header = struct.pack("<II", num_tokens, dim)
-    data = struct.pack(
-        f"<{num_tokens * dim}f",
-        *(val for vec in embedding for val in vec),
-    )
-    return header + data
+    data = np.ascontiguousarray(embedding, dtype=_MULTIVEC_DTYPE)
+    if data.ndim != 2:
+        raise ValueError(
+            f"Multi-vector embedding must be 2-D, got shape {data.shape}"
+        )
+    num_tokens, dim = data.shape
+    return _MULTIVEC_HEADER.pack(num_tokens, dim) + data.tobytes()
+
+
+def unpack_multivec_array(blob: bytes | memoryview | pa.Buffer) -> np.ndarray:
+    """Decode Koji binary format to a ``(num_tokens, dim)`` array without copying.
+
+    The result is a read-only view over *blob*; call ``.copy()`` before
+    mutating it.
+
+    Args:
+        blob: Packed binary blob from Koji.
+
+    Returns:
+        Read-only ``float32`` array of shape ``(num_tokens, dim)``.
+
+    Raises:
+        ValueError: If *blob* is shorter than its header declares.
+    """
+    num_tokens, dim = _MULTIVEC_HEADER.unpack_from(blob)
+    count = num_tokens * dim
+    view = np.frombuffer(
+        blob, dtype=_MULTIVEC_DTYPE, count=count, offset=_MULTIVEC_HEADER.size,
+    ).reshape(num_tokens, dim)
+    view.flags.writeable = False
+    return view
+
+
+def pool_multivec(blob: bytes | memoryview | None) -> bytes | None:
+    """Mean-pool a packed multi-vector into a packed ``1 x dim`` vector.
+
+    The pooled vector is L2-normalized, so Koji's ``<~>`` against it
+    scores a query by the dot product of its summed tokens with the
+    row's mean direction -- a cheap single-vector proxy for MaxSim.
+
+    Args:
+        blob: Packed binary blob from :func:`pack_multivec`, or ``None``.
+
+    Returns:
+        Packed ``1 x dim`` blob, or ``None`` if *blob* is empty.
+    """
+    if not blob:
+        return None
+    tokens = unpack_multivec_array(blob)
+    if tokens.shape[0] == 0:
+        return None
+    pooled = tokens.mean(axis=0, keepdims=True)
+    norm = float(np.linalg.norm(pooled))
+    if norm > 0:
+        pooled /= norm
+    return pack_multivec(pooled)
+
+
+def _pooled_for(row: dict[str, Any]) -> bytes | None:
+    """``pooled_embedding`` for an inserted row, pooling ``embedding`` if absent."""
+    if row.get("pooled_embedding") is not None:
+        return row["pooled_embedding"]
+    return pool_multivec(row.get("embedding"))
 
 
 def unpack_multivec(blob: bytes) -> list[list[float]]:
     """Unpack Koji binary format to multi-vector embedding.
 
+    Prefer :func:`unpack_multivec_array` on hot paths; this variant
+    materializes every value as a Python float.
+
     Args:
         blob: Packed binary blob from Koji.
 
     Returns:
         List of token vectors.
     """
-    num_tokens, dim = struct.unpack("<II", blob[:8])
-    values = struct.unpack(f"<{num_tokens * dim}f", blob[8:])
-    return [list(values[i * dim : (i + 1) * dim]) for i in range(num_tokens)]
+    return unpack_multivec_array(blob).tolist()
+
+
+def unpack_multivec_column(
+    column: pa.Array | pa.ChunkedArray,
+) -> list[np.ndarray | None]:
+    """Decode an Arrow ``binary`` column of packed embeddings.
+
+    Each element is a zero-copy view over the column's data buffer (see
+    :func:`unpack_multivec_array`), so the views stay valid only while the
+    column is referenced.
+
+    Args:
+        column: Arrow ``binary`` or ``large_binary`` column, e.g.
+            ``result.column("embedding")``.
+
+    Returns:
+        One read-only ``(num_tokens, dim)`` array per row, or ``None``
+        for null rows.
+    """
+    chunks = column.chunks if isinstance(column, pa.ChunkedArray) else [column]
+    decoded: list[np.ndarray | None] = []
+    for chunk in chunks:
+        for value in chunk:
+            decoded.append(
+                unpack_multivec_array(value.as_buffer()) if value.is_valid else None
+            )
+    return decoded
+
+
+# ---------------------------------------------------------------------------
+# Write batching
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _WriteBatch:
+    """Writes buffered by :meth:`KojiClient.batch` until it exits.
+
+    Attributes:
+        tables: Pending insert tables per target table, in first-write order.
+        doc_ids: Documents created inside the batch but not yet inserted.
+        relation_keys: ``(src, dst, type)`` keys of pending relations.
+        graph_edges: ``(src, dst, type, weight)`` edges to add to the
+            graph index once the batch is flushed.
+        deferred_writes: Writes applied immediately whose sync and
+            compaction accounting were deferred.
+    """
+
+    tables: dict[str, list[pa.Table]] = dc_field(default_factory=dict)
+    doc_ids: set[str] = dc_field(default_factory=set)
+    relation_keys: set[tuple[str, str, str]] = dc_field(default_factory=set)
+    graph_edges: list[tuple[str, str, str, float]] = dc_field(default_factory=list)
+    deferred_writes: int = 0
+
+
+# ---------------------------------------------------------------------------
+# Graph result caching
+# ---------------------------------------------------------------------------
+
+def _cached_graph_algorithm(
+    algorithm: str,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Serve a ``KojiClient.graph_*`` method from the graph result cache.
+
+    The cache key is the algorithm name, the bound call arguments, and
+    the current graph and document-set versions.
+
+    Args:
+        algorithm: Name recorded in cache statistics.
+
+    Returns:
+        Method decorator.
+    """
+    def decorator(method: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self: KojiClient, *args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = tuple(
+                (name, value)
+                for name, value in bound.arguments.items()
+                if name != "self"
+            )
+            return self._graph_result(
+                algorithm, params, lambda: method(self, *args, **kwargs),
+            )
+
+        return wrapper
+
+    return decorator
 
 
 # ---------------------------------------------------------------------------
@@ -324,8 +603,32 @@ class KojiClient:
 
     def __init__(self, config: KojiConfig) -> None:
         self._config = config
-        self._db: koji.Database | None = None
+        self._db: InstrumentedDatabase | None = None
+        self._query_stats = QueryStats(slow_query_ms=config.slow_query_ms)
         self._write_count: int = 0
+        # Open write batch per thread; see batch() and the _batch property.
+        self._batch_local = threading.local()
+        self._maintenance: CompactionScheduler | None = None
+        self._cache: RowCache | None = (
+            RowCache(
+                max_entries=config.cache_max_entries,
+                max_bytes=config.cache_max_bytes,
+                ttl_seconds=config.cache_ttl_seconds,
+            )
+            if config.cache_max_entries > 0
+            else None
+        )
+        # Lazily loaded adjacency over doc_relations; see graph_index().
+        self._graph: GraphIndex | None = None
+        self._graph_loaded_at: float = 0.0
+        self._graph_next_version: int = 0
+        self._graph_lock = threading.Lock()
+        # Bumped when documents are added, removed, or change project, so
+        # cached graph results keyed on it are not served stale.
+        self._documents_version: int = 0
+        self._graph_results = GraphResultCache(config.graph_cache_max_entries)
+        # Bumped by every write to _INDEX_TABLES; search result caches key on it.
+        self._index_version: int = 0
 
     # -- lifecycle -----------------------------------------------------------
 
@@ -345,9 +648,18 @@ class KojiClient:
             db_path = Path(self._config.db_path)
             db_path.parent.mkdir(parents=True, exist_ok=True)
 
-            self._db = koji.open(str(db_path))
+            self._db = InstrumentedDatabase(koji.open(str(db_path)), self._query_stats)
             self._sync_schema()
 
+            if self._config.run_maintenance and self._config.compact_interval > 0:
+                self._maintenance = CompactionScheduler(
+                    self,
+                    compact_interval=self._config.compact_interval,
+                    idle_seconds=self._config.compact_idle_seconds,
+                    check_seconds=self._config.compact_check_seconds,
+                )
+                self._maintenance.start()
+
             logger.info(
                 "koji_client.opened",
                 db_path=str(db_path),
@@ -367,6 +679,10 @@ class KojiClient:
         if self._db is None:
             return
 
+        if self._maintenance is not None:
+            self._maintenance.stop()
+            self._maintenance = None
+
         try:
             self._db.sync()
             logger.info("koji_client.closed", db_path=self._config.db_path)
@@ -375,23 +691,148 @@ class KojiClient:
         finally:
             self._db = None
             self._write_count = 0
+            if self._cache is not None:
+                self._cache.clear()
+            self._reset_graph_index()
+            self._graph_results.clear()
 
     def sync(self) -> None:
         """Flush pending writes to disk."""
         self._require_open()
         self._db.sync()
 
+    def invalidate_caches(self) -> None:
+        """Drop cached rows, the graph index, and graph results.
+
+        Call after bulk writes that bypass the ``create_*`` methods, such
+        as a snapshot restore.
+        """
+        if self._cache is not None:
+            self._cache.clear()
+        self._reset_graph_index()
+        self._graph_results.clear()
+        self._documents_version += 1
+        self._index_version += 1
+
+    @property
+    def db_path(self) -> str:
+        """Configured database path."""
+        return self._config.db_path
+
+    @property
+    def index_version(self) -> int:
+        """Counter bumped by every write to documents, pages, chunks or relations.
+
+        Only this client's writes are counted; caches keyed on it should
+        also expire entries to pick up writes from other processes.
+        """
+        return self._index_version
+
+    @property
+    def query_stats(self) -> QueryStats:
+        """Per-statement latency, row and byte aggregates for this client."""
+        return self._query_stats
+
+    @property
+    def maintenance(self) -> CompactionScheduler | None:
+        """Background compaction scheduler, or ``None`` if disabled or closed."""
+        return self._maintenance
+
+    @property
+    def _batch(self) -> _WriteBatch | None:
+        """The calling thread's open write batch, if any."""
+        return getattr(self._batch_local, "batch", None)
+
+    @_batch.setter
+    def _batch(self, batch: _WriteBatch | None) -> None:
+        self._batch_local.batch = batch
+
+    def backfill_row_project_ids(self, dry_run: bool = False) -> dict[str, int]:
+        """Fill ``project_id`` on pages and chunks written before the column existed.
+
+        A one-shot migration, run through
+        ``processing.project_id_backfill``; project-scoped searches miss
+        rows without a copy until it has run. Only rows whose copy is
+        NULL are touched, so re-running it is harmless.
+
+        Args:
+            dry_run: Count the rows that would be updated without writing.
+
+        Returns:
+            Rows updated (or, with *dry_run*, to update) per table.
+        """
+        self._require_open()
+        report: dict[str, int] = {}
+        for table in ("pages", "chunks"):
+            missing = (
+                f"FROM {table} t JOIN documents d ON t.doc_id = d.doc_id "
+                f"WHERE t.project_id IS NULL AND d.project_id IS NOT NULL"
+            )
+            if dry_run:
+                result = self._db.query(f"SELECT COUNT(*) AS n {missing}", [])
+                report[table] = int(result.column("n")[0].as_py() or 0)
+                continue
+
+            result = self._db.query(f"SELECT DISTINCT t.doc_id, d.project_id {missing}", [])
+            by_project: dict[str, list[str]] = {}
+            for doc_id, project_id in zip(
+                result.column("doc_id").to_pylist(), result.column("project_id").to_pylist(),
+            ):
+                by_project.setdefault(project_id, []).append(doc_id)
+
+            updated = 0
+            for project_id, doc_ids in by_project.items():
+                for start in range(0, len(doc_ids), _BACKFILL_DOCS_PER_UPDATE):
+                    quoted = ", ".join(
+                        f"'{_sanitize_sql_value(doc_id)}'"
+                        for doc_id in doc_ids[start:start + _BACKFILL_DOCS_PER_UPDATE]
+                    )
+                    updated += self._db.update(
+                        table, {"project_id": project_id},
+                        f"doc_id IN ({quoted}) AND project_id IS NULL",
+                    ).rows_updated
+            report[table] = updated
+
+        if not dry_run and any(report.values()):
+            if self._cache is not None:
+                for table in report:
+                    self._cache.clear(table)
+            self._index_version += 1
+            self._after_write()
+            logger.info("koji_client.project_ids_backfilled", **report)
+        return report
+
+    def compact(self) -> None:
+        """Compact storage and prune old versions on the calling thread.
+
+        Normally invoked by the background :class:`CompactionScheduler`;
+        writes never run compaction inline.
+        """
+        self._require_open()
+        self._db.compact()
+        try:
+            self._db.cleanup_versions(keep_versions=2)
+        except Exception:
+            pass  # cleanup_versions may fail on empty tables
+        logger.debug("koji_client.compacted", write_count=self._write_count)
+
     def health_check(self) -> dict[str, Any]:
         """Return database health status.
 
         Returns:
-            Dictionary with connection status and table list.
+            Dictionary with connection status, table list, row cache
+            counters (``None`` when the cache is disabled), and query
+            totals with the five costliest statement templates.
         """
+        cache = self._cache.stats() if self._cache is not None else None
+        queries = self._query_stats.snapshot(limit=5)
         if self._db is None:
             return {
                 "connected": False,
                 "db_path": self._config.db_path,
                 "tables": [],
+                "cache": cache,
+                "queries": queries,
             }
 
         try:
@@ -400,12 +841,16 @@ class KojiClient:
                 "connected": True,
                 "db_path": self._config.db_path,
                 "tables": tables,
+                "cache": cache,
+                "queries": queries,
             }
         except Exception:
             return {
                 "connected": False,
                 "db_path": self._config.db_path,
                 "tables": [],
+                "cache": cache,
+                "queries": queries,
             }
 
     # -- raw SQL -------------------------------------------------------------
@@ -429,23 +874,162 @@ class KojiClient:
         except Exception as exc:
             raise KojiQueryError(f"Query failed: {exc}") from exc
 
-    def insert(self, table: str, data: pa.Table | pa.RecordBatch) -> None:
+    def query_batches(
+        self,
+        sql: str,
+        key: str | Sequence[str],
+        params: list[Any] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[pa.RecordBatch]:
+        """Stream query results as RecordBatches of at most *batch_size* rows.
+
+        Pages through the result by *key* (``WHERE key > ? ORDER BY key
+        LIMIT ?``), so every page is an index range read and only one
+        page is held in memory at a time, however deep the scan goes.
+        *sql* must be a single ``SELECT`` without ``ORDER BY`` or
+        ``LIMIT``; the key predicate is ANDed into its ``WHERE`` clause, so a
+        top-level ``OR`` there must be parenthesized.
+        The key columns must be unique together and selected by *sql*.
+        Rows written behind the scan position are not seen.
+
+        Args:
+            sql: SQL query string.
+            key: Key column, or columns for a composite key, optionally
+                alias-qualified (``"c.id"``).
+            params: Optional positional parameters (``?`` placeholders).
+            batch_size: Maximum rows per batch.
+
+        Yields:
+            Non-empty RecordBatches, in key order.
+
+        Raises:
+            ValueError: If *batch_size* is not positive or *key* is empty.
+            KojiQueryError: If a page query fails.
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        keys = [key] if isinstance(key, str) else list(key)
+        if not keys:
+            raise ValueError("query_batches needs at least one key column")
+        params = list(params or [])
+        # Result columns drop the alias: "c.id" comes back as "id".
+        names = [k.rsplit(".", 1)[-1] for k in keys]
+        # (k1, k2) > (a, b)  ==  k1 > a OR (k1 = a AND k2 > b)
+        after = " OR ".join(
+            "(" + " AND ".join([f"{k} = ?" for k in keys[:i]] + [f"{keys[i]} > ?"]) + ")"
+            for i in range(len(keys))
+        )
+        joiner = " AND " if _WHERE_RE.search(sql) else " WHERE "
+        order = f" ORDER BY {', '.join(keys)} LIMIT ?"
+        last: list[Any] | None = None
+        while True:
+            if last is None:
+                page = self.query(sql + order, [*params, batch_size])
+            else:
+                bound = [v for i in range(len(keys)) for v in last[: i + 1]]
+                page = self.query(
+                    f"{sql}{joiner}({after}){order}", [*params, *bound, batch_size],
+                )
+            if page.num_rows:
+                yield page.combine_chunks().to_batches()[0]
+            if page.num_rows < batch_size:
+                return
+            last = [page.column(name)[-1].as_py() for name in names]
+
+    def insert(
+        self,
+        table: str,
+        data: pa.Table | pa.RecordBatch,
+        sync: bool = True,
+    ) -> None:
         """Insert data into a table.
 
         Args:
             table: Target table name.
             data: PyArrow Table or RecordBatch to insert.
+            sync: Run the post-write sync. Bulk loads pass ``False`` and
+                call :meth:`sync` once when every insert has landed.
+
+        Inside :meth:`batch` the rows are buffered and written when the
+        batch exits.
 
         Raises:
             KojiQueryError: If the insert fails.
         """
         self._require_open()
+        if self._batch is not None:
+            if isinstance(data, pa.RecordBatch):
+                data = pa.Table.from_batches([data])
+            self._batch.tables.setdefault(table, []).append(data)
+            return
         try:
             self._db.insert(table, data)
-            self._after_write()
+            if table in _INDEX_TABLES:
+                self._index_version += 1
+            self._after_write(sync=sync)
         except Exception as exc:
             raise KojiQueryError(f"Insert into {table} failed: {exc}") from exc
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group writes into a single commit.
+
+        Inside the block, :meth:`insert` (and every ``create_*`` /
+        ``insert_*`` method built on it) buffers rows per table. On exit
+        each table receives one concatenated insert, followed by one
+        sync and one round of compaction accounting. Updates and deletes
+        still apply immediately, but their sync is deferred to exit too.
+
+        Buffered rows are not visible to queries until the batch exits,
+        except that :meth:`document_exists` and the duplicate checks in
+        :meth:`create_document` and :meth:`create_relation` account for
+        them. Nested ``batch()`` blocks join the outermost one.
+
+        If the block raises, buffered rows are discarded; writes that
+        were already applied are still synced.
+
+        The batch belongs to the calling thread. Writes from other
+        threads sharing the client apply immediately, and neither they
+        nor their reads see this batch's buffered rows.
+
+        Example:
+            >>> with client.batch():
+            ...     for src, dst in pairs:
+            ...         client.create_relation(src, dst, "similar_to")
+
+        Raises:
+            KojiQueryError: If flushing a buffered table fails.
+        """
+        self._require_open()
+        if self._batch is not None:
+            yield
+            return
+
+        batch = _WriteBatch()
+        self._batch = batch
+        try:
+            yield
+        except BaseException:
+            self._batch = None
+            if batch.deferred_writes:
+                self._after_write(batch.deferred_writes)
+            raise
+        self._batch = None
+        try:
+            self._flush_batch(batch)
+        except BaseException:
+            # Unknown which relations landed; reload from Koji next time.
+            self._reset_graph_index()
+            raise
+        if batch.doc_ids:
+            self._documents_version += 1
+        if batch.graph_edges:
+            def add_edges(index: GraphIndex) -> None:
+                for edge in batch.graph_edges:
+                    index.add_edge(*edge)
+
+            self._update_graph_index(add_edges)
+
     # -- document CRUD -------------------------------------------------------
 
     def create_document(
@@ -477,8 +1061,7 @@ class KojiClient:
         Raises:
             KojiDuplicateError: If ``doc_id`` already exists.
         """
-        existing = self.get_document(doc_id)
-        if existing is not None:
+        if self.document_exists(doc_id):
             raise KojiDuplicateError(f"Document {doc_id} already exists")
 
         now = datetime.now(timezone.utc).isoformat()
@@ -493,6 +1076,7 @@ class KojiClient:
             pa.field("metadata", pa.string()),
             pa.field("enrichment", pa.string()),
             pa.field("created_at", pa.string()),
+            pa.field("node_id", pa.int64()),
         ])
         table = pa.table(
             {
@@ -505,10 +1089,14 @@ class KojiClient:
                 "metadata": [_serialize_metadata(metadata)],
                 "enrichment": [_serialize_metadata(enrichment)],
                 "created_at": [now],
+                "node_id": [self._allocate_node_ids(1)],
             },
             schema=schema,
         )
         self.insert("documents", table)
+        self._documents_version += 1
+        if self._batch is not None:
+            self._batch.doc_ids.add(doc_id)
 
         logger.info(
             "koji_client.document_created",
@@ -518,28 +1106,151 @@ class KojiClient:
             format=format,
         )
 
-    def get_document(self, doc_id: str) -> dict[str, Any] | None:
+    def get_document(
+        self,
+        doc_id: str,
+        columns: list[str] | tuple[str, ...] | None = None,
+    ) -> dict[str, Any] | None:
         """Retrieve a document by ID.
 
         Args:
             doc_id: Document identifier.
+            columns: Optional column projection. ``None`` selects every
+                column, including the full ``markdown`` body.
 
         Returns:
             Document as a dictionary, or ``None`` if not found.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
+        """
+        select, json_fields = self._document_projection(columns)
+        self._require_open()
+
+        def load() -> dict[str, Any] | None:
+            try:
+                result = self.query(
+                    f"SELECT {select} FROM documents WHERE doc_id = ?", [doc_id]
+                )
+                if result.num_rows == 0:
+                    return None
+                rows = self._arrow_to_dicts(result, json_fields=json_fields)
+                return rows[0]
+            except Exception:
+                return None
+
+        return self._read_through("documents", (doc_id, select), doc_id, load)
+
+    def get_document_summary(self, doc_id: str) -> dict[str, Any] | None:
+        """Retrieve a document without its ``markdown`` and ``enrichment``.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            Document summary dictionary (see ``DOCUMENT_SUMMARY_COLUMNS``),
+            or ``None`` if not found.
+        """
+        return self.get_document(doc_id, columns=DOCUMENT_SUMMARY_COLUMNS)
+
+    def find_document_by_filename(
+        self,
+        filename: str,
+        columns: list[str] | tuple[str, ...] | None = None,
+    ) -> dict[str, Any] | None:
+        """Retrieve the newest document with an exact *filename*.
+
+        Args:
+            filename: Stored filename to match.
+            columns: Optional column projection. ``None`` selects every
+                column, including the full ``markdown`` body.
+
+        Returns:
+            Document as a dictionary, or ``None`` if no document matches.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
+        """
+        select, json_fields = self._document_projection(columns)
+        result = self.query(
+            f"SELECT {select} FROM documents WHERE filename = ? "
+            f"ORDER BY created_at DESC LIMIT 1",
+            [filename],
+        )
+        rows = self._arrow_to_dicts(result, json_fields=json_fields)
+        return rows[0] if rows else None
+
+    def document_exists(self, doc_id: str) -> bool:
+        """Check whether a document exists without fetching its columns.
+
+        Args:
+            doc_id: Document identifier.
+
+        Returns:
+            ``True`` if a document with *doc_id* exists, including one
+            created earlier in the current :meth:`batch`.
         """
         self._require_open()
+        if self._batch is not None and doc_id in self._batch.doc_ids:
+            return True
         try:
             result = self.query(
-                "SELECT * FROM documents WHERE doc_id = ?", [doc_id]
-            )
-            if result.num_rows == 0:
-                return None
-            rows = self._arrow_to_dicts(
-                result, json_fields=["metadata", "enrichment"],
+                "SELECT doc_id FROM documents WHERE doc_id = ? LIMIT 1", [doc_id]
             )
-            return rows[0]
+            return result.num_rows > 0
         except Exception:
-            return None
+            return False
+
+    def get_documents(
+        self,
+        doc_ids: Iterable[str],
+        columns: list[str] | tuple[str, ...] | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Retrieve several documents in a single query.
+
+        Args:
+            doc_ids: Document identifiers. Duplicates are ignored.
+            columns: Optional column projection. ``None`` selects every
+                column, including the full ``markdown`` body.
+
+        Returns:
+            Mapping of ``doc_id`` to document dictionary. IDs that do not
+            exist are absent from the mapping.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
+        """
+        select, json_fields = self._document_projection(columns)
+        ids = list(dict.fromkeys(doc_ids))
+        if not ids:
+            return {}
+        self._require_open()
+
+        found: dict[str, dict[str, Any]] = {}
+        generation = 0
+        if self._cache is not None:
+            for doc_id in ids:
+                cached = self._cache.get("documents", (doc_id, select))
+                if cached is not None:
+                    found[doc_id] = cached
+            ids = [doc_id for doc_id in ids if doc_id not in found]
+            if not ids:
+                return found
+            generation = self._cache.generation("documents")
+
+        placeholders = ", ".join("?" for _ in ids)
+        result = self.query(
+            f"SELECT {select} FROM documents WHERE doc_id IN ({placeholders})",
+            ids,
+        )
+        for row in self._arrow_to_dicts(result, json_fields=json_fields):
+            found[row["doc_id"]] = row
+            if self._cache is not None:
+                self._cache.put(
+                    "documents", (row["doc_id"], select), row,
+                    row_id=row["doc_id"], generation=generation,
+                )
+        return found
 
     def get_document_markdown(self, doc_id: str) -> str | None:
         """Retrieve the markdown content for a document.
@@ -550,7 +1261,7 @@ class KojiClient:
         Returns:
             Markdown string or ``None`` if document not found.
         """
-        doc = self.get_document(doc_id)
+        doc = self.get_document(doc_id, columns=["doc_id", "markdown"])
         return doc.get("markdown") if doc else None
 
     def list_documents(
@@ -559,6 +1270,7 @@ class KojiClient:
         project_id: str | None = None,
         limit: int = 100,
         offset: int = 0,
+        columns: list[str] | tuple[str, ...] | None = None,
     ) -> list[dict[str, Any]]:
         """List documents with optional format and project filters.
 
@@ -567,10 +1279,16 @@ class KojiClient:
             project_id: Filter by project (optional). ``None`` returns all.
             limit: Maximum results to return.
             offset: Number of results to skip.
+            columns: Optional column projection. ``None`` selects every
+                column, including the full ``markdown`` body.
 
         Returns:
             List of document dictionaries ordered by ``created_at`` descending.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
         """
+        select, json_fields = self._document_projection(columns)
         clauses: list[str] = []
         params: list[Any] = []
 
@@ -582,13 +1300,126 @@ class KojiClient:
             params.append(project_id)
 
         where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
-        sql = f"SELECT * FROM documents{where} ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        sql = (
+            f"SELECT {select} FROM documents{where} "
+            f"ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        )
         params.extend([limit, offset])
 
         result = self.query(sql, params)
-        return self._arrow_to_dicts(
-            result, json_fields=["metadata", "enrichment"],
+        return self._arrow_to_dicts(result, json_fields=json_fields)
+
+    def list_document_summaries(
+        self,
+        project_id: str | None = None,
+        search: str | None = None,
+        extensions: list[str] | None = None,
+        sort_by: str = "newest_first",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """List lightweight document summaries for the library view.
+
+        Filtering, sorting, and pagination run inside Koji, and the
+        ``markdown``/``image``/``embedding`` columns are never selected.
+        Page and chunk counts come from aggregate queries scoped to the
+        returned page of documents, so cost scales with ``limit`` rather
+        than with the size of the library.
+
+        Args:
+            project_id: Filter by project (optional). ``None`` returns all.
+            search: Case-insensitive filename substring (optional).
+            extensions: Allowed filename extensions with dot prefix
+                (e.g. ``[".mp3", ".wav"]``). ``None`` disables the filter.
+            sort_by: ``newest_first`` (default), ``oldest_first``,
+                ``name_asc``, or ``name_desc``.
+            limit: Maximum results to return.
+            offset: Number of results to skip.
+
+        Returns:
+            Tuple of ``(summaries, total)`` where *total* is the number of
+            matching documents before pagination. Each summary holds
+            ``doc_id``, ``project_id``, ``filename``, ``format``,
+            ``created_at``, ``metadata``, ``page_count``, ``chunk_count``,
+            ``first_page_num``, and ``first_page_has_image``.
+        """
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        if project_id is not None:
+            clauses.append("project_id = ?")
+            params.append(project_id)
+        if search:
+            clauses.append("STRPOS(LOWER(filename), ?) > 0")
+            params.append(search.lower())
+        if extensions is not None:
+            if not extensions:
+                return [], 0
+            ext_clauses = " OR ".join("LOWER(filename) LIKE ?" for _ in extensions)
+            clauses.append(f"({ext_clauses})")
+            params.extend(f"%{ext.lower()}" for ext in extensions)
+
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = _DOCUMENT_SORT_ORDERS.get(
+            sort_by, _DOCUMENT_SORT_ORDERS["newest_first"],
+        )
+
+        count_result = self.query(
+            f"SELECT COUNT(*) AS n FROM documents{where}", params,
+        )
+        counts = count_result.to_pydict()
+        total = int(counts["n"][0]) if counts["n"] else 0
+        if total == 0:
+            return [], 0
+
+        result = self.query(
+            f"SELECT doc_id, project_id, filename, format, created_at, metadata "
+            f"FROM documents{where} ORDER BY {order}, doc_id LIMIT ? OFFSET ?",
+            [*params, limit, offset],
         )
+        summaries = self._arrow_to_dicts(result, json_fields=["metadata"])
+        if not summaries:
+            return [], total
+
+        doc_ids = [s["doc_id"] for s in summaries]
+        placeholders = ", ".join("?" for _ in doc_ids)
+
+        page_stats = self.query(
+            f"SELECT doc_id, COUNT(*) AS page_count, "
+            f"MIN(page_num) AS first_page_num, "
+            f"MIN(CASE WHEN thumb IS NOT NULL OR image IS NOT NULL "
+            f"THEN page_num END) AS first_image_page "
+            f"FROM pages WHERE doc_id IN ({placeholders}) GROUP BY doc_id",
+            doc_ids,
+        ).to_pydict()
+        pages_by_doc = {
+            doc_id: (
+                page_stats["page_count"][i],
+                page_stats["first_page_num"][i],
+                page_stats["first_image_page"][i],
+            )
+            for i, doc_id in enumerate(page_stats["doc_id"])
+        }
+
+        chunk_stats = self.query(
+            f"SELECT doc_id, COUNT(*) AS chunk_count "
+            f"FROM chunks WHERE doc_id IN ({placeholders}) GROUP BY doc_id",
+            doc_ids,
+        ).to_pydict()
+        chunks_by_doc = dict(zip(chunk_stats["doc_id"], chunk_stats["chunk_count"]))
+
+        for summary in summaries:
+            page_count, first_page, first_image_page = pages_by_doc.get(
+                summary["doc_id"], (0, None, None),
+            )
+            summary["page_count"] = int(page_count)
+            summary["chunk_count"] = int(chunks_by_doc.get(summary["doc_id"], 0))
+            summary["first_page_num"] = first_page
+            summary["first_page_has_image"] = (
+                first_page is not None and first_image_page == first_page
+            )
+
+        return summaries, total
 
     def update_document(self, doc_id: str, **fields: Any) -> None:
         """Update fields on an existing document.
@@ -621,7 +1452,19 @@ class KojiClient:
 
         safe_id = _sanitize_sql_value(doc_id)
         result = self._db.update("documents", fields, f"doc_id = '{safe_id}'")
+        self._invalidate_cached("documents", [doc_id])
+        if "project_id" in fields:
+            self._documents_version += 1
+            if result.rows_updated > 0:
+                # Keep the denormalized copies on pages and chunks in step.
+                for table in ("pages", "chunks"):
+                    self._db.update(
+                        table, {"project_id": fields["project_id"]}, f"doc_id = '{safe_id}'",
+                    )
+                    if self._cache is not None:
+                        self._cache.invalidate_group(table, doc_id)
         if result.rows_updated > 0:
+            self._index_version += 1
             self._after_write()
 
     def delete_document(self, doc_id: str) -> None:
@@ -646,6 +1489,13 @@ class KojiClient:
                 ("documents", f"doc_id = '{safe_id}'"),
             ]:
                 self._delete_where(table, condition)
+        self._invalidate_cached("documents", [doc_id])
+        if self._cache is not None:
+            self._cache.invalidate_group("pages", doc_id)
+            self._cache.invalidate_group("chunks", doc_id)
+        self._update_graph_index(lambda index: index.remove_node(doc_id))
+        self._documents_version += 1
+        self._index_version += 1
         self._after_write()
         logger.info("koji_client.document_deleted", doc_id=doc_id)
 
@@ -804,14 +1654,27 @@ class KojiClient:
 
         safe_id = _sanitize_sql_value(project_id)
 
-        # Delete documents first (cascades to pages, chunks, relations)
-        if doc_count > 0:
-            docs = self.list_documents(project_id=project_id, limit=100000)
-            for doc in docs:
-                self.delete_document(doc["doc_id"])
+        # Delete documents first (cascades to pages, chunks, relations).
+        # Walk doc_ids in keyset pages so memory stays bounded by the
+        # page size, not the project size.
+        last_doc_id = ""
+        while doc_count > 0:
+            page = self.query(
+                "SELECT doc_id FROM documents WHERE project_id = ? AND doc_id > ? "
+                "ORDER BY doc_id LIMIT ?",
+                [project_id, last_doc_id, _PROJECT_DELETE_PAGE_SIZE],
+            ).column("doc_id").to_pylist()
+            for doc_id in page:
+                self.delete_document(doc_id)
+            if len(page) < _PROJECT_DELETE_PAGE_SIZE:
+                break
+            last_doc_id = page[-1]
 
         # Delete the project row
         self._delete_where("projects", f"project_id = '{safe_id}'")
+        if self._cache is not None:
+            for table in ("documents", "pages", "chunks"):
+                self._cache.clear(table)
         self._after_write()
 
         logger.info(
@@ -844,8 +1707,11 @@ class KojiClient:
 
         Accepts a list of dictionaries and converts to PyArrow internally.
         Required keys: ``id``, ``doc_id``, ``page_num``.
-        Optional keys: ``image``, ``thumb``, ``embedding``, ``structure``,
-        ``enrichment``, ``width``, ``height``.
+        Optional keys: ``image``, ``thumb``, ``embedding``,
+        ``pooled_embedding`` (defaults to :func:`pool_multivec` of
+        ``embedding``), ``structure``, ``enrichment``, ``width``,
+        ``height``, ``project_id`` (defaults to the parent document's
+        project).
 
         Args:
             pages: List of page data dictionaries.
@@ -867,11 +1733,14 @@ class KojiClient:
             pa.field("image", pa.binary()),
             pa.field("thumb", pa.binary()),
             pa.field("embedding", pa.binary()),
+            pa.field("pooled_embedding", pa.binary()),
             pa.field("structure", pa.string()),
             pa.field("enrichment", pa.string()),
             pa.field("width", pa.int64()),
             pa.field("height", pa.int64()),
+            pa.field("project_id", pa.string()),
         ])
+        project_ids = self._row_project_ids(pages)
         table = pa.table(
             {
                 "id": [p["id"] for p in pages],
@@ -880,6 +1749,7 @@ class KojiClient:
                 "image": [p.get("image") for p in pages],
                 "thumb": [p.get("thumb") for p in pages],
                 "embedding": [p.get("embedding") for p in pages],
+                "pooled_embedding": [_pooled_for(p) for p in pages],
                 "structure": [
                     _safe_json(p.get("structure")) for p in pages
                 ],
@@ -888,18 +1758,22 @@ class KojiClient:
                 ],
                 "width": [p.get("width") for p in pages],
                 "height": [p.get("height") for p in pages],
+                "project_id": project_ids,
             },
             schema=schema,
         )
         self.insert("pages", table)
+        self._invalidate_cached("pages", [p["id"] for p in pages])
 
     def insert_chunks(self, chunks: list[dict[str, Any]]) -> None:
         """Insert chunk records.
 
         Accepts a list of dictionaries and converts to PyArrow internally.
         Required keys: ``id``, ``doc_id``, ``page_num``, ``text``.
-        Optional keys: ``embedding``, ``context``, ``enrichment``,
-        ``word_count``, ``start_time``, ``end_time``.
+        Optional keys: ``embedding``, ``pooled_embedding`` (defaults to
+        :func:`pool_multivec` of ``embedding``), ``context``,
+        ``enrichment``, ``word_count``, ``start_time``, ``end_time``,
+        ``project_id`` (defaults to the parent document's project).
 
         Args:
             chunks: List of chunk data dictionaries.
@@ -920,12 +1794,15 @@ class KojiClient:
             pa.field("page_num", pa.int64()),
             pa.field("text", pa.string()),
             pa.field("embedding", pa.binary()),
+            pa.field("pooled_embedding", pa.binary()),
             pa.field("context", pa.string()),
             pa.field("enrichment", pa.string()),
             pa.field("word_count", pa.int64()),
             pa.field("start_time", pa.float64()),
             pa.field("end_time", pa.float64()),
+            pa.field("project_id", pa.string()),
         ])
+        project_ids = self._row_project_ids(chunks)
         table = pa.table(
             {
                 "id": [c["id"] for c in chunks],
@@ -933,6 +1810,7 @@ class KojiClient:
                 "page_num": [c["page_num"] for c in chunks],
                 "text": [c["text"] for c in chunks],
                 "embedding": [c.get("embedding") for c in chunks],
+                "pooled_embedding": [_pooled_for(c) for c in chunks],
                 "context": [
                     _safe_json(c.get("context")) for c in chunks
                 ],
@@ -942,10 +1820,42 @@ class KojiClient:
                 "word_count": [c.get("word_count") for c in chunks],
                 "start_time": [c.get("start_time") for c in chunks],
                 "end_time": [c.get("end_time") for c in chunks],
+                "project_id": project_ids,
             },
             schema=schema,
         )
         self.insert("chunks", table)
+        self._invalidate_cached("chunks", [c["id"] for c in chunks])
+
+    def _row_project_ids(self, rows: list[dict[str, Any]]) -> list[str | None]:
+        """Project id for each page or chunk row, from its parent document.
+
+        Rows that carry ``project_id`` keep it. Documents created earlier
+        in the current :meth:`batch` are resolved from the buffer.
+        """
+        wanted = {r["doc_id"] for r in rows if r.get("project_id") is None}
+        projects: dict[str, str | None] = {}
+        if wanted and self._batch is not None:
+            for part in self._batch.tables.get("documents", []):
+                for doc_id, project_id in zip(
+                    part.column("doc_id").to_pylist(), part.column("project_id").to_pylist(),
+                ):
+                    if doc_id in wanted:
+                        projects[doc_id] = project_id
+        missing = sorted(wanted - projects.keys())
+        if missing:
+            placeholders = ", ".join("?" for _ in missing)
+            result = self.query(
+                f"SELECT doc_id, project_id FROM documents WHERE doc_id IN ({placeholders})",
+                missing,
+            )
+            projects.update(zip(
+                result.column("doc_id").to_pylist(), result.column("project_id").to_pylist(),
+            ))
+        return [
+            r["project_id"] if r.get("project_id") is not None else projects.get(r["doc_id"])
+            for r in rows
+        ]
 
     def get_pages_for_document(self, doc_id: str) -> list[dict[str, Any]]:
         """Retrieve all pages for a document, ordered by page number.
@@ -991,19 +1901,23 @@ class KojiClient:
             Page dictionary or ``None``.
         """
         self._require_open()
-        try:
-            row = self._db.find_by_id("pages", page_id)
-            if row is None:
+
+        def load() -> dict[str, Any] | None:
+            try:
+                row = self._db.find_by_id("pages", page_id)
+                if row is None:
+                    return None
+                for field in ("structure", "enrichment"):
+                    if row.get(field) and isinstance(row[field], str):
+                        try:
+                            row[field] = json.loads(row[field])
+                        except (json.JSONDecodeError, TypeError):
+                            pass
+                return row
+            except Exception:
                 return None
-            for field in ("structure", "enrichment"):
-                if row.get(field) and isinstance(row[field], str):
-                    try:
-                        row[field] = json.loads(row[field])
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-            return row
-        except Exception:
-            return None
+
+        return self._read_through("pages", page_id, page_id, load, group_field="doc_id")
 
     def get_chunk(self, chunk_id: str) -> dict[str, Any] | None:
         """Retrieve a single chunk by ID.
@@ -1015,19 +1929,153 @@ class KojiClient:
             Chunk dictionary or ``None``.
         """
         self._require_open()
-        try:
-            row = self._db.find_by_id("chunks", chunk_id)
-            if row is None:
+
+        def load() -> dict[str, Any] | None:
+            try:
+                row = self._db.find_by_id("chunks", chunk_id)
+                if row is None:
+                    return None
+                for field in ("context", "enrichment"):
+                    if row.get(field) and isinstance(row[field], str):
+                        try:
+                            row[field] = json.loads(row[field])
+                        except (json.JSONDecodeError, TypeError):
+                            pass
+                return row
+            except Exception:
                 return None
-            for field in ("context", "enrichment"):
-                if row.get(field) and isinstance(row[field], str):
-                    try:
-                        row[field] = json.loads(row[field])
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-            return row
-        except Exception:
+
+        return self._read_through("chunks", chunk_id, chunk_id, load, group_field="doc_id")
+
+    def get_page_image(
+        self, doc_id: str, page_num: int, thumbnail: bool = False,
+    ) -> bytes | None:
+        """Read one page's image blob without loading the rest of the row.
+
+        Args:
+            doc_id: Document identifier.
+            page_num: 1-based page number.
+            thumbnail: Read the ``thumb`` column instead of ``image``.
+
+        Returns:
+            Image bytes, or ``None`` if the page or column is empty.
+        """
+        column = "thumb" if thumbnail else "image"
+        result = self.query(
+            f"SELECT {column} FROM pages WHERE doc_id = ? AND page_num = ? LIMIT 1",
+            [doc_id, page_num],
+        )
+        if result.num_rows == 0:
             return None
+        return result.column(column)[0].as_py()
+
+    def list_pages_missing_thumbs(
+        self, after_id: str = "", limit: int = 32,
+    ) -> list[dict[str, Any]]:
+        """List pages whose ``thumb`` column is empty, in page ID order.
+
+        Keyset-paginated on ``id`` so callers can walk the table even
+        when some pages cannot be given a thumbnail.
+
+        Args:
+            after_id: Return pages with ``id`` greater than this.
+            limit: Maximum pages to return. Each row carries the
+                full-resolution ``image``, so keep this small.
+
+        Returns:
+            List of dicts with ``id``, ``doc_id``, ``page_num``, and
+            ``image`` (``None`` when the page has no stored image).
+        """
+        result = self.query(
+            "SELECT id, doc_id, page_num, image FROM pages "
+            "WHERE thumb IS NULL AND id > ? ORDER BY id LIMIT ?",
+            [after_id, limit],
+        )
+        return self._arrow_to_dicts(result)
+
+    def list_rows_missing_pooled(
+        self,
+        table: str,
+        after_id: str = "",
+        limit: int = 256,
+    ) -> list[dict[str, Any]]:
+        """List pages or chunks that have an embedding but no pooled vector.
+
+        Keyset-paginated on ``id``, like :meth:`list_pages_missing_thumbs`.
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            after_id: Return rows with ``id`` greater than this.
+            limit: Maximum rows to return.
+
+        Returns:
+            List of dicts with ``id`` and packed ``embedding``.
+
+        Raises:
+            ValueError: If *table* is not ``pages`` or ``chunks``.
+        """
+        if table not in _POOLED_TABLES:
+            raise ValueError(f"table must be one of {_POOLED_TABLES}, got {table!r}")
+        result = self.query(
+            f"SELECT id, embedding FROM {table} "
+            f"WHERE pooled_embedding IS NULL AND embedding IS NOT NULL "
+            f"AND id > ? ORDER BY id LIMIT ?",
+            [after_id, limit],
+        )
+        return self._arrow_to_dicts(result)
+
+    def set_pooled_embeddings(self, table: str, pooled: dict[str, bytes]) -> int:
+        """Store pooled vectors in ``pooled_embedding``.
+
+        Args:
+            table: ``"pages"`` or ``"chunks"``.
+            pooled: Mapping of row ID to packed pooled vector.
+
+        Returns:
+            Number of rows updated.
+
+        Raises:
+            ValueError: If *table* is not ``pages`` or ``chunks``.
+        """
+        if table not in _POOLED_TABLES:
+            raise ValueError(f"table must be one of {_POOLED_TABLES}, got {table!r}")
+        if not pooled:
+            return 0
+        self._require_open()
+
+        updated = 0
+        for row_id, blob in pooled.items():
+            safe_id = _sanitize_sql_value(row_id)
+            result = self._db.update(table, {"pooled_embedding": blob}, f"id = '{safe_id}'")
+            updated += result.rows_updated
+        self._invalidate_cached(table, list(pooled))
+        if updated:
+            self._index_version += 1
+            self._after_write(updated)
+        return updated
+
+    def set_page_thumbs(self, thumbs: dict[str, bytes]) -> int:
+        """Store encoded thumbnails in the ``pages.thumb`` column.
+
+        Args:
+            thumbs: Mapping of page ID to thumbnail bytes.
+
+        Returns:
+            Number of pages updated.
+        """
+        if not thumbs:
+            return 0
+        self._require_open()
+
+        updated = 0
+        for page_id, thumb in thumbs.items():
+            safe_id = _sanitize_sql_value(page_id)
+            result = self._db.update("pages", {"thumb": thumb}, f"id = '{safe_id}'")
+            updated += result.rows_updated
+        self._invalidate_cached("pages", list(thumbs))
+        if updated:
+            self._after_write(updated)
+        return updated
 
     # -- relationship operations ---------------------------------------------
 
@@ -1051,28 +2099,23 @@ class KojiClient:
             KojiDuplicateError: If the relation already exists.
             ValueError: If either document does not exist.
         """
-        if self.get_document(src_doc_id) is None:
+        if not self.document_exists(src_doc_id):
             raise ValueError(f"Source document {src_doc_id} not found")
-        if self.get_document(dst_doc_id) is None:
+        if not self.document_exists(dst_doc_id):
             raise ValueError(f"Destination document {dst_doc_id} not found")
 
         # Check for duplicate
-        existing = self.query(
-            "SELECT * FROM doc_relations "
+        key = (src_doc_id, dst_doc_id, relation_type)
+        pending = self._batch is not None and key in self._batch.relation_keys
+        if pending or self.query(
+            "SELECT src_doc_id FROM doc_relations "
             "WHERE src_doc_id = ? AND dst_doc_id = ? AND relation_type = ?",
             [src_doc_id, dst_doc_id, relation_type],
-        )
-        if existing.num_rows > 0:
+        ).num_rows > 0:
             raise KojiDuplicateError(
                 f"Relation {src_doc_id} -{relation_type}-> {dst_doc_id} already exists"
             )
 
-        schema = pa.schema([
-            pa.field("src_doc_id", pa.string(), nullable=False),
-            pa.field("dst_doc_id", pa.string(), nullable=False),
-            pa.field("relation_type", pa.string(), nullable=False),
-            pa.field("metadata", pa.string()),
-        ])
         table = pa.table(
             {
                 "src_doc_id": [src_doc_id],
@@ -1080,9 +2123,15 @@ class KojiClient:
                 "relation_type": [relation_type],
                 "metadata": [_serialize_metadata(metadata)],
             },
-            schema=schema,
+            schema=_RELATION_SCHEMA,
         )
         self.insert("doc_relations", table)
+        edge = (src_doc_id, dst_doc_id, relation_type, edge_weight(metadata))
+        if self._batch is not None:
+            self._batch.relation_keys.add(key)
+            self._batch.graph_edges.append(edge)
+        else:
+            self._update_graph_index(lambda index: index.add_edge(*edge))
 
         logger.info(
             "koji_client.relation_created",
@@ -1091,6 +2140,190 @@ class KojiClient:
             type=relation_type,
         )
 
+    def create_relations_bulk(
+        self,
+        rows: Iterable[dict[str, Any]],
+        on_conflict: str = "skip",
+    ) -> dict[str, int]:
+        """Create many relationships with set-based validation.
+
+        Checks endpoint existence with one ``IN`` query, finds relations
+        that already exist with a second, and inserts the remainder as a
+        single Arrow table. Inside :meth:`batch` the insert is buffered
+        like any other.
+
+        Args:
+            rows: Relation dicts with ``src_doc_id``, ``dst_doc_id``,
+                ``relation_type`` and optional ``metadata``. Repeated
+                keys within *rows* keep the first occurrence.
+            on_conflict: ``skip`` (default) leaves existing relations
+                untouched; ``replace`` overwrites their metadata.
+                Relations still buffered in the current batch are always
+                skipped.
+
+        Returns:
+            Dict with ``created`` (new relations), ``replaced`` (existing
+            relations overwritten), and ``skipped`` (duplicates, existing
+            relations under ``skip``, and rows whose documents do not
+            exist).
+
+        Raises:
+            ValueError: If *on_conflict* is not ``skip`` or ``replace``.
+            KojiQueryError: If a lookup or the insert fails.
+        """
+        if on_conflict not in _RELATION_CONFLICT_MODES:
+            raise ValueError(f"Invalid on_conflict mode: {on_conflict!r}")
+        self._require_open()
+
+        pending: dict[tuple[str, str, str], dict[str, Any] | None] = {}
+        skipped = 0
+        for row in rows:
+            key = (row["src_doc_id"], row["dst_doc_id"], row["relation_type"])
+            if key in pending:
+                skipped += 1
+            else:
+                pending[key] = row.get("metadata")
+        if not pending:
+            return {"created": 0, "replaced": 0, "skipped": skipped}
+
+        # Endpoint existence, one query.
+        doc_ids = list({doc_id for key in pending for doc_id in key[:2]})
+        result = self.query(
+            f"SELECT doc_id FROM documents "
+            f"WHERE doc_id IN ({', '.join('?' for _ in doc_ids)})",
+            doc_ids,
+        )
+        known = set(result.column("doc_id").to_pylist())
+        if self._batch is not None:
+            known |= self._batch.doc_ids
+        missing = [key for key in pending if key[0] not in known or key[1] not in known]
+        for key in missing:
+            del pending[key]
+        skipped += len(missing)
+
+        # Anti-join against existing (src, dst, type) keys, one query.
+        existing: set[tuple[str, str, str]] = set()
+        if pending:
+            srcs = list({key[0] for key in pending})
+            types = list({key[2] for key in pending})
+            result = self.query(
+                "SELECT src_doc_id, dst_doc_id, relation_type FROM doc_relations "
+                f"WHERE src_doc_id IN ({', '.join('?' for _ in srcs)}) "
+                f"AND relation_type IN ({', '.join('?' for _ in types)})",
+                srcs + types,
+            )
+            d = result.to_pydict()
+            existing = {
+                key
+                for key in zip(d["src_doc_id"], d["dst_doc_id"], d["relation_type"])
+                if key in pending
+            }
+        if self._batch is not None:
+            buffered = self._batch.relation_keys & pending.keys()
+            existing -= buffered
+            for key in buffered:
+                del pending[key]
+            skipped += len(buffered)
+
+        replaced = 0
+        if existing and on_conflict == "replace":
+            self._delete_relation_keys(existing)
+            replaced = len(existing)
+        else:
+            for key in existing:
+                del pending[key]
+            skipped += len(existing)
+
+        if pending:
+            keys = list(pending)
+            table = pa.table(
+                {
+                    "src_doc_id": [key[0] for key in keys],
+                    "dst_doc_id": [key[1] for key in keys],
+                    "relation_type": [key[2] for key in keys],
+                    "metadata": [_serialize_metadata(pending[key]) for key in keys],
+                },
+                schema=_RELATION_SCHEMA,
+            )
+            self.insert("doc_relations", table)
+            edges = [(*key, edge_weight(pending[key])) for key in keys]
+            if self._batch is not None:
+                self._batch.relation_keys.update(keys)
+                self._batch.graph_edges.extend(edges)
+            else:
+                def add_edges(index: GraphIndex) -> None:
+                    for edge in edges:
+                        index.add_edge(*edge)
+
+                self._update_graph_index(add_edges)
+
+        counts = {
+            "created": len(pending) - replaced,
+            "replaced": replaced,
+            "skipped": skipped,
+        }
+        logger.info("koji_client.relations_bulk_created", on_conflict=on_conflict, **counts)
+        return counts
+
+    def _delete_relation_keys(self, keys: Iterable[tuple[str, str, str]]) -> None:
+        """Delete specific relations with a single statement.
+
+        Args:
+            keys: ``(src_doc_id, dst_doc_id, relation_type)`` tuples.
+        """
+        keys = list(keys)
+        condition = " OR ".join(
+            f"(src_doc_id = '{_sanitize_sql_value(src)}' "
+            f"AND dst_doc_id = '{_sanitize_sql_value(dst)}' "
+            f"AND relation_type = '{_sanitize_sql_value(rel_type)}')"
+            for src, dst, rel_type in keys
+        )
+        self._db.delete("doc_relations", condition)
+        self._index_version += 1
+
+        def remove_edges(index: GraphIndex) -> None:
+            for key in keys:
+                index.remove_edge(*key)
+
+        self._update_graph_index(remove_edges)
+        self._after_write()
+
+    def graph_index(self) -> GraphIndex:
+        """Return the in-memory adjacency index over ``doc_relations``.
+
+        Loaded on first use and kept current by this client's relation
+        writes. Relations written by other processes are picked up when
+        the index is reloaded after ``graph_index_ttl_seconds``.
+
+        Returns:
+            The current :class:`GraphIndex`.
+
+        Raises:
+            KojiQueryError: If loading the relations fails.
+        """
+        self._require_open()
+        with self._graph_lock:
+            ttl = self._config.graph_index_ttl_seconds
+            if self._graph is None or (
+                ttl > 0 and time.monotonic() - self._graph_loaded_at >= ttl
+            ):
+                self._graph = self._load_graph_index()
+                self._graph_loaded_at = time.monotonic()
+            return self._graph
+
+    @property
+    def graph_version(self) -> int:
+        """Version of the relation graph; changes whenever an edge does."""
+        return self.graph_index().version
+
+    def graph_cache_stats(self) -> dict[str, Any]:
+        """Hit rate and compute time of the graph algorithm result cache.
+
+        Returns:
+            Counters from :meth:`GraphResultCache.stats`.
+        """
+        return self._graph_results.stats()
+
     def get_relations(
         self,
         doc_id: str,
@@ -1139,6 +2372,63 @@ class KojiClient:
 
         return results
 
+    def get_relations_for(
+        self,
+        doc_ids: Iterable[str],
+        direction: str = "both",
+        relation_types: Iterable[str] | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Get relationships for several documents in a single query.
+
+        Equivalent to calling :meth:`get_relations` once per document.
+        A relation whose endpoints are both in *doc_ids* is listed under
+        each endpoint it matches.
+
+        Args:
+            doc_ids: Document identifiers. Duplicates are ignored.
+            direction: ``outgoing``, ``incoming``, or ``both`` (default).
+            relation_types: Restrict to these relation types (optional).
+
+        Returns:
+            Mapping of every requested ``doc_id`` to its relation
+            dictionaries (empty list when it has none).
+
+        Raises:
+            ValueError: If *direction* is not a recognised value.
+        """
+        if direction not in ("outgoing", "incoming", "both"):
+            raise ValueError(f"Invalid relation direction: {direction!r}")
+
+        ids = list(dict.fromkeys(doc_ids))
+        grouped: dict[str, list[dict[str, Any]]] = {doc_id: [] for doc_id in ids}
+        if not ids:
+            return grouped
+
+        placeholders = ", ".join("?" for _ in ids)
+        clauses: list[str] = []
+        params: list[Any] = []
+        if direction in ("outgoing", "both"):
+            clauses.append(f"src_doc_id IN ({placeholders})")
+            params.extend(ids)
+        if direction in ("incoming", "both"):
+            clauses.append(f"dst_doc_id IN ({placeholders})")
+            params.extend(ids)
+
+        sql = f"SELECT * FROM doc_relations WHERE ({' OR '.join(clauses)})"
+        types = list(dict.fromkeys(relation_types or ()))
+        if types:
+            sql += f" AND relation_type IN ({', '.join('?' for _ in types)})"
+            params.extend(types)
+
+        result = self.query(sql, params)
+        for rel in self._arrow_to_dicts(result, json_fields=["metadata"]):
+            src, dst = rel["src_doc_id"], rel["dst_doc_id"]
+            if direction in ("outgoing", "both") and src in grouped:
+                grouped[src].append(rel)
+            if direction in ("incoming", "both") and dst in grouped and dst != src:
+                grouped[dst].append(rel)
+        return grouped
+
     def delete_relation(
         self,
         src_doc_id: str,
@@ -1171,6 +2461,10 @@ class KojiClient:
                 src=src_doc_id, dst=dst_doc_id, rel=relation_type,
                 error=str(exc),
             )
+        self._update_graph_index(
+            lambda index: index.remove_edge(src_doc_id, dst_doc_id, relation_type)
+        )
+        self._index_version += 1
         self._after_write()
 
     # -- processing jobs CRUD ------------------------------------------------
@@ -1207,6 +2501,9 @@ class KojiClient:
             "queued_at": now,
             "started_at": None,
             "completed_at": None,
+            "worker_id": None,
+            "lease_expires_at": None,
+            "attempts": 0,
         }
         table = pa.table(
             {k: [v] for k, v in record.items()},
@@ -1222,6 +2519,9 @@ class KojiClient:
                 pa.field("queued_at", pa.string()),
                 pa.field("started_at", pa.string()),
                 pa.field("completed_at", pa.string()),
+                pa.field("worker_id", pa.string()),
+                pa.field("lease_expires_at", pa.string()),
+                pa.field("attempts", pa.int64()),
             ]),
         )
         try:
@@ -1239,45 +2539,232 @@ class KojiClient:
                 ) from exc
             raise KojiQueryError(f"Create job failed: {exc}") from exc
 
-    def claim_next_job(self) -> Optional[dict[str, Any]]:
+    def claim_next_job(
+        self,
+        worker_id: str | None = None,
+        lease_seconds: float = DEFAULT_JOB_LEASE_SECONDS,
+    ) -> dict[str, Any] | None:
         """Claim the oldest queued job for processing.
 
-        Atomically selects the oldest ``status='queued'`` row and
-        updates it to ``status='processing'``.
+        The claim is a compare-and-set: the row is updated only while it
+        is still ``queued`` with the ``attempts`` value that was read, and
+        the claim succeeds only if exactly one row changed. Concurrent
+        workers therefore never claim the same job; a worker that loses
+        the race moves on to the next candidate. Candidates are read and
+        claimed through a fresh handle so claims made by other processes
+        since this client opened are seen.
+
+        Args:
+            worker_id: Identifier recorded as the lease holder
+                (alphanumeric, hyphens, and underscores).
+            lease_seconds: Lease duration; extend it with
+                :meth:`heartbeat_job` while processing.
 
         Returns:
-            Job dict with all fields, or None if no queued jobs.
+            Job dict with all fields, or None if no job could be claimed.
+
+        Raises:
+            ValueError: If *worker_id* contains unsafe characters.
         """
         self._require_open()
+        if worker_id is not None:
+            _sanitize_sql_value(worker_id)
         try:
-            result = self._db.query(
+            db = self._fresh_db()
+            result = db.query(
                 "SELECT * FROM processing_jobs "
                 "WHERE status = 'queued' "
-                "ORDER BY queued_at ASC LIMIT 1"
+                f"ORDER BY queued_at ASC LIMIT {_CLAIM_CANDIDATES}"
             )
-            if result.num_rows == 0:
-                return None
+        except Exception as exc:
+            logger.warning("koji_client.claim_job_error", error=str(exc))
+            return None
 
-            job = self._arrow_row_to_dict(result)
-            doc_id = job["doc_id"]
-            safe_id = _sanitize_sql_value(doc_id)
-            now = datetime.now(timezone.utc).isoformat()
+        for job in self._arrow_to_dicts(result):
+            claimed = self._try_claim_job(job, worker_id, lease_seconds, db=db)
+            if claimed is not None:
+                return claimed
+        return None
 
-            self._db.update(
+    def _try_claim_job(
+        self,
+        job: dict[str, Any],
+        worker_id: str | None,
+        lease_seconds: float,
+        db: Any = None,
+    ) -> dict[str, Any] | None:
+        """Compare-and-set one queued job to ``processing``.
+
+        Args:
+            job: Job row as read by :meth:`claim_next_job`.
+            worker_id: Lease holder to record.
+            lease_seconds: Lease duration.
+            db: Handle to update through; defaults to a fresh one.
+
+        Returns:
+            The updated job dict, or None if another worker got there first.
+        """
+        doc_id = job["doc_id"]
+        safe_id = _sanitize_sql_value(doc_id)
+        attempts = job.get("attempts")
+        attempts_clause = (
+            "attempts IS NULL" if attempts is None else f"attempts = {int(attempts)}"
+        )
+        now = datetime.now(timezone.utc)
+        fields = {
+            "status": "processing",
+            "started_at": now.isoformat(),
+            "worker_id": worker_id,
+            "lease_expires_at": (now + timedelta(seconds=lease_seconds)).isoformat(),
+            "attempts": int(attempts or 0) + 1,
+        }
+        try:
+            result = (db or self._fresh_db()).update(
                 "processing_jobs",
-                {"status": "processing", "started_at": now},
-                f"doc_id = '{safe_id}'",
+                fields,
+                f"doc_id = '{safe_id}' AND status = 'queued' AND {attempts_clause}",
             )
-            self._after_write()
+        except Exception as exc:
+            logger.debug("koji_client.claim_conflict", doc_id=doc_id, error=str(exc))
+            return None
+        if result.rows_updated != 1:
+            return None
+        self._after_write()
+
+        job.update(fields)
+        logger.info(
+            "koji_client.job_claimed",
+            doc_id=doc_id,
+            worker_id=worker_id,
+            attempt=fields["attempts"],
+        )
+        return job
+
+    def heartbeat_job(
+        self,
+        doc_id: str,
+        worker_id: str | None,
+        lease_seconds: float = DEFAULT_JOB_LEASE_SECONDS,
+    ) -> bool:
+        """Extend the lease on a job this worker is processing.
 
-            job["status"] = "processing"
-            job["started_at"] = now
-            logger.info("koji_client.job_claimed", doc_id=doc_id)
-            return job
+        Args:
+            doc_id: Job identifier.
+            worker_id: Lease holder that claimed the job.
+            lease_seconds: New lease duration from now.
 
+        Returns:
+            True if the lease was extended, False if the job is no longer
+            held by *worker_id* (e.g. it was requeued after expiring).
+        """
+        self._require_open()
+        safe_id = _sanitize_sql_value(doc_id)
+        expires = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        try:
+            result = self._fresh_db().update(
+                "processing_jobs",
+                {"lease_expires_at": expires.isoformat()},
+                f"doc_id = '{safe_id}' AND status = 'processing' "
+                f"AND {self._worker_clause(worker_id)}",
+            )
         except Exception as exc:
-            logger.warning("koji_client.claim_job_error", error=str(exc))
-            return None
+            logger.debug("koji_client.heartbeat_error", doc_id=doc_id, error=str(exc))
+            return False
+        return result.rows_updated > 0
+
+    def requeue_expired_jobs(
+        self,
+        max_attempts: int = DEFAULT_JOB_MAX_ATTEMPTS,
+        lease_seconds: float = DEFAULT_JOB_LEASE_SECONDS,
+    ) -> int:
+        """Requeue ``processing`` jobs whose lease has expired.
+
+        Jobs that have already been attempted *max_attempts* times are
+        marked failed instead. Jobs claimed before leases existed (no
+        ``lease_expires_at``) are treated as expired once they have been
+        processing for *lease_seconds*. Leases are read and requeued
+        through a fresh handle so heartbeats from other processes are seen.
+
+        Args:
+            max_attempts: Claims allowed before a job is failed.
+            lease_seconds: Age after which a lease-less job is expired.
+
+        Returns:
+            Number of jobs requeued or failed.
+        """
+        self._require_open()
+        now = datetime.now(timezone.utc)
+        stale_start = (now - timedelta(seconds=lease_seconds)).isoformat()
+        try:
+            db = self._fresh_db()
+            result = db.query(
+                "SELECT doc_id, worker_id, attempts, lease_expires_at "
+                "FROM processing_jobs WHERE status = 'processing' "
+                "AND (lease_expires_at < ? "
+                "OR (lease_expires_at IS NULL AND started_at < ?))",
+                [now.isoformat(), stale_start],
+            )
+        except Exception as exc:
+            logger.warning("koji_client.requeue_query_error", error=str(exc))
+            return 0
+
+        recovered = 0
+        for job in self._arrow_to_dicts(result):
+            safe_id = _sanitize_sql_value(job["doc_id"])
+            lease = job.get("lease_expires_at")
+            lease_clause = (
+                "lease_expires_at IS NULL"
+                if lease is None
+                else f"lease_expires_at = '{_sql_timestamp(lease)}'"
+            )
+            attempts = int(job.get("attempts") or 0)
+            if attempts >= max_attempts:
+                fields = {
+                    "status": "failed",
+                    "progress": 0.0,
+                    "stage": "Failed",
+                    "error": (
+                        f"Lease expired after {attempts} attempts "
+                        f"(last worker: {job.get('worker_id')})"
+                    ),
+                    "completed_at": now.isoformat(),
+                    "worker_id": None,
+                    "lease_expires_at": None,
+                }
+            else:
+                fields = {
+                    "status": "queued",
+                    "progress": 0.0,
+                    "stage": "Requeued",
+                    "worker_id": None,
+                    "lease_expires_at": None,
+                }
+            try:
+                # Guard on the observed lease so a heartbeat that lands
+                # in between keeps the job with its worker.
+                updated = db.update(
+                    "processing_jobs",
+                    fields,
+                    f"doc_id = '{safe_id}' AND status = 'processing' AND {lease_clause}",
+                )
+            except Exception as exc:
+                logger.debug(
+                    "koji_client.requeue_conflict", doc_id=job["doc_id"], error=str(exc),
+                )
+                continue
+            if updated.rows_updated:
+                recovered += 1
+                logger.warning(
+                    "koji_client.job_lease_expired",
+                    doc_id=job["doc_id"],
+                    worker_id=job.get("worker_id"),
+                    attempts=attempts,
+                    action=fields["status"],
+                )
+
+        if recovered:
+            self._after_write(recovered)
+        return recovered
 
     def update_job_progress(
         self,
@@ -1309,39 +2796,60 @@ class KojiClient:
                 error=str(exc),
             )
 
-    def complete_job(self, doc_id: str) -> None:
+    def complete_job(self, doc_id: str, worker_id: str | None = None) -> bool:
         """Mark a job as completed.
 
         Args:
             doc_id: Job identifier.
+            worker_id: If given, only complete the job while this worker
+                still holds its lease.
+
+        Returns:
+            True if the job was updated.
         """
         self._require_open()
         safe_id = _sanitize_sql_value(doc_id)
         now = datetime.now(timezone.utc).isoformat()
-        self._db.update(
+        condition = f"doc_id = '{safe_id}'"
+        if worker_id is not None:
+            condition += f" AND {self._worker_clause(worker_id)}"
+        result = self._fresh_db().update(
             "processing_jobs",
             {
                 "status": "completed",
                 "progress": 1.0,
                 "stage": "Completed",
                 "completed_at": now,
+                "lease_expires_at": None,
             },
-            f"doc_id = '{safe_id}'",
+            condition,
         )
         self._after_write()
+        if not result.rows_updated:
+            logger.warning("koji_client.job_lease_lost", doc_id=doc_id, worker_id=worker_id)
+            return False
         logger.info("koji_client.job_completed", doc_id=doc_id)
+        return True
 
-    def fail_job(self, doc_id: str, error: str) -> None:
+    def fail_job(self, doc_id: str, error: str, worker_id: str | None = None) -> bool:
         """Mark a job as failed.
 
         Args:
             doc_id: Job identifier.
             error: Error message describing the failure.
+            worker_id: If given, only fail the job while this worker
+                still holds its lease.
+
+        Returns:
+            True if the job was updated.
         """
         self._require_open()
         safe_id = _sanitize_sql_value(doc_id)
         now = datetime.now(timezone.utc).isoformat()
-        self._db.update(
+        condition = f"doc_id = '{safe_id}'"
+        if worker_id is not None:
+            condition += f" AND {self._worker_clause(worker_id)}"
+        result = self._fresh_db().update(
             "processing_jobs",
             {
                 "status": "failed",
@@ -1349,27 +2857,37 @@ class KojiClient:
                 "stage": "Failed",
                 "error": error,
                 "completed_at": now,
+                "lease_expires_at": None,
             },
-            f"doc_id = '{safe_id}'",
+            condition,
         )
         self._after_write()
+        if not result.rows_updated:
+            logger.warning("koji_client.job_lease_lost", doc_id=doc_id, worker_id=worker_id)
+            return False
         logger.warning("koji_client.job_failed", doc_id=doc_id, error=error)
+        return True
 
-    def _fresh_job_query(self, sql: str) -> Any:
-        """Run a query against processing_jobs using a fresh DB handle.
+    @staticmethod
+    def _worker_clause(worker_id: str | None) -> str:
+        """SQL predicate matching jobs leased to *worker_id*."""
+        if worker_id is None:
+            return "worker_id IS NULL"
+        return f"worker_id = '{_sanitize_sql_value(worker_id)}'"
+
+    def _fresh_db(self) -> Any:
+        """Open a short-lived DB handle for cross-process compare-and-set.
 
         Lance datasets cache their version in memory.  When a separate
         worker process writes to the same database, the cached handle is
-        stale.  This method opens a short-lived connection to ensure
-        reads always see the latest data.
+        stale.  A fresh connection always sees the latest data; it is
+        closed by GC once dropped.
         """
-        import koji as _koji
+        return koji.open(str(self._config.db_path))
 
-        db = _koji.open(str(self._config.db_path))
-        try:
-            return db.query(sql)
-        finally:
-            pass  # short-lived, GC will close
+    def _fresh_job_query(self, sql: str) -> Any:
+        """Run a query against processing_jobs using a fresh DB handle."""
+        return self._fresh_db().query(sql)
 
     def get_job(self, doc_id: str) -> Optional[dict[str, Any]]:
         """Get a processing job by doc_id.
@@ -1468,45 +2986,30 @@ class KojiClient:
         self,
         root_doc_id: str,
         max_depth: int = 3,
+        columns: list[str] | tuple[str, ...] | None = None,
     ) -> list[dict[str, Any]]:
         """Find all documents related to a root document via graph traversal.
 
-        Uses iterative BFS queries — one hop per iteration — because
-        Koji's recursive CTEs do not support arithmetic expressions
-        in the recursive term (verified in Koji 0.2.0).
+        Traverses outgoing edges in the in-memory :meth:`graph_index`
+        (Koji's recursive CTEs do not support arithmetic expressions in
+        the recursive term, verified in Koji 0.2.0), then fetches the
+        discovered documents in one query.
 
         Args:
             root_doc_id: Starting document identifier.
             max_depth: Maximum traversal depth.
+            columns: Optional document column projection. ``None`` selects
+                every column, including the full ``markdown`` body.
 
         Returns:
             List of related document dicts with ``depth`` and ``relation_type``.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
         """
-        visited: set[str] = {root_doc_id}
+        select, json_fields = self._document_projection(columns)
         # (doc_id, relation_type, depth)
-        found: list[tuple[str, str, int]] = []
-        frontier = [root_doc_id]
-
-        for depth in range(1, max_depth + 1):
-            if not frontier:
-                break
-
-            placeholders = ", ".join("?" for _ in frontier)
-            rows = self.query(
-                f"SELECT dst_doc_id, relation_type FROM doc_relations "
-                f"WHERE src_doc_id IN ({placeholders})",
-                frontier,
-            )
-            d = rows.to_pydict()
-            next_frontier: list[str] = []
-            for i in range(rows.num_rows):
-                dst = d["dst_doc_id"][i]
-                rel_type = d["relation_type"][i]
-                if dst not in visited:
-                    visited.add(dst)
-                    found.append((dst, rel_type, depth))
-                    next_frontier.append(dst)
-            frontier = next_frontier
+        found = self.graph_index().bfs(root_doc_id, max_depth=max_depth)
 
         if not found:
             return []
@@ -1515,14 +3018,12 @@ class KojiClient:
         doc_ids = [f[0] for f in found]
         placeholders = ", ".join("?" for _ in doc_ids)
         docs_result = self.query(
-            f"SELECT * FROM documents WHERE doc_id IN ({placeholders})",
+            f"SELECT {select} FROM documents WHERE doc_id IN ({placeholders})",
             doc_ids,
         )
         docs_by_id = {
             doc["doc_id"]: doc
-            for doc in self._arrow_to_dicts(
-                docs_result, json_fields=["metadata", "enrichment"],
-            )
+            for doc in self._arrow_to_dicts(docs_result, json_fields=json_fields)
         }
 
         results: list[dict[str, Any]] = []
@@ -1539,15 +3040,12 @@ class KojiClient:
     # -- graph algorithms ----------------------------------------------------
 
     _GRAPH_EDGE_QUERY = (
-        "WITH doc_map AS ("
-        "  SELECT doc_id, ROW_NUMBER() OVER (ORDER BY doc_id) AS node_id"
-        "  FROM documents"
-        ") "
-        "SELECT CAST(sm.node_id AS BIGINT) AS src, "
-        "       CAST(dm.node_id AS BIGINT) AS dst "
+        "SELECT CAST(s.node_id AS BIGINT) AS src, "
+        "       CAST(d.node_id AS BIGINT) AS dst "
         "FROM doc_relations r "
-        "JOIN doc_map sm ON r.src_doc_id = sm.doc_id "
-        "JOIN doc_map dm ON r.dst_doc_id = dm.doc_id"
+        "JOIN documents s ON r.src_doc_id = s.doc_id "
+        "JOIN documents d ON r.dst_doc_id = d.doc_id "
+        "WHERE s.node_id IS NOT NULL AND d.node_id IS NOT NULL"
     )
 
     def _project_graph_edge_query(self, project_id: str) -> str:
@@ -1561,16 +3059,105 @@ class KojiClient:
         """
         safe_pid = _sanitize_sql_value(project_id)
         return (
-            "WITH doc_map AS ("
-            "  SELECT doc_id, ROW_NUMBER() OVER (ORDER BY doc_id) AS node_id"
-            f"  FROM documents WHERE project_id = '{safe_pid}'"
-            ") "
-            "SELECT CAST(sm.node_id AS BIGINT) AS src, "
-            "       CAST(dm.node_id AS BIGINT) AS dst "
-            "FROM doc_relations r "
-            "JOIN doc_map sm ON r.src_doc_id = sm.doc_id "
-            "JOIN doc_map dm ON r.dst_doc_id = dm.doc_id"
+            f"{self._GRAPH_EDGE_QUERY} "
+            f"AND s.project_id = '{safe_pid}' AND d.project_id = '{safe_pid}'"
+        )
+
+    def _allocate_node_ids(self, count: int) -> int:
+        """Reserve *count* consecutive graph node ids for new documents.
+
+        Advances the ``node_id`` counter with a compare-and-set through a
+        fresh handle, retrying when another writer -- a thread or another
+        process in the worker pool -- moved it first, so no id is ever
+        handed out twice. A missing counter is seeded from the highest
+        stored ``node_id``.
+
+        Args:
+            count: Ids to reserve.
+
+        Returns:
+            The first reserved id.
+
+        Raises:
+            KojiQueryError: If the counter kept moving for
+                ``_COUNTER_CAS_ATTEMPTS`` rounds.
+        """
+        for _ in range(_COUNTER_CAS_ATTEMPTS):
+            db = self._fresh_db()
+            result = db.query(f"SELECT value FROM counters WHERE name = '{_NODE_ID_COUNTER}'")
+            if result.num_rows == 0:
+                self._seed_node_id_counter(db)
+                continue
+            first = int(result.column("value")[0].as_py())
+            updated = db.update(
+                "counters",
+                {"value": first + count},
+                f"name = '{_NODE_ID_COUNTER}' AND value = {first}",
+            )
+            if updated.rows_updated == 1:
+                return first
+        raise KojiQueryError(
+            f"Node id allocation lost {_COUNTER_CAS_ATTEMPTS} races in a row"
+        )
+
+    def _seed_node_id_counter(self, db: Any) -> None:
+        """Create the ``node_id`` counter above every stored id.
+
+        Losing the race to another seeding writer is harmless: the
+        caller re-reads the counter either way.
+        """
+        result = db.query("SELECT MAX(node_id) AS max_id FROM documents")
+        stored = result.column("max_id")[0].as_py() if result.num_rows else None
+        row = pa.table(
+            {"name": [_NODE_ID_COUNTER], "value": [int(stored or 0) + 1]},
+            schema=pa.schema([
+                pa.field("name", pa.string(), nullable=False),
+                pa.field("value", pa.int64()),
+            ]),
+        )
+        try:
+            db.insert("counters", row)
+        except Exception as exc:
+            if "duplicate" not in str(exc).lower():
+                raise KojiQueryError(f"Seeding node id counter failed: {exc}") from exc
+
+    def backfill_node_ids(self, dry_run: bool = False) -> dict[str, int]:
+        """Give graph node ids to documents written before ``node_id`` existed.
+
+        A one-shot migration, run through ``processing.node_id_backfill``;
+        graph algorithms leave documents without an id out until it has
+        run. Ids come from the shared counter in ``doc_id`` order, and
+        only rows whose id is still NULL are written, so re-running it is
+        harmless.
+
+        Args:
+            dry_run: Count the documents that would be numbered without writing.
+
+        Returns:
+            Documents numbered (or, with *dry_run*, to number).
+        """
+        self._require_open()
+        result = self._db.query(
+            "SELECT doc_id FROM documents WHERE node_id IS NULL ORDER BY doc_id", [],
         )
+        doc_ids = result.column("doc_id").to_pylist()
+        if dry_run or not doc_ids:
+            return {"documents": len(doc_ids)}
+
+        first = self._allocate_node_ids(len(doc_ids))
+        updated = 0
+        for node_id, doc_id in enumerate(doc_ids, start=first):
+            safe_id = _sanitize_sql_value(doc_id)
+            updated += self._db.update(
+                "documents", {"node_id": node_id},
+                f"doc_id = '{safe_id}' AND node_id IS NULL",
+            ).rows_updated
+        if updated:
+            self._invalidate_cached("documents", doc_ids)
+            self._documents_version += 1
+            self._after_write()
+            logger.info("koji_client.node_ids_backfilled", documents=updated)
+        return {"documents": updated}
 
     def _doc_id_int_mapping(
         self,
@@ -1578,8 +3165,11 @@ class KojiClient:
     ) -> dict[int, str]:
         """Build a reverse mapping from integer node IDs to text doc_ids.
 
-        Uses ``ROW_NUMBER() OVER (ORDER BY doc_id)`` to assign stable integers
-        matching the edge query used by graph algorithms.
+        Reads the persisted ``node_id`` column, so ids are stable across
+        inserts and algorithm outputs can be compared between runs.
+        Documents without an id (legacy rows, see
+        :meth:`backfill_node_ids`) are left out, as they are by the graph
+        edge queries.
 
         Args:
             project_id: Optional project scope. ``None`` includes all documents.
@@ -1589,23 +3179,14 @@ class KojiClient:
         """
         self._require_open()
 
+        sql = "SELECT doc_id, node_id FROM documents WHERE node_id IS NOT NULL"
+        params: list[Any] = []
         if project_id is not None:
-            safe_pid = _sanitize_sql_value(project_id)
-            sql = (
-                "SELECT doc_id, ROW_NUMBER() OVER (ORDER BY doc_id) AS node_id "
-                f"FROM documents WHERE project_id = '{safe_pid}'"
-            )
-        else:
-            sql = (
-                "SELECT doc_id, ROW_NUMBER() OVER (ORDER BY doc_id) AS node_id "
-                "FROM documents"
-            )
-        result = self.query(sql)
+            sql += " AND project_id = ?"
+            params.append(project_id)
+        result = self.query(sql, params)
         d = result.to_pydict()
-        return {
-            d["node_id"][i]: d["doc_id"][i]
-            for i in range(result.num_rows)
-        }
+        return dict(zip(d["node_id"], d["doc_id"]))
 
     def _run_graph_algorithm(
         self,
@@ -1644,6 +3225,7 @@ class KojiClient:
                 f"Graph algorithm '{algorithm}' failed: {exc}"
             ) from exc
 
+    @_cached_graph_algorithm("pagerank")
     def graph_pagerank(
         self,
         damping: float = 0.85,
@@ -1688,6 +3270,7 @@ class KojiClient:
 
         return scores
 
+    @_cached_graph_algorithm("communities")
     def graph_communities(
         self,
         project_id: str | None = None,
@@ -1726,6 +3309,7 @@ class KojiClient:
 
         return communities
 
+    @_cached_graph_algorithm("label_propagation")
     def graph_label_propagation(
         self,
         max_iterations: int = 100,
@@ -1768,6 +3352,7 @@ class KojiClient:
 
         return communities
 
+    @_cached_graph_algorithm("shortest_paths")
     def graph_shortest_paths(
         self,
         source_doc_id: str,
@@ -1811,6 +3396,7 @@ class KojiClient:
 
         return distances
 
+    @_cached_graph_algorithm("scc")
     def graph_scc(
         self,
         project_id: str | None = None,
@@ -1844,6 +3430,7 @@ class KojiClient:
 
         return components
 
+    @_cached_graph_algorithm("topological_sort")
     def graph_topological_sort(
         self,
         project_id: str | None = None,
@@ -1885,6 +3472,7 @@ class KojiClient:
         ordered.sort(key=lambda x: x[0])
         return [doc_id for _, doc_id in ordered]
 
+    @_cached_graph_algorithm("has_cycle")
     def graph_has_cycle(
         self,
         project_id: str | None = None,
@@ -1925,10 +3513,14 @@ class KojiClient:
             Number of rows deleted.
         """
         safe_type = _sanitize_sql_value(relation_type)
-        return self._delete_where(
+        deleted = self._delete_where(
             "doc_relations",
             f"relation_type = '{safe_type}'",
         )
+        self._update_graph_index(lambda index: index.remove_type(relation_type))
+        if deleted:
+            self._index_version += 1
+        return deleted
 
     # -- internal helpers ----------------------------------------------------
 
@@ -1955,6 +3547,150 @@ class KojiClient:
             )
             return 0
 
+    def _load_graph_index(self) -> GraphIndex:
+        """Build a :class:`GraphIndex` from every row of ``doc_relations``.
+
+        Must be called with ``_graph_lock`` held.
+        """
+        result = self.query(
+            "SELECT src_doc_id, dst_doc_id, relation_type, metadata FROM doc_relations"
+        )
+        d = result.to_pydict()
+        if self._graph is not None:
+            self._graph_next_version = self._graph.version + 1
+        index = GraphIndex.from_edges(
+            zip(
+                d["src_doc_id"],
+                d["dst_doc_id"],
+                d["relation_type"],
+                (edge_weight(m) for m in d["metadata"]),
+            ),
+            version=self._graph_next_version,
+        )
+        logger.debug("koji_client.graph_index_loaded", **index.stats())
+        return index
+
+    def _update_graph_index(self, update: Callable[[GraphIndex], Any]) -> None:
+        """Apply a write to the graph index if it has been loaded.
+
+        Args:
+            update: Callback receiving the index.
+        """
+        with self._graph_lock:
+            if self._graph is not None:
+                update(self._graph)
+
+    def _reset_graph_index(self) -> None:
+        """Drop the graph index so the next use reloads it from Koji."""
+        with self._graph_lock:
+            if self._graph is not None:
+                self._graph_next_version = self._graph.version + 1
+                self._graph = None
+
+    def _graph_result(
+        self,
+        algorithm: str,
+        params: tuple[tuple[str, Any], ...],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Return a cached graph algorithm result, computing it on a miss.
+
+        Args:
+            algorithm: Algorithm name.
+            params: Bound call arguments.
+            compute: Runs the algorithm.
+
+        Returns:
+            The (shallow-copied when cached) result.
+        """
+        versions = (self.graph_version, self._documents_version)
+        key = (algorithm, params, *versions)
+        hit, value = self._graph_results.get(algorithm, key)
+        if hit:
+            return value
+        start = time.perf_counter()
+        value = compute()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._graph_results.put(algorithm, key, value, elapsed_ms, versions)
+        logger.debug(
+            "koji_client.graph_algorithm_computed",
+            algorithm=algorithm,
+            elapsed_ms=round(elapsed_ms, 2),
+        )
+        return value
+
+    @staticmethod
+    def _document_projection(
+        columns: list[str] | tuple[str, ...] | None,
+    ) -> tuple[str, list[str]]:
+        """Build a ``SELECT`` list and JSON field list for document reads.
+
+        ``doc_id`` is always included so results can be keyed by ID.
+
+        Args:
+            columns: Requested document columns, or ``None`` for all.
+
+        Returns:
+            Tuple of ``(select_list, json_fields)``.
+
+        Raises:
+            ValueError: If *columns* names an unknown document column.
+        """
+        if columns is None:
+            return "*", list(_DOCUMENT_JSON_FIELDS)
+
+        unknown = set(columns) - set(DOCUMENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Invalid document columns: {unknown}")
+
+        selected = ["doc_id", *(c for c in columns if c != "doc_id")]
+        json_fields = [f for f in _DOCUMENT_JSON_FIELDS if f in selected]
+        return ", ".join(selected), json_fields
+
+    def _read_through(
+        self,
+        table: str,
+        key: Any,
+        row_id: str,
+        load: Callable[[], dict[str, Any] | None],
+        group_field: str | None = None,
+    ) -> dict[str, Any] | None:
+        """Serve a point read from the row cache, loading on a miss.
+
+        Args:
+            table: Table the row belongs to.
+            key: Cache key (row ID plus any projection).
+            row_id: Primary key used for invalidation.
+            load: Reads the row from Koji; returns ``None`` if absent.
+            group_field: Row field holding the parent ID (e.g. ``doc_id``)
+                so the row is dropped when its document is deleted.
+
+        Returns:
+            The row, or ``None`` if it does not exist. Misses are not cached.
+        """
+        if self._cache is None:
+            return load()
+
+        cached = self._cache.get(table, key)
+        if cached is not None:
+            return cached
+
+        generation = self._cache.generation(table)
+        row = load()
+        if row is not None:
+            self._cache.put(
+                table, key, row,
+                row_id=row_id,
+                generation=generation,
+                group=row.get(group_field) if group_field else None,
+            )
+        return row
+
+    def _invalidate_cached(self, table: str, row_ids: list[str]) -> None:
+        """Drop cached rows after a write. No-op when the cache is disabled."""
+        if self._cache is not None:
+            self._cache.invalidate(table, row_ids)
+
     def _require_open(self) -> None:
         """Raise if the database is not open."""
         if self._db is None:
@@ -2001,26 +3737,67 @@ class KojiClient:
             self._db.insert("projects", table)
             logger.info("koji_client.default_project_created")
 
-    def _after_write(self) -> None:
-        """Post-write hook: sync, compact, and prune old versions."""
-        self._write_count += 1
+    def _flush_batch(self, batch: _WriteBatch) -> None:
+        """Write a finished batch: one insert per table, then one sync.
+
+        Args:
+            batch: Batch whose buffered tables should be inserted.
 
-        if self._config.sync_on_write:
+        Raises:
+            KojiQueryError: If an insert fails. Tables inserted before the
+                failure are still synced.
+        """
+        writes = batch.deferred_writes
+        try:
+            for table, parts in batch.tables.items():
+                data = (
+                    parts[0] if len(parts) == 1
+                    else pa.concat_tables(parts, promote_options="default")
+                )
+                try:
+                    self._db.insert(table, data)
+                except Exception as exc:
+                    raise KojiQueryError(
+                        f"Insert into {table} failed: {exc}"
+                    ) from exc
+                writes += 1
+        finally:
+            if _INDEX_TABLES.intersection(batch.tables):
+                self._index_version += 1
+            if writes:
+                self._after_write(writes)
+
+        logger.debug(
+            "koji_client.batch_flushed",
+            rows={
+                table: sum(part.num_rows for part in parts)
+                for table, parts in batch.tables.items()
+            },
+            deferred_writes=batch.deferred_writes,
+        )
+
+    def _after_write(self, writes: int = 1, sync: bool = True) -> None:
+        """Post-write hook: sync and record the write for maintenance.
+
+        Compaction is left to the background :class:`CompactionScheduler`.
+        Inside :meth:`batch` the hook only records the write; the batch
+        runs it once on exit.
+
+        Args:
+            writes: Number of writes being committed.
+            sync: Whether to sync (subject to ``sync_on_write``).
+        """
+        if self._batch is not None:
+            self._batch.deferred_writes += writes
+            return
+
+        self._write_count += writes
+
+        if sync and self._config.sync_on_write:
             self._db.sync()
 
-        if (
-            self._config.compact_interval > 0
-            and self._write_count % self._config.compact_interval == 0
-        ):
-            self._db.compact()
-            try:
-                self._db.cleanup_versions(keep_versions=2)
-            except Exception:
-                pass  # cleanup_versions may fail on empty tables
-            logger.debug(
-                "koji_client.compacted",
-                write_count=self._write_count,
-            )
+        if self._maintenance is not None:
+            self._maintenance.record_write(writes)
 
     @staticmethod
     def _arrow_row_to_dict(result: pa.Table) -> dict[str, Any]:
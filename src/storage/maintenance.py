@@ -0,0 +1,363 @@
+"""
+Background maintenance for the Koji database.
+
+Compaction and old-version cleanup rewrite data files and can take
+seconds on a large library. Running them inline from the write path
+stalls whichever request happens to land on the N-th write, so
+``KojiClient`` delegates them to a :class:`CompactionScheduler` thread
+that compacts only when enough new data has accumulated and the
+database has gone quiet.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+if TYPE_CHECKING:
+    from .koji_client import KojiClient
+
+logger = structlog.get_logger(__name__)
+
+# Compact even under sustained writes once the backlog reaches this
+# multiple of ``compact_interval``, so a busy ingest cannot defer
+# compaction forever.
+_BACKLOG_MULTIPLIER = 4
+
+# Window used to report the recent write rate.
+_WRITE_RATE_WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class StorageFootprint:
+    """On-disk size of a Koji database.
+
+    Attributes:
+        bytes: Total size of all files under the database path.
+        fragments: Number of Lance data fragment files (``*.lance``).
+        versions: Number of Lance version manifests (``*.manifest``).
+    """
+
+    bytes: int = 0
+    fragments: int = 0
+    versions: int = 0
+
+
+@dataclass
+class CompactionRun:
+    """Outcome of a single compaction pass.
+
+    Attributes:
+        reason: Why the pass ran (``idle``, ``backlog``, or ``manual``).
+        started_at: ISO-8601 UTC start time.
+        duration_ms: Wall-clock duration of compaction and cleanup.
+        bytes_before: Database size before the pass.
+        bytes_after: Database size after the pass.
+        bytes_reclaimed: ``bytes_before - bytes_after`` (never negative).
+        fragments_before: Data fragment count before the pass.
+        fragments_after: Data fragment count after the pass.
+        writes_compacted: Writes recorded since the previous pass.
+        error: Error message if the pass failed.
+    """
+
+    reason: str
+    started_at: str
+    duration_ms: float = 0.0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    bytes_reclaimed: int = 0
+    fragments_before: int = 0
+    fragments_after: int = 0
+    writes_compacted: int = 0
+    error: str | None = None
+
+
+def scan_storage(db_path: str | Path) -> StorageFootprint:
+    """Measure the on-disk footprint of a Koji database.
+
+    Args:
+        db_path: Database path (file or directory).
+
+    Returns:
+        Footprint totals; all zero if *db_path* does not exist.
+    """
+    path = Path(db_path)
+    footprint = StorageFootprint()
+    if path.is_file():
+        footprint.bytes = path.stat().st_size
+        return footprint
+    if not path.is_dir():
+        return footprint
+
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                footprint.bytes += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue  # removed by a concurrent cleanup
+            if name.endswith(".lance"):
+                footprint.fragments += 1
+            elif name.endswith(".manifest"):
+                footprint.versions += 1
+    return footprint
+
+
+class CompactionScheduler:
+    """Runs Koji compaction on a background thread.
+
+    Compaction becomes *due* once ``compact_interval`` writes have been
+    recorded, or ``compact_interval`` new data fragments have appeared
+    on disk, since the last pass. A due compaction runs when no write
+    has been recorded for ``idle_seconds``, or unconditionally once the
+    backlog reaches ``_BACKLOG_MULTIPLIER`` times the interval.
+
+    Args:
+        client: Open client whose database should be maintained.
+        compact_interval: Writes or new fragments before compaction is due.
+        idle_seconds: Quiet period required before a due compaction runs.
+        check_seconds: Interval between heuristic evaluations.
+        history_size: Number of recent runs kept for :meth:`status`.
+    """
+
+    def __init__(
+        self,
+        client: KojiClient,
+        compact_interval: int,
+        idle_seconds: float = 5.0,
+        check_seconds: float = 30.0,
+        history_size: int = 20,
+    ) -> None:
+        self._client = client
+        self._compact_interval = compact_interval
+        self._idle_seconds = idle_seconds
+        self._check_seconds = check_seconds
+
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._manual_requested = False
+
+        self._writes_since_compaction = 0
+        self._last_write_at: float | None = None
+        self._recent_writes: deque[float] = deque()
+        self._fragment_baseline = scan_storage(client.db_path).fragments
+
+        self._running = False
+        self._history: deque[CompactionRun] = deque(maxlen=history_size)
+        self._total_runs = 0
+        self._total_bytes_reclaimed = 0
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the maintenance thread. Idempotent."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="koji-compaction", daemon=True,
+        )
+        self._thread.start()
+        logger.debug(
+            "koji_maintenance.started",
+            compact_interval=self._compact_interval,
+            idle_seconds=self._idle_seconds,
+            check_seconds=self._check_seconds,
+        )
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop the maintenance thread, waiting for an in-flight pass.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.debug("koji_maintenance.stopped")
+
+    # -- write accounting ----------------------------------------------------
+
+    def record_write(self, count: int = 1) -> None:
+        """Record committed writes. Called from the client's write path.
+
+        Args:
+            count: Number of writes committed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._writes_since_compaction += count
+            self._last_write_at = now
+            self._recent_writes.append(now)
+            self._trim_recent(now)
+
+    # -- compaction ----------------------------------------------------------
+
+    def trigger(self) -> bool:
+        """Ask the maintenance thread to compact as soon as possible.
+
+        Returns:
+            ``True`` if the request was queued, ``False`` if the thread
+            is not running.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        with self._lock:
+            self._manual_requested = True
+        self._wake.set()
+        return True
+
+    def run_now(self, reason: str = "manual") -> CompactionRun:
+        """Compact on the calling thread, measuring duration and bytes reclaimed.
+
+        Args:
+            reason: Label recorded with the run.
+
+        Returns:
+            The recorded :class:`CompactionRun`.
+        """
+        with self._run_lock:
+            with self._lock:
+                writes = self._writes_since_compaction
+                self._running = True
+
+            before = scan_storage(self._client.db_path)
+            run = CompactionRun(
+                reason=reason,
+                started_at=datetime.now(timezone.utc).isoformat(),
+                bytes_before=before.bytes,
+                fragments_before=before.fragments,
+                writes_compacted=writes,
+            )
+            t0 = time.perf_counter()
+            try:
+                self._client.compact()
+            except Exception as exc:
+                run.error = str(exc)
+            run.duration_ms = round((time.perf_counter() - t0) * 1000, 2)
+
+            after = scan_storage(self._client.db_path)
+            run.bytes_after = after.bytes
+            run.fragments_after = after.fragments
+            run.bytes_reclaimed = max(0, before.bytes - after.bytes)
+
+            with self._lock:
+                self._running = False
+                self._history.append(run)
+                self._total_runs += 1
+                if run.error is None:
+                    # Writes that landed during the pass stay pending.
+                    self._writes_since_compaction -= writes
+                    self._fragment_baseline = after.fragments
+                    self._total_bytes_reclaimed += run.bytes_reclaimed
+
+        if run.error is None:
+            logger.info("koji_maintenance.compacted", **asdict(run))
+        else:
+            logger.warning("koji_maintenance.compaction_failed", **asdict(run))
+        return run
+
+    def due_reason(self) -> str | None:
+        """Evaluate the compaction heuristics.
+
+        Returns:
+            ``"idle"`` or ``"backlog"`` if a pass should run now, else
+            ``None``.
+        """
+        if self._compact_interval <= 0:
+            return None
+
+        with self._lock:
+            writes = self._writes_since_compaction
+            last_write_at = self._last_write_at
+            baseline = self._fragment_baseline
+        if writes <= 0:
+            return None
+
+        new_fragments = scan_storage(self._client.db_path).fragments - baseline
+        backlog = max(writes, new_fragments)
+        if backlog < self._compact_interval:
+            return None
+
+        idle_for = time.monotonic() - last_write_at if last_write_at else float("inf")
+        if idle_for >= self._idle_seconds:
+            return "idle"
+        if backlog >= self._compact_interval * _BACKLOG_MULTIPLIER:
+            return "backlog"
+        return None
+
+    def status(self) -> dict[str, Any]:
+        """Return scheduler state and recent compaction history.
+
+        Returns:
+            Dictionary with heuristic inputs, the last run, run history
+            (newest first), and lifetime totals.
+        """
+        now = time.monotonic()
+        footprint = scan_storage(self._client.db_path)
+        with self._lock:
+            self._trim_recent(now)
+            history = [asdict(run) for run in reversed(self._history)]
+            return {
+                "enabled": self._compact_interval > 0,
+                "thread_alive": self._thread is not None and self._thread.is_alive(),
+                "running": self._running,
+                "manual_requested": self._manual_requested,
+                "compact_interval": self._compact_interval,
+                "idle_seconds": self._idle_seconds,
+                "writes_since_compaction": self._writes_since_compaction,
+                "seconds_since_last_write": (
+                    round(now - self._last_write_at, 2)
+                    if self._last_write_at is not None else None
+                ),
+                "writes_last_minute": len(self._recent_writes),
+                "fragments": footprint.fragments,
+                "fragments_since_compaction": max(
+                    0, footprint.fragments - self._fragment_baseline,
+                ),
+                "versions": footprint.versions,
+                "bytes_on_disk": footprint.bytes,
+                "last_run": history[0] if history else None,
+                "history": history,
+                "total_runs": self._total_runs,
+                "total_bytes_reclaimed": self._total_bytes_reclaimed,
+            }
+
+    # -- internals -----------------------------------------------------------
+
+    def _loop(self) -> None:
+        """Thread body: wake periodically (or on trigger) and compact if due."""
+        while not self._stopping.is_set():
+            self._wake.wait(self._check_seconds)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+
+            with self._lock:
+                manual = self._manual_requested
+                self._manual_requested = False
+            try:
+                reason = "manual" if manual else self.due_reason()
+                if reason is not None:
+                    self.run_now(reason)
+            except Exception as exc:
+                logger.warning("koji_maintenance.loop_error", error=str(exc))
+
+    def _trim_recent(self, now: float) -> None:
+        """Drop write timestamps older than the rate window. Caller holds the lock."""
+        cutoff = now - _WRITE_RATE_WINDOW_SECONDS
+        while self._recent_writes and self._recent_writes[0] < cutoff:
+            self._recent_writes.popleft()
@@ -0,0 +1,344 @@
+"""
+Per-statement instrumentation for Koji database calls.
+
+``KojiClient`` wraps its ``koji.Database`` handle in an
+:class:`InstrumentedDatabase`, so every ``query``, ``insert``,
+``update``, ``delete``, point lookup and graph call is timed, whether
+it goes through the client's public helpers or ``self._db`` directly.
+Statements are grouped by template (literals and ``IN`` lists
+collapsed to ``?``) into :class:`QueryStats`, which keeps a latency
+histogram, row and byte counts per template and logs statements that
+exceed the slow-query threshold with their parameters redacted.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Histogram bucket upper bounds in milliseconds; one overflow bucket follows.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (
+    1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000,
+)
+
+# Distinct templates tracked before new ones are folded into one row,
+# so ad-hoc SQL cannot grow the table without bound.
+_MAX_TEMPLATES = 512
+_OVERFLOW_TEMPLATE = "<other>"
+_MAX_TEMPLATE_CHARS = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce a SQL statement to its template.
+
+    String and numeric literals become ``?``, placeholder lists such as
+    ``IN (?, ?, ?)`` become ``(?...)`` and whitespace is collapsed, so
+    the same statement with different values maps to one template.
+
+    Args:
+        sql: SQL text.
+
+    Returns:
+        Normalized template, truncated to 500 characters.
+    """
+    template = _WHITESPACE.sub(" ", sql).strip()
+    template = _STRING_LITERAL.sub("?", template)
+    template = _NUMBER_LITERAL.sub("?", template)
+    template = _PLACEHOLDER_LIST.sub("(?...)", template)
+    return template[:_MAX_TEMPLATE_CHARS]
+
+
+def redact_params(params: Sequence[Any] | None) -> list[str]:
+    """Describe query parameters without revealing their values.
+
+    Args:
+        params: Positional query parameters.
+
+    Returns:
+        One ``<type>`` or ``<type:length>`` string per parameter.
+    """
+    redacted: list[str] = []
+    for value in params or ():
+        if value is None:
+            redacted.append("<null>")
+        elif isinstance(value, (str, bytes, bytearray, list, tuple)):
+            redacted.append(f"<{type(value).__name__}:{len(value)}>")
+        else:
+            redacted.append(f"<{type(value).__name__}>")
+    return redacted
+
+
+@dataclass
+class StatementStats:
+    """Aggregates for one statement template.
+
+    Attributes:
+        op: Operation (``query``, ``insert``, ``update``, ``delete``, ...).
+        count: Executions recorded.
+        errors: Executions that raised.
+        total_ms: Summed latency.
+        max_ms: Slowest execution.
+        rows: Rows returned or affected.
+        bytes: Arrow bytes returned (queries) or written (inserts).
+        buckets: Execution counts per :data:`LATENCY_BUCKETS_MS` bucket,
+            plus a final overflow bucket.
+    """
+
+    op: str
+    count: int = 0
+    errors: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def percentile(self, q: float) -> float:
+        """Estimate a latency percentile from the histogram.
+
+        Args:
+            q: Quantile in ``[0, 1]``.
+
+        Returns:
+            Upper bound of the bucket holding the quantile (``max_ms``
+            for the overflow bucket).
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return (
+                    min(float(LATENCY_BUCKETS_MS[i]), self.max_ms)
+                    if i < len(LATENCY_BUCKETS_MS) else self.max_ms
+                )
+        return self.max_ms
+
+    def to_dict(self, template: str) -> dict[str, Any]:
+        return {
+            "template": template,
+            "op": self.op,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "histogram": {
+                **{f"le_{bound:g}": n for bound, n in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                "le_inf": self.buckets[-1],
+            },
+        }
+
+
+class QueryStats:
+    """Thread-safe per-template latency, row and byte aggregates.
+
+    Args:
+        slow_query_ms: Statements at or above this latency are logged
+            with redacted parameters. ``0`` disables the slow-query log.
+    """
+
+    def __init__(self, slow_query_ms: float = 500.0) -> None:
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._statements: dict[tuple[str, str], StatementStats] = {}
+        self._slow_queries = 0
+
+    def record(
+        self,
+        op: str,
+        statement: str,
+        elapsed_ms: float,
+        rows: int = 0,
+        nbytes: int = 0,
+        params: Sequence[Any] | None = None,
+        error: bool = False,
+    ) -> None:
+        """Record one execution.
+
+        Args:
+            op: Operation name.
+            statement: SQL text or a synthetic statement such as
+                ``INSERT INTO pages``.
+            elapsed_ms: Execution latency.
+            rows: Rows returned or affected.
+            nbytes: Bytes returned or written.
+            params: Query parameters, used only for the redacted log.
+            error: Whether the execution raised.
+        """
+        template = normalize_sql(statement)
+        slow = 0 < self.slow_query_ms <= elapsed_ms
+        with self._lock:
+            key = (op, template)
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= _MAX_TEMPLATES:
+                    key = (op, _OVERFLOW_TEMPLATE)
+                    stats = self._statements.get(key)
+                if stats is None:
+                    stats = self._statements[key] = StatementStats(op=op)
+            stats.count += 1
+            stats.errors += int(error)
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.rows += rows
+            stats.bytes += nbytes
+            stats.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            self._slow_queries += int(slow)
+
+        if slow:
+            logger.warning(
+                "koji_client.slow_query",
+                op=op,
+                template=template,
+                elapsed_ms=round(elapsed_ms, 2),
+                rows=rows,
+                bytes=nbytes,
+                params=redact_params(params),
+                error=error,
+            )
+
+    def snapshot(self, limit: int | None = None) -> dict[str, Any]:
+        """Aggregates for every template, slowest total first.
+
+        Args:
+            limit: Return only the top *limit* templates (optional).
+
+        Returns:
+            Dict with ``slow_query_ms``, ``totals`` and ``statements``.
+        """
+        with self._lock:
+            items = sorted(
+                self._statements.items(), key=lambda item: item[1].total_ms, reverse=True,
+            )
+            statements = [stats.to_dict(template) for (_, template), stats in items]
+            totals = {
+                "statements": len(items),
+                "count": sum(s.count for _, s in items),
+                "errors": sum(s.errors for _, s in items),
+                "total_ms": round(sum(s.total_ms for _, s in items), 3),
+                "rows": sum(s.rows for _, s in items),
+                "bytes": sum(s.bytes for _, s in items),
+                "slow_queries": self._slow_queries,
+            }
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "totals": totals,
+            "statements": statements if limit is None else statements[:limit],
+        }
+
+    def reset(self) -> None:
+        """Discard all aggregates."""
+        with self._lock:
+            self._statements.clear()
+            self._slow_queries = 0
+
+
+class InstrumentedDatabase:
+    """Proxy around a ``koji.Database`` that records :class:`QueryStats`.
+
+    Statement methods are timed; every other attribute is forwarded
+    unchanged.
+
+    Args:
+        db: Open Koji database handle.
+        stats: Aggregates to record into.
+    """
+
+    def __init__(self, db: Any, stats: QueryStats) -> None:
+        self._db = db
+        self._stats = stats
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._db, name)
+
+    def query(self, sql: str, params: Sequence[Any] | None = None) -> Any:
+        return self._timed(
+            "query", sql, params, lambda: self._db.query(sql, params),
+            lambda result: (result.num_rows, result.nbytes),
+        )
+
+    def find_by_id(self, table: str, row_id: str) -> Any:
+        return self._timed(
+            "find_by_id", f"FIND {table} BY id", None,
+            lambda: self._db.find_by_id(table, row_id),
+            lambda row: (int(row is not None), 0),
+        )
+
+    def insert(self, table: str, data: Any) -> Any:
+        return self._timed(
+            "insert", f"INSERT INTO {table}", None, lambda: self._db.insert(table, data),
+            lambda _: (data.num_rows, data.nbytes),
+        )
+
+    def update(self, table: str, fields: dict[str, Any], condition: str) -> Any:
+        statement = f"UPDATE {table} SET {', '.join(sorted(fields))} WHERE {condition}"
+        return self._timed(
+            "update", statement, None, lambda: self._db.update(table, fields, condition),
+            lambda result: (getattr(result, "rows_updated", 0), 0),
+        )
+
+    def delete(self, table: str, condition: str) -> Any:
+        return self._timed(
+            "delete", f"DELETE FROM {table} WHERE {condition}", None,
+            lambda: self._db.delete(table, condition),
+            lambda result: (getattr(result, "rows_deleted", 0), 0),
+        )
+
+    def delete_cascade(self, table: str, condition: str) -> Any:
+        return self._timed(
+            "delete", f"DELETE CASCADE FROM {table} WHERE {condition}", None,
+            lambda: self._db.delete_cascade(table, condition),
+            lambda result: (getattr(result, "rows_deleted", 0), 0),
+        )
+
+    def graph(self, edge_query: str, algorithm: str, **kwargs: Any) -> Any:
+        return self._timed(
+            "graph", f"GRAPH {algorithm}", None,
+            lambda: self._db.graph(edge_query, algorithm, **kwargs),
+            lambda result: (result.num_rows, result.nbytes),
+        )
+
+    def _timed(
+        self,
+        op: str,
+        statement: str,
+        params: Sequence[Any] | None,
+        call: Callable[[], Any],
+        measure: Callable[[Any], tuple[int, int]],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._stats.record(op, statement, elapsed_ms, params=params, error=True)
+            raise
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        try:
+            rows, nbytes = measure(result)
+        except Exception:
+            rows, nbytes = 0, 0
+        self._stats.record(op, statement, elapsed_ms, rows, nbytes, params=params)
+        return result
@@ -0,0 +1,299 @@
+"""
+Bounded read-through cache for Koji row lookups.
+
+``KojiClient`` uses a :class:`RowCache` to serve repeated point reads
+(``get_document``, ``get_page``, ``get_chunk``) from memory. Each table
+gets its own LRU bounded by entry count and estimated bytes; writes
+through the client invalidate affected rows.
+
+The cache is shared by the API server's request threads, so every
+operation takes a lock. A per-table generation counter closes the race
+where a reader fetches a row, a writer invalidates it, and the reader
+then caches the stale copy.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+# Fixed per-entry overhead added to the estimated payload size.
+_ENTRY_OVERHEAD_BYTES = 256
+
+
+@dataclass
+class CacheStats:
+    """Counters for one cached table.
+
+    Attributes:
+        entries: Rows currently cached.
+        bytes: Estimated size of cached rows.
+        hits: Lookups served from the cache.
+        misses: Lookups that fell through to Koji.
+        evictions: Rows dropped to stay within bounds or after expiry.
+        invalidations: Rows dropped because of a write.
+    """
+
+    entries: int = 0
+    bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _Entry:
+    """A cached row plus the bookkeeping needed to invalidate it."""
+
+    value: Any
+    row_id: str
+    group: str | None
+    size: int
+    expires_at: float | None
+
+
+def estimate_size(value: Any) -> int:
+    """Roughly estimate the memory held by a row value.
+
+    Counts string and binary payloads plus a small constant per
+    container element; exact accounting is not needed for bounding.
+
+    Args:
+        value: Row dictionary or nested value.
+
+    Returns:
+        Estimated size in bytes.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(16 + estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sum(8 + estimate_size(v) for v in value)
+    return 8
+
+
+class _TableCache:
+    """LRU for a single table. Callers must hold the owning cache's lock."""
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self.by_row: dict[str, set[Hashable]] = {}
+        self.by_group: dict[str, set[str]] = {}
+        self.stats = CacheStats()
+        self.generation = 0
+
+    def remove(self, key: Hashable) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.stats.bytes -= entry.size
+        keys = self.by_row.get(entry.row_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_row[entry.row_id]
+                if entry.group is not None:
+                    rows = self.by_group.get(entry.group)
+                    if rows is not None:
+                        rows.discard(entry.row_id)
+                        if not rows:
+                            del self.by_group[entry.group]
+
+    def evict_to_bounds(self) -> None:
+        while self.entries and (
+            len(self.entries) > self.max_entries or self.stats.bytes > self.max_bytes
+        ):
+            oldest = next(iter(self.entries))
+            self.remove(oldest)
+            self.stats.evictions += 1
+
+
+class RowCache:
+    """Thread-safe, per-table LRU cache of row dictionaries.
+
+    Values are deep-copied on the way in and out so callers can mutate
+    what they receive without corrupting the cache.
+
+    Args:
+        max_entries: Maximum rows cached per table.
+        max_bytes: Maximum estimated bytes cached per table.
+        ttl_seconds: Expire rows after this many seconds (``0`` keeps
+            rows until evicted or invalidated). Bounds staleness from
+            writes made by other processes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float = 0.0,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._tables: dict[str, _TableCache] = {}
+        self._lock = threading.Lock()
+
+    def generation(self, table: str) -> int:
+        """Return the table's invalidation generation.
+
+        Capture this before reading from Koji and pass it to :meth:`put`;
+        the row is discarded if the table was invalidated in between.
+
+        Args:
+            table: Table name.
+        """
+        with self._lock:
+            return self._table(table).generation
+
+    def get(self, table: str, key: Hashable) -> Any | None:
+        """Look up a cached row, updating hit/miss counters.
+
+        Args:
+            table: Table name.
+            key: Cache key (row ID plus any projection).
+
+        Returns:
+            A copy of the cached value, or ``None`` on a miss.
+        """
+        with self._lock:
+            cache = self._table(table)
+            entry = cache.entries.get(key)
+            if entry is not None and entry.expires_at is not None:
+                if time.monotonic() >= entry.expires_at:
+                    cache.remove(key)
+                    cache.stats.evictions += 1
+                    entry = None
+            if entry is None:
+                cache.stats.misses += 1
+                return None
+            cache.entries.move_to_end(key)
+            cache.stats.hits += 1
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def put(
+        self,
+        table: str,
+        key: Hashable,
+        value: Any,
+        row_id: str,
+        generation: int,
+        group: str | None = None,
+    ) -> None:
+        """Cache a row read from Koji.
+
+        Args:
+            table: Table name.
+            key: Cache key (row ID plus any projection).
+            value: Row dictionary to cache.
+            row_id: Primary key used by :meth:`invalidate`.
+            generation: Value of :meth:`generation` taken before the read.
+            group: Optional parent ID (e.g. ``doc_id`` for pages) used by
+                :meth:`invalidate_group`.
+        """
+        size = estimate_size(value) + _ENTRY_OVERHEAD_BYTES
+        if size > self._max_bytes:
+            return
+        stored = copy.deepcopy(value)
+        expires_at = (
+            time.monotonic() + self._ttl_seconds if self._ttl_seconds > 0 else None
+        )
+
+        with self._lock:
+            cache = self._table(table)
+            if cache.generation != generation:
+                return
+            cache.remove(key)
+            cache.entries[key] = _Entry(stored, row_id, group, size, expires_at)
+            cache.stats.bytes += size
+            cache.by_row.setdefault(row_id, set()).add(key)
+            if group is not None:
+                cache.by_group.setdefault(group, set()).add(row_id)
+            cache.evict_to_bounds()
+
+    def invalidate(self, table: str, row_ids: Iterable[str]) -> None:
+        """Drop every cached variant of the given rows.
+
+        Args:
+            table: Table name.
+            row_ids: Primary keys of rows that changed.
+        """
+        with self._lock:
+            cache = self._table(table)
+            cache.generation += 1
+            for row_id in row_ids:
+                self._drop_row(cache, row_id)
+
+    def invalidate_group(self, table: str, group: str) -> None:
+        """Drop every cached row belonging to a parent ID.
+
+        Args:
+            table: Table name.
+            group: Parent ID passed to :meth:`put` (e.g. ``doc_id``).
+        """
+        with self._lock:
+            cache = self._table(table)
+            cache.generation += 1
+            for row_id in list(cache.by_group.get(group, ())):
+                self._drop_row(cache, row_id)
+
+    def clear(self, table: str | None = None) -> None:
+        """Drop all cached rows for *table*, or for every table.
+
+        Args:
+            table: Table name, or ``None`` for all tables.
+        """
+        with self._lock:
+            tables = [self._table(table)] if table else list(self._tables.values())
+            for cache in tables:
+                cache.generation += 1
+                cache.stats.invalidations += len(cache.entries)
+                for key in list(cache.entries):
+                    cache.remove(key)
+
+    def stats(self) -> dict[str, Any]:
+        """Return configured bounds and per-table counters.
+
+        Returns:
+            Dictionary with ``max_entries``, ``max_bytes``,
+            ``ttl_seconds``, and a ``tables`` mapping of counters.
+        """
+        with self._lock:
+            tables = {}
+            for name, cache in self._tables.items():
+                counters = asdict(cache.stats)
+                counters["entries"] = len(cache.entries)
+                tables[name] = counters
+        return {
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+            "ttl_seconds": self._ttl_seconds,
+            "tables": tables,
+        }
+
+    def _table(self, table: str) -> _TableCache:
+        """Return (creating if needed) the LRU for *table*. Caller holds the lock."""
+        cache = self._tables.get(table)
+        if cache is None:
+            cache = _TableCache(self._max_entries, self._max_bytes)
+            self._tables[table] = cache
+        return cache
+
+    @staticmethod
+    def _drop_row(cache: _TableCache, row_id: str) -> None:
+        """Remove every key cached for *row_id*. Caller holds the lock."""
+        for key in list(cache.by_row.get(row_id, ())):
+            cache.remove(key)
+            cache.stats.invalidations += 1
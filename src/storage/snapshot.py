@@ -0,0 +1,377 @@
+"""
+Snapshot export and restore for the Koji database.
+
+Streams the content tables (``projects``, ``documents``, ``pages``,
+``chunks``, ``doc_relations``) to one Arrow IPC or Parquet file per
+table, optionally zstd-compressed, next to a ``manifest.json``. Export
+reads through an open :class:`KojiClient` in primary-key order, one
+page at a time, so services keep serving and writing while it runs.
+Restore loads every table in parallel with large inserts and one final
+sync. Both directions report rows, bytes and MB/s per table.
+
+Usage:
+    python3 -m tkr_docusearch.storage.snapshot export DIR [--format arrow|parquet]
+        [--compression zstd|none] [--batch-size N]
+    python3 -m tkr_docusearch.storage.snapshot import DIR [--workers N] [--batch-size N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import structlog
+
+from .koji_client import DOCUSEARCH_SCHEMA, KojiClient
+
+logger = structlog.get_logger(__name__)
+
+# Tables in restore dependency order. ``processing_jobs`` is a transient
+# queue and is not part of a snapshot.
+SNAPSHOT_TABLES: tuple[str, ...] = ("projects", "documents", "pages", "chunks", "doc_relations")
+# Foreign-key parents, restored one after another before any child table.
+# The remaining tables only reference documents and load in parallel.
+_PARENT_TABLES: tuple[str, ...] = ("projects", "documents")
+SNAPSHOT_FORMATS: tuple[str, ...] = ("arrow", "parquet")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Rows per read page and per restore insert. Page rows carry image blobs,
+# so this bounds memory at roughly batch_size * largest row.
+DEFAULT_BATCH_SIZE = 500
+
+_FILE_SUFFIXES = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+def _primary_key(table: str) -> list[str]:
+    columns = DOCUSEARCH_SCHEMA[table]["columns"]
+    return [name for name, spec in columns.items() if spec.get("primary_key")]
+
+
+def _throughput(nbytes: int, seconds: float) -> float:
+    return round(nbytes / 1_000_000 / seconds, 2) if seconds > 0 else 0.0
+
+
+def _table_pages(client: KojiClient, table: str, batch_size: int) -> Iterator[pa.Table]:
+    """Read *table* in primary-key order, *batch_size* rows at a time."""
+    for batch in client.query_batches(
+        f"SELECT * FROM {table}", key=_primary_key(table), batch_size=batch_size,
+    ):
+        yield pa.Table.from_batches([batch])
+
+
+class _TableWriter:
+    """Append-only writer for one snapshot file."""
+
+    def __init__(
+        self, path: Path, schema: pa.Schema, fmt: str, compression: str | None,
+    ) -> None:
+        self.schema = schema
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(
+                str(path), schema, compression=compression or "none",
+            )
+            self._sink = None
+        else:
+            self._sink = pa.OSFile(str(path), "wb")
+            self._writer = pa.ipc.new_file(
+                self._sink, schema,
+                options=pa.ipc.IpcWriteOptions(compression=compression),
+            )
+
+    def write(self, table: pa.Table) -> None:
+        if table.schema != self.schema:
+            table = table.cast(self.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _read_batches(path: Path, fmt: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        yield from pq.ParquetFile(str(path)).iter_batches(batch_size=batch_size)
+        return
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
+
+
+def export_snapshot(
+    client: KojiClient,
+    path: str | Path,
+    fmt: str = "arrow",
+    compression: str | None = "zstd",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, Any]:
+    """Write every snapshot table to *path*.
+
+    Rows are read in primary-key order, one page at a time, so writers
+    are never blocked. Each table is read independently; rows written
+    to a table while it is being exported may or may not be included,
+    so quiesce ingestion first if cross-table consistency matters.
+
+    Args:
+        client: Open ``KojiClient``.
+        path: Output directory; created if missing, must not already
+            hold a snapshot.
+        fmt: ``"arrow"`` (Arrow IPC file) or ``"parquet"``.
+        compression: ``"zstd"``, ``"lz4"`` (Arrow only) or ``None``.
+        batch_size: Rows per read page and per written batch.
+
+    Returns:
+        The manifest: format, compression, creation time, totals with
+        ``mb_per_s``, and per-table ``rows``, ``bytes`` (uncompressed
+        Arrow), ``file_bytes``, ``seconds`` and ``mb_per_s``.
+
+    Raises:
+        ValueError: If *fmt* is unknown or *path* already holds a snapshot.
+    """
+    if fmt not in SNAPSHOT_FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}; expected one of {SNAPSHOT_FORMATS}")
+    out_dir = Path(path)
+    if (out_dir / MANIFEST_NAME).exists():
+        raise ValueError(f"Snapshot already exists at {out_dir}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    tables: dict[str, dict[str, Any]] = {}
+    for table in SNAPSHOT_TABLES:
+        table_started = time.perf_counter()
+        file_path = out_dir / f"{table}{_FILE_SUFFIXES[fmt]}"
+        schema = client.query(f"SELECT * FROM {table} LIMIT 0").schema
+        writer = _TableWriter(file_path, schema, fmt, compression)
+        rows = nbytes = 0
+        try:
+            for page in _table_pages(client, table, batch_size):
+                writer.write(page)
+                rows += page.num_rows
+                nbytes += page.nbytes
+        finally:
+            writer.close()
+
+        seconds = time.perf_counter() - table_started
+        tables[table] = {
+            "file": file_path.name,
+            "rows": rows,
+            "bytes": nbytes,
+            "file_bytes": file_path.stat().st_size,
+            "seconds": round(seconds, 3),
+            "mb_per_s": _throughput(nbytes, seconds),
+        }
+        logger.info("snapshot.table_exported", table=table, **tables[table])
+
+    seconds = time.perf_counter() - started
+    total_bytes = sum(t["bytes"] for t in tables.values())
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "format": fmt,
+        "compression": compression,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "rows": sum(t["rows"] for t in tables.values()),
+        "bytes": total_bytes,
+        "file_bytes": sum(t["file_bytes"] for t in tables.values()),
+        "seconds": round(seconds, 3),
+        "mb_per_s": _throughput(total_bytes, seconds),
+        "tables": tables,
+    }
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    logger.info(
+        "snapshot.exported",
+        path=str(out_dir),
+        **{k: v for k, v in manifest.items() if k != "tables"},
+    )
+    return manifest
+
+
+def _restore_table(
+    client: KojiClient,
+    table: str,
+    path: Path,
+    fmt: str,
+    batch_size: int,
+    skip_keys: set[str],
+) -> dict[str, Any]:
+    """Insert one snapshot file in ``batch_size``-row inserts without syncing."""
+    started = time.perf_counter()
+    keys = _primary_key(table)
+    rows = nbytes = 0
+    pending: list[pa.RecordBatch] = []
+    pending_rows = 0
+
+    def flush() -> None:
+        nonlocal rows, nbytes, pending, pending_rows
+        data = pa.Table.from_batches(pending)
+        # Koji primary keys are non-nullable; files may not say so.
+        schema = pa.schema([
+            f.with_nullable(False) if f.name in keys else f for f in data.schema
+        ])
+        data = data.cast(schema)
+        if skip_keys:
+            data = data.filter(pc.invert(pc.is_in(
+                data.column(keys[0]), value_set=pa.array(sorted(skip_keys)),
+            )))
+        if data.num_rows:
+            client.insert(table, data, sync=False)
+            rows += data.num_rows
+            nbytes += data.nbytes
+        pending, pending_rows = [], 0
+
+    for batch in _read_batches(path, fmt, batch_size):
+        if not batch.num_rows:
+            continue
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= batch_size:
+            flush()
+    if pending:
+        flush()
+
+    seconds = time.perf_counter() - started
+    return {
+        "rows": rows,
+        "bytes": nbytes,
+        "seconds": round(seconds, 3),
+        "mb_per_s": _throughput(nbytes, seconds),
+    }
+
+
+def import_snapshot(
+    client: KojiClient,
+    path: str | Path,
+    workers: int = 4,
+    batch_size: int = 5000,
+) -> dict[str, Any]:
+    """Restore a snapshot written by :func:`export_snapshot`.
+
+    ``projects`` and then ``documents`` load first, so every foreign key
+    target exists before the child tables (pages, chunks, relations)
+    load in parallel. Each table is written with large inserts that skip
+    the per-write sync; the database is synced once at the end. The target
+    must be empty apart from projects it already has (such as the seeded
+    ``default`` project), which are kept and skipped from the snapshot.
+
+    Args:
+        client: Open ``KojiClient`` on the target database.
+        path: Snapshot directory.
+        workers: Child tables restored concurrently.
+        batch_size: Rows per insert.
+
+    Returns:
+        Totals with ``mb_per_s`` and per-table ``rows``, ``bytes``,
+        ``seconds`` and ``mb_per_s``.
+
+    Raises:
+        FileNotFoundError: If *path* has no manifest.
+        ValueError: If the manifest is unsupported or a target table
+            other than ``projects`` already holds rows.
+    """
+    in_dir = Path(path)
+    manifest = json.loads((in_dir / MANIFEST_NAME).read_text())
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest.get('version')!r}")
+    fmt = manifest["format"]
+
+    skip: dict[str, set[str]] = {}
+    for table in manifest["tables"]:
+        if table not in SNAPSHOT_TABLES:
+            raise ValueError(f"Unknown snapshot table {table!r}")
+        key = _primary_key(table)[0]
+        limit = "" if table == "projects" else " LIMIT 1"
+        existing = client.query(f"SELECT {key} FROM {table}{limit}").column(key).to_pylist()
+        if existing and table != "projects":
+            raise ValueError(f"Cannot restore into non-empty table {table!r}")
+        skip[table] = set(existing)
+
+    def restore(table: str) -> dict[str, Any]:
+        return _restore_table(
+            client, table, in_dir / manifest["tables"][table]["file"], fmt,
+            batch_size, skip[table],
+        )
+
+    started = time.perf_counter()
+    tables = {
+        table: restore(table) for table in _PARENT_TABLES if table in manifest["tables"]
+    }
+    children = [table for table in manifest["tables"] if table not in tables]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {table: pool.submit(restore, table) for table in children}
+        tables.update({table: future.result() for table, future in futures.items()})
+    client.sync()
+    client.invalidate_caches()
+
+    seconds = time.perf_counter() - started
+    total_bytes = sum(t["bytes"] for t in tables.values())
+    report = {
+        "format": fmt,
+        "rows": sum(t["rows"] for t in tables.values()),
+        "bytes": total_bytes,
+        "seconds": round(seconds, 3),
+        "mb_per_s": _throughput(total_bytes, seconds),
+        "tables": tables,
+    }
+    logger.info(
+        "snapshot.imported",
+        **{k: v for k, v in report.items() if k != "tables"},
+    )
+    return report
+
+
+def main() -> None:
+    """Export or import a snapshot of the database at ``KOJI_DB_PATH``."""
+    parser = argparse.ArgumentParser(description="Export or restore a Koji snapshot")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_cmd = commands.add_parser("export", help="Write a snapshot directory")
+    export_cmd.add_argument("path", help="Output directory")
+    export_cmd.add_argument("--format", choices=SNAPSHOT_FORMATS, default="arrow")
+    export_cmd.add_argument(
+        "--compression", choices=("zstd", "lz4", "none"), default="zstd",
+    )
+    export_cmd.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    import_cmd = commands.add_parser("import", help="Restore a snapshot into an empty database")
+    import_cmd.add_argument("path", help="Snapshot directory")
+    import_cmd.add_argument("--workers", type=int, default=4, help="Tables restored in parallel")
+    import_cmd.add_argument("--batch-size", type=int, default=5000, help="Rows per insert")
+    args = parser.parse_args()
+
+    from ..config.koji_config import KojiConfig
+
+    client = KojiClient(KojiConfig.from_env())
+    client.open()
+    try:
+        if args.command == "export":
+            report = export_snapshot(
+                client, args.path, fmt=args.format,
+                compression=None if args.compression == "none" else args.compression,
+                batch_size=args.batch_size,
+            )
+        else:
+            report = import_snapshot(
+                client, args.path, workers=args.workers, batch_size=args.batch_size,
+            )
+    finally:
+        client.close()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
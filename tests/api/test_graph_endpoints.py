@@ -3,7 +3,7 @@
 Tests the /api/graph/* endpoints using FastAPI TestClient with a real
 Koji database (file-based via tmp_path).
 
-Covers all 8 graph endpoints:
+Covers all 9 graph endpoints:
     - GET /api/graph/overview
     - GET /api/graph/neighborhood/{doc_id}
     - GET /api/graph/path
@@ -12,6 +12,7 @@ Covers all 8 graph endpoints:
     - GET /api/graph/similar/{doc_id}
     - GET /api/graph/edges
     - GET /api/graph/reading-order
+    - GET /api/graph/stats
 """
 
 import pytest
@@ -548,6 +549,35 @@ class TestReadingOrder:
         assert data["total"] == 0
 
 
+class TestGraphStats:
+    """Tests for the stats endpoint and graph algorithm caching."""
+
+    def test_repeated_requests_hit_cache(self, koji_client, test_client):
+        """A repeated reading-order request is served from the cache until a write."""
+        for name in ["st-A", "st-B", "st-C"]:
+            koji_client.create_document(
+                doc_id=name, filename=f"{name}.pdf", format="pdf"
+            )
+        koji_client.create_relation("st-A", "st-B", "references")
+
+        first = test_client.get("/api/graph/reading-order").json()
+        second = test_client.get("/api/graph/reading-order").json()
+        assert first == second
+
+        stats = test_client.get("/api/graph/stats").json()
+        cache = stats["algorithm_cache"]
+        assert cache["algorithms"]["has_cycle"]["hits"] == 1
+        assert cache["algorithms"]["has_cycle"]["misses"] == 1
+        assert cache["hit_rate"] == 0.5
+        assert stats["graph"]["edges"] == 1
+
+        # A new edge changes the graph version, so results are recomputed.
+        koji_client.create_relation("st-B", "st-C", "references")
+        test_client.get("/api/graph/reading-order")
+        cache = test_client.get("/api/graph/stats").json()["algorithm_cache"]
+        assert cache["algorithms"]["has_cycle"]["misses"] == 2
+
+
 # ---------------------------------------------------------------------------
 # Edge cases and error handling
 # ---------------------------------------------------------------------------
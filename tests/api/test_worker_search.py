@@ -8,6 +8,8 @@ Tests the search HTTP contract on the worker FastAPI app:
 - n_results pass-through
 - 503 when the search engine is not ready
 - Request validation (empty query, out-of-range n_results)
+- Cached searches missing after /delete
+- Two-stage recall report
 
 These tests use FastAPI TestClient against the worker app with patched
 module-level globals to avoid starting real services or loading embeddings.
@@ -227,6 +229,148 @@ class TestWorkerSearch:
         assert "not ready" in response.json()["detail"].lower()
 
 
+class TestWorkerSearchPagination:
+    """Cursor pagination via paginate=true and GET /search/next."""
+
+    def test_paginated_search_returns_cursor(self, test_client):
+        """paginate is forwarded and the cursor fields are returned."""
+        client, mock_search = test_client
+        mock_search.search.return_value = {
+            **_make_search_response(results=[_make_search_result(doc_id="doc-1")]),
+            "next_cursor": "abc", "offset": 0, "total_candidates": 40,
+        }
+
+        response = client.post("/search", json={"query": "q", "n_results": 1, "paginate": True})
+
+        assert response.status_code == 200
+        mock_search.search.assert_called_once_with(
+            query="q", n_results=1, search_mode="hybrid", paginate=True,
+        )
+        data = response.json()
+        assert data["next_cursor"] == "abc"
+        assert data["total_candidates"] == 40
+
+    def test_next_page_slices_without_searching(self, test_client):
+        """GET /search/next calls next_page only and keeps the API mode name."""
+        client, mock_search = test_client
+        mock_search.next_page.return_value = {
+            **_make_search_response(results=[_make_search_result(doc_id="doc-2", page=4)]),
+            "query": "q", "search_mode": "text_only",
+            "next_cursor": None, "offset": 10, "total_candidates": 11,
+        }
+
+        response = client.get("/search/next", params={"cursor": "abc"})
+
+        assert response.status_code == 200
+        mock_search.next_page.assert_called_once_with("abc")
+        mock_search.search.assert_not_called()
+        data = response.json()
+        assert data["query"] == "q"
+        assert data["search_mode"] == "text"
+        assert data["results"][0]["page_num"] == 4
+        assert data["offset"] == 10
+        assert data["next_cursor"] is None
+
+    def test_next_page_expired_and_malformed_cursors(self, test_client):
+        """Expired cursors are 404, malformed ones 400."""
+        client, mock_search = test_client
+
+        mock_search.next_page.return_value = None
+        assert client.get("/search/next", params={"cursor": "gone"}).status_code == 404
+
+        mock_search.next_page.side_effect = ValueError("Malformed search cursor")
+        assert client.get("/search/next", params={"cursor": "!!"}).status_code == 400
+
+
+class TestWorkerSearchBatch:
+    """POST /search/batch endpoint behaviour."""
+
+    def test_batch_returns_one_response_per_query(self, test_client):
+        """All searches go to search_many at once; failures stay per-query."""
+        client, mock_search = test_client
+        mock_search.search_many.return_value = {
+            "responses": [
+                _make_search_response(
+                    results=[_make_search_result(doc_id="doc-1", page=2)],
+                    total_time_ms=12.0,
+                ),
+                {"query": "broken", "error": "scan failed"},
+            ],
+            "embed_time_ms": 8.0,
+            "total_time_ms": 30.0,
+        }
+
+        response = client.post("/search/batch", json={"searches": [
+            {"query": "revenue", "search_mode": "text", "n_results": 5},
+            {"query": "broken"},
+        ]})
+
+        assert response.status_code == 200
+        data = response.json()
+        mock_search.search_many.assert_called_once_with([
+            {"query": "revenue", "n_results": 5, "search_mode": "text_only"},
+            {"query": "broken", "n_results": 10, "search_mode": "hybrid"},
+        ])
+        assert data["total_queries"] == 2
+        assert data["embed_time_ms"] == 8.0
+        assert data["search_time_ms"] == 30.0
+
+        first, second = data["responses"]
+        assert first["query"] == "revenue"
+        assert first["results"][0]["page_num"] == 2
+        assert second == {
+            "query": "broken", "results": [], "total_results": 0, "error": "scan failed",
+        }
+
+    def test_batch_invalid_search_returns_400(self, test_client):
+        """A ValueError from search_many is reported as a bad request."""
+        client, mock_search = test_client
+        mock_search.search_many.side_effect = ValueError("searches[0]: bad filter")
+
+        response = client.post("/search/batch", json={"searches": [{"query": "q"}]})
+
+        assert response.status_code == 400
+
+    def test_batch_size_limits(self, test_client):
+        """Empty batches and batches over SEARCH_BATCH_MAX_QUERIES are rejected."""
+        client, _mock_search = test_client
+        too_many = [{"query": "q"}] * (ww.SEARCH_BATCH_MAX_QUERIES + 1)
+
+        assert client.post("/search/batch", json={"searches": []}).status_code == 422
+        assert client.post("/search/batch", json={"searches": too_many}).status_code == 422
+
+
+class TestWorkerSearchRecall:
+    """POST /search/recall endpoint behaviour."""
+
+    def test_recall_reports_measure_recall(self, test_client):
+        """Queries and settings are passed to measure_recall; its report is returned."""
+        client, mock_search = test_client
+        mock_search.measure_recall.return_value = {"queries": 2, "recall": 0.9}
+
+        response = client.post("/search/recall", json={
+            "queries": ["revenue", "churn"], "search_mode": "text", "candidates": 200,
+        })
+
+        assert response.status_code == 200
+        assert response.json() == {"queries": 2, "recall": 0.9}
+        mock_search.measure_recall.assert_called_once_with(
+            ["revenue", "churn"], n_results=10, search_mode="text_only", candidates=200,
+        )
+
+
+class TestWorkerShutdown:
+    """Shutdown hook releases the search engine."""
+
+    def test_shutdown_closes_search_engine(self, test_client):
+        """The cached KojiSearch is closed so its thread pools stop."""
+        _, mock_search = test_client
+
+        asyncio.run(ww.shutdown_event())
+
+        mock_search.close.assert_called_once_with()
+
+
 # ============================================================================
 # Request Validation Tests
 # ============================================================================
@@ -258,3 +402,67 @@ class TestSearchRequestValidation:
         response = client.post("/search", json={"query": "q", "n_results": 101})
 
         assert response.status_code == 422
+
+
+# ============================================================================
+# Result Cache Invalidation Tests
+# ============================================================================
+
+
+class TestSearchCacheInvalidation:
+    """/delete goes through the shared client, so cached searches miss afterwards."""
+
+    def test_delete_invalidates_cached_search(self, test_client, monkeypatch):
+        """A search repeated after /delete re-runs instead of serving the deleted doc."""
+        import numpy as np
+        import pyarrow as pa
+
+        from src.core.testing.mocks import MockKojiClient
+        from src.search.koji_search import KojiSearch
+        from src.search.result_cache import SearchResultCache
+
+        class _ScanningKoji(MockKojiClient):
+            scans = 0
+
+            def query(self, sql, params=None):
+                if "<~>" not in sql:
+                    return super().query(sql, params)
+                self.scans += 1
+                docs = list(self._documents)
+                return pa.table({
+                    "id": [f"{d}-c0" for d in docs], "doc_id": docs,
+                    "page_num": [1] * len(docs), "text": ["t"] * len(docs),
+                    "context": [None] * len(docs),
+                    "filename": [self._documents[d]["filename"] for d in docs],
+                    "format": ["pdf"] * len(docs), "_distance": [0.1] * len(docs),
+                })
+
+        client, _mock_search = test_client
+        koji = _ScanningKoji()
+        koji.open()
+        koji.create_document(doc_id="doc-1", filename="report.pdf", format="pdf")
+        embedder = MagicMock()
+        embedder.embed_query.return_value = np.ones((1, 2), dtype=np.float32)
+        ww.koji_client = koji
+        ww.app.state.search_engine = KojiSearch(
+            koji_client=koji, shikomi_client=embedder, result_cache=SearchResultCache(),
+        )
+        for helper in (
+            "delete_document_images", "delete_document_cover_art",
+            "delete_document_markdown", "cleanup_temp_directories",
+        ):
+            monkeypatch.setattr(ww, helper, lambda doc_id: 0)
+
+        body = {"query": "report", "search_mode": "text"}
+        assert client.post("/search", json=body).json()["total_results"] == 1
+        assert client.post("/search", json=body).json()["total_results"] == 1
+        assert koji.scans == 1
+
+        response = client.post(
+            "/delete", json={"file_path": "/uploads/report.pdf", "filename": "report.pdf"},
+        )
+        assert response.status_code == 200
+        assert response.json()["doc_id"] == "doc-1"
+
+        assert client.post("/search", json=body).json()["total_results"] == 0
+        assert koji.scans == 2
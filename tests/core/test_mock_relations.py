@@ -42,6 +42,27 @@ class TestMockRelations:
         assert relations[0]["dst_doc_id"] == "doc-B"
         assert relations[0]["relation_type"] == "references"
 
+    def test_create_relations_bulk(self, client):
+        """Bulk creation skips duplicates and missing docs, or replaces."""
+        _create_two_docs(client)
+        client.create_relation("doc-A", "doc-B", "references", metadata={"v": 1})
+
+        rows = [
+            {"src_doc_id": "doc-A", "dst_doc_id": "doc-B", "relation_type": "references",
+             "metadata": {"v": 2}},
+            {"src_doc_id": "doc-B", "dst_doc_id": "doc-A", "relation_type": "references"},
+            {"src_doc_id": "doc-B", "dst_doc_id": "doc-A", "relation_type": "references"},
+            {"src_doc_id": "doc-A", "dst_doc_id": "ghost", "relation_type": "references"},
+        ]
+        assert client.create_relations_bulk(rows) == {
+            "created": 1, "replaced": 0, "skipped": 3,
+        }
+        assert client.create_relations_bulk(rows[:1], on_conflict="replace") == {
+            "created": 0, "replaced": 1, "skipped": 0,
+        }
+        outgoing = client.get_relations("doc-A", direction="outgoing")
+        assert outgoing[0]["metadata"] == {"v": 2}
+
     def test_create_relation_missing_doc(self, client):
         """ValueError when a referenced document does not exist."""
         client.create_document(doc_id="doc-A", filename="a.pdf", format="pdf")
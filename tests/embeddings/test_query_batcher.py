@@ -0,0 +1,155 @@
+"""Tests for micro-batched query encoding."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.embeddings.query_batcher import QueryBatcher
+
+
+class _RecordingEncoder:
+    """Encodes each query as a 1x1 matrix holding its length."""
+
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        self.batches: list[list[str]] = []
+        self.threads: set[str] = set()
+        self._gate = gate
+
+    def __call__(self, queries: list[str]) -> list[np.ndarray]:
+        if self._gate is not None:
+            self._gate.wait(5)
+        self.batches.append(list(queries))
+        self.threads.add(threading.current_thread().name)
+        return [np.full((1, 1), len(q), dtype=np.float32) for q in queries]
+
+
+def _encode_concurrently(batcher: QueryBatcher, queries: list[str]) -> list[np.ndarray]:
+    results: list[np.ndarray | None] = [None] * len(queries)
+
+    def worker(i: int) -> None:
+        results[i] = batcher.encode(queries[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(queries))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    return results
+
+
+def test_concurrent_queries_share_one_batch():
+    """Queries arriving within the window are encoded together and fanned out."""
+    encoder = _RecordingEncoder()
+    batcher = QueryBatcher(encoder, window_ms=200, max_batch_size=8)
+    batcher.start()
+    try:
+        queries = ["a", "bb", "ccc", "bb"]
+        results = _encode_concurrently(batcher, queries)
+    finally:
+        batcher.stop()
+
+    assert [int(r[0, 0]) for r in results] == [1, 2, 3, 2]
+    assert len(encoder.batches) == 1
+    assert sorted(encoder.batches[0]) == ["a", "bb", "ccc"]
+    assert encoder.threads == {"query-encoder"}
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["queries"] == 4
+    assert stats["largest_batch"] == 4
+
+
+def test_max_batch_size_splits_batches():
+    """No encode call receives more than max_batch_size queries."""
+    gate = threading.Event()
+    encoder = _RecordingEncoder(gate)
+    batcher = QueryBatcher(encoder, window_ms=50, max_batch_size=2)
+    batcher.start()
+    try:
+        gate.set()
+        results = _encode_concurrently(batcher, [f"q{i}" for i in range(5)])
+    finally:
+        batcher.stop()
+
+    assert all(r is not None for r in results)
+    assert all(len(batch) <= 2 for batch in encoder.batches)
+    assert sum(len(batch) for batch in encoder.batches) == 5
+
+
+def test_encoder_error_propagates_to_callers():
+    """A failing batch raises in every caller and the thread keeps serving."""
+    calls = []
+
+    def encode(queries):
+        calls.append(queries)
+        if len(calls) == 1:
+            raise RuntimeError("model exploded")
+        return [np.zeros((1, 1), dtype=np.float32) for _ in queries]
+
+    batcher = QueryBatcher(encode, window_ms=0)
+    batcher.start()
+    try:
+        with pytest.raises(RuntimeError, match="model exploded"):
+            batcher.encode("first")
+        assert batcher.encode("second").shape == (1, 1)
+    finally:
+        batcher.stop()
+
+
+def test_encode_requires_running_thread():
+    """encode() before start() or after stop() raises."""
+    batcher = QueryBatcher(_RecordingEncoder())
+    with pytest.raises(RuntimeError, match="not running"):
+        batcher.encode("q")
+    batcher.start()
+    batcher.stop()
+    with pytest.raises(RuntimeError, match="not running"):
+        batcher.encode("q")
+
+
+def test_encode_many_shares_batches_in_order():
+    """encode_many enqueues all queries at once and returns them in order."""
+    encoder = _RecordingEncoder()
+    batcher = QueryBatcher(encoder, window_ms=0, max_batch_size=2)
+    batcher.start()
+    try:
+        results = batcher.encode_many(["a", "bbb", "cc"])
+    finally:
+        batcher.stop()
+
+    assert [int(r[0, 0]) for r in results] == [1, 3, 2]
+    assert encoder.batches == [["a", "bbb"], ["cc"]]
+
+
+def test_encode_racing_stop_never_hangs():
+    """Requests submitted while stop() runs are encoded or fail, never left waiting."""
+    outcomes: list[str] = []
+    lock = threading.Lock()
+
+    for _ in range(20):
+        batcher = QueryBatcher(_RecordingEncoder(), window_ms=0)
+        batcher.start()
+        go = threading.Event()
+
+        def worker() -> None:
+            go.wait(5)
+            try:
+                batcher.encode("q")
+                outcome = "encoded"
+            except RuntimeError:
+                outcome = "stopped"
+            with lock:
+                outcomes.append(outcome)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(4)]
+        for t in threads:
+            t.start()
+        go.set()
+        batcher.stop()
+        for t in threads:
+            t.join(5)
+        assert not any(t.is_alive() for t in threads)
+
+    assert len(outcomes) == 80
@@ -0,0 +1,82 @@
+"""Tests for the query embedding cache."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.embeddings import query_cache
+from src.embeddings.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def _key(text: str) -> tuple[str, str, str]:
+    return (normalize_query(text), "model", "4bit")
+
+
+def _matrix(rows: int = 4, dim: int = 8) -> np.ndarray:
+    return np.ones((rows, dim), dtype=np.float32)
+
+
+def test_normalize_query():
+    """Whitespace collapses and Unicode is NFC; case is kept."""
+    assert normalize_query("  Café\t  prices \n") == "Café prices"
+    assert normalize_query("Cafe\u0301") == "Café"
+    assert normalize_query("ABC") != normalize_query("abc")
+
+
+def test_get_and_put_count_hits_and_misses():
+    """Lookups are counted and returned arrays are read-only."""
+    cache = QueryEmbeddingCache()
+    assert cache.get(_key("q")) is None
+
+    cache.put(_key("q"), _matrix())
+    hit = cache.get(_key("q"))
+
+    assert hit.dtype == np.float32
+    assert not hit.flags.writeable
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == _matrix().nbytes
+
+
+def test_bounds_evict_least_recently_used():
+    """Entry and byte limits evict the oldest unused entries."""
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put(_key("a"), _matrix())
+    cache.put(_key("b"), _matrix())
+    cache.get(_key("a"))
+    cache.put(_key("c"), _matrix())
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is not None
+
+    small = QueryEmbeddingCache(max_bytes=_matrix().nbytes * 2)
+    for text in ("a", "b", "c"):
+        small.put(_key(text), _matrix())
+    assert small.stats()["entries"] == 2
+    assert small.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    """Entries older than the TTL are dropped on lookup."""
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    cache = QueryEmbeddingCache(ttl_seconds=60)
+    cache.put(_key("q"), _matrix())
+
+    now[0] += 61
+    assert cache.get(_key("q")) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_save_and_reload(tmp_path):
+    """Persisted entries survive a restart; corrupt files are ignored."""
+    path = tmp_path / "cache.npz"
+    cache = QueryEmbeddingCache(persist_path=path)
+    cache.put(_key("q"), _matrix(3, 5) * 2)
+    assert cache.save() == 1
+
+    reloaded = QueryEmbeddingCache(persist_path=path)
+    np.testing.assert_array_equal(reloaded.get(_key("q")), _matrix(3, 5) * 2)
+
+    path.write_bytes(b"not an npz")
+    assert QueryEmbeddingCache(persist_path=path).stats()["entries"] == 0
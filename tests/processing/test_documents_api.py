@@ -306,6 +306,38 @@ def test_get_image_caching_headers(client, temp_image_dir):
     assert "max-age=86400" in response.headers["cache-control"]
 
 
+def test_get_image_from_db_thumb_vs_full(client, monkeypatch, temp_image_dir):
+    """DB-served thumbnails read pages.thumb; full images read pages.image."""
+    from tkr_docusearch.core.testing.mocks import MockKojiClient
+
+    doc_id = "db-only-doc-1234"
+    mock_client = MockKojiClient()
+    mock_client.insert_pages([
+        {"id": f"{doc_id}-page001", "doc_id": doc_id, "page_num": 1,
+         "image": b"\x89PNG-full", "thumb": b"\xff\xd8-thumb"},
+        {"id": f"{doc_id}-page002", "doc_id": doc_id, "page_num": 2,
+         "image": b"\x89PNG-full-2"},
+    ])
+
+    import tkr_docusearch.processing.documents_api as api_module
+
+    monkeypatch.setattr(api_module, "get_storage_client", lambda: mock_client)
+
+    response = client.get(f"/images/{doc_id}/page001_thumb.jpg")
+    assert response.status_code == 200
+    assert response.content == b"\xff\xd8-thumb"
+    assert response.headers["content-type"] == "image/jpeg"
+
+    response = client.get(f"/images/{doc_id}/page001.png")
+    assert response.content == b"\x89PNG-full"
+    assert response.headers["content-type"] == "image/png"
+
+    # Pages without a stored thumbnail fall back to the full image
+    response = client.get(f"/images/{doc_id}/page002_thumb.jpg")
+    assert response.content == b"\x89PNG-full-2"
+    assert response.headers["content-type"] == "image/png"
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
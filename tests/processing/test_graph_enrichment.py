@@ -311,7 +311,7 @@ class TestComputeSameTopic:
     def test_same_topic_returns_zero_on_mock(self, mock_client, service):
         """MockKojiClient raises KojiQueryError for raw SQL.
 
-        compute_same_topic calls _build_doc_heading_sets which uses query().
+        compute_same_topic calls _build_doc_heading_sets which uses query_batches().
         KojiQueryError is caught internally, returning an empty heading map,
         so the method returns 0 without crashing.
         """
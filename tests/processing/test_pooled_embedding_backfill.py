@@ -0,0 +1,69 @@
+"""
+Unit tests for the pooled_embedding backfill.
+
+Tests cover:
+- Mean-pooled, normalized vectors written for pages and chunks
+- Rows without an embedding, or already pooled, left alone
+- Dry-run mode
+"""
+
+import numpy as np
+import pytest
+
+from tkr_docusearch.core.testing.mocks import MockKojiClient
+from tkr_docusearch.processing.pooled_embedding_backfill import backfill_pooled_embeddings
+from tkr_docusearch.storage.koji_client import (
+    pack_multivec,
+    pool_multivec,
+    unpack_multivec_array,
+)
+
+_TOKENS = np.array([[3.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+
+
+@pytest.fixture
+def storage():
+    """Mock client with pages and chunks from before pooled vectors existed."""
+    client = MockKojiClient()
+    client.insert_pages([
+        {"id": "pool-doc-a-page001", "doc_id": "pool-doc-a", "page_num": 1,
+         "embedding": pack_multivec(_TOKENS)},
+        {"id": "pool-doc-a-page002", "doc_id": "pool-doc-a", "page_num": 2},
+    ])
+    client.insert_chunks([
+        {"id": "pool-doc-a-chunk0", "doc_id": "pool-doc-a", "page_num": 1, "text": "a",
+         "embedding": pack_multivec(_TOKENS)},
+        {"id": "pool-doc-a-chunk1", "doc_id": "pool-doc-a", "page_num": 1, "text": "b",
+         "embedding": pack_multivec(_TOKENS), "pooled_embedding": b"existing"},
+    ])
+    return client
+
+
+def test_pool_multivec_is_normalized_mean():
+    """The pooled vector is the L2-normalized token mean, packed as 1 x dim."""
+    pooled = unpack_multivec_array(pool_multivec(pack_multivec(_TOKENS)))
+
+    np.testing.assert_allclose(pooled, [[1.0, 0.0]])
+    assert pool_multivec(None) is None
+
+
+def test_backfill_fills_missing_pooled_vectors(storage):
+    """Only rows with an embedding and no pooled vector are written."""
+    report = backfill_pooled_embeddings(storage, batch_size=1)
+
+    assert report == {
+        "pages": {"scanned": 1, "updated": 1, "failed": 0},
+        "chunks": {"scanned": 1, "updated": 1, "failed": 0},
+    }
+    page = storage.get_pages_for_document("pool-doc-a")[0]
+    np.testing.assert_allclose(unpack_multivec_array(page["pooled_embedding"]), [[1.0, 0.0]])
+    assert storage.get_chunk("pool-doc-a-chunk1")["pooled_embedding"] == b"existing"
+    assert storage.list_rows_missing_pooled("chunks") == []
+
+
+def test_dry_run_writes_nothing(storage):
+    """Dry-run counts rows without updating them."""
+    report = backfill_pooled_embeddings(storage, dry_run=True)
+
+    assert report["pages"]["updated"] == 1
+    assert len(storage.list_rows_missing_pooled("pages")) == 1
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import numpy as np
@@ -9,6 +10,7 @@ import pytest
 
 from shikomi.types import MultiVectorEmbedding
 
+from src.embeddings.query_cache import QueryEmbeddingCache
 from src.embeddings.query_engine import QueryEngine
 
 
@@ -34,18 +36,17 @@ def _make_mock_engine() -> MagicMock:
 class TestEmbedQuery:
     """Tests for QueryEngine.embed_query."""
 
-    def test_returns_nested_lists(self) -> None:
-        """embed_query returns list[list[float]]."""
+    def test_returns_float32_matrix(self) -> None:
+        """embed_query returns the (num_tokens, dim) float32 array."""
         engine = _make_mock_engine()
         qe = QueryEngine(engine=engine)
         qe.connect()
 
         result = qe.embed_query("what is the quarterly revenue?")
 
-        assert isinstance(result, list)
-        assert len(result) == 32
-        assert isinstance(result[0], list)
-        assert isinstance(result[0][0], float)
+        assert isinstance(result, np.ndarray)
+        assert result.shape == (32, 128)
+        assert result.dtype == np.float32
 
         qe.close()
 
@@ -72,6 +73,122 @@ class TestEmbedQuery:
         qe.close()
 
 
+class TestEmbedQueryCache:
+    """Tests for the query embedding cache in embed_query."""
+
+    def test_repeated_query_skips_model(self) -> None:
+        """A repeated (whitespace-normalized) query is served from cache."""
+        engine = _make_mock_engine()
+        qe = QueryEngine(engine=engine, cache=QueryEmbeddingCache())
+        qe.connect()
+
+        first = qe.embed_query("quarterly revenue")
+        second = qe.embed_query("  quarterly   revenue ")
+
+        assert engine.encode_queries.await_count == 1
+        np.testing.assert_array_equal(first, second)
+        assert not second.flags.writeable
+        stats = qe.health_check()["cache"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        qe.close()
+
+    def test_disabled_cache_always_runs_model(self) -> None:
+        """max_entries=0 disables caching."""
+        engine = _make_mock_engine()
+        qe = QueryEngine(engine=engine, cache=QueryEmbeddingCache(max_entries=0))
+        qe.connect()
+
+        qe.embed_query("revenue")
+        qe.embed_query("revenue")
+
+        assert engine.encode_queries.await_count == 2
+        qe.close()
+
+    def test_close_persists_cache(self, tmp_path) -> None:
+        """close() writes the cache file, which a new engine reuses."""
+        path = tmp_path / "query_cache.npz"
+        qe = QueryEngine(engine=_make_mock_engine(), cache=QueryEmbeddingCache(persist_path=path))
+        qe.connect()
+        qe.embed_query("revenue")
+        qe.close()
+
+        engine = _make_mock_engine()
+        restarted = QueryEngine(engine=engine, cache=QueryEmbeddingCache(persist_path=path))
+        restarted.connect()
+        restarted.embed_query("revenue")
+
+        engine.encode_queries.assert_not_awaited()
+        restarted.close()
+
+
+class TestEmbedQueryBatching:
+    """Tests for micro-batching concurrent embed_query calls."""
+
+    def test_concurrent_queries_share_one_encode_call(self) -> None:
+        """Queries from several threads are encoded in one batch."""
+
+        async def encode(queries):
+            return [
+                MultiVectorEmbedding(
+                    num_tokens=1, dim=4, data=np.full((1, 4), len(q), dtype=np.float32),
+                )
+                for q in queries
+            ]
+
+        engine = MagicMock()
+        engine.encode_queries = AsyncMock(side_effect=encode)
+        qe = QueryEngine(
+            engine=engine, cache=QueryEmbeddingCache(max_entries=0),
+            batch_window_ms=200, max_batch_size=8,
+        )
+        qe.connect()
+
+        queries = ["a", "bb", "ccc"]
+        results: dict[str, np.ndarray] = {}
+        threads = [
+            threading.Thread(target=lambda q=q: results.__setitem__(q, qe.embed_query(q)))
+            for q in queries
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        assert engine.encode_queries.await_count == 1
+        assert sorted(engine.encode_queries.await_args.args[0]) == queries
+        for q in queries:
+            assert results[q][0, 0] == len(q)
+        assert qe.health_check()["batching"]["largest_batch"] == 3
+        qe.close()
+
+    def test_embed_queries_encodes_misses_together(self) -> None:
+        """embed_queries serves hits from cache and encodes misses in one call."""
+
+        async def encode(queries):
+            return [
+                MultiVectorEmbedding(
+                    num_tokens=1, dim=4, data=np.full((1, 4), len(q), dtype=np.float32),
+                )
+                for q in queries
+            ]
+
+        engine = MagicMock()
+        engine.encode_queries = AsyncMock(side_effect=encode)
+        qe = QueryEngine(engine=engine, cache=QueryEmbeddingCache(), batch_window_ms=0)
+        qe.connect()
+        qe.embed_query("bb")
+
+        results = qe.embed_queries(["a", "bb", "ccc"])
+
+        assert engine.encode_queries.await_count == 2
+        assert engine.encode_queries.await_args.args[0] == ["a", "ccc"]
+        assert [r[0, 0] for r in results] == [1, 2, 3]
+        with pytest.raises(ValueError, match="Query cannot be empty"):
+            qe.embed_queries(["ok", " "])
+        qe.close()
+
+
 # ---------------------------------------------------------------------------
 # Lifecycle tests
 # ---------------------------------------------------------------------------
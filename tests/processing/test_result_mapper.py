@@ -257,6 +257,18 @@ class TestMapPageRecords:
 
         assert "image" not in records[0]
 
+    def test_with_thumbs(self) -> None:
+        """Thumbnail bytes are mapped to 'thumb'; missing ones are omitted."""
+        embs = [_make_embedding(), _make_embedding()]
+        records = map_page_records(
+            doc_id="doc-thumbs",
+            visual_embeddings=embs,
+            page_thumbs=[b"\xff\xd8-thumb1", None],
+        )
+
+        assert records[0]["thumb"] == b"\xff\xd8-thumb1"
+        assert "thumb" not in records[1]
+
     def test_doc_id_propagated(self) -> None:
         """Each page record has the parent doc_id."""
         embs = [_make_embedding()]
@@ -0,0 +1,86 @@
+"""
+Unit tests for the pages.thumb backfill.
+
+Tests cover:
+- Thumbnails generated from stored page images
+- Legacy on-disk thumbnails reused when no image blob is stored
+- Pages with no source image skipped without stalling pagination
+- Dry-run mode
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from tkr_docusearch.core.testing.mocks import MockKojiClient
+from tkr_docusearch.processing.thumbnail_backfill import backfill_page_thumbnails
+
+
+def _png(size=(800, 1000)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color="green").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    """Point on-disk page image lookups at a temporary directory."""
+    import tkr_docusearch.processing.image_utils as image_utils
+
+    monkeypatch.setattr(image_utils, "PAGE_IMAGE_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def storage():
+    """Mock client with a mix of pages needing backfill."""
+    client = MockKojiClient()
+    client.insert_pages([
+        {"id": "backfill-doc-a-page001", "doc_id": "backfill-doc-a", "page_num": 1,
+         "image": _png()},
+        {"id": "backfill-doc-a-page002", "doc_id": "backfill-doc-a", "page_num": 2,
+         "image": _png(), "thumb": b"\xff\xd8-existing"},
+        {"id": "backfill-doc-b-page001", "doc_id": "backfill-doc-b", "page_num": 1},
+        {"id": "backfill-doc-c-page001", "doc_id": "backfill-doc-c", "page_num": 1},
+    ])
+    return client
+
+
+def test_backfill_fills_missing_thumbs(storage, image_dir):
+    """Stored images and legacy disk thumbnails both populate pages.thumb."""
+    legacy = image_dir / "backfill-doc-b"
+    legacy.mkdir()
+    (legacy / "page001_thumb.jpg").write_bytes(b"\xff\xd8-legacy")
+
+    stats = backfill_page_thumbnails(storage, batch_size=1)
+
+    assert stats == {"scanned": 3, "updated": 2, "skipped": 1, "failed": 0}
+
+    thumb = storage.get_page_image("backfill-doc-a", 1, thumbnail=True)
+    assert Image.open(io.BytesIO(thumb)).size == (300, 375)
+    assert storage.get_page_image("backfill-doc-a", 2, thumbnail=True) == b"\xff\xd8-existing"
+    assert storage.get_page_image("backfill-doc-b", 1, thumbnail=True) == b"\xff\xd8-legacy"
+    assert storage.get_page_image("backfill-doc-c", 1, thumbnail=True) is None
+
+
+def test_backfill_dry_run(storage, image_dir):
+    """Dry runs report counts without writing."""
+    stats = backfill_page_thumbnails(storage, dry_run=True)
+
+    assert stats["updated"] == 1
+    assert storage.get_page_image("backfill-doc-a", 1, thumbnail=True) is None
+
+
+def test_backfill_counts_undecodable_images(image_dir):
+    """Corrupt image blobs are counted as failures, not raised."""
+    client = MockKojiClient()
+    client.insert_pages([
+        {"id": "backfill-doc-x-page001", "doc_id": "backfill-doc-x", "page_num": 1,
+         "image": b"not an image"},
+    ])
+
+    stats = backfill_page_thumbnails(client)
+
+    assert stats["failed"] == 1
+    assert stats["updated"] == 0
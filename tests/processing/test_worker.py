@@ -6,6 +6,7 @@ the job lifecycle: claim → process → complete/fail.
 
 from __future__ import annotations
 
+import time
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -14,7 +15,7 @@ import pytest
 from src.config.koji_config import KojiConfig
 from src.core.testing.mocks import MockShikomiIngester
 from src.processing.processor import DocumentProcessor
-from src.processing.worker import process_job
+from src.processing.worker import LeaseHeartbeat, process_job, worker_identity
 from src.storage.koji_client import KojiClient
 
 FIXTURES = Path(__file__).parent.parent / "fixtures"
@@ -121,3 +122,71 @@ class TestProcessJob:
         # Both should have stored documents
         docs = koji.list_documents()
         assert len(docs) >= 2
+
+
+class TestLeases:
+    """Tests for lease handling in the worker."""
+
+    def test_worker_identity_is_sql_safe(self) -> None:
+        """Worker IDs only use characters Koji accepts in predicates."""
+        worker_id = worker_identity(3)
+        assert worker_id.endswith("-3")
+        assert all(c.isalnum() or c in "-_" for c in worker_id)
+
+    def test_heartbeat_renews_until_exit(self) -> None:
+        """The heartbeat thread renews the lease until the block exits."""
+        koji = MagicMock()
+        koji.heartbeat_job.return_value = True
+
+        with LeaseHeartbeat(koji, "doc-1", "worker-a", lease_seconds=0.03) as heartbeat:
+            deadline = time.monotonic() + 2
+            while koji.heartbeat_job.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.005)
+
+        calls = koji.heartbeat_job.call_count
+        assert calls >= 2
+        assert heartbeat.lost is False
+        time.sleep(0.05)
+        assert koji.heartbeat_job.call_count == calls
+
+    def test_heartbeat_flags_lost_lease(self) -> None:
+        """A failed renewal marks the lease as lost and stops renewing."""
+        koji = MagicMock()
+        koji.heartbeat_job.return_value = False
+
+        with LeaseHeartbeat(koji, "doc-1", "worker-a", lease_seconds=0.03) as heartbeat:
+            deadline = time.monotonic() + 2
+            while not heartbeat.lost and time.monotonic() < deadline:
+                time.sleep(0.005)
+
+        assert heartbeat.lost is True
+        assert koji.heartbeat_job.call_count == 1
+
+    def test_leased_job_completes(self, koji, processor) -> None:
+        """A job claimed with a worker ID is completed under its lease."""
+        koji.create_job("lease1", "sample.pdf", str(FIXTURES / "sample.pdf"))
+        job = koji.claim_next_job(worker_id="worker-a")
+
+        process_job(job, processor, koji, worker_id="worker-a")
+
+        result = koji.get_job("lease1")
+        assert result["status"] == "completed"
+        assert result["worker_id"] == "worker-a"
+
+    def test_lost_lease_aborts_before_storing(self, koji, processor, monkeypatch) -> None:
+        """A worker that loses its lease mid-job writes no results or status."""
+        koji.create_job("lease2", "sample.pdf", str(FIXTURES / "sample.pdf"))
+        job = koji.claim_next_job(worker_id="worker-a")
+        monkeypatch.setattr(koji, "heartbeat_job", lambda *args: False)
+        ingest = processor.ingester.process
+
+        def slow_process(*args, **kwargs):
+            time.sleep(0.2)  # outlast the first heartbeat
+            return ingest(*args, **kwargs)
+
+        monkeypatch.setattr(processor.ingester, "process", slow_process)
+
+        process_job(job, processor, koji, worker_id="worker-a", lease_seconds=0.03)
+
+        assert koji.get_job("lease2")["status"] == "processing"
+        assert koji.query("SELECT doc_id FROM documents").num_rows == 0
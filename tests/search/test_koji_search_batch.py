@@ -0,0 +1,107 @@
+"""Tests for KojiSearch.search_many (one embedding pass for many queries)."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search.koji_search import KojiSearch
+
+
+class _ChunkKoji(MockKojiClient):
+    """Answers every chunk scan with one hit."""
+
+    def query(self, sql, params=None):
+        if "<~>" not in sql:
+            return super().query(sql, params)
+        return pa.table({
+            "id": ["doc-A-c0"], "doc_id": ["doc-A"], "page_num": [1],
+            "text": ["t"], "context": [None], "filename": ["a.pdf"],
+            "format": ["pdf"], "_distance": [0.1],
+        })
+
+
+class _BatchEmbedder:
+    """Records single and batched embedding calls."""
+
+    def __init__(self) -> None:
+        self.single_calls = 0
+        self.batches: list[list[str]] = []
+
+    def embed_query(self, query):
+        self.single_calls += 1
+        return np.ones((1, 2), dtype=np.float32)
+
+    def embed_queries(self, queries):
+        self.batches.append(list(queries))
+        return [np.ones((1, 2), dtype=np.float32) for _ in queries]
+
+
+@pytest.fixture
+def embedder():
+    return _BatchEmbedder()
+
+
+@pytest.fixture
+def search(embedder):
+    koji = _ChunkKoji()
+    koji.open()
+    return KojiSearch(koji_client=koji, shikomi_client=embedder)
+
+
+def test_queries_are_embedded_in_one_call(search, embedder):
+    """All queries go through one embed_queries call; responses keep input order."""
+    result = search.search_many([
+        {"query": "revenue", "search_mode": "text_only"},
+        {"query": "margins", "search_mode": "text_only", "n_results": 1},
+        {"query": "growth", "search_mode": "text_only"},
+    ])
+
+    assert embedder.batches == [["revenue", "margins", "growth"]]
+    assert embedder.single_calls == 0
+    assert [r["query"] for r in result["responses"]] == ["revenue", "margins", "growth"]
+    assert all(r["results"][0]["doc_id"] == "doc-A" for r in result["responses"])
+    assert result["embed_time_ms"] >= 0
+    assert result["total_time_ms"] >= result["embed_time_ms"]
+
+
+def test_failed_search_does_not_fail_the_batch(search, monkeypatch):
+    """An error in one search is reported in its slot only."""
+    original = search.text_search
+
+    def flaky(query, *args, **kwargs):
+        if query == "bad":
+            raise RuntimeError("scan failed")
+        return original(query, *args, **kwargs)
+
+    monkeypatch.setattr(search, "text_search", flaky)
+    result = search.search_many([
+        {"query": "good", "search_mode": "text_only"},
+        {"query": "bad", "search_mode": "text_only"},
+    ])
+
+    assert "error" not in result["responses"][0]
+    assert result["responses"][1] == {"query": "bad", "error": "scan failed"}
+
+
+@pytest.mark.parametrize("params, match", [
+    ({"query": "  "}, "query must not be empty"),
+    ({"query": "q", "search_mode": "fuzzy"}, "search_mode"),
+    ({"query": "q", "limit": 3}, "unknown arguments"),
+    ({"query": "q", "filters": {"colour": "red"}}, "Unknown search filters"),
+])
+def test_invalid_search_rejected_before_embedding(search, embedder, params, match):
+    with pytest.raises(ValueError, match=match):
+        search.search_many([{"query": "ok"}, params])
+    assert embedder.batches == []
+
+
+def test_close_shuts_down_pools(search):
+    """Pools exist from construction; searches after close() are rejected."""
+    search.search_many([{"query": "q", "search_mode": "text_only"}])
+    search.close()
+
+    with pytest.raises(RuntimeError):
+        search.hybrid_search("q", query_embedding=np.ones((1, 2), dtype=np.float32))
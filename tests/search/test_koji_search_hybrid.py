@@ -0,0 +1,81 @@
+"""Tests for concurrent retrieval and stage timings in hybrid search."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search.koji_search import KojiSearch
+
+
+class _BarrierKoji(MockKojiClient):
+    """Mock whose vector scans only return once both are in flight."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.scan_threads: dict[str, str] = {}
+        self.document_lookups = 0
+
+    def query(self, sql, params=None):
+        table = "pages" if "FROM pages" in sql else "chunks"
+        self.scan_threads[table] = threading.current_thread().name
+        self.barrier.wait()
+        return pa.table({
+            "doc_id": ["doc-A"], "page_num": [1],
+            "_distance": [0.2 if table == "pages" else 0.4],
+        })
+
+    def get_documents(self, doc_ids, columns=None):
+        self.document_lookups += 1
+        return super().get_documents(doc_ids, columns=columns)
+
+
+class _StubShikomi:
+    def embed_query(self, query):
+        return np.ones((2, 4), dtype=np.float32)
+
+
+@pytest.fixture
+def koji():
+    client = _BarrierKoji()
+    client.open()
+    client.create_document(doc_id="doc-A", filename="a.pdf", format="pdf")
+    return client
+
+
+@pytest.mark.parametrize("project_id", [None, "proj-1"])
+def test_page_and_chunk_scans_run_concurrently(koji, project_id):
+    """Both scans are in flight at once; a sequential search would time out."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.hybrid_search("hello", n_results=5, project_id=project_id)
+
+    assert koji.scan_threads["pages"] != koji.scan_threads["chunks"]
+    assert response["results"][0]["metadata"]["filename"] == "a.pdf"
+    assert response["results"][0]["metadata"]["source"] == "visual"
+    assert koji.document_lookups == 1
+
+
+def test_hybrid_response_reports_stage_timings(koji):
+    """stage1/stage2 split the total and the breakdown names each stage."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.hybrid_search("hello")
+
+    assert set(response["timings"]) == {
+        "embed_ms", "page_scan_ms", "chunk_scan_ms", "merge_ms", "boost_ms",
+    }
+    assert all(ms >= 0 for ms in response["timings"].values())
+    assert response["stage1_time_ms"] + response["stage2_time_ms"] == pytest.approx(
+        response["total_time_ms"]
+    )
+    assert response["stage1_time_ms"] >= response["timings"]["page_scan_ms"]
+
+    stats = search.get_search_stats()
+    assert stats["avg_stage1_ms"] == pytest.approx(response["stage1_time_ms"])
+    assert stats["avg_stage2_ms"] == pytest.approx(response["stage2_time_ms"])
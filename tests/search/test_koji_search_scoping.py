@@ -0,0 +1,74 @@
+"""Tests for project-scoped vector search in KojiSearch.
+
+Validates that scoped searches filter ``pages``/``chunks`` on their
+denormalized ``project_id`` without joining ``documents``, and that
+filenames and formats are still attached to the results.
+
+Uses a ``MockKojiClient`` that answers raw SQL with canned tables.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search.koji_search import KojiSearch
+
+
+class _SqlRecordingKoji(MockKojiClient):
+    """MockKojiClient whose ``query`` records SQL and returns canned rows."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.statements: list[tuple[str, list]] = []
+
+    def query(self, sql, params=None):
+        self.statements.append((sql, list(params or [])))
+        if "FROM documents" in sql:
+            return pa.table({
+                "doc_id": ["doc-A"], "filename": ["a.pdf"], "format": ["pdf"],
+            })
+        if "FROM chunks" in sql:
+            return pa.table({
+                "id": ["doc-A-c0"], "doc_id": ["doc-A"], "page_num": [1],
+                "text": ["hello"], "context": [None], "_distance": [0.5],
+            })
+        return pa.table({
+            "id": ["doc-A-p1"], "doc_id": ["doc-A"], "page_num": [1],
+            "structure": [None], "_distance": [0.25],
+        })
+
+
+class _StubShikomi:
+    def embed_query(self, query):
+        return np.ones((2, 4), dtype=np.float32)
+
+
+@pytest.fixture
+def koji():
+    client = _SqlRecordingKoji()
+    client.open()
+    client.create_document(doc_id="doc-A", filename="a.pdf", format="pdf")
+    return client
+
+
+@pytest.mark.parametrize("mode", ["text_only", "visual_only", "hybrid"])
+def test_scoped_search_filters_without_join(koji, mode):
+    """Vector scans filter on project_id directly; no JOIN is issued."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.search("hello", n_results=5, search_mode=mode, project_id="proj-1")
+
+    vector_sql = [(sql, params) for sql, params in koji.statements if "<~>" in sql]
+    assert vector_sql
+    for sql, params in vector_sql:
+        assert "JOIN" not in sql
+        assert "project_id = $2" in sql
+        assert params[1] == "proj-1"
+
+    result = response["results"][0]
+    assert result["doc_id"] == "doc-A"
+    assert result["metadata"]["filename"] == "a.pdf"
+    assert result["metadata"]["format"] == "pdf"
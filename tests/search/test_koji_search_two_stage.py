@@ -0,0 +1,124 @@
+"""Tests for two-stage (pooled prefilter + exact MaxSim) retrieval."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search.koji_search import KojiSearch
+from src.storage import pack_multivec
+
+_QUERY = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+
+# Stage 1 returns these in pooled order; exact MaxSim prefers doc-B.
+_CANDIDATES = [
+    ("doc-A", np.array([[0.6, 0.6]], dtype=np.float32)),   # MaxSim 1.2
+    ("doc-B", np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)),  # 2.0
+    ("doc-C", np.array([[0.1, 0.0]], dtype=np.float32)),   # 0.1
+]
+
+
+class _TwoStageKoji(MockKojiClient):
+    """Answers pooled scans with candidate multi-vectors, exact scans with distances."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.statements: list[str] = []
+
+    def query(self, sql, params=None):
+        self.statements.append(sql)
+        n = len(_CANDIDATES)
+        if "pooled_embedding <~>" in sql:
+            return pa.table({
+                "id": [f"{d}-c0" for d, _ in _CANDIDATES],
+                "doc_id": [d for d, _ in _CANDIDATES],
+                "page_num": [1] * n,
+                "text": ["t"] * n,
+                "context": [None] * n,
+                "embedding": [pack_multivec(m) for _, m in _CANDIDATES],
+            })
+        if "FROM documents" in sql:
+            return pa.table({
+                "doc_id": list(params),
+                "filename": [f"{d}.pdf" for d in params],
+                "format": ["pdf"] * len(params),
+            })
+        # Exact path: doc-B first, then doc-A.
+        return pa.table({
+            "id": ["doc-B-c0", "doc-A-c0"], "doc_id": ["doc-B", "doc-A"],
+            "page_num": [1, 1], "text": ["t", "t"], "context": [None, None],
+            "filename": ["b.pdf", "a.pdf"], "format": ["pdf", "pdf"],
+            "_distance": [0.1, 0.2],
+        })
+
+
+class _StubShikomi:
+    def embed_query(self, query):
+        return _QUERY
+
+
+@pytest.fixture
+def search():
+    koji = _TwoStageKoji()
+    koji.open()
+    for doc_id, _ in _CANDIDATES:
+        koji.create_document(doc_id=doc_id, filename=f"{doc_id}.pdf", format="pdf")
+    return KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+
+def test_two_stage_reranks_candidates_by_exact_maxsim(search):
+    """Candidates from the pooled scan are reordered by exact MaxSim."""
+    response = search.search(
+        "q", n_results=2, search_mode="text_only",
+        retrieval_mode="two_stage", rerank_candidates=3,
+    )
+
+    pooled_sql = [sql for sql in search._koji.statements if "<~>" in sql]
+    assert len(pooled_sql) == 1 and "pooled_embedding <~>" in pooled_sql[0]
+    assert [r["doc_id"] for r in response["results"]] == ["doc-B", "doc-A"]
+    # MaxSim / query tokens: 2.0 / 2 and 1.2 / 2.
+    assert response["results"][0]["score"] == pytest.approx(1.0)
+    assert response["results"][1]["score"] == pytest.approx(0.6)
+    assert response["results"][0]["metadata"]["filename"] == "doc-B.pdf"
+    assert response["retrieval_mode"] == "two_stage"
+    assert response["reranked_count"] == 3
+    assert "rerank_ms" in response["timings"]
+
+
+def test_hybrid_two_stage_merges_reranked_scores(search):
+    """Hybrid two-stage scans both tables' pooled vectors and merges by score."""
+    response = search.search("q", n_results=1, retrieval_mode="two_stage")
+
+    assert sum("pooled_embedding <~>" in sql for sql in search._koji.statements) == 2
+    assert response["results"][0]["doc_id"] == "doc-B"
+    assert response["reranked_count"] == 6
+
+
+def test_exact_is_the_default(search):
+    """Without a retrieval mode the full multi-vector scan is used."""
+    response = search.search("q", n_results=2, search_mode="text_only")
+
+    scans = [sql for sql in search._koji.statements if "<~>" in sql]
+    assert not any("pooled_embedding" in sql for sql in scans)
+    # Exact hits are scored from Koji's distance; no multi-vectors are fetched.
+    assert not any(", embedding" in sql for sql in scans)
+    assert response["results"][0]["score"] == pytest.approx(1 / 1.1)
+    assert response["retrieval_mode"] == "exact"
+    assert response["reranked_count"] == 0
+
+
+def test_invalid_retrieval_mode_rejected(search):
+    with pytest.raises(ValueError, match="retrieval_mode"):
+        search.search("q", retrieval_mode="approximate")
+
+
+def test_measure_recall_against_exact(search):
+    """Recall compares two-stage results with the exact path per query."""
+    report = search.measure_recall(["q"], n_results=2, search_mode="text_only", candidates=3)
+
+    assert report["queries"] == 1
+    assert report["recall"] == pytest.approx(1.0)
+    assert report["candidates"] == 3
+    assert report["per_query"][0]["exact_ms"] >= 0
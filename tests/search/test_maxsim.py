@@ -0,0 +1,41 @@
+"""Tests for exact NumPy MaxSim scoring."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.search.maxsim import maxsim_scores
+
+
+def _brute_force(query, doc):
+    return float((query @ doc.T).max(axis=1).sum())
+
+
+def test_matches_brute_force_for_ragged_documents():
+    """Stacked scoring equals per-document MaxSim for varied token counts."""
+    rng = np.random.default_rng(7)
+    query = rng.standard_normal((6, 16)).astype(np.float32)
+    docs = [rng.standard_normal((n, 16)).astype(np.float32) for n in (1, 9, 3, 40)]
+
+    scores = maxsim_scores(query, docs)
+
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, [_brute_force(query, d) for d in docs], rtol=1e-5)
+
+
+def test_missing_documents_score_negative_infinity():
+    """None and zero-token documents rank last without breaking the others."""
+    query = np.eye(2, dtype=np.float32)
+    docs = [None, np.zeros((0, 2), dtype=np.float32), np.eye(2, dtype=np.float32)]
+
+    scores = maxsim_scores(query, docs)
+
+    assert np.isneginf(scores[0]) and np.isneginf(scores[1])
+    assert scores[2] == pytest.approx(2.0)
+
+
+def test_dimension_mismatch_raises():
+    """Documents must share the query's embedding dimension."""
+    with pytest.raises(ValueError, match="dim"):
+        maxsim_scores(np.ones((2, 4), np.float32), [np.ones((3, 5), np.float32)])
@@ -0,0 +1,166 @@
+"""Tests for search filter pushdown."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search.filters import SearchFilters
+from src.search.koji_search import KojiSearch
+
+
+class TestSearchFilters:
+    """Parsing and SQL compilation."""
+
+    def test_file_type_group_and_formats_intersect(self):
+        filters = SearchFilters.from_dict({"file_type_group": "audio", "formats": [".MP3", "pdf"]})
+        assert filters.formats == ("mp3",)
+
+    def test_all_group_and_none_values_filter_nothing(self):
+        assert SearchFilters.from_dict({"file_type_group": "all", "page_min": None}) is None
+
+    def test_unknown_key_rejected(self):
+        with pytest.raises(ValueError, match="Unknown search filters"):
+            SearchFilters.from_dict({"colour": "blue"})
+
+    def test_inverted_range_rejected(self):
+        with pytest.raises(ValueError, match="page_min"):
+            SearchFilters.from_dict({"page_min": 5, "page_max": 2})
+
+    def test_row_where_numbers_placeholders(self):
+        filters = SearchFilters.from_dict({
+            "doc_ids": ["a", "b"], "page_min": 2, "time_start": 10.0, "time_end": 20.0,
+        })
+
+        clauses, params = filters.row_where("chunks", 3, prefix="c.")
+
+        assert clauses == [
+            "c.doc_id IN ($3, $4)", "c.page_num >= $5",
+            "c.end_time >= $6", "c.start_time <= $7",
+        ]
+        assert params == ["a", "b", 2, 10.0, 20.0]
+        assert filters.row_where("pages", 1)[0] == ["doc_id IN ($1, $2)", "page_num >= $3"]
+        assert filters.matches_nothing("pages")
+
+
+class _RecordingKoji(MockKojiClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.statements: list[tuple[str, list]] = []
+
+    def query(self, sql, params=None):
+        self.statements.append((sql, list(params or [])))
+        if sql.startswith("SELECT doc_id FROM documents"):
+            return pa.table({"doc_id": ["doc-A"]})
+        if "FROM documents" in sql:
+            return pa.table({"doc_id": ["doc-A"], "filename": ["a.mp3"], "format": ["mp3"]})
+        return pa.table({
+            "id": ["doc-A-c0"], "doc_id": ["doc-A"], "page_num": [1], "text": ["hi"],
+            "context": [None], "filename": ["a.mp3"], "format": ["mp3"], "_distance": [0.1],
+        })
+
+    def vector_statements(self):
+        return [(sql, params) for sql, params in self.statements if "<~>" in sql]
+
+
+class _StubShikomi:
+    def embed_query(self, query):
+        return np.ones((2, 4), dtype=np.float32)
+
+
+@pytest.fixture
+def koji():
+    client = _RecordingKoji()
+    client.open()
+    return client
+
+
+def test_document_filters_resolve_to_doc_ids_in_where(koji):
+    """Format and date filters become a doc_id predicate next to <~>."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.search(
+        "q", search_mode="text_only", project_id="proj-1",
+        filters={"file_type_group": "audio", "created_after": "2026-01-01", "page_max": 3},
+    )
+
+    lookup_sql, lookup_params = koji.statements[0]
+    assert "format IN ($1, $2)" in lookup_sql and "created_at >= $3" in lookup_sql
+    assert "project_id = $4" in lookup_sql and "LIMIT $5" in lookup_sql
+    assert lookup_params == ["mp3", "wav", "2026-01-01", "proj-1", 257]
+
+    [(sql, params)] = koji.vector_statements()
+    assert "project_id = $2 AND doc_id IN ($3) AND page_num <= $4 LIMIT $5" in sql
+    assert params[1:] == ["proj-1", "doc-A", 3, 10]
+    assert response["total_results"] == 1
+
+
+def test_unscoped_join_qualifies_filter_columns(koji):
+    """The joined exact scan filters on the chunk alias."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    search.search("q", search_mode="text_only", filters={"time_start": 30.0})
+
+    [(sql, params)] = koji.vector_statements()
+    assert "c.embedding <~> $1 AND c.end_time >= $2" in sql
+    assert params[1:] == [30.0, 10]
+
+
+def test_time_window_skips_page_scan_in_hybrid(koji):
+    """Pages have no timestamps, so only chunks are scanned."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.search("q", filters={"time_end": 60.0})
+
+    assert [sql for sql, _ in koji.vector_statements() if "FROM pages" in sql] == []
+    assert {r["metadata"]["source"] for r in response["results"]} == {"text"}
+
+
+def test_no_matching_documents_skips_vector_scans(koji):
+    """An empty doc_id set returns no results without scanning."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    response = search.search("q", filters={"doc_ids": []})
+
+    assert koji.vector_statements() == []
+    assert response["results"] == []
+
+
+def test_unscoped_exact_scan_filters_documents_in_join(koji):
+    """The join the unscoped exact scan already does carries document predicates."""
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    search.search("q", search_mode="text_only", filters={"formats": ["pdf"], "page_min": 2})
+
+    assert not any(sql.startswith("SELECT doc_id") for sql, _ in koji.statements)
+    [(sql, params)] = koji.vector_statements()
+    assert "c.embedding <~> $1 AND c.page_num >= $2 AND d.format IN ($3)" in sql
+    assert params[1:] == [2, "pdf", 10]
+
+
+class _LargeMatchKoji(_RecordingKoji):
+    """Resolves every document filter to more doc_ids than the cap."""
+
+    def query(self, sql, params=None):
+        if sql.startswith("SELECT doc_id FROM documents"):
+            self.statements.append((sql, list(params)))
+            return pa.table({"doc_id": [f"doc-{i}" for i in range(257)]})
+        return super().query(sql, params)
+
+
+def test_large_document_match_falls_back_to_join():
+    """Above the resolve cap, join-free scans join documents instead of binding doc_ids."""
+    koji = _LargeMatchKoji()
+    koji.open()
+    search = KojiSearch(koji_client=koji, shikomi_client=_StubShikomi())
+
+    search.search("q", filters={"file_type_group": "pdf"})
+
+    scans = koji.vector_statements()
+    assert len(scans) == 2
+    for sql, params in scans:
+        assert "JOIN documents d" in sql and "d.format IN ($2)" in sql
+        assert "doc_id IN" not in sql
+        assert len(params) == 3
@@ -0,0 +1,131 @@
+"""Tests for cursor pagination over a stored candidate list."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search import cursor_store
+from src.search.cursor_store import SearchCursorStore
+from src.search.koji_search import KojiSearch
+from src.search.result_cache import SearchResultCache
+
+_DOCS = [f"doc-{i}" for i in range(5)]
+
+
+class _RankedKoji(MockKojiClient):
+    """Answers chunk scans with up to five ranked hits and counts them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.scans = 0
+        self.limits: list[int] = []
+
+    def query(self, sql, params=None):
+        if "<~>" not in sql:
+            return super().query(sql, params)
+        self.scans += 1
+        self.limits.append(params[-1])
+        docs = _DOCS[:params[-1]]
+        return pa.table({
+            "id": [f"{d}-c0" for d in docs], "doc_id": docs, "page_num": [1] * len(docs),
+            "text": ["t"] * len(docs), "context": [None] * len(docs),
+            "filename": [f"{d}.pdf" for d in docs], "format": ["pdf"] * len(docs),
+            "_distance": [0.1 * (i + 1) for i in range(len(docs))],
+        })
+
+
+class _CountingShikomi:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_query(self, query):
+        self.calls += 1
+        return np.ones((1, 2), dtype=np.float32)
+
+
+@pytest.fixture
+def search():
+    koji = _RankedKoji()
+    koji.open()
+    return KojiSearch(
+        koji_client=koji, shikomi_client=_CountingShikomi(),
+        result_cache=SearchResultCache(max_entries=0),
+        cursor_store=SearchCursorStore(), cursor_depth=50,
+    )
+
+
+def _doc_ids(response):
+    return [r["doc_id"] for r in response["results"]]
+
+
+def test_pages_come_from_one_search(search):
+    """Follow-up pages slice the first search's list without embedding or scanning."""
+    first = search.search("q", n_results=2, search_mode="text_only", paginate=True)
+
+    assert search._koji.limits == [50]
+    assert _doc_ids(first) == ["doc-0", "doc-1"]
+    assert first["total_candidates"] == 5
+    assert first["offset"] == 0
+
+    second = search.next_page(first["next_cursor"])
+    third = search.next_page(second["next_cursor"])
+
+    assert _doc_ids(second) == ["doc-2", "doc-3"]
+    assert _doc_ids(third) == ["doc-4"]
+    assert third["next_cursor"] is None
+    assert third["offset"] == 4
+    assert third["query"] == "q"
+    assert search._koji.scans == 1
+    assert search._shikomi.calls == 1
+
+    assert _doc_ids(search.next_page(first["next_cursor"])) == ["doc-2", "doc-3"]
+
+
+def test_paginated_cache_hit_skips_embedding():
+    """A repeated paginated search is served from the cache without encoding."""
+    koji = _RankedKoji()
+    koji.open()
+    search = KojiSearch(
+        koji_client=koji, shikomi_client=_CountingShikomi(),
+        result_cache=SearchResultCache(), cursor_store=SearchCursorStore(), cursor_depth=50,
+    )
+    first = search.search("q", n_results=2, search_mode="text_only", paginate=True)
+    again = search.search("q", n_results=2, search_mode="text_only", paginate=True)
+
+    assert _doc_ids(again) == _doc_ids(first)
+    assert again["cached"] is True
+    assert koji.scans == 1
+    assert search._shikomi.calls == 1
+
+
+def test_single_page_has_no_cursor(search):
+    response = search.search("q", n_results=10, search_mode="text_only", paginate=True)
+
+    assert response["next_cursor"] is None
+    assert search._cursors.stats()["entries"] == 0
+
+
+def test_unpaginated_search_is_unchanged(search):
+    response = search.search("q", n_results=2, search_mode="text_only")
+
+    assert search._koji.limits == [2]
+    assert "next_cursor" not in response
+
+
+def test_expired_and_malformed_cursors(monkeypatch):
+    """Expired cursors return None; malformed ones raise ValueError."""
+    now = [100.0]
+    monkeypatch.setattr(cursor_store.time, "monotonic", lambda: now[0])
+    store = SearchCursorStore(ttl_seconds=60)
+    page = store.open([{"doc_id": "a"}, {"doc_id": "b"}], page_size=1, context={})
+
+    now[0] += 60
+    assert store.page(page.next_cursor) is None
+    assert store.stats()["expirations"] == 1
+
+    for cursor in ("not base64!", "bm8tb2Zmc2V0", "YWJjOi0x"):
+        with pytest.raises(ValueError, match="Malformed"):
+            store.page(cursor)
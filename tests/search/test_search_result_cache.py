@@ -0,0 +1,130 @@
+"""Tests for the index-versioned search result cache."""
+
+from __future__ import annotations
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from src.core.testing.mocks import MockKojiClient
+from src.search import result_cache
+from src.search.koji_search import KojiSearch
+from src.search.result_cache import SearchResultCache
+
+
+def test_hit_returns_a_copy():
+    """Hits are counted and callers cannot mutate the cached response."""
+    cache = SearchResultCache()
+    assert cache.get(("q",), version=0) is None
+
+    cache.put(("q",), 0, {"results": [{"doc_id": "a"}]})
+    hit = cache.get(("q",), version=0)
+    hit["results"].clear()
+
+    assert cache.get(("q",), version=0) == {"results": [{"doc_id": "a"}]}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_newer_index_version_drops_entries():
+    """A write (new version) invalidates everything; stale results are not stored."""
+    cache = SearchResultCache()
+    cache.put(("a",), 1, {"n": 1})
+    cache.put(("b",), 1, {"n": 2})
+
+    assert cache.get(("a",), version=2) is None
+    assert cache.stats()["invalidations"] == 2
+
+    cache.put(("a",), 1, {"n": 3})
+    assert cache.get(("a",), version=2) is None
+
+
+def test_bounds_and_ttl(monkeypatch):
+    """Entries are evicted LRU-first and expire after the TTL."""
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = SearchResultCache(max_entries=2, ttl_seconds=10)
+    for key in ("a", "b", "c"):
+        cache.put((key,), 0, {})
+    assert cache.get(("a",), version=0) is None
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 10
+    assert cache.get(("b",), version=0) is None
+    assert cache.stats()["expirations"] == 1
+
+    assert SearchResultCache(max_entries=0).enabled is False
+
+
+class _CountingKoji(MockKojiClient):
+    """Answers chunk scans with one hit and counts them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.scans = 0
+
+    def query(self, sql, params=None):
+        if "<~>" not in sql:
+            return super().query(sql, params)
+        self.scans += 1
+        return pa.table({
+            "id": ["doc-A-c0"], "doc_id": ["doc-A"], "page_num": [1],
+            "text": ["t"], "context": [None], "filename": ["a.pdf"],
+            "format": ["pdf"], "_distance": [0.1],
+        })
+
+
+class _StubShikomi:
+    def embed_query(self, query):
+        return np.ones((1, 2), dtype=np.float32)
+
+
+@pytest.fixture
+def search():
+    koji = _CountingKoji()
+    koji.open()
+    for doc_id in ("doc-A", "doc-B"):
+        koji.create_document(doc_id=doc_id, filename=f"{doc_id}.pdf", format="pdf")
+    return KojiSearch(
+        koji_client=koji, shikomi_client=_StubShikomi(), result_cache=SearchResultCache(),
+    )
+
+
+def test_repeated_search_skips_scans(search):
+    """An identical (whitespace-normalized) search is served from the cache."""
+    first = search.search("revenue", search_mode="text_only")
+    second = search.search("  revenue ", search_mode="text_only")
+
+    assert search._koji.scans == 1
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["results"] == first["results"]
+
+    search.search("revenue", search_mode="text_only", n_results=5)
+    search.search("revenue", search_mode="text_only", filters={"page_min": 2})
+    assert search._koji.scans == 3
+
+    stats = search.get_search_stats()
+    assert stats["total_queries"] == 3
+    assert stats["result_cache"]["hits"] == 1
+    assert stats["result_cache"]["hit_rate"] == pytest.approx(0.25)
+
+
+def test_index_write_invalidates(search):
+    """Writing chunks or relations forces the next search to scan again."""
+    search.search("revenue", search_mode="text_only")
+    search._koji.insert_chunks([{"id": "doc-B-c0", "doc_id": "doc-B", "page_num": 1}])
+    search.search("revenue", search_mode="text_only")
+    search._koji.create_relation("doc-A", "doc-B", "references")
+    search.search("revenue", search_mode="text_only")
+
+    assert search._koji.scans == 3
+
+
+def test_use_cache_false_bypasses(search):
+    search.search("revenue", search_mode="text_only")
+    response = search.search("revenue", search_mode="text_only", use_cache=False)
+
+    assert search._koji.scans == 2
+    assert response["cached"] is False
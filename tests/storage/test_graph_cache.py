@@ -0,0 +1,68 @@
+"""
+Unit tests for the graph algorithm result cache.
+
+Tests cover:
+- Hit and miss counters per algorithm
+- Pruning of results computed against old versions
+- LRU bound and the disabled cache
+- Copy isolation of cached results
+"""
+
+from tkr_docusearch.storage.graph_cache import GraphResultCache
+
+
+def _key(algorithm, *versions, params=()):
+    return (algorithm, params, *versions)
+
+
+def test_hit_after_put():
+    """A stored result is returned on the next lookup with the same key."""
+    cache = GraphResultCache(max_entries=4)
+    key = _key("pagerank", 1, 1)
+    assert cache.get("pagerank", key) == (False, None)
+
+    cache.put("pagerank", key, {"doc-a": 0.5}, compute_ms=12.0, versions=(1, 1))
+    assert cache.get("pagerank", key) == (True, {"doc-a": 0.5})
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["algorithms"]["pagerank"]["compute_ms_total"] == 12.0
+
+
+def test_old_versions_pruned_on_put():
+    """Storing a result for new versions drops results for old ones."""
+    cache = GraphResultCache(max_entries=4)
+    cache.put("scc", _key("scc", 1, 1), {"a": 0}, compute_ms=1.0, versions=(1, 1))
+    cache.put("scc", _key("scc", 2, 1), {"a": 1}, compute_ms=1.0, versions=(2, 1))
+
+    assert cache.stats()["entries"] == 1
+    assert cache.get("scc", _key("scc", 1, 1)) == (False, None)
+
+
+def test_lru_bound_and_disabled_cache():
+    """Entries are capped; a zero-size cache only records compute time."""
+    cache = GraphResultCache(max_entries=2)
+    for project in ("p1", "p2", "p3"):
+        key = _key("pagerank", 1, 1, params=(("project_id", project),))
+        cache.put("pagerank", key, {}, compute_ms=1.0, versions=(1, 1))
+    assert cache.stats()["entries"] == 2
+
+    disabled = GraphResultCache(max_entries=0)
+    disabled.put("has_cycle", _key("has_cycle", 1, 1), True, compute_ms=3.0, versions=(1, 1))
+    assert disabled.get("has_cycle", _key("has_cycle", 1, 1)) == (False, None)
+    assert disabled.stats()["algorithms"]["has_cycle"]["last_compute_ms"] == 3.0
+
+
+def test_results_are_copied():
+    """Mutating a returned result does not change the cached copy."""
+    cache = GraphResultCache()
+    key = _key("topological_sort", 1, 1)
+    order = ["a", "b"]
+    cache.put("topological_sort", key, order, compute_ms=1.0, versions=(1, 1))
+    order.append("c")
+
+    _, cached = cache.get("topological_sort", key)
+    cached.append("d")
+    assert cache.get("topological_sort", key) == (True, ["a", "b"])
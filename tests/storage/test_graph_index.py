@@ -0,0 +1,112 @@
+"""
+Unit tests for the in-memory relation graph index.
+
+Tests cover:
+- CSR construction and neighbor lookups in both directions
+- Incremental edge adds and removals, including masked CSR edges
+- Type and node removal
+- BFS and shortest paths
+- Overlay folding into rebuilt CSR arrays
+- Version counter
+"""
+
+import pytest
+
+from tkr_docusearch.storage.graph_index import GraphIndex, edge_weight
+
+
+@pytest.fixture
+def index():
+    """a -> b -> c chain plus a -> c shortcut of another type."""
+    return GraphIndex.from_edges([
+        ("a", "b", "references", 1.0),
+        ("b", "c", "similar_to", 0.8),
+        ("a", "c", "cites", 1.0),
+        ("a", "b", "references", 5.0),  # duplicate, ignored
+    ])
+
+
+def test_from_edges_builds_both_directions(index):
+    """Outgoing and incoming adjacency agree and duplicates collapse."""
+    assert sorted(index.neighbors("a")) == [
+        ("b", "references", 1.0), ("c", "cites", 1.0),
+    ]
+    assert sorted(index.neighbors("c", direction="incoming")) == [
+        ("a", "cites", 1.0), ("b", "similar_to", pytest.approx(0.8)),
+    ]
+    assert index.neighbors("a", relation_types=["cites"]) == [("c", "cites", 1.0)]
+    assert index.neighbors("missing") == []
+    assert index.stats()["edges"] == 3
+
+
+def test_relations_for_matches_storage_shape(index):
+    """Relation dicts carry endpoints, type, and weight per document."""
+    grouped = index.relations_for(["b", "zzz"])
+    assert sorted((r["src_doc_id"], r["dst_doc_id"]) for r in grouped["b"]) == [
+        ("a", "b"), ("b", "c"),
+    ]
+    assert grouped["zzz"] == []
+
+    with pytest.raises(ValueError, match="Invalid relation direction"):
+        index.relations_for(["a"], direction="sideways")
+
+
+def test_add_and_remove_edges(index):
+    """Incremental writes are visible immediately and bump the version."""
+    version = index.version
+    assert index.add_edge("c", "d", "references") is True
+    assert index.add_edge("c", "d", "references") is False
+    assert index.neighbors("d", direction="incoming") == [("c", "references", 1.0)]
+
+    # CSR edge masked, then re-added through the overlay.
+    assert index.remove_edge("a", "b", "references") is True
+    assert index.remove_edge("a", "b", "references") is False
+    assert index.neighbors("a") == [("c", "cites", 1.0)]
+    assert index.add_edge("a", "b", "references", 2.0) is True
+    assert ("b", "references", 2.0) in index.neighbors("a")
+
+    assert index.version == version + 3
+    assert index.stats()["edges"] == 4
+
+
+def test_remove_type_and_node(index):
+    """Type and node removal drop every matching edge."""
+    assert index.remove_type("references") == 1
+    assert index.neighbors("b", direction="incoming") == []
+    assert index.remove_type("unknown") == 0
+
+    assert index.remove_node("c") == 2
+    assert index.stats()["edges"] == 0
+    assert index.bfs("a") == []
+
+
+def test_bfs_and_shortest_path(index):
+    """BFS reports first-reach depth; paths take the fewest hops."""
+    assert index.bfs("a") == [("b", "references", 1), ("c", "cites", 1)]
+    assert index.bfs("b", direction="incoming") == [("a", "references", 1)]
+    assert index.shortest_path("a", "c") == [("a", "c", "cites")]
+    assert index.shortest_path("c", "a") == []
+    assert index.shortest_path("c", "a", direction="both") == [("c", "a", "cites")]
+
+
+def test_overlay_folds_into_csr():
+    """Enough incremental writes rebuild the CSR without changing results."""
+    index = GraphIndex()
+    for i in range(3000):
+        index.add_edge(f"n{i}", f"n{i + 1}", "next")
+    for i in range(0, 3000, 2):
+        index.remove_edge(f"n{i}", f"n{i + 1}", "next")
+
+    stats = index.stats()
+    assert stats["edges"] == 1500
+    assert stats["overlay_edges"] + stats["masked_edges"] < 1500
+    assert index.bfs("n1", max_depth=10) == [("n2", "next", 1)]
+
+
+def test_edge_weight_from_metadata():
+    """Weights come from metadata scores, defaulting to 1.0."""
+    assert edge_weight({"score": 0.5}) == 0.5
+    assert edge_weight('{"jaccard": 0.25}') == 0.25
+    assert edge_weight({"weight": True}) == 1.0
+    assert edge_weight("not json") == 1.0
+    assert edge_weight(None) == 1.0
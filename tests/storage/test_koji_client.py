@@ -12,6 +12,11 @@ Tests cover:
 - Validation and error handling
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pyarrow as pa
 import pytest
 
 from tkr_docusearch.config.koji_config import KojiConfig
@@ -21,6 +26,8 @@ from tkr_docusearch.storage.koji_client import (
     KojiDuplicateError,
     pack_multivec,
     unpack_multivec,
+    unpack_multivec_array,
+    unpack_multivec_column,
 )
 
 
@@ -130,6 +137,65 @@ class TestDocumentCRUD:
         md = client.get_document_markdown("doc-test-1234")
         assert md == "# Hello\n\nWorld"
 
+    def test_get_document_with_columns(self, client):
+        """Column projection omits unrequested columns but keeps doc_id."""
+        client.create_document(
+            doc_id="doc-test-1234",
+            filename="test.md",
+            format="md",
+            markdown="# Large body",
+            metadata={"author": "Test"},
+        )
+
+        doc = client.get_document("doc-test-1234", columns=["filename", "metadata"])
+        assert doc == {
+            "doc_id": "doc-test-1234",
+            "filename": "test.md",
+            "metadata": {"author": "Test"},
+        }
+
+    def test_get_document_invalid_column(self, client):
+        """Unknown projection columns are rejected before querying."""
+        with pytest.raises(ValueError, match="Invalid document columns"):
+            client.get_document("doc-test-1234", columns=["filename; DROP"])
+
+    def test_get_document_summary_excludes_markdown(self, client):
+        """Summary reads skip the markdown and enrichment columns."""
+        client.create_document(
+            doc_id="doc-test-1234",
+            filename="test.md",
+            format="md",
+            markdown="# Large body",
+            enrichment={"summary": "s"},
+        )
+
+        summary = client.get_document_summary("doc-test-1234")
+        assert summary["filename"] == "test.md"
+        assert "markdown" not in summary
+        assert "enrichment" not in summary
+        assert client.get_document_summary("nonexistent-doc") is None
+
+    def test_document_exists(self, client):
+        """document_exists reflects presence without fetching columns."""
+        assert client.document_exists("doc-test-1234") is False
+        client.create_document(doc_id="doc-test-1234", filename="a.pdf", format="pdf")
+        assert client.document_exists("doc-test-1234") is True
+
+    def test_get_documents_bulk(self, client):
+        """get_documents returns found documents keyed by ID."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+
+        docs = client.get_documents(
+            ["doc-test-0001", "doc-test-0002", "nonexistent-doc", "doc-test-0001"],
+            columns=["filename"],
+        )
+        assert docs == {
+            "doc-test-0001": {"doc_id": "doc-test-0001", "filename": "a.pdf"},
+            "doc-test-0002": {"doc_id": "doc-test-0002", "filename": "b.pdf"},
+        }
+        assert client.get_documents([]) == {}
+
     def test_get_document_markdown_not_found(self, client):
         """Verify returns None for non-existent document."""
         result = client.get_document_markdown("nonexistent-doc")
@@ -205,6 +271,55 @@ class TestDocumentCRUD:
         page2 = client.list_documents(limit=2, offset=2)
         assert len(page2) == 2
 
+    def test_list_document_summaries_counts(self, client):
+        """Summaries carry page/chunk counts without blob columns."""
+        client.create_document(doc_id="doc-sum-0001", filename="a.pdf", format="pdf")
+        client.create_document(doc_id="doc-sum-0002", filename="b.md", format="md")
+        client.insert_pages([
+            {"id": "doc-sum-0001-page001", "doc_id": "doc-sum-0001", "page_num": 1,
+             "image": b"\x89PNG"},
+            {"id": "doc-sum-0001-page002", "doc_id": "doc-sum-0001", "page_num": 2},
+        ])
+        client.insert_chunks([
+            {"id": "doc-sum-0001-chunk0001", "doc_id": "doc-sum-0001",
+             "page_num": 1, "text": "Hello"},
+        ])
+
+        summaries, total = client.list_document_summaries(sort_by="name_asc")
+        assert total == 2
+        assert [s["doc_id"] for s in summaries] == ["doc-sum-0001", "doc-sum-0002"]
+
+        first, second = summaries
+        assert first["page_count"] == 2
+        assert first["chunk_count"] == 1
+        assert first["first_page_num"] == 1
+        assert first["first_page_has_image"] is True
+        assert "markdown" not in first and "image" not in first
+        assert second["page_count"] == 0
+        assert second["chunk_count"] == 0
+        assert second["first_page_has_image"] is False
+
+    def test_list_document_summaries_filters_and_pagination(self, client):
+        """Search, extension filter, and paging are applied in SQL."""
+        for i, name in enumerate(["Report.PDF", "notes.md", "report-v2.pdf", "song.mp3"]):
+            client.create_document(
+                doc_id=f"doc-sum-{i:04d}", filename=name, format=name.rsplit(".", 1)[1],
+            )
+
+        summaries, total = client.list_document_summaries(search="report")
+        assert total == 2
+        assert {s["filename"] for s in summaries} == {"Report.PDF", "report-v2.pdf"}
+
+        summaries, total = client.list_document_summaries(extensions=[".mp3", ".wav"])
+        assert total == 1
+        assert summaries[0]["filename"] == "song.mp3"
+
+        summaries, total = client.list_document_summaries(
+            sort_by="name_desc", limit=2, offset=1,
+        )
+        assert total == 4
+        assert [s["filename"] for s in summaries] == ["Report.PDF", "report-v2.pdf"]
+
     def test_delete_document_cascade(self, client):
         """Create doc + pages + chunks, delete doc, verify all gone."""
         client.create_document(
@@ -572,6 +687,103 @@ class TestRelations:
         both = client.get_relations("doc-test-0002", direction="both")
         assert len(both) == 1
 
+    def test_create_relations_bulk_skip(self, client):
+        """Existing, repeated, and dangling rows are skipped; the rest inserted."""
+        self._create_two_docs(client)
+        client.create_relation("doc-test-0001", "doc-test-0002", "references")
+
+        rows = [
+            {"src_doc_id": "doc-test-0001", "dst_doc_id": "doc-test-0002",
+             "relation_type": "references"},
+            {"src_doc_id": "doc-test-0002", "dst_doc_id": "doc-test-0001",
+             "relation_type": "references", "metadata": {"score": 0.7}},
+            {"src_doc_id": "doc-test-0002", "dst_doc_id": "doc-test-0001",
+             "relation_type": "references"},
+            {"src_doc_id": "doc-test-0002", "dst_doc_id": "doc-test-9999",
+             "relation_type": "references"},
+        ]
+        counts = client.create_relations_bulk(rows)
+
+        assert counts == {"created": 1, "replaced": 0, "skipped": 3}
+        incoming = client.get_relations("doc-test-0001", direction="incoming")
+        assert [r["metadata"] for r in incoming] == [{"score": 0.7}]
+
+    def test_create_relations_bulk_replace(self, client):
+        """Replace mode overwrites existing relation metadata."""
+        self._create_two_docs(client)
+        client.create_relation(
+            "doc-test-0001", "doc-test-0002", "similar_to", metadata={"score": 0.1},
+        )
+        index = client.graph_index()
+
+        counts = client.create_relations_bulk(
+            [{"src_doc_id": "doc-test-0001", "dst_doc_id": "doc-test-0002",
+              "relation_type": "similar_to", "metadata": {"score": 0.9}}],
+            on_conflict="replace",
+        )
+
+        assert counts == {"created": 0, "replaced": 1, "skipped": 0}
+        relations = client.get_relations("doc-test-0001", direction="outgoing")
+        assert [r["metadata"] for r in relations] == [{"score": 0.9}]
+        assert index.neighbors("doc-test-0001") == [
+            ("doc-test-0002", "similar_to", pytest.approx(0.9)),
+        ]
+
+    def test_create_relations_bulk_in_batch(self, client):
+        """Inside a batch, documents and relations buffered earlier are honoured."""
+        with client.batch():
+            client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+            client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+            rows = [{"src_doc_id": "doc-test-0001", "dst_doc_id": "doc-test-0002",
+                     "relation_type": "references"}]
+            assert client.create_relations_bulk(rows)["created"] == 1
+            assert client.create_relations_bulk(rows)["skipped"] == 1
+
+        assert len(client.get_relations("doc-test-0001", direction="outgoing")) == 1
+
+    def test_create_relations_bulk_invalid_mode(self, client):
+        """Unknown conflict modes are rejected."""
+        with pytest.raises(ValueError, match="on_conflict"):
+            client.create_relations_bulk([], on_conflict="merge")
+
+    def test_get_relations_for_groups_by_doc(self, client):
+        """Bulk relation lookup matches per-document get_relations."""
+        self._create_two_docs(client)
+        client.create_document(doc_id="doc-test-0003", filename="c.pdf", format="pdf")
+        client.create_relation(
+            src_doc_id="doc-test-0001",
+            dst_doc_id="doc-test-0002",
+            relation_type="references",
+        )
+        client.create_relation(
+            src_doc_id="doc-test-0003",
+            dst_doc_id="doc-test-0001",
+            relation_type="similar_to",
+        )
+
+        ids = ["doc-test-0001", "doc-test-0002", "doc-test-0003"]
+        grouped = client.get_relations_for(ids)
+        assert set(grouped) == set(ids)
+        for doc_id in ids:
+            expected = client.get_relations(doc_id, direction="both")
+            assert sorted(r["relation_type"] for r in grouped[doc_id]) == sorted(
+                r["relation_type"] for r in expected
+            )
+
+        outgoing = client.get_relations_for(ids, direction="outgoing")
+        assert [r["dst_doc_id"] for r in outgoing["doc-test-0001"]] == ["doc-test-0002"]
+        assert outgoing["doc-test-0002"] == []
+
+        typed = client.get_relations_for(
+            ["doc-test-0001"], relation_types=["similar_to"],
+        )
+        assert [r["src_doc_id"] for r in typed["doc-test-0001"]] == ["doc-test-0003"]
+
+    def test_get_relations_for_invalid_direction(self, client):
+        """Unknown directions are rejected."""
+        with pytest.raises(ValueError, match="Invalid relation direction"):
+            client.get_relations_for(["doc-test-0001"], direction="sideways")
+
     def test_create_relation_with_metadata(self, client):
         """Verify relation metadata is stored."""
         self._create_two_docs(client)
@@ -619,6 +831,33 @@ class TestRelations:
         assert "doc-test-B" in shallow_ids
         assert "doc-test-C" not in shallow_ids
 
+    def test_graph_index_tracks_relation_writes(self, client):
+        """Relation writes update the loaded graph index and bump its version."""
+        self._create_two_docs(client)
+        client.create_document(doc_id="doc-test-0003", filename="c.pdf", format="pdf")
+        client.create_relation("doc-test-0001", "doc-test-0002", "references")
+
+        index = client.graph_index()
+        version = client.graph_version
+        assert index.neighbors("doc-test-0001") == [("doc-test-0002", "references", 1.0)]
+
+        with client.batch():
+            client.create_relation(
+                "doc-test-0002", "doc-test-0003", "similar_to", metadata={"score": 0.5},
+            )
+            assert index.neighbors("doc-test-0002") == []
+        assert index.neighbors("doc-test-0002") == [("doc-test-0003", "similar_to", 0.5)]
+        assert [d for d, _, _ in index.bfs("doc-test-0001")] == [
+            "doc-test-0002", "doc-test-0003",
+        ]
+
+        client.delete_relation("doc-test-0001", "doc-test-0002", "references")
+        assert index.neighbors("doc-test-0001") == []
+        client.delete_relations_by_type("similar_to")
+        assert index.stats()["edges"] == 0
+        assert client.graph_version > version
+        assert client.graph_index() is index
+
 
 class TestMultivec:
     """Test multi-vector packing/unpacking."""
@@ -648,6 +887,390 @@ class TestMultivec:
         assert len(unpacked) == 1
         assert len(unpacked[0]) == 4
 
+    def test_pack_ndarray_matches_list(self):
+        """ndarray and nested-list inputs produce identical blobs."""
+        data = np.random.default_rng(7).standard_normal((16, 8)).astype(np.float32)
+        assert pack_multivec(data) == pack_multivec(data.tolist())
+
+    def test_pack_rejects_non_2d(self):
+        """A flat vector is not a valid multi-vector embedding."""
+        with pytest.raises(ValueError, match="2-D"):
+            pack_multivec(np.zeros(4, dtype=np.float32))
+
+    def test_unpack_array_is_readonly_view(self):
+        """unpack_multivec_array returns a read-only view with the right shape."""
+        data = np.arange(12, dtype=np.float32).reshape(3, 4)
+        blob = pack_multivec(data)
+
+        view = unpack_multivec_array(blob)
+        assert view.shape == (3, 4)
+        assert view.dtype == np.float32
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, data)
+
+    def test_unpack_column(self):
+        """Arrow binary columns decode row-by-row, preserving nulls."""
+        a = np.ones((2, 3), dtype=np.float32)
+        b = np.full((1, 3), 2.0, dtype=np.float32)
+        column = pa.chunked_array([
+            pa.array([pack_multivec(a), None], type=pa.binary()),
+            pa.array([pack_multivec(b)], type=pa.binary()),
+        ])
+
+        decoded = unpack_multivec_column(column)
+        assert len(decoded) == 3
+        np.testing.assert_array_equal(decoded[0], a)
+        assert decoded[1] is None
+        np.testing.assert_array_equal(decoded[2], b)
+
+
+class TestBatch:
+    """Test group-commit write batching."""
+
+    def test_batch_defers_inserts_until_exit(self, client):
+        """Rows written inside a batch land with one insert per table."""
+        with client.batch():
+            client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+            client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+            assert client.query("SELECT doc_id FROM documents").num_rows == 0
+            assert client.document_exists("doc-test-0001")
+
+            client.create_relation(
+                src_doc_id="doc-test-0001",
+                dst_doc_id="doc-test-0002",
+                relation_type="references",
+            )
+
+        assert client.get_documents(["doc-test-0001", "doc-test-0002"]).keys() == {
+            "doc-test-0001",
+            "doc-test-0002",
+        }
+        assert len(client.get_relations("doc-test-0001", direction="outgoing")) == 1
+
+    def test_batch_syncs_once(self, client):
+        """A batch issues a single sync regardless of how many rows it writes."""
+
+        class _SyncCounter:
+            def __init__(self, db):
+                self.db = db
+                self.syncs = 0
+
+            def sync(self):
+                self.syncs += 1
+                self.db.sync()
+
+            def __getattr__(self, name):
+                return getattr(self.db, name)
+
+        counter = _SyncCounter(client._db)
+        client._db = counter
+        try:
+            with client.batch():
+                for i in range(5):
+                    client.create_document(
+                        doc_id=f"doc-test-{i:04d}", filename="a.pdf", format="pdf",
+                    )
+        finally:
+            client._db = counter.db
+
+        assert counter.syncs == 1
+
+    def test_batch_duplicate_relation(self, client):
+        """Pending relations count toward the duplicate check."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+
+        with client.batch():
+            client.create_relation(
+                src_doc_id="doc-test-0001",
+                dst_doc_id="doc-test-0002",
+                relation_type="references",
+            )
+            with pytest.raises(KojiDuplicateError):
+                client.create_relation(
+                    src_doc_id="doc-test-0001",
+                    dst_doc_id="doc-test-0002",
+                    relation_type="references",
+                )
+
+    def test_batch_discards_on_error(self, client):
+        """Buffered rows are dropped when the block raises."""
+        with pytest.raises(RuntimeError):
+            with client.batch():
+                client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+                raise RuntimeError("boom")
+
+        assert client.document_exists("doc-test-0001") is False
+
+    def test_batch_is_per_thread(self, client):
+        """Another thread's writes bypass the batch and survive its discard."""
+        with pytest.raises(RuntimeError):
+            with client.batch():
+                client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+
+                def other_thread():
+                    assert client.document_exists("doc-test-0001") is False
+                    client.create_document(
+                        doc_id="doc-test-0002", filename="b.pdf", format="pdf",
+                    )
+
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    pool.submit(other_thread).result()
+                assert client.query("SELECT doc_id FROM documents").num_rows == 1
+                raise RuntimeError("boom")
+
+        assert client.document_exists("doc-test-0001") is False
+        assert client.document_exists("doc-test-0002") is True
+
+    def test_nested_batch_joins_outer(self, client):
+        """Inner batches flush only when the outermost batch exits."""
+        with client.batch():
+            with client.batch():
+                client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+            assert client.query("SELECT doc_id FROM documents").num_rows == 0
+
+        assert client.document_exists("doc-test-0001")
+
+    def test_index_version_tracks_search_visible_writes(self, client):
+        """Document, page, chunk and relation writes bump index_version; jobs do not."""
+        version = client.index_version
+        with client.batch():
+            client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+            client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+            assert client.index_version == version
+        assert client.index_version > version
+
+        version = client.index_version
+        client.insert_chunks([
+            {"id": "doc-test-0001-chunk0001", "doc_id": "doc-test-0001", "page_num": 1},
+        ])
+        assert client.index_version > version
+
+        version = client.index_version
+        client.create_relation("doc-test-0001", "doc-test-0002", "references")
+        assert client.index_version > version
+
+        version = client.index_version
+        client.delete_relation("doc-test-0001", "doc-test-0002", "references")
+        client.update_document("doc-test-0002", filename="c.pdf")
+        assert client.index_version == version + 2
+
+        version = client.index_version
+        client.create_job(doc_id="doc-test-0001", filename="a.pdf", file_path="/tmp/a.pdf")
+        assert client.index_version == version
+
+
+class TestRowCache:
+    """Test the read-through row cache."""
+
+    def _doc_counters(self, client):
+        return client.health_check()["cache"]["tables"]["documents"]
+
+    def test_repeated_reads_hit_cache(self, client):
+        """A second get_document is served from the cache."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.get_document("doc-test-0001")
+        client.get_document("doc-test-0001")
+
+        counters = self._doc_counters(client)
+        assert counters["misses"] == 1
+        assert counters["hits"] == 1
+
+    def test_get_documents_only_fetches_misses(self, client):
+        """Batched lookups reuse rows cached by earlier reads."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.create_document(doc_id="doc-test-0002", filename="b.pdf", format="pdf")
+        client.get_documents(["doc-test-0001"], columns=["metadata"])
+
+        docs = client.get_documents(["doc-test-0001", "doc-test-0002"], columns=["metadata"])
+
+        assert docs.keys() == {"doc-test-0001", "doc-test-0002"}
+        assert self._doc_counters(client)["hits"] == 1
+
+    def test_update_invalidates(self, client):
+        """update_document drops the cached row."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.get_document("doc-test-0001")
+
+        client.update_document("doc-test-0001", status="complete")
+
+        assert client.get_document("doc-test-0001")["status"] == "complete"
+
+    def test_delete_invalidates_document_and_pages(self, client):
+        """delete_document drops the document and its cached pages."""
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+        client.insert_pages([
+            {"id": "doc-test-0001-page001", "doc_id": "doc-test-0001", "page_num": 1},
+        ])
+        assert client.get_page("doc-test-0001-page001") is not None
+        assert client.get_document("doc-test-0001") is not None
+
+        client.delete_document("doc-test-0001")
+
+        assert client.get_document("doc-test-0001") is None
+        assert client.get_page("doc-test-0001-page001") is None
+
+    def test_mutating_result_does_not_poison_cache(self, client):
+        """Callers may mutate returned rows freely."""
+        client.create_document(
+            doc_id="doc-test-0001", filename="a.pdf", format="pdf",
+            metadata={"title": "A"},
+        )
+        client.get_document("doc-test-0001")["metadata"]["title"] = "changed"
+
+        assert client.get_document("doc-test-0001")["metadata"]["title"] == "A"
+
+    def test_cache_disabled(self, tmp_path):
+        """cache_max_entries=0 disables the cache."""
+        config = KojiConfig(db_path=str(tmp_path / "test.db"), cache_max_entries=0)
+        c = KojiClient(config)
+        c.open()
+        try:
+            c.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+            assert c.get_document("doc-test-0001") is not None
+            assert c.health_check()["cache"] is None
+        finally:
+            c.close()
+
+
+class TestJobQueue:
+    """Test lease-based job claims."""
+
+    def test_claim_records_lease(self, client):
+        """A claim records the worker, lease expiry, and attempt count."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+
+        job = client.claim_next_job(worker_id="worker-a", lease_seconds=60)
+
+        assert job["doc_id"] == "job-1"
+        assert job["worker_id"] == "worker-a"
+        assert job["attempts"] == 1
+        stored = client.get_job("job-1")
+        assert stored["status"] == "processing"
+        assert stored["worker_id"] == "worker-a"
+        assert stored["lease_expires_at"] == job["lease_expires_at"]
+
+    def test_claimed_job_is_not_claimed_twice(self, client):
+        """A second worker gets the next job, never the one already claimed."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.create_job("job-2", "b.pdf", "/tmp/b.pdf")
+
+        first = client.claim_next_job(worker_id="worker-a")
+        second = client.claim_next_job(worker_id="worker-b")
+
+        assert {first["doc_id"], second["doc_id"]} == {"job-1", "job-2"}
+        assert client.claim_next_job(worker_id="worker-c") is None
+
+    def test_stale_claim_loses_race(self, client):
+        """A claim based on an outdated read does not steal the job."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        snapshot = client.list_jobs(status="queued")[0]
+        client.claim_next_job(worker_id="worker-a")
+
+        assert client._try_claim_job(snapshot, "worker-b", 60) is None
+        assert client.get_job("job-1")["worker_id"] == "worker-a"
+
+    def test_two_clients_race_for_jobs(self, client, config):
+        """Clients on one path, as in a worker pool, never claim a job twice."""
+        other = KojiClient(config)
+        other.open()
+        try:
+            for i in range(6):
+                client.create_job(f"job-{i}", f"{i}.pdf", f"/tmp/{i}.pdf")
+            barrier = threading.Barrier(2)
+
+            def drain(worker: KojiClient, worker_id: str) -> list[str]:
+                barrier.wait()
+                claimed = []
+                while (job := worker.claim_next_job(worker_id=worker_id)) is not None:
+                    claimed.append(job["doc_id"])
+                return claimed
+
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                a = pool.submit(drain, client, "worker-a")
+                b = pool.submit(drain, other, "worker-b")
+                claimed_a, claimed_b = a.result(), b.result()
+
+            assert sorted(claimed_a + claimed_b) == [f"job-{i}" for i in range(6)]
+            for doc_id in claimed_b:
+                assert client.get_job(doc_id)["worker_id"] == "worker-b"
+        finally:
+            other.close()
+
+    def test_heartbeat_only_for_lease_holder(self, client):
+        """Only the worker holding the lease can extend it."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.claim_next_job(worker_id="worker-a", lease_seconds=60)
+
+        assert client.heartbeat_job("job-1", "worker-a", lease_seconds=600) is True
+        assert client.heartbeat_job("job-1", "worker-b", lease_seconds=600) is False
+
+    def test_expired_lease_is_requeued(self, client):
+        """Jobs whose lease lapsed go back to the queue and can be reclaimed."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.claim_next_job(worker_id="worker-a", lease_seconds=-1)
+
+        assert client.requeue_expired_jobs() == 1
+
+        job = client.get_job("job-1")
+        assert job["status"] == "queued"
+        assert job["worker_id"] is None
+        reclaimed = client.claim_next_job(worker_id="worker-b")
+        assert reclaimed["attempts"] == 2
+        assert client.heartbeat_job("job-1", "worker-a") is False
+
+    def test_live_lease_is_not_requeued(self, client):
+        """Jobs with an unexpired lease are left alone."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.claim_next_job(worker_id="worker-a", lease_seconds=60)
+
+        assert client.requeue_expired_jobs() == 0
+        assert client.get_job("job-1")["status"] == "processing"
+
+    def test_requeue_sees_heartbeat_from_other_client(self, client, config):
+        """A lease renewed by another process's client is not requeued."""
+        other = KojiClient(config)
+        other.open()
+        try:
+            client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+            assert client.requeue_expired_jobs() == 0
+            other.claim_next_job(worker_id="worker-b", lease_seconds=-1)
+            assert other.heartbeat_job("job-1", "worker-b", lease_seconds=600) is True
+
+            assert client.requeue_expired_jobs() == 0
+            assert other.complete_job("job-1", worker_id="worker-b") is True
+            assert client.get_job("job-1")["status"] == "completed"
+        finally:
+            other.close()
+
+    def test_expired_after_max_attempts_fails(self, client):
+        """A job that keeps expiring is failed instead of retried forever."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.claim_next_job(worker_id="worker-a", lease_seconds=-1)
+
+        assert client.requeue_expired_jobs(max_attempts=1) == 1
+
+        job = client.get_job("job-1")
+        assert job["status"] == "failed"
+        assert "Lease expired" in job["error"]
+
+    def test_complete_requires_lease(self, client):
+        """A worker whose job was requeued cannot complete it."""
+        client.create_job("job-1", "a.pdf", "/tmp/a.pdf")
+        client.claim_next_job(worker_id="worker-a", lease_seconds=-1)
+        client.requeue_expired_jobs()
+        client.claim_next_job(worker_id="worker-b")
+
+        assert client.complete_job("job-1", worker_id="worker-a") is False
+        assert client.get_job("job-1")["status"] == "processing"
+        assert client.complete_job("job-1", worker_id="worker-b") is True
+        assert client.get_job("job-1")["status"] == "completed"
+
+    def test_unsafe_worker_id_rejected(self, client):
+        """Worker IDs are interpolated into SQL and must be identifier-safe."""
+        with pytest.raises(ValueError):
+            client.claim_next_job(worker_id="worker' OR '1'='1")
+
 
 class TestHealthCheck:
     """Test health check."""
@@ -660,6 +1283,16 @@ class TestHealthCheck:
         assert isinstance(health["tables"], list)
         assert len(health["tables"]) >= 4
 
+    def test_health_check_reports_query_stats(self, client):
+        """Statements are aggregated per template in the health payload."""
+        client.query("SELECT COUNT(*) AS n FROM documents")
+        client.query("SELECT COUNT(*) AS n FROM documents")
+
+        stats = client.query_stats.snapshot()
+        templates = {s["template"]: s for s in stats["statements"]}
+        assert templates["SELECT COUNT(*) AS n FROM documents"]["count"] == 2
+        assert client.health_check()["queries"]["totals"]["count"] >= 2
+
     def test_health_check_disconnected(self, config):
         """Verify health response when not connected."""
         c = KojiClient(config)
@@ -681,6 +1314,154 @@ class TestRawSQL:
         assert result.column("n")[0].as_py() == 1
 
 
+class TestQueryBatches:
+    """Test streaming query results."""
+
+    def test_query_batches_pages_through_results(self, client):
+        """Every row is yielded once, in order, in bounded batches."""
+        for i in range(5):
+            client.create_document(doc_id=f"doc-batch-{i}", filename=f"{i}.pdf", format="pdf")
+
+        batches = list(client.query_batches(
+            "SELECT doc_id FROM documents", key="doc_id", batch_size=2,
+        ))
+
+        assert [b.num_rows for b in batches] == [2, 2, 1]
+        doc_ids = [d for b in batches for d in b.column("doc_id").to_pylist()]
+        assert doc_ids == [f"doc-batch-{i}" for i in range(5)]
+
+    def test_query_batches_empty_and_invalid(self, client):
+        """Empty results yield nothing; batch_size must be positive."""
+        assert list(client.query_batches(
+            "SELECT doc_id FROM documents WHERE doc_id = ?", key="doc_id", params=["nope"],
+        )) == []
+        with pytest.raises(ValueError, match="batch_size"):
+            list(client.query_batches("SELECT doc_id FROM documents", "doc_id", batch_size=0))
+
+    def test_query_batches_composite_key(self, client):
+        """Composite keys resume after the last (src, dst, type) tuple."""
+        for doc_id in ("doc-a", "doc-b", "doc-c"):
+            client.create_document(doc_id=doc_id, filename=f"{doc_id}.pdf", format="pdf")
+        edges = [
+            ("doc-a", "doc-b", "cites"), ("doc-a", "doc-b", "references"),
+            ("doc-a", "doc-c", "cites"), ("doc-b", "doc-c", "cites"),
+            ("doc-c", "doc-a", "cites"),
+        ]
+        for src, dst, rel in edges:
+            client.create_relation(src, dst, rel)
+
+        batches = list(client.query_batches(
+            "SELECT r.src_doc_id, r.dst_doc_id, r.relation_type FROM doc_relations r "
+            "WHERE r.src_doc_id <> ?",
+            key=["r.src_doc_id", "r.dst_doc_id", "r.relation_type"],
+            params=["doc-z"],
+            batch_size=2,
+        ))
+
+        assert [b.num_rows for b in batches] == [2, 2, 1]
+        rows = [
+            (row["src_doc_id"], row["dst_doc_id"], row["relation_type"])
+            for b in batches for row in b.to_pylist()
+        ]
+        assert rows == edges
+
+    def test_find_document_by_filename(self, client):
+        """Exact filename matches return a projected document."""
+        client.create_document(doc_id="doc-find-1", filename="report.pdf", format="pdf")
+
+        doc = client.find_document_by_filename("report.pdf", columns=["doc_id", "format"])
+        assert doc["doc_id"] == "doc-find-1"
+        assert doc["format"] == "pdf"
+        assert client.find_document_by_filename("other.pdf") is None
+
+    def test_delete_project_walks_documents_in_pages(self, client, monkeypatch):
+        """Project deletion removes every document across several pages."""
+        monkeypatch.setattr(
+            "tkr_docusearch.storage.koji_client._PROJECT_DELETE_PAGE_SIZE", 2,
+        )
+        client.create_project(project_id="proj-stream", name="Stream")
+        for i in range(5):
+            client.create_document(
+                doc_id=f"doc-proj-{i}", filename=f"{i}.pdf", format="pdf",
+                project_id="proj-stream",
+            )
+        client.create_document(doc_id="doc-keep", filename="keep.pdf", format="pdf")
+
+        assert client.delete_project("proj-stream") == 5
+        assert client.count_documents_in_project("proj-stream") == 0
+        assert client.get_document("doc-keep") is not None
+
+
+class TestRowProjectIds:
+    """Verify the project_id copy on pages and chunks."""
+
+    def _seed(self, client, project_id="proj-rows"):
+        client.create_project(project_id=project_id, name="Rows")
+        client.create_document(
+            doc_id="doc-rows-1", filename="a.pdf", format="pdf", project_id=project_id,
+        )
+        client.insert_pages([{"id": "doc-rows-1-p1", "doc_id": "doc-rows-1", "page_num": 1}])
+        client.insert_chunks([{
+            "id": "doc-rows-1-c0", "doc_id": "doc-rows-1", "page_num": 1, "text": "t",
+        }])
+
+    def _row_projects(self, client, table):
+        result = client.query(f"SELECT project_id FROM {table} WHERE doc_id = ?", ["doc-rows-1"])
+        return set(result.column("project_id").to_pylist())
+
+    def test_insert_copies_document_project(self, client):
+        """Pages and chunks inherit their document's project."""
+        self._seed(client)
+        assert self._row_projects(client, "pages") == {"proj-rows"}
+        assert self._row_projects(client, "chunks") == {"proj-rows"}
+
+    def test_insert_inside_batch_uses_buffered_document(self, client):
+        """A document created earlier in the same batch is resolved."""
+        client.create_project(project_id="proj-rows", name="Rows")
+        with client.batch():
+            client.create_document(
+                doc_id="doc-rows-1", filename="a.pdf", format="pdf", project_id="proj-rows",
+            )
+            client.insert_pages([{"id": "doc-rows-1-p1", "doc_id": "doc-rows-1", "page_num": 1}])
+        assert self._row_projects(client, "pages") == {"proj-rows"}
+
+    def test_moving_document_updates_rows(self, client):
+        """Changing a document's project rewrites its pages and chunks."""
+        self._seed(client)
+        client.create_project(project_id="proj-moved", name="Moved")
+        client.update_document("doc-rows-1", project_id="proj-moved")
+        assert self._row_projects(client, "pages") == {"proj-moved"}
+        assert self._row_projects(client, "chunks") == {"proj-moved"}
+
+    def test_backfill_fills_null_project_ids(self, config):
+        """Rows written without a project_id are filled by the one-shot backfill."""
+        c = KojiClient(config)
+        c.open()
+        c.create_document(doc_id="doc-rows-1", filename="a.pdf", format="pdf")
+        legacy_schema = pa.schema([
+            pa.field("id", pa.string(), nullable=False),
+            pa.field("doc_id", pa.string()),
+            pa.field("page_num", pa.int64()),
+        ])
+        c.insert("pages", pa.table(
+            {"id": ["doc-rows-1-p1"], "doc_id": ["doc-rows-1"], "page_num": [1]},
+            schema=legacy_schema,
+        ))
+        c.close()
+
+        c.open()
+        try:
+            assert self._row_projects(c, "pages") == {None}
+            assert c.backfill_row_project_ids(dry_run=True) == {"pages": 1, "chunks": 0}
+            assert self._row_projects(c, "pages") == {None}
+
+            assert c.backfill_row_project_ids() == {"pages": 1, "chunks": 0}
+            assert self._row_projects(c, "pages") == {"default"}
+            assert c.backfill_row_project_ids() == {"pages": 0, "chunks": 0}
+        finally:
+            c.close()
+
+
 class TestUpdateDocumentPreservesChildren:
     """Verify that update_document() no longer destroys child data.
 
@@ -10,6 +10,9 @@ Graph algorithm tests are skipped when the installed koji-python binary
 was not built with graph support (``graph()`` method missing).
 """
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import koji
 import pytest
 
@@ -67,6 +70,71 @@ class TestDocIdIntMapping:
         mapping = client._doc_id_int_mapping()
         assert mapping == {}
 
+    def test_node_ids_stable_across_inserts(self, client):
+        """Inserting a document that sorts first does not shift existing ids."""
+        client.create_document(doc_id="doc-M", filename="m.pdf", format="pdf")
+        before = {v: k for k, v in client._doc_id_int_mapping().items()}
+
+        client.create_document(doc_id="doc-A", filename="a.pdf", format="pdf")
+        after = {v: k for k, v in client._doc_id_int_mapping().items()}
+
+        assert after["doc-M"] == before["doc-M"]
+        assert after["doc-A"] > after["doc-M"]
+
+    def test_mapping_does_not_write(self, client):
+        """Documents without an id are left out until the backfill numbers them."""
+        for doc_id in ("doc-P", "doc-Q", "doc-R"):
+            client.create_document(doc_id=doc_id, filename=f"{doc_id}.pdf", format="pdf")
+        ids = {v: k for k, v in client._doc_id_int_mapping().items()}
+        client._db.update("documents", {"node_id": None}, "doc_id = 'doc-R'")
+
+        assert set(client._doc_id_int_mapping().values()) == {"doc-P", "doc-Q"}
+        assert client.backfill_node_ids(dry_run=True) == {"documents": 1}
+        assert client.backfill_node_ids() == {"documents": 1}
+
+        numbered = {v: k for k, v in client._doc_id_int_mapping().items()}
+        assert numbered["doc-P"] == ids["doc-P"]
+        assert numbered["doc-R"] > max(ids.values())
+        assert client.backfill_node_ids() == {"documents": 0}
+
+    def test_concurrent_clients_never_share_ids(self, client, config):
+        """Clients on one path, as in a worker pool, draw distinct ids."""
+        other = KojiClient(config)
+        other.open()
+        try:
+            barrier = threading.Barrier(2)
+
+            def ingest(writer: KojiClient, prefix: str) -> None:
+                barrier.wait()
+                for i in range(10):
+                    writer.create_document(
+                        doc_id=f"{prefix}-{i}", filename=f"{prefix}-{i}.pdf", format="pdf",
+                    )
+
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                for future in [pool.submit(ingest, client, "a"), pool.submit(ingest, other, "b")]:
+                    future.result()
+
+            result = client.query("SELECT node_id FROM documents")
+            node_ids = result.column("node_id").to_pylist()
+            assert len(node_ids) == 20
+            assert len(set(node_ids)) == 20
+        finally:
+            other.close()
+
+    def test_project_scoped_mapping(self, client):
+        """Project scope filters the mapping without renumbering."""
+        client.create_project("proj-a", "Project A")
+        client.create_document(doc_id="doc-1", filename="1.pdf", format="pdf")
+        client.create_document(
+            doc_id="doc-2", filename="2.pdf", format="pdf", project_id="proj-a",
+        )
+
+        full = client._doc_id_int_mapping()
+        scoped = client._doc_id_int_mapping(project_id="proj-a")
+        assert list(scoped.values()) == ["doc-2"]
+        assert full[next(iter(scoped))] == "doc-2"
+
 
 @requires_graph
 class TestGraphPageRank:
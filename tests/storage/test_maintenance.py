@@ -0,0 +1,167 @@
+"""
+Unit tests for the background compaction scheduler.
+
+Uses a lightweight stand-in client that only exposes ``db_path`` and
+``compact()`` so heuristics can be exercised without a Koji database.
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from tkr_docusearch.config.koji_config import KojiConfig
+from tkr_docusearch.storage.koji_client import KojiClient
+from tkr_docusearch.storage.maintenance import CompactionScheduler, scan_storage
+
+
+class _FakeClient:
+    """Client stand-in whose compaction deletes stale fragment files."""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.compactions = 0
+
+    def compact(self):
+        self.compactions += 1
+        data_dir = Path(self.db_path) / "documents.lance" / "data"
+        for stale in sorted(data_dir.glob("*.lance"))[1:]:
+            stale.unlink()
+
+
+@pytest.fixture
+def db_dir(tmp_path):
+    """A directory laid out like a Lance-backed Koji database."""
+    root = tmp_path / "koji.db"
+    data = root / "documents.lance" / "data"
+    versions = root / "documents.lance" / "_versions"
+    data.mkdir(parents=True)
+    versions.mkdir(parents=True)
+    for i in range(3):
+        (data / f"frag-{i}.lance").write_bytes(b"x" * 100)
+        (versions / f"{i}.manifest").write_bytes(b"m")
+    return root
+
+
+def test_scan_storage(db_dir, tmp_path):
+    """Fragments, versions, and bytes are counted from the Lance layout."""
+    footprint = scan_storage(db_dir)
+    assert footprint.fragments == 3
+    assert footprint.versions == 3
+    assert footprint.bytes == 303
+
+    assert scan_storage(tmp_path / "missing").bytes == 0
+
+
+def test_not_due_below_interval(db_dir):
+    """Fewer writes than the interval never trigger compaction."""
+    scheduler = CompactionScheduler(
+        _FakeClient(db_dir), compact_interval=10, idle_seconds=0,
+    )
+    scheduler.record_write(9)
+    assert scheduler.due_reason() is None
+
+
+def test_due_when_idle(db_dir):
+    """A due compaction runs once writes have gone quiet."""
+    scheduler = CompactionScheduler(
+        _FakeClient(db_dir), compact_interval=10, idle_seconds=0,
+    )
+    scheduler.record_write(10)
+    assert scheduler.due_reason() == "idle"
+
+
+def test_busy_defers_until_backlog(db_dir):
+    """Recent writes defer compaction until the backlog ceiling."""
+    scheduler = CompactionScheduler(
+        _FakeClient(db_dir), compact_interval=10, idle_seconds=60,
+    )
+    scheduler.record_write(10)
+    assert scheduler.due_reason() is None
+
+    scheduler.record_write(30)
+    assert scheduler.due_reason() == "backlog"
+
+
+def test_due_on_new_fragments(db_dir):
+    """Fragment growth alone can make compaction due."""
+    scheduler = CompactionScheduler(
+        _FakeClient(db_dir), compact_interval=2, idle_seconds=0,
+    )
+    data = db_dir / "documents.lance" / "data"
+    for i in range(3, 5):
+        (data / f"frag-{i}.lance").write_bytes(b"x")
+    scheduler.record_write(1)
+    assert scheduler.due_reason() == "idle"
+
+
+def test_run_now_records_reclaimed_bytes(db_dir):
+    """A pass records duration and bytes reclaimed, and resets the backlog."""
+    client = _FakeClient(db_dir)
+    scheduler = CompactionScheduler(client, compact_interval=10, idle_seconds=0)
+    scheduler.record_write(12)
+
+    run = scheduler.run_now()
+
+    assert client.compactions == 1
+    assert run.reason == "manual"
+    assert run.bytes_reclaimed == 200
+    assert run.fragments_before == 3
+    assert run.fragments_after == 1
+    assert run.writes_compacted == 12
+    assert run.error is None
+
+    status = scheduler.status()
+    assert status["writes_since_compaction"] == 0
+    assert status["total_runs"] == 1
+    assert status["total_bytes_reclaimed"] == 200
+    assert status["last_run"]["bytes_reclaimed"] == 200
+
+
+def test_trigger_runs_on_background_thread(db_dir):
+    """A manual trigger is serviced by the maintenance thread."""
+    client = _FakeClient(db_dir)
+    scheduler = CompactionScheduler(client, compact_interval=10, check_seconds=60)
+    assert scheduler.trigger() is False  # not started
+
+    scheduler.start()
+    try:
+        assert scheduler.trigger() is True
+        deadline = time.monotonic() + 5
+        while client.compactions == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+
+    assert client.compactions == 1
+    assert scheduler.status()["thread_alive"] is False
+
+
+def test_client_writes_do_not_compact_inline(tmp_path, monkeypatch):
+    """KojiClient leaves compaction to the scheduler, even at the interval."""
+    monkeypatch.setattr(
+        KojiClient, "compact", lambda self: pytest.fail("compacted inline"),
+    )
+    config = KojiConfig(
+        db_path=str(tmp_path / "test.db"), compact_interval=1, run_maintenance=True,
+    )
+    client = KojiClient(config)
+    client.open()
+    try:
+        client.create_document(doc_id="doc-test-0001", filename="a.pdf", format="pdf")
+
+        assert client.maintenance is not None
+        assert client.maintenance.status()["writes_since_compaction"] >= 1
+    finally:
+        client.close()
+    assert client.maintenance is None
+
+
+def test_client_without_maintenance_starts_no_scheduler(tmp_path):
+    """Only clients opted in with ``run_maintenance`` run compaction."""
+    client = KojiClient(KojiConfig(db_path=str(tmp_path / "test.db"), compact_interval=1))
+    client.open()
+    try:
+        assert client.maintenance is None
+    finally:
+        client.close()
@@ -0,0 +1,115 @@
+"""
+Unit tests for Koji query instrumentation.
+
+Tests cover:
+- SQL template normalization
+- Per-template counts, histograms, and percentile estimates
+- Slow-query logging with redacted parameters
+- InstrumentedDatabase timing, row/byte capture, and error counting
+"""
+
+import pyarrow as pa
+import pytest
+from structlog.testing import capture_logs
+
+from tkr_docusearch.storage.query_stats import (
+    InstrumentedDatabase,
+    QueryStats,
+    normalize_sql,
+    redact_params,
+)
+
+
+class _FakeDatabase:
+    """Minimal stand-in for ``koji.Database`` statement methods."""
+
+    def __init__(self):
+        self.synced = False
+
+    def query(self, sql, params):
+        if "missing_table" in sql:
+            raise RuntimeError("no such table")
+        return pa.table({"doc_id": ["a", "b"]})
+
+    def insert(self, table, data):
+        return None
+
+    def sync(self):
+        self.synced = True
+
+
+def test_normalize_sql_collapses_literals():
+    """Statements differing only in values share a template."""
+    a = normalize_sql("SELECT *  FROM pages\n WHERE doc_id = 'abc' AND page_num = 3")
+    b = normalize_sql("SELECT * FROM pages WHERE doc_id = 'x''y' AND page_num = 12")
+    assert a == b == "SELECT * FROM pages WHERE doc_id = ? AND page_num = ?"
+
+    assert normalize_sql("SELECT doc_id FROM documents WHERE doc_id IN (?, ?, ?)") == (
+        "SELECT doc_id FROM documents WHERE doc_id IN (?...)"
+    )
+    assert normalize_sql("WHERE embedding <~> $1 LIMIT 10") == "WHERE embedding <~> $1 LIMIT ?"
+
+
+def test_redact_params():
+    """Only types and lengths of parameters are reported."""
+    assert redact_params(["secret", b"\x00\x01", 3, None]) == [
+        "<str:6>", "<bytes:2>", "<int>", "<null>",
+    ]
+
+
+def test_record_aggregates_by_template():
+    """Counts, rows, bytes, and percentiles accumulate per template."""
+    stats = QueryStats(slow_query_ms=0)
+    for elapsed in (0.5, 0.5, 3.0, 40.0):
+        stats.record("query", "SELECT * FROM pages WHERE id = 'p1'", elapsed, rows=1, nbytes=10)
+    stats.record("query", "SELECT COUNT(*) FROM documents", 200.0)
+
+    snapshot = stats.snapshot()
+    top, second = snapshot["statements"]
+    assert top["template"] == "SELECT COUNT(*) FROM documents"
+    assert second["count"] == 4
+    assert second["rows"] == 4
+    assert second["bytes"] == 40
+    assert second["p50_ms"] == 1
+    assert second["p99_ms"] == 40.0
+    assert second["histogram"]["le_1"] == 2
+    assert snapshot["totals"]["count"] == 5
+    assert len(stats.snapshot(limit=1)["statements"]) == 1
+
+    stats.reset()
+    assert stats.snapshot()["statements"] == []
+
+
+def test_slow_query_logged_with_redacted_params():
+    """Slow statements are logged by template, never with raw values."""
+    stats = QueryStats(slow_query_ms=100)
+    with capture_logs() as logs:
+        stats.record("query", "SELECT * FROM documents WHERE doc_id = ?", 150.0,
+                     params=["private-doc-id"])
+        stats.record("query", "SELECT 1", 5.0)
+
+    assert len(logs) == 1
+    assert logs[0]["event"] == "koji_client.slow_query"
+    assert logs[0]["params"] == ["<str:14>"]
+    assert "private-doc-id" not in str(logs[0])
+    assert stats.snapshot()["totals"]["slow_queries"] == 1
+
+
+def test_instrumented_database_records_and_forwards():
+    """Statement calls are recorded; other attributes pass through."""
+    stats = QueryStats(slow_query_ms=0)
+    db = InstrumentedDatabase(_FakeDatabase(), stats)
+
+    result = db.query("SELECT doc_id FROM documents WHERE doc_id = ?", ["a"])
+    assert result.num_rows == 2
+    db.insert("pages", pa.table({"id": ["p1", "p2", "p3"]}))
+    with pytest.raises(RuntimeError):
+        db.query("SELECT * FROM missing_table", [])
+    db.sync()
+
+    by_template = {s["template"]: s for s in stats.snapshot()["statements"]}
+    assert by_template["SELECT doc_id FROM documents WHERE doc_id = ?"]["rows"] == 2
+    assert by_template["SELECT doc_id FROM documents WHERE doc_id = ?"]["bytes"] > 0
+    assert by_template["INSERT INTO pages"]["rows"] == 3
+    assert by_template["SELECT * FROM missing_table"]["errors"] == 1
+    assert db.synced is True
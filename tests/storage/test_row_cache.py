@@ -0,0 +1,170 @@
+"""
+Unit tests for the KojiClient row cache.
+
+Tests cover:
+- LRU eviction by entry count and estimated bytes
+- Row, group, and table invalidation
+- Generation check against stale puts
+- TTL expiry
+- Copy-on-read isolation
+"""
+
+import threading
+
+from tkr_docusearch.storage.row_cache import RowCache
+
+
+def _counters(cache, table):
+    return cache.stats()["tables"][table]
+
+
+def test_hit_and_miss_counters():
+    """Misses, then hits, are counted per table."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    assert cache.get("documents", "doc-1") is None
+
+    gen = cache.generation("documents")
+    cache.put("documents", "doc-1", {"doc_id": "doc-1"}, row_id="doc-1", generation=gen)
+    assert cache.get("documents", "doc-1") == {"doc_id": "doc-1"}
+
+    counters = _counters(cache, "documents")
+    assert counters["hits"] == 1
+    assert counters["misses"] == 1
+    assert counters["entries"] == 1
+
+
+def test_lru_evicts_least_recently_used():
+    """Exceeding max_entries evicts the least recently read row."""
+    cache = RowCache(max_entries=2, max_bytes=1 << 20)
+    for key in ("a", "b"):
+        cache.put("pages", key, {"id": key}, row_id=key, generation=0)
+    cache.get("pages", "a")
+    cache.put("pages", "c", {"id": "c"}, row_id="c", generation=0)
+
+    assert cache.get("pages", "b") is None
+    assert cache.get("pages", "a") == {"id": "a"}
+    assert _counters(cache, "pages")["evictions"] == 1
+
+
+def test_byte_bound():
+    """Rows are evicted to stay under max_bytes; oversized rows are skipped."""
+    cache = RowCache(max_entries=100, max_bytes=1000)
+    cache.put("chunks", "big", {"text": "x" * 5000}, row_id="big", generation=0)
+    assert cache.get("chunks", "big") is None
+
+    for i in range(5):
+        cache.put("chunks", i, {"text": "x" * 200}, row_id=str(i), generation=0)
+    counters = _counters(cache, "chunks")
+    assert counters["bytes"] <= 1000
+    assert counters["evictions"] > 0
+
+
+def test_tables_are_bounded_independently():
+    """Filling one table does not evict rows from another."""
+    cache = RowCache(max_entries=1, max_bytes=1 << 20)
+    cache.put("documents", "d", {"id": "d"}, row_id="d", generation=0)
+    cache.put("pages", "p1", {"id": "p1"}, row_id="p1", generation=0)
+    cache.put("pages", "p2", {"id": "p2"}, row_id="p2", generation=0)
+
+    assert cache.get("documents", "d") == {"id": "d"}
+
+
+def test_invalidate_drops_all_projections():
+    """Invalidating a row drops every key cached for it."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("documents", ("doc-1", "*"), {"a": 1}, row_id="doc-1", generation=0)
+    cache.put("documents", ("doc-1", "doc_id"), {"a": 1}, row_id="doc-1", generation=0)
+
+    cache.invalidate("documents", ["doc-1"])
+
+    assert cache.get("documents", ("doc-1", "*")) is None
+    assert cache.get("documents", ("doc-1", "doc_id")) is None
+    assert _counters(cache, "documents")["invalidations"] == 2
+
+
+def test_invalidate_group():
+    """Rows tagged with a parent ID are dropped together."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    for page_id, doc_id in (("p1", "doc-a"), ("p2", "doc-a"), ("p3", "doc-b")):
+        cache.put("pages", page_id, {"id": page_id}, row_id=page_id, generation=0, group=doc_id)
+
+    cache.invalidate_group("pages", "doc-a")
+
+    assert cache.get("pages", "p1") is None
+    assert cache.get("pages", "p2") is None
+    assert cache.get("pages", "p3") == {"id": "p3"}
+
+
+def test_stale_put_is_discarded():
+    """A row read before an invalidation is not cached afterwards."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    gen = cache.generation("documents")
+    cache.invalidate("documents", ["doc-1"])  # concurrent write
+    cache.put("documents", "doc-1", {"old": True}, row_id="doc-1", generation=gen)
+
+    assert cache.get("documents", "doc-1") is None
+
+
+def test_ttl_expiry(monkeypatch):
+    """Rows older than ttl_seconds are treated as misses."""
+    clock = [100.0]
+    monkeypatch.setattr("tkr_docusearch.storage.row_cache.time.monotonic", lambda: clock[0])
+    cache = RowCache(max_entries=10, max_bytes=1 << 20, ttl_seconds=5)
+    cache.put("documents", "doc-1", {"a": 1}, row_id="doc-1", generation=0)
+
+    clock[0] += 4
+    assert cache.get("documents", "doc-1") == {"a": 1}
+    clock[0] += 2
+    assert cache.get("documents", "doc-1") is None
+    assert _counters(cache, "documents")["evictions"] == 1
+
+
+def test_values_are_copied():
+    """Mutating a returned row does not change the cached copy."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    row = {"metadata": {"title": "A"}}
+    cache.put("documents", "doc-1", row, row_id="doc-1", generation=0)
+    row["metadata"]["title"] = "changed"
+
+    got = cache.get("documents", "doc-1")
+    got["metadata"]["title"] = "mutated"
+
+    assert cache.get("documents", "doc-1") == {"metadata": {"title": "A"}}
+
+
+def test_clear():
+    """clear() empties one table or all of them."""
+    cache = RowCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("documents", "d", {"id": "d"}, row_id="d", generation=0)
+    cache.put("pages", "p", {"id": "p"}, row_id="p", generation=0)
+
+    cache.clear("pages")
+    assert cache.get("pages", "p") is None
+    assert cache.get("documents", "d") == {"id": "d"}
+
+    cache.clear()
+    assert cache.get("documents", "d") is None
+
+
+def test_concurrent_access():
+    """Concurrent puts, gets, and invalidations keep bookkeeping consistent."""
+    cache = RowCache(max_entries=50, max_bytes=1 << 20)
+
+    def worker(n):
+        for i in range(500):
+            key = f"row-{(n * 7 + i) % 80}"
+            gen = cache.generation("pages")
+            if cache.get("pages", key) is None:
+                cache.put("pages", key, {"id": key}, row_id=key, generation=gen, group="doc")
+            if i % 50 == 0:
+                cache.invalidate_group("pages", "doc")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    counters = _counters(cache, "pages")
+    assert counters["entries"] <= 50
+    assert counters["bytes"] >= 0
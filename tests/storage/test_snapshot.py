@@ -0,0 +1,112 @@
+"""
+Tests for Koji snapshot export and restore.
+
+Tests cover:
+- Round trip through Arrow IPC and Parquet snapshots
+- Foreign-key cascades working on a parallel restore
+- Manifest contents and throughput reporting
+- Restore refusing non-empty targets
+- Export refusing to overwrite an existing snapshot
+"""
+
+import json
+
+import pytest
+
+from tkr_docusearch.config.koji_config import KojiConfig
+from tkr_docusearch.storage.koji_client import KojiClient
+from tkr_docusearch.storage.snapshot import (
+    MANIFEST_NAME,
+    SNAPSHOT_TABLES,
+    export_snapshot,
+    import_snapshot,
+)
+
+
+def _open_client(path):
+    client = KojiClient(KojiConfig(db_path=str(path)))
+    client.open()
+    return client
+
+
+@pytest.fixture
+def source(tmp_path):
+    """Database with a project, documents, pages, chunks, and relations."""
+    client = _open_client(tmp_path / "source.db")
+    client.create_project(project_id="proj-snap", name="Snapshot")
+    for i in range(5):
+        doc_id = f"doc-snap-{i}"
+        client.create_document(
+            doc_id=doc_id, filename=f"{i}.pdf", format="pdf", project_id="proj-snap",
+        )
+        client.insert_pages([{
+            "id": f"{doc_id}-page1", "doc_id": doc_id, "page_num": 1,
+            "image": b"\x89PNG" + bytes(64),
+        }])
+        client.insert_chunks([{
+            "id": f"{doc_id}-chunk0", "doc_id": doc_id, "page_num": 1, "text": f"text {i}",
+        }])
+    client.create_relation("doc-snap-0", "doc-snap-1", "references")
+    client.create_relation("doc-snap-1", "doc-snap-2", "similar_to")
+    yield client
+    client.close()
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_round_trip(source, tmp_path, fmt):
+    """A restored database holds the same rows as the source."""
+    manifest = export_snapshot(source, tmp_path / "snap", fmt=fmt, batch_size=2)
+
+    assert set(manifest["tables"]) == set(SNAPSHOT_TABLES)
+    assert manifest["tables"]["documents"]["rows"] == 5
+    assert manifest["tables"]["doc_relations"]["rows"] == 2
+    assert manifest["mb_per_s"] >= 0
+    on_disk = json.loads((tmp_path / "snap" / MANIFEST_NAME).read_text())
+    assert on_disk["format"] == fmt
+
+    target = _open_client(tmp_path / "target.db")
+    try:
+        report = import_snapshot(target, tmp_path / "snap", workers=3, batch_size=2)
+
+        # The seeded "default" project is kept rather than duplicated.
+        assert report["tables"]["projects"]["rows"] == manifest["tables"]["projects"]["rows"] - 1
+        assert report["tables"]["pages"]["rows"] == 5
+        assert target.count_documents_in_project("proj-snap") == 5
+        assert target.get_page_image("doc-snap-3", 1) == b"\x89PNG" + bytes(64)
+        related = target.get_related_documents("doc-snap-0", columns=["doc_id"])
+        assert {r["doc_id"] for r in related} == {"doc-snap-1", "doc-snap-2"}
+    finally:
+        target.close()
+
+
+def test_parallel_restore_keeps_cascades(source, tmp_path):
+    """Children restored in parallel still cascade from their documents."""
+    export_snapshot(source, tmp_path / "snap")
+    target = _open_client(tmp_path / "target.db")
+    try:
+        import_snapshot(target, tmp_path / "snap", workers=3, batch_size=2)
+
+        target.delete_document("doc-snap-1")
+
+        assert target.query("SELECT doc_id FROM documents").num_rows == 4
+        for table in ("pages", "chunks"):
+            rows = target.query(f"SELECT id FROM {table} WHERE doc_id = ?", ["doc-snap-1"])
+            assert rows.num_rows == 0
+        assert target.query("SELECT id FROM pages").num_rows == 4
+        assert target.query("SELECT src_doc_id FROM doc_relations").num_rows == 0
+    finally:
+        target.close()
+
+
+def test_import_refuses_non_empty_target(source, tmp_path):
+    """Restoring over existing documents is rejected."""
+    export_snapshot(source, tmp_path / "snap")
+    with pytest.raises(ValueError, match="non-empty table"):
+        import_snapshot(source, tmp_path / "snap")
+
+
+def test_export_refuses_existing_snapshot(source, tmp_path):
+    """An existing manifest is never overwritten."""
+    export_snapshot(source, tmp_path / "snap", compression=None)
+    with pytest.raises(ValueError, match="already exists"):
+        export_snapshot(source, tmp_path / "snap")
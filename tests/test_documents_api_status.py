@@ -25,6 +25,7 @@ import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from tkr_docusearch.core.testing.mocks import MockKojiClient
 from tkr_docusearch.processing.documents_api import router
 
 # ============================================================================
@@ -57,7 +58,7 @@ def mock_koji_client():
 
 @pytest.fixture
 def sample_koji_documents() -> List[Dict[str, Any]]:
-    """Sample document records from KojiClient.list_documents()."""
+    """Sample document records from the Koji ``documents`` table."""
     return [
         {
             "doc_id": "doc1",
@@ -269,13 +270,25 @@ def _configure_mock_koji(
 ) -> None:
     """Wire up a mock KojiClient with the given data.
 
+    ``list_document_summaries`` is backed by an in-memory
+    ``MockKojiClient`` so search, file-type, sort, and pagination
+    parameters are honoured the same way the SQL pushdown applies them.
+
     Args:
         mock_client: Mock KojiClient instance.
-        documents: Return value for list_documents().
+        documents: Document records served by list_document_summaries().
         pages: Mapping of doc_id to page records for get_pages_for_document().
         chunks: Mapping of doc_id to chunk records for get_chunks_for_document().
     """
-    mock_client.list_documents.return_value = documents
+    store = MockKojiClient()
+    for doc in documents:
+        store._documents[doc["doc_id"]] = dict(doc)
+    for page_records in pages.values():
+        store.insert_pages(page_records)
+    for chunk_records in chunks.values():
+        store.insert_chunks(chunk_records)
+
+    mock_client.list_document_summaries.side_effect = store.list_document_summaries
     mock_client.get_pages_for_document.side_effect = lambda doc_id: pages.get(doc_id, [])
     mock_client.get_chunks_for_document.side_effect = lambda doc_id: chunks.get(doc_id, [])
 
@@ -998,7 +1011,7 @@ class TestEdgeCases:
 
     def test_list_documents_database_error(self, client, mock_koji_client):
         """Test 500 error when database fails during list operation."""
-        mock_koji_client.list_documents.side_effect = Exception("Database error")
+        mock_koji_client.list_document_summaries.side_effect = Exception("Database error")
 
         response = client.get("/documents")
 
@@ -8,6 +8,7 @@ Target Coverage: 95%+
 Contract: integration-contracts/02-image-utils.contract.md
 """
 
+import io
 import shutil
 import tempfile
 from pathlib import Path
@@ -17,6 +18,7 @@ from PIL import Image
 
 from tkr_docusearch.processing.image_utils import (
     delete_document_images,
+    encode_thumbnail,
     generate_thumbnail,
     get_image_path,
     image_exists,
@@ -247,6 +249,39 @@ def test_generate_thumbnail_does_not_modify_original():
     assert img.size == original_size
 
 
+# ============================================================================
+# Tests for encode_thumbnail()
+# ============================================================================
+
+
+def test_encode_thumbnail_from_image():
+    """Test encoding a PIL image to thumbnail JPEG bytes."""
+    data = encode_thumbnail(Image.new("RGB", (1600, 2000), color="red"))
+
+    assert data[:2] == b"\xff\xd8"
+    thumb = Image.open(io.BytesIO(data))
+    assert thumb.format == "JPEG"
+    assert thumb.size == (300, 375)
+
+
+def test_encode_thumbnail_from_png_bytes():
+    """Test encoding from PNG bytes is much smaller than the source."""
+    buffer = io.BytesIO()
+    Image.effect_noise((1600, 2000), 64).convert("RGB").save(buffer, format="PNG")
+    png_bytes = buffer.getvalue()
+
+    data = encode_thumbnail(png_bytes)
+
+    assert Image.open(io.BytesIO(data)).size == (300, 375)
+    assert len(data) * 20 < len(png_bytes)
+
+
+def test_encode_thumbnail_rejects_invalid_bytes():
+    """Test undecodable bytes raise ValueError."""
+    with pytest.raises(ValueError):
+        encode_thumbnail(b"not an image")
+
+
 # ============================================================================
 # Tests for get_image_path()
 # ============================================================================